@@ -65,6 +65,14 @@ def require_admin_or_supervisor(user: User = Depends(get_current_user)) -> User:
     return user
 
 
+def require_admin(user: User = Depends(get_current_user)) -> User:
+    try:
+        require_roles(user.role, ["WAREHOUSE_ADMIN"])
+    except PermissionError:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+    return user
+
+
 def require_warehouse_staff(user: User = Depends(get_current_user)) -> User:
     try:
         require_roles(user.role, ["WAREHOUSE_ADMIN", "WAREHOUSE_SUPERVISOR", "WAREHOUSE_WORKER", "DRIVER"])
@@ -81,3 +89,8 @@ def is_client_user(user: User) -> bool:
     return user.role == ROLE_CLIENT_USER or user.client_id is not None
 
 
+def can_approve_orders(user: User) -> bool:
+    # Same roles as require_admin_or_supervisor, for routes open to all staff that approve as a side effect
+    return user.role in ("WAREHOUSE_ADMIN", "WAREHOUSE_SUPERVISOR")
+
+
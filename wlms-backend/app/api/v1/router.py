@@ -21,6 +21,7 @@ from app.api.v1.routes_returns import router as returns_router
 from app.api.v1.routes_reports import router as reports_router
 from app.api.v1.routes_audit import router as audit_router
 from app.api.v1.routes_invites import router as invites_router
+from app.api.v1.routes_license_plates import router as license_plates_router
 from app.api.v1.routes_dashboard import router as dashboard_router
 
 api_router = APIRouter()
@@ -35,6 +36,7 @@ api_router.include_router(warehouses_router)
 api_router.include_router(products_router)
 api_router.include_router(inbound_router)
 api_router.include_router(putaway_router)
+api_router.include_router(license_plates_router)
 api_router.include_router(inventory_router)
 api_router.include_router(users_router)
 api_router.include_router(outbound_router)
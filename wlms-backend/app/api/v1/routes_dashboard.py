@@ -10,11 +10,10 @@ from app.models.client import Client
 from app.models.discrepancy import DiscrepancyReport
 from app.models.inbound import InboundShipment
 from app.models.inventory import InventoryBalance
-from app.models.location import Location
+from app.models.location_occupancy import LocationOccupancy
 from app.models.outbound import OutboundOrder
 from app.models.product_batch import ProductBatch
 from app.models.user import User
-from app.models.warehouse import Warehouse
 from app.models.warehouse_zone import WarehouseZone
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
@@ -44,16 +43,14 @@ def summary(db: Session = Depends(get_db), user: User = Depends(require_admin_or
         )
     )
 
-    # Occupied pallet positions (v1 approximation): distinct STORAGE locations with on_hand > 0
+    # Occupied pallet positions: STORAGE locations holding stock (partial index on location_occupancy)
     occupied_positions = db.scalar(
-        select(func.count(func.distinct(InventoryBalance.location_id)))
-        .join(Location, InventoryBalance.location_id == Location.id)
-        .join(WarehouseZone, Location.zone_id == WarehouseZone.id)
-        .join(Warehouse, Location.warehouse_id == Warehouse.id)
-        .where(InventoryBalance.tenant_id == user.tenant_id)
-        .where(Warehouse.tenant_id == user.tenant_id)
+        select(func.count())
+        .select_from(LocationOccupancy)
+        .join(WarehouseZone, LocationOccupancy.zone_id == WarehouseZone.id)
+        .where(LocationOccupancy.tenant_id == user.tenant_id)
         .where(WarehouseZone.zone_type == "STORAGE")
-        .where(InventoryBalance.on_hand_qty > 0)
+        .where(LocationOccupancy.on_hand_qty > 0)
     )
 
     # Expiring items (count of balance rows with on_hand > 0 and expiry within X days)
@@ -15,7 +15,7 @@ from app.models.product import Product
 from app.models.user import User
 from app.models.warehouse import Warehouse
 from app.schemas.discrepancy import DiscrepancyCreate, DiscrepancyOut
-from app.services.inventory_service import LedgerCreate, add_ledger_and_apply_on_hand
+from app.services.inventory_service import LedgerCreate, apply_ledger_batch
 from app.services.audit_service import audit_log
 
 router = APIRouter(prefix="/discrepancies", tags=["discrepancies"])
@@ -143,41 +143,25 @@ def approve_discrepancy(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Not pending")
 
     # Apply adjustment if delta != 0
-    if d.delta_qty > 0:
-        add_ledger_and_apply_on_hand(
+    if d.delta_qty != 0:
+        apply_ledger_batch(
             db,
-            entry=LedgerCreate(
-                tenant_id=d.tenant_id,
-                client_id=d.client_id,
-                warehouse_id=d.warehouse_id,
-                product_id=d.product_id,
-                batch_id=d.batch_id,
-                from_location_id=None,
-                to_location_id=d.location_id,
-                qty_delta=d.delta_qty,
-                event_type="ADJUSTMENT_PLUS",
-                reference_type="DISCREPANCY",
-                reference_id=str(d.id),
-                performed_by_user_id=user.id,
-            ),
-        )
-    elif d.delta_qty < 0:
-        add_ledger_and_apply_on_hand(
-            db,
-            entry=LedgerCreate(
-                tenant_id=d.tenant_id,
-                client_id=d.client_id,
-                warehouse_id=d.warehouse_id,
-                product_id=d.product_id,
-                batch_id=d.batch_id,
-                from_location_id=d.location_id,
-                to_location_id=None,
-                qty_delta=d.delta_qty,
-                event_type="ADJUSTMENT_MINUS",
-                reference_type="DISCREPANCY",
-                reference_id=str(d.id),
-                performed_by_user_id=user.id,
-            ),
+            entries=[
+                LedgerCreate(
+                    tenant_id=d.tenant_id,
+                    client_id=d.client_id,
+                    warehouse_id=d.warehouse_id,
+                    product_id=d.product_id,
+                    batch_id=d.batch_id,
+                    from_location_id=d.location_id if d.delta_qty < 0 else None,
+                    to_location_id=d.location_id if d.delta_qty > 0 else None,
+                    qty_delta=d.delta_qty,
+                    event_type="ADJUSTMENT_PLUS" if d.delta_qty > 0 else "ADJUSTMENT_MINUS",
+                    reference_type="DISCREPANCY",
+                    reference_id=str(d.id),
+                    performed_by_user_id=user.id,
+                )
+            ],
         )
 
     d.status = "APPROVED"
@@ -10,7 +10,7 @@ from app.api.v1.deps import get_current_user
 from app.db.session import get_db
 from app.models.file import File
 from app.models.user import User
-from app.services.storage_service import load_bytes
+from app.services.document_jobs import document_response
 
 router = APIRouter(prefix="/files", tags=["files"])
 
@@ -50,6 +50,7 @@ def list_files(
             "original_name": f.original_name,
             "mime_type": f.mime_type,
             "size_bytes": f.size_bytes,
+            "status": f.status,
             "created_at": f.created_at.isoformat(),
         }
         for f in items
@@ -68,8 +69,6 @@ def download(file_id: str, db: Session = Depends(get_db), user: User = Depends(g
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
     if user.client_id is not None and f.client_id != user.client_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-
-    data = load_bytes(storage_provider=f.storage_provider, storage_key=f.storage_key)
-    return Response(content=data, media_type=f.mime_type, headers={"Content-Disposition": f'attachment; filename="{f.original_name}"'})
+    return document_response(f)
 
 
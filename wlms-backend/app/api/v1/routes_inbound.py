@@ -1,38 +1,67 @@
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File as UploadFileParam, status
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql import func
 from sqlalchemy.orm import Session
 
-from app.api.v1.deps import get_current_user, is_client_user, require_warehouse_staff
+from app.api.v1.deps import can_approve_orders, get_current_user, is_client_user, require_warehouse_staff
 from app.core.config import settings
 from app.core.rbac import ROLE_WAREHOUSE_ADMIN, ROLE_WAREHOUSE_SUPERVISOR
 from app.db.session import get_db
 from app.models.client import Client
 from app.models.inbound import InboundLine, InboundShipment
 from app.models.location import Location
-from app.models.product import Product
 from app.models.product_batch import ProductBatch
 from app.models.user import User
 from app.models.warehouse import Warehouse
 from app.models.warehouse_zone import WarehouseZone
-from app.schemas.inbound import InboundCreate, InboundLineOut, InboundOut, InboundScanLine
+from app.schemas.inbound import (
+    AsnImportOut,
+    AsnImportShipmentOut,
+    InboundCreate,
+    InboundLineOut,
+    InboundOut,
+    InboundScanBatch,
+    InboundScanBatchOut,
+    InboundScanLine,
+    InboundScanResultOut,
+    InboundVarianceLineOut,
+    InboundVarianceOut,
+)
+from app.services import product_cache
+from app.services.asn_service import (
+    import_asn,
+    inbound_variance,
+    new_reference_number,
+    parse_asn_csv,
+    parse_asn_json,
+)
 from app.services.billing_service import create_billing_event
+from app.services.crossdock_service import CrossDockResult, crossdock_inbound
 from app.models.file import File
-from app.services.document_service import render_inbound_pdf
+from app.services.document_jobs import document_language, document_response, queue_document
 from app.services.inventory_service import LedgerCreate, add_ledger_and_apply_on_hand
-from app.services.storage_service import save_bytes, load_bytes
 from app.services.audit_service import audit_log
 from app.services.notification_service import queue_inbound_received_email
+from app.services.receiving_service import ReceiveScan, receive_scans
 from app.services.uom_service import qty_to_pieces
 
 router = APIRouter(prefix="/inbound", tags=["inbound"])
 
 
-def _ref_number() -> str:
-    return f"INB-{datetime.now(timezone.utc).strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+def _crossdock_out(r: CrossDockResult | None) -> dict | None:
+    if r is None:
+        return None
+    return {
+        "orders": [str(oid) for oid in r.orders],
+        "completed": [str(oid) for oid in r.completed],
+        "units": r.units,
+        "picking_task_id": str(r.picking_task_id) if r.picking_task_id else None,
+        "approved": r.approved,
+    }
 
 
 def _to_out(i: InboundShipment) -> InboundOut:
@@ -45,6 +74,7 @@ def _to_out(i: InboundShipment) -> InboundOut:
         status=i.status,
         supplier=i.supplier,
         notes=i.notes,
+        asn_reference=i.asn_reference,
     )
 
 
@@ -98,7 +128,7 @@ def create_inbound(
         tenant_id=user.tenant_id,
         client_id=payload.client_id,
         warehouse_id=payload.warehouse_id,
-        reference_number=_ref_number(),
+        reference_number=new_reference_number(),
         status="DRAFT",
         supplier=payload.supplier,
         notes=payload.notes,
@@ -122,6 +152,86 @@ def create_inbound(
     return _to_out(inbound)
 
 
+@router.post("/asn-import", response_model=AsnImportOut, status_code=status.HTTP_201_CREATED)
+def import_asn_file(
+    client_id: str,
+    warehouse_id: str,
+    request: Request,
+    file: UploadFile = UploadFileParam(...),
+    fmt: str | None = Query(default=None, alias="format"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> AsnImportOut:
+    """
+    Bulk-create DRAFT inbound shipments from an ASN file (CSV or JSON, picked by `format` or the file name).
+    The file is parsed as a stream; shipments and expected lines are inserted set-based in one transaction.
+    """
+    try:
+        cid = uuid.UUID(client_id)
+        wid = uuid.UUID(warehouse_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid client_id/warehouse_id")
+
+    # Same rules as create_inbound: client users import for their own client only.
+    if is_client_user(user):
+        if user.client_id is None or user.client_id != cid:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+    else:
+        if user.role not in {ROLE_WAREHOUSE_ADMIN, ROLE_WAREHOUSE_SUPERVISOR}:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+
+    if db.scalar(select(Client.id).where(Client.id == cid, Client.tenant_id == user.tenant_id)) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid client_id")
+    if db.scalar(select(Warehouse.id).where(Warehouse.id == wid, Warehouse.tenant_id == user.tenant_id)) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid warehouse_id")
+
+    fmt = (fmt or ("json" if (file.filename or "").lower().endswith(".json") else "csv")).lower()
+    if fmt not in {"csv", "json"}:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid format (csv/json)")
+    errors: list[dict] = []
+    lines = parse_asn_json(file.file, errors) if fmt == "json" else parse_asn_csv(file.file, errors)
+
+    try:
+        result = import_asn(
+            db,
+            tenant_id=user.tenant_id,
+            client_id=cid,
+            warehouse_id=wid,
+            lines=lines,
+            errors=errors,
+            created_by_user_id=user.id,
+        )
+        db.flush()
+    except IntegrityError:
+        # The same ASN imported concurrently (uq_inbound_shipments_client_asn)
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="ASN already imported")
+
+    audit_log(
+        db,
+        tenant_id=user.tenant_id,
+        actor_user_id=user.id,
+        action="inbound.asn_import",
+        entity_type="Client",
+        entity_id=str(cid),
+        after={
+            "warehouse_id": str(wid),
+            "shipments": len(result.shipments),
+            "lines": result.lines,
+            "errors": len(result.errors),
+        },
+        ip_address=request.client.host if request and request.client else None,
+        user_agent=request.headers.get("user-agent") if request else None,
+    )
+    db.commit()
+    return AsnImportOut(
+        created=len(result.shipments),
+        lines=result.lines,
+        shipments=[AsnImportShipmentOut(asn_reference=ref, inbound_id=iid) for ref, iid in result.shipments],
+        errors=result.errors,
+    )
+
+
 @router.get("/{inbound_id}", response_model=InboundOut)
 def get_inbound(inbound_id: str, db: Session = Depends(get_db), user: User = Depends(get_current_user)) -> InboundOut:
     try:
@@ -140,6 +250,51 @@ def get_inbound(inbound_id: str, db: Session = Depends(get_db), user: User = Dep
     return _to_out(inbound)
 
 
+@router.get("/{inbound_id}/variance", response_model=InboundVarianceOut)
+def get_inbound_variance(
+    inbound_id: str,
+    discrepancies_only: bool = False,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> InboundVarianceOut:
+    """Received vs expected (ASN) quantities per product, computed in the database."""
+    try:
+        iid = uuid.UUID(inbound_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inbound not found")
+
+    stmt = select(InboundShipment.id).where(InboundShipment.id == iid, InboundShipment.tenant_id == user.tenant_id)
+    if is_client_user(user):
+        if user.client_id is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inbound not found")
+        stmt = stmt.where(InboundShipment.client_id == user.client_id)
+    if db.scalar(stmt) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inbound not found")
+
+    lines = inbound_variance(db, inbound_id=iid, discrepancies_only=discrepancies_only)
+    expected = sum(l.expected_qty for l in lines)
+    received = sum(l.received_qty for l in lines)
+    return InboundVarianceOut(
+        inbound_id=iid,
+        expected_qty=expected,
+        received_qty=received,
+        variance=received - expected,
+        discrepancies=sum(1 for l in lines if l.status != "MATCH"),
+        lines=[
+            InboundVarianceLineOut(
+                product_id=l.product_id,
+                sku=l.sku,
+                name=l.name,
+                expected_qty=l.expected_qty,
+                received_qty=l.received_qty,
+                variance=l.variance,
+                status=l.status,
+            )
+            for l in lines
+        ],
+    )
+
+
 @router.post("/{inbound_id}/start-receiving")
 def start_receiving(
     inbound_id: str,
@@ -201,13 +356,9 @@ def scan_line(
     if zone is None or zone.zone_type != "STAGING":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Location is not a staging zone")
 
-    # find product by barcode, scoped by tenant+client
-    product = db.scalar(
-        select(Product).where(
-            Product.tenant_id == user.tenant_id,
-            Product.client_id == inbound.client_id,
-            Product.barcode == payload.barcode,
-        )
+    # find product by barcode, scoped by tenant+client (product master-data cache)
+    product = product_cache.get_by_barcode(
+        db, tenant_id=user.tenant_id, client_id=inbound.client_id, barcode=payload.barcode
     )
     if product is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown product barcode")
@@ -293,19 +444,103 @@ def scan_line(
     return _line_out(line)
 
 
+@router.post("/{inbound_id}/scan-lines:batch", response_model=InboundScanBatchOut)
+def scan_lines_batch(
+    inbound_id: str,
+    payload: InboundScanBatch,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> InboundScanBatchOut:
+    """Receive many scans in one transaction; per-scan results, invalid scans are rejected individually."""
+    try:
+        iid = uuid.UUID(inbound_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inbound not found")
+
+    # Locked so concurrent batches for the same inbound add to its lines one after the other
+    inbound = db.scalar(
+        select(InboundShipment)
+        .where(InboundShipment.id == iid, InboundShipment.tenant_id == user.tenant_id)
+        .with_for_update()
+    )
+    if inbound is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inbound not found")
+
+    results = receive_scans(
+        db,
+        inbound=inbound,
+        scans=[
+            ReceiveScan(
+                barcode=sc.barcode,
+                qty=sc.qty,
+                location_staging_id=sc.location_staging_id,
+                uom=sc.uom,
+                batch_number=sc.batch_number,
+                expiry_date=sc.expiry_date,
+            )
+            for sc in payload.scans
+        ],
+        performed_by_user_id=user.id,
+    )
+    out = InboundScanBatchOut(
+        received=sum(r.status == "RECEIVED" for r in results),
+        rejected=sum(r.status == "REJECTED" for r in results),
+        qty_pieces=sum(r.qty_pieces for r in results),
+        results=[
+            InboundScanResultOut(
+                index=r.index,
+                status=r.status,
+                detail=r.detail,
+                product_id=r.product_id,
+                batch_id=r.batch_id,
+                line_id=r.line_id,
+                qty_pieces=r.qty_pieces,
+            )
+            for r in results
+        ],
+    )
+    if out.received:
+        # One audit row for the batch instead of one per scan
+        audit_log(
+            db,
+            tenant_id=user.tenant_id,
+            actor_user_id=user.id,
+            action="inbound.scan_batch",
+            entity_type="InboundShipment",
+            entity_id=str(inbound.id),
+            after={
+                "received": out.received,
+                "rejected": out.rejected,
+                "qty_pieces": out.qty_pieces,
+                "lines": sorted({r.line_id for r in results if r.line_id is not None}),
+            },
+            ip_address=request.client.host if request and request.client else None,
+            user_agent=request.headers.get("user-agent") if request else None,
+        )
+    db.commit()
+    return out
+
+
 @router.post("/{inbound_id}/complete")
 def complete_inbound(
     inbound_id: str,
     request: Request,
+    crossdock: bool | None = None,
     db: Session = Depends(get_db),
     user: User = Depends(require_warehouse_staff),
-) -> dict[str, str]:
+) -> dict:
     try:
         iid = uuid.UUID(inbound_id)
     except Exception:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inbound not found")
 
-    inbound = db.scalar(select(InboundShipment).where(InboundShipment.id == iid, InboundShipment.tenant_id == user.tenant_id))
+    # Locked so two concurrent completes cannot both cross-dock the same receipt
+    inbound = db.scalar(
+        select(InboundShipment)
+        .where(InboundShipment.id == iid, InboundShipment.tenant_id == user.tenant_id)
+        .with_for_update()
+    )
     if inbound is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inbound not found")
 
@@ -313,6 +548,29 @@ def complete_inbound(
     inbound.status = "RECEIVED"
     inbound.received_at = datetime.now(timezone.utc)
 
+    # Cross-dock: hand received staging stock to waiting orders before anyone puts it away.
+    xdock = None
+    if (settings.crossdock_enabled if crossdock is None else crossdock) and before_status != "RECEIVED":
+        xdock = crossdock_inbound(db, inbound=inbound, can_approve=can_approve_orders(user))
+        # One entry per order: approved (and sent to picking) for supervisors, only reserved for other staff
+        for oid in xdock.completed:
+            audit_log(
+                db,
+                tenant_id=user.tenant_id,
+                actor_user_id=user.id,
+                action="outbound.approve" if xdock.approved else "outbound.crossdock_reserve",
+                entity_type="OutboundOrder",
+                entity_id=str(oid),
+                before={"status": "SUBMITTED"},
+                after={
+                    "status": ("PICKING" if xdock.picking_task_id else "APPROVED") if xdock.approved else "SUBMITTED",
+                    "crossdock_inbound_id": str(inbound.id),
+                    "picking_task_id": str(xdock.picking_task_id) if xdock.picking_task_id else None,
+                },
+                ip_address=request.client.host if request and request.client else None,
+                user_agent=request.headers.get("user-agent") if request else None,
+            )
+
     # Billing event: inbound lines count (simple v1)
     line_count = db.scalar(select(func.count(InboundLine.id)).where(InboundLine.inbound_id == inbound.id)) or 0
     if line_count > 0:
@@ -327,31 +585,18 @@ def complete_inbound(
             event_date=inbound.received_at.date(),
         )
 
-    # Generate and store Receiving PDF (idempotent)
+    # Queue the Receiving PDF (idempotent); the document worker renders it unless it is disabled
     if inbound.receiving_pdf_file_id is None:
-        client = db.scalar(select(Client).where(Client.id == inbound.client_id, Client.tenant_id == user.tenant_id))
-        lang = (client.preferred_language if client else None) or user.language_pref or "en"
-        lines = db.scalars(select(InboundLine).where(InboundLine.inbound_id == inbound.id)).all()
-        pdf = render_inbound_pdf(
-            inbound_id=str(inbound.id),
-            reference_number=inbound.reference_number,
-            lines=[{"product_id": str(l.product_id), "received_qty": l.received_qty} for l in lines],
-            language=lang,
-        )
-        key, size = save_bytes(data=pdf, filename=f"receiving_{inbound.id}.pdf")
-        f = File(
+        f = queue_document(
+            db,
             tenant_id=user.tenant_id,
             client_id=inbound.client_id,
             file_type="RECEIVING_PDF",
-            storage_provider=settings.file_storage_provider,
-            storage_key=key,
+            reference_id=inbound.id,
             original_name=f"receiving_{inbound.reference_number}.pdf",
-            mime_type="application/pdf",
-            size_bytes=size,
+            language=document_language(db, tenant_id=user.tenant_id, client_id=inbound.client_id, user=user),
             created_by_user_id=user.id,
         )
-        db.add(f)
-        db.flush()
         inbound.receiving_pdf_file_id = f.id
 
     audit_log(
@@ -365,6 +610,7 @@ def complete_inbound(
         after={
             "status": inbound.status,
             "receiving_pdf_file_id": str(inbound.receiving_pdf_file_id) if inbound.receiving_pdf_file_id else None,
+            "crossdock": _crossdock_out(xdock),
         },
         ip_address=request.client.host if request and request.client else None,
         user_agent=request.headers.get("user-agent") if request else None,
@@ -381,7 +627,10 @@ def complete_inbound(
                     language=r.language_pref or "en",
                 )
     db.commit()
-    return {"status": "ok"}
+    out: dict = {"status": "ok"}
+    if xdock is not None:
+        out["crossdock"] = _crossdock_out(xdock)
+    return out
 
 
 @router.get("/{inbound_id}/document")
@@ -405,9 +654,6 @@ def get_inbound_document(
     f = db.scalar(select(File).where(File.id == inbound.receiving_pdf_file_id, File.tenant_id == user.tenant_id))
     if f is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
-    data = load_bytes(storage_provider=f.storage_provider, storage_key=f.storage_key)
-    from fastapi import Response
-
-    return Response(content=data, media_type=f.mime_type, headers={"Content-Disposition": f'attachment; filename="{f.original_name}"'})
+    return document_response(f)
 
 
@@ -1,27 +1,91 @@
 import uuid
-from datetime import date
+from datetime import date, datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.v1.deps import get_current_user, is_client_user
+from app.api.v1.deps import get_current_user, is_client_user, require_admin
 from app.db.session import get_db
 from app.models.inventory import InventoryBalance, InventoryLedger
+from app.models.inventory_availability import InventoryAvailability
 from app.models.location import Location
 from app.models.product import Product
 from app.models.product_batch import ProductBatch
 from app.models.warehouse import Warehouse
 from app.models.user import User
-from app.schemas.inventory import InventoryBalanceOut
+from app.schemas.inventory import InventoryBalanceAsOfOut, InventoryBalanceOut, StockLevelOut
 from app.schemas.inventory_moves import InventoryLedgerOut, InventoryTransfer
+from app.services.availability_service import rebuild_availability
+from app.services.checkpoint_service import StockScope, on_hand_as_of
 from app.services.inventory_service import move_on_hand
+from app.services.ledger_partition_service import ledger_time_bounds
 from app.services.audit_service import audit_log
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
 
-@router.get("/balances", response_model=list[InventoryBalanceOut])
+def _parse_uuid(value: str | None, field: str) -> uuid.UUID | None:
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {field}")
+
+
+def _balances_as_of(
+    db: Session,
+    *,
+    user: User,
+    as_of: str,
+    client_id: str | None,
+    warehouse_id: str | None,
+    product_id: str | None,
+    location_id: str | None,
+    unsupported: bool,
+) -> list[InventoryBalanceAsOfOut]:
+    """Point-in-time on-hand, replayed from the nearest checkpoint or from current balances."""
+    if unsupported:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="as_of cannot be combined with expiry/category filters"
+        )
+    try:
+        ts = datetime.fromisoformat(as_of)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid as_of")
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+
+    if is_client_user(user):
+        if user.client_id is None:
+            return []
+        cid = user.client_id
+    else:
+        cid = _parse_uuid(client_id, "client_id")
+    scope = StockScope(
+        tenant_id=user.tenant_id,
+        client_id=cid,
+        warehouse_id=_parse_uuid(warehouse_id, "warehouse_id"),
+        product_id=_parse_uuid(product_id, "product_id"),
+        location_id=_parse_uuid(location_id, "location_id"),
+    )
+    rows = on_hand_as_of(db, scope=scope, as_of=ts)
+    return [
+        InventoryBalanceAsOfOut(
+            as_of=ts,
+            client_id=client_k,
+            warehouse_id=wh_k,
+            location_id=loc_k,
+            product_id=prod_k,
+            batch_id=batch_k,
+            on_hand_qty=qty,
+        )
+        for (client_k, wh_k, loc_k, prod_k, batch_k), qty in sorted(rows.items(), key=lambda kv: str(kv[0]))
+    ]
+
+
+@router.get("/balances", response_model=list[InventoryBalanceOut] | list[InventoryBalanceAsOfOut])
 def list_balances(
     client_id: str | None = Query(default=None),
     warehouse_id: str | None = Query(default=None),
@@ -30,9 +94,22 @@ def list_balances(
     expiry_after: str | None = Query(default=None),
     expiry_before: str | None = Query(default=None),
     product_category: str | None = Query(default=None),
+    as_of: str | None = Query(default=None),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
-) -> list[InventoryBalanceOut]:
+) -> list[InventoryBalanceOut] | list[InventoryBalanceAsOfOut]:
+    if as_of:
+        return _balances_as_of(
+            db,
+            user=user,
+            as_of=as_of,
+            client_id=client_id,
+            warehouse_id=warehouse_id,
+            product_id=product_id,
+            location_id=location_id,
+            unsupported=bool(expiry_after or expiry_before or product_category),
+        )
+
     stmt = select(InventoryBalance).where(InventoryBalance.tenant_id == user.tenant_id)
 
     if is_client_user(user):
@@ -103,13 +180,59 @@ def list_balances(
     ]
 
 
+@router.get("/stock-levels", response_model=list[StockLevelOut])
+def list_stock_levels(
+    client_id: str | None = Query(default=None),
+    warehouse_id: str | None = Query(default=None),
+    product_id: str | None = Query(default=None),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> list[StockLevelOut]:
+    """Stock per SKU from the availability summary (no balance scan)."""
+    stmt = select(InventoryAvailability).where(InventoryAvailability.tenant_id == user.tenant_id)
+    if is_client_user(user):
+        if user.client_id is None:
+            return []
+        stmt = stmt.where(InventoryAvailability.client_id == user.client_id)
+    elif client_id:
+        stmt = stmt.where(InventoryAvailability.client_id == _parse_uuid(client_id, "client_id"))
+    if warehouse_id:
+        stmt = stmt.where(InventoryAvailability.warehouse_id == _parse_uuid(warehouse_id, "warehouse_id"))
+    if product_id:
+        stmt = stmt.where(InventoryAvailability.product_id == _parse_uuid(product_id, "product_id"))
+
+    return [
+        StockLevelOut(
+            client_id=a.client_id,
+            warehouse_id=a.warehouse_id,
+            product_id=a.product_id,
+            pickable_on_hand_qty=a.pickable_on_hand_qty,
+            pickable_reserved_qty=a.pickable_reserved_qty,
+            pickable_available_qty=a.pickable_available_qty,
+            staging_on_hand_qty=a.staging_on_hand_qty,
+            staging_reserved_qty=a.staging_reserved_qty,
+            staging_available_qty=a.staging_available_qty,
+        )
+        for a in db.scalars(stmt).all()
+    ]
+
+
 @router.get("/movements", response_model=list[InventoryLedgerOut])
 def list_movements(
     limit: int = Query(default=200, ge=1, le=2000),
+    date_from: str | None = Query(default=None),
+    date_to: str | None = Query(default=None),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ) -> list[InventoryLedgerOut]:
-    stmt = select(InventoryLedger).where(InventoryLedger.tenant_id == user.tenant_id).order_by(InventoryLedger.created_at.desc()).limit(limit)
+    start, end = ledger_time_bounds(date_from=date_from, date_to=date_to)
+    stmt = (
+        select(InventoryLedger)
+        .where(InventoryLedger.tenant_id == user.tenant_id)
+        .where(InventoryLedger.created_at >= start, InventoryLedger.created_at < end)
+        .order_by(InventoryLedger.created_at.desc())
+        .limit(limit)
+    )
     if is_client_user(user) and user.client_id is not None:
         stmt = stmt.where(InventoryLedger.client_id == user.client_id)
     rows = db.scalars(stmt).all()
@@ -200,3 +323,24 @@ def transfer(
     return {"status": "ok"}
 
 
+@router.post("/availability/rebuild")
+def rebuild_availability_summary(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin),
+) -> dict[str, int]:
+    """Repair job: recompute this tenant's availability summary from inventory balances."""
+    rows = rebuild_availability(db, tenant_id=user.tenant_id)
+    audit_log(
+        db,
+        tenant_id=user.tenant_id,
+        actor_user_id=user.id,
+        action="inventory.availability_rebuild",
+        entity_type="InventoryAvailability",
+        entity_id=str(user.tenant_id),
+        after={"rows": rows},
+        ip_address=request.client.host if request and request.client else None,
+        user_agent=request.headers.get("user-agent") if request else None,
+    )
+    db.commit()
+    return {"rows": rows}
@@ -0,0 +1,240 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import require_warehouse_staff
+from app.db.session import get_db
+from app.models.license_plate import LicensePlate, LicensePlateMove
+from app.models.outbound import OutboundOrder
+from app.models.user import User
+from app.schemas.license_plate import (
+    LicensePlateCreate,
+    LicensePlateDispatchIn,
+    LicensePlateItemOut,
+    LicensePlateItemsAdd,
+    LicensePlateMoveIn,
+    LicensePlateMoveOut,
+    LicensePlateOut,
+)
+from app.services.audit_service import audit_log
+from app.services.billing_service import create_billing_event
+from app.services.document_jobs import document_language, queue_document
+from app.services.license_plate_service import (
+    PlateItem,
+    add_items,
+    create_license_plate,
+    dispatch_license_plate,
+    get_license_plate,
+    move_license_plate,
+    plate_items,
+    unpack,
+)
+
+router = APIRouter(prefix="/license-plates", tags=["license-plates"])
+
+
+def _to_out(db: Session, plate: LicensePlate) -> LicensePlateOut:
+    return LicensePlateOut(
+        id=plate.id,
+        code=plate.code,
+        client_id=plate.client_id,
+        warehouse_id=plate.warehouse_id,
+        location_id=plate.location_id,
+        status=plate.status,
+        items=[
+            LicensePlateItemOut(product_id=it.product_id, batch_id=it.batch_id, qty=it.qty)
+            for it in plate_items(db, plate=plate)
+        ],
+    )
+
+
+def _move_out(move: LicensePlateMove) -> LicensePlateMoveOut:
+    return LicensePlateMoveOut(
+        id=move.id,
+        license_plate_id=move.license_plate_id,
+        from_location_id=move.from_location_id,
+        to_location_id=move.to_location_id,
+        event_type=move.event_type,
+        lines=move.lines,
+        units=move.units,
+        outbound_id=move.outbound_id,
+        created_at=move.created_at,
+    )
+
+
+def _audit(db: Session, request: Request, user: User, *, action: str, plate: LicensePlate, after: dict) -> None:
+    audit_log(
+        db,
+        tenant_id=user.tenant_id,
+        actor_user_id=user.id,
+        action=action,
+        entity_type="LicensePlate",
+        entity_id=str(plate.id),
+        after={"code": plate.code, **after},
+        ip_address=request.client.host if request and request.client else None,
+        user_agent=request.headers.get("user-agent") if request else None,
+    )
+
+
+@router.post("", response_model=LicensePlateOut, status_code=status.HTTP_201_CREATED)
+def create_plate(
+    payload: LicensePlateCreate,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> LicensePlateOut:
+    plate = create_license_plate(
+        db, tenant_id=user.tenant_id, client_id=payload.client_id, location_id=payload.location_id, code=payload.code
+    )
+    _audit(db, request, user, action="license_plates.create", plate=plate, after={"location_id": str(plate.location_id)})
+    db.commit()
+    return _to_out(db, plate)
+
+
+@router.get("/{code}", response_model=LicensePlateOut)
+def get_plate(code: str, db: Session = Depends(get_db), user: User = Depends(require_warehouse_staff)) -> LicensePlateOut:
+    return _to_out(db, get_license_plate(db, tenant_id=user.tenant_id, code=code))
+
+
+@router.post("/{code}/items", response_model=LicensePlateOut)
+def add_plate_items(
+    code: str,
+    payload: LicensePlateItemsAdd,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> LicensePlateOut:
+    plate = get_license_plate(db, tenant_id=user.tenant_id, code=code, lock=True)
+    add_items(
+        db,
+        plate=plate,
+        items=[PlateItem(product_id=i.product_id, batch_id=i.batch_id, qty=i.qty) for i in payload.items],
+    )
+    _audit(
+        db,
+        request,
+        user,
+        action="license_plates.add_items",
+        plate=plate,
+        after={"lines": len(payload.items), "units": sum(i.qty for i in payload.items)},
+    )
+    db.commit()
+    return _to_out(db, plate)
+
+
+@router.post("/{code}/unpack", response_model=LicensePlateOut)
+def unpack_plate(
+    code: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> LicensePlateOut:
+    plate = get_license_plate(db, tenant_id=user.tenant_id, code=code, lock=True)
+    removed = unpack(db, plate=plate)
+    _audit(db, request, user, action="license_plates.unpack", plate=plate, after={"lines": removed})
+    db.commit()
+    return _to_out(db, plate)
+
+
+@router.post("/{code}/move", response_model=LicensePlateMoveOut)
+def move_plate(
+    code: str,
+    payload: LicensePlateMoveIn,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> LicensePlateMoveOut:
+    """Put-away or transfer a whole plate with one scan (fixed statement count regardless of SKUs on it)."""
+    plate = get_license_plate(db, tenant_id=user.tenant_id, code=code, lock=True)
+    move = move_license_plate(db, plate=plate, to_location_id=payload.to_location_id, performed_by_user_id=user.id)
+    _audit(
+        db,
+        request,
+        user,
+        action="license_plates.move",
+        plate=plate,
+        after={
+            "move_id": str(move.id),
+            "event_type": move.event_type,
+            "from_location_id": str(move.from_location_id),
+            "to_location_id": str(move.to_location_id),
+        },
+    )
+    db.commit()
+    db.refresh(move)
+    return _move_out(move)
+
+
+@router.post("/{code}/dispatch", response_model=LicensePlateMoveOut)
+def dispatch_plate(
+    code: str,
+    payload: LicensePlateDispatchIn,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> LicensePlateMoveOut:
+    """Ship a whole plate against an APPROVED outbound order whose reservations at the plate's location cover it."""
+    o = db.scalar(
+        select(OutboundOrder)
+        .where(OutboundOrder.id == payload.outbound_id, OutboundOrder.tenant_id == user.tenant_id)
+        .with_for_update()
+    )
+    if o is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outbound not found")
+    plate = get_license_plate(db, tenant_id=user.tenant_id, code=code, lock=True)
+    before_status = o.status
+    move = dispatch_license_plate(db, plate=plate, order=o, performed_by_user_id=user.id)
+    _audit(
+        db,
+        request,
+        user,
+        action="license_plates.dispatch",
+        plate=plate,
+        after={
+            "move_id": str(move.id),
+            "outbound_id": str(o.id),
+            "from_location_id": str(move.from_location_id),
+            "units": move.units,
+        },
+    )
+    if o.status == "DISPATCHED":
+        # Same records as dispatch_confirm: dispatch billing event, dispatch note, order audit.
+        o.dispatch_pdf_file_id = o.dispatch_pdf_file_id or queue_document(
+            db,
+            tenant_id=user.tenant_id,
+            client_id=o.client_id,
+            file_type="DISPATCH_PDF",
+            reference_id=o.id,
+            original_name=f"dispatch_{o.order_number}.pdf",
+            language=document_language(db, tenant_id=user.tenant_id, client_id=o.client_id, user=user),
+            created_by_user_id=user.id,
+        ).id
+        audit_log(
+            db,
+            tenant_id=user.tenant_id,
+            actor_user_id=user.id,
+            action="dispatch.confirm",
+            entity_type="OutboundOrder",
+            entity_id=str(o.id),
+            before={"status": before_status},
+            after={
+                "status": o.status,
+                "dispatch_pdf_file_id": str(o.dispatch_pdf_file_id),
+                "license_plate": plate.code,
+            },
+            ip_address=request.client.host if request and request.client else None,
+            user_agent=request.headers.get("user-agent") if request else None,
+        )
+        create_billing_event(
+            db,
+            client_id=o.client_id,
+            warehouse_id=o.warehouse_id,
+            event_type="DISPATCH_ORDER",
+            quantity=1,
+            reference_type="OUTBOUND",
+            reference_id=str(o.id),
+            event_date=o.dispatched_at.date(),
+        )
+    db.commit()
+    db.refresh(move)
+    return _move_out(move)
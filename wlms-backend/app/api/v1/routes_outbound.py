@@ -1,33 +1,51 @@
 import uuid
-from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File as UploadFileParam, status
 from sqlalchemy import select
-from sqlalchemy.sql import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.api.v1.deps import get_current_user, is_client_user, require_admin_or_supervisor
+from app.api.v1.deps import get_current_user, is_client_user, require_admin, require_admin_or_supervisor
+from app.core.config import settings
+from app.db.retry import run_with_retry
 from app.db.session import get_db
 from app.models.client import Client
-from app.models.inventory import InventoryBalance
-from app.models.location import Location
 from app.models.outbound import OutboundLine, OutboundOrder
 from app.models.product import Product
 from app.models.user import User
 from app.models.warehouse import Warehouse
-from app.models.warehouse_zone import WarehouseZone
-from app.schemas.outbound import OutboundCreate, OutboundLineOut, OutboundOut
-from app.services.reservation_service import reserve_for_outbound_line
+from app.schemas.outbound import (
+    OutboundCreate,
+    OutboundImportOut,
+    OutboundImportResultOut,
+    OutboundLineOut,
+    OutboundOut,
+    OutboundWaveReserve,
+    OutboundWaveReserveOut,
+    ReservationReleaseExpiredBody,
+)
+from app.services.reservation_service import (
+    RELEASABLE_STATUSES,
+    ReleaseResult,
+    WaveResult,
+    release_expired_reservations,
+    release_order_reservations,
+    reserve_for_outbound,
+    reserve_wave,
+)
 from app.services.audit_service import audit_log
+from app.services.availability_service import pickable_available
+from app.services.outbound_import_service import (
+    import_orders,
+    new_order_number,
+    parse_orders_csv,
+    parse_orders_ndjson,
+)
 from app.services.uom_service import qty_to_pieces
 
 router = APIRouter(prefix="/outbound", tags=["outbound"])
 
 
-def _order_number() -> str:
-    return f"OUT-{datetime.now(timezone.utc).strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
-
-
 def _to_out(o: OutboundOrder) -> OutboundOut:
     return OutboundOut(
         id=o.id,
@@ -38,6 +56,7 @@ def _to_out(o: OutboundOrder) -> OutboundOut:
         status=o.status,
         destination_json=o.destination_json,
         requested_ship_date=o.requested_ship_date,
+        external_reference=o.external_reference,
     )
 
 
@@ -100,7 +119,7 @@ def create_outbound(
         tenant_id=user.tenant_id,
         client_id=payload.client_id,
         warehouse_id=payload.warehouse_id,
-        order_number=_order_number(),
+        order_number=new_order_number(),
         status="SUBMITTED" if is_client_user(user) else "DRAFT",
         destination_json=payload.destination.model_dump(),
         requested_ship_date=payload.requested_ship_date,
@@ -110,6 +129,13 @@ def create_outbound(
     db.add(o)
     db.flush()
 
+    available = pickable_available(
+        db,
+        tenant_id=user.tenant_id,
+        client_id=payload.client_id,
+        warehouse_id=payload.warehouse_id,
+        product_ids=list({ln.product_id for ln in payload.lines}),
+    )
     for ln in payload.lines:
         p = db.scalar(
             select(Product).where(Product.id == ln.product_id, Product.tenant_id == user.tenant_id, Product.client_id == payload.client_id)
@@ -119,19 +145,8 @@ def create_outbound(
         qty_pieces = qty_to_pieces(product=p, qty=ln.qty, uom=ln.uom or "piece")
 
         # Enforce "cannot request more than available" (v1 no backorders):
-        # Sum available across non-STAGING locations in this warehouse.
-        available_sum = db.scalar(
-            select(func.coalesce(func.sum(InventoryBalance.available_qty), 0))
-            .select_from(InventoryBalance)
-            .join(Location, InventoryBalance.location_id == Location.id)
-            .join(WarehouseZone, Location.zone_id == WarehouseZone.id)
-            .where(InventoryBalance.tenant_id == user.tenant_id)
-            .where(InventoryBalance.client_id == payload.client_id)
-            .where(InventoryBalance.warehouse_id == payload.warehouse_id)
-            .where(InventoryBalance.product_id == ln.product_id)
-            .where(WarehouseZone.zone_type != "STAGING")
-        )
-        if (available_sum or 0) < qty_pieces:
+        # available across non-STAGING locations in this warehouse (availability summary).
+        if available[ln.product_id] < qty_pieces:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Insufficient available stock")
 
         db.add(
@@ -161,6 +176,88 @@ def create_outbound(
     return _to_out(o)
 
 
+@router.post("/import", response_model=OutboundImportOut)
+def import_outbound(
+    client_id: str,
+    warehouse_id: str,
+    request: Request,
+    file: UploadFile = UploadFileParam(...),
+    fmt: str | None = Query(default=None, alias="format"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> OutboundImportOut:
+    """
+    Bulk order ingest (marketplace batches): NDJSON (one order per line) or CSV (one row per order line),
+    picked by `format` or the file name. Each order is CREATED or REJECTED on its own; one commit for all.
+    """
+    try:
+        cid = uuid.UUID(client_id)
+        wid = uuid.UUID(warehouse_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid client_id/warehouse_id")
+
+    # Client users can only create for their own client
+    if is_client_user(user):
+        if user.client_id is None or user.client_id != cid:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+
+    if db.scalar(select(Client.id).where(Client.id == cid, Client.tenant_id == user.tenant_id)) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid client_id")
+    if db.scalar(select(Warehouse.id).where(Warehouse.id == wid, Warehouse.tenant_id == user.tenant_id)) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid warehouse_id")
+
+    name = (file.filename or "").lower()
+    fmt = (fmt or ("ndjson" if name.endswith((".ndjson", ".jsonl")) else "csv")).lower()
+    if fmt not in {"csv", "ndjson"}:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid format (csv/ndjson)")
+    orders = parse_orders_ndjson(file.file) if fmt == "ndjson" else parse_orders_csv(file.file)
+
+    try:
+        results = import_orders(
+            db,
+            tenant_id=user.tenant_id,
+            client_id=cid,
+            warehouse_id=wid,
+            orders=orders,
+            order_status="SUBMITTED" if is_client_user(user) else "DRAFT",
+            created_by_user_id=user.id,
+        )
+        db.flush()
+    except IntegrityError:
+        # The same marketplace orders imported concurrently (uq_outbound_orders_client_external_ref)
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Orders already imported")
+
+    created = sum(1 for r in results if r.status == "CREATED")
+    audit_log(
+        db,
+        tenant_id=user.tenant_id,
+        actor_user_id=user.id,
+        action="outbound.import",
+        entity_type="Client",
+        entity_id=str(cid),
+        after={"warehouse_id": str(wid), "format": fmt, "created": created, "rejected": len(results) - created},
+        ip_address=request.client.host if request and request.client else None,
+        user_agent=request.headers.get("user-agent") if request else None,
+    )
+    db.commit()
+    return OutboundImportOut(
+        created=created,
+        rejected=len(results) - created,
+        results=[
+            OutboundImportResultOut(
+                row=r.row,
+                order_ref=r.order_ref,
+                status=r.status,
+                detail=r.detail,
+                outbound_id=r.outbound_id,
+                order_number=r.order_number,
+            )
+            for r in results
+        ],
+    )
+
+
 @router.get("/{outbound_id}", response_model=OutboundOut)
 def get_outbound(outbound_id: str, db: Session = Depends(get_db), user: User = Depends(get_current_user)) -> OutboundOut:
     try:
@@ -210,43 +307,172 @@ def approve_outbound(
     except Exception:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outbound not found")
 
-    o = db.scalar(select(OutboundOrder).where(OutboundOrder.id == oid, OutboundOrder.tenant_id == user.tenant_id))
-    if o is None:
+    # Reservation locks balances; a concurrent approver can still deadlock/serialize against us,
+    # in which case the whole approval is replayed from a fresh transaction.
+    def _approve() -> None:
+        o = db.scalar(
+            select(OutboundOrder).where(OutboundOrder.id == oid, OutboundOrder.tenant_id == user.tenant_id).with_for_update()
+        )
+        if o is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outbound not found")
+        if o.status not in {"SUBMITTED", "DRAFT"}:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Outbound not approvable")
+
+        lines = db.scalars(select(OutboundLine).where(OutboundLine.outbound_id == o.id)).all()
+        reserve_for_outbound(db, order=o, lines=lines)
+
+        before_status = o.status
+        o.status = "APPROVED"
+        audit_log(
+            db,
+            tenant_id=user.tenant_id,
+            actor_user_id=user.id,
+            action="outbound.approve",
+            entity_type="OutboundOrder",
+            entity_id=str(o.id),
+            before={"status": before_status},
+            after={"status": o.status},
+            ip_address=request.client.host if request and request.client else None,
+            user_agent=request.headers.get("user-agent") if request else None,
+        )
+        db.commit()
+
+    run_with_retry(db, _approve)
+    return {"status": "ok"}
+
+
+@router.post("/waves/reserve", response_model=OutboundWaveReserveOut)
+def reserve_outbound_wave(
+    payload: OutboundWaveReserve,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin_or_supervisor),
+) -> OutboundWaveReserveOut:
+    """Approve a batch of orders in one transaction; fully allocated orders become APPROVED."""
+    wave_id = uuid.uuid4()
+    result: WaveResult | None = None
+
+    def _reserve() -> None:
+        nonlocal result
+        result = reserve_wave(
+            db,
+            tenant_id=user.tenant_id,
+            outbound_ids=payload.outbound_ids,
+            sort=payload.sort,
+            allow_partial=payload.allow_partial,
+        )
+        audit_log(
+            db,
+            tenant_id=user.tenant_id,
+            actor_user_id=user.id,
+            action="outbound.wave_reserve",
+            entity_type="OutboundWave",
+            entity_id=str(wave_id),
+            before=None,
+            after={
+                "sort": payload.sort,
+                "allow_partial": payload.allow_partial,
+                "fully_allocated": [str(i) for i in result.fully_allocated],
+                "partially_allocated": [str(i) for i in result.partially_allocated],
+                "not_allocated": [str(i) for i in result.not_allocated],
+            },
+            ip_address=request.client.host if request and request.client else None,
+            user_agent=request.headers.get("user-agent") if request else None,
+        )
+        db.commit()
+
+    run_with_retry(db, _reserve)
+    assert result is not None
+    return OutboundWaveReserveOut(
+        wave_id=wave_id,
+        fully_allocated=result.fully_allocated,
+        partially_allocated=result.partially_allocated,
+        not_allocated=result.not_allocated,
+        skipped=result.skipped,
+        reservations=len(result.reservations),
+    )
+
+
+@router.post("/{outbound_id}/cancel")
+def cancel_outbound(
+    outbound_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin_or_supervisor),
+) -> dict[str, object]:
+    try:
+        oid = uuid.UUID(outbound_id)
+    except Exception:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outbound not found")
-    if o.status not in {"SUBMITTED", "DRAFT"}:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Outbound not approvable")
-
-    lines = db.scalars(select(OutboundLine).where(OutboundLine.outbound_id == o.id)).all()
-    for l in lines:
-        remaining = l.requested_qty - l.reserved_qty
-        if remaining <= 0:
-            continue
-        reserve_for_outbound_line(
+
+    released_qty = 0
+
+    def _cancel() -> None:
+        nonlocal released_qty
+        o = db.scalar(
+            select(OutboundOrder).where(OutboundOrder.id == oid, OutboundOrder.tenant_id == user.tenant_id).with_for_update()
+        )
+        if o is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outbound not found")
+        if o.status not in RELEASABLE_STATUSES:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Outbound not cancellable")
+
+        released_qty = release_order_reservations(db, orders=[o]).qty
+        before_status = o.status
+        o.status = "CANCELLED"
+        audit_log(
             db,
-            tenant_id=o.tenant_id,
-            outbound_id=o.id,
-            client_id=o.client_id,
-            warehouse_id=o.warehouse_id,
-            product_id=l.product_id,
-            qty=remaining,
+            tenant_id=user.tenant_id,
+            actor_user_id=user.id,
+            action="outbound.cancel",
+            entity_type="OutboundOrder",
+            entity_id=str(o.id),
+            before={"status": before_status},
+            after={"status": o.status, "released_qty": released_qty},
+            ip_address=request.client.host if request and request.client else None,
+            user_agent=request.headers.get("user-agent") if request else None,
         )
-        l.reserved_qty += remaining
+        db.commit()
+
+    run_with_retry(db, _cancel)
+    return {"status": "ok", "released_qty": released_qty}
+
+
+@router.post("/reservations/release-expired")
+def release_expired(
+    payload: ReservationReleaseExpiredBody,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin),
+) -> dict[str, int]:
+    """Background job (run e.g. every few minutes): release reservations past their TTL, batch by batch."""
+    batch_size = payload.batch_size or settings.reservation_release_batch_size
+    results: list[ReleaseResult] = []
+
+    # One transaction per batch keeps lock time short; a batch that deadlocks with an approval is replayed.
+    def _batch() -> None:
+        result = release_expired_reservations(db, tenant_id=user.tenant_id, limit=batch_size)
+        db.commit()
+        results.append(result)
+
+    while True:
+        run_with_retry(db, _batch)
+        if len(results[-1].outbound_ids) < batch_size:
+            break
+    orders = sum(len(r.outbound_ids) for r in results)
+    reservations = sum(r.reservations for r in results)
+    qty = sum(r.qty for r in results)
 
-    before_status = o.status
-    o.status = "APPROVED"
     audit_log(
         db,
         tenant_id=user.tenant_id,
         actor_user_id=user.id,
-        action="outbound.approve",
-        entity_type="OutboundOrder",
-        entity_id=str(o.id),
-        before={"status": before_status},
-        after={"status": o.status},
+        action="outbound.reservations_release_expired",
+        entity_type="InventoryReservation",
+        entity_id="expired",
+        after={"orders": orders, "reservations": reservations, "qty": qty},
         ip_address=request.client.host if request and request.client else None,
         user_agent=request.headers.get("user-agent") if request else None,
     )
     db.commit()
-    return {"status": "ok"}
-
-
+    return {"orders": orders, "reservations": reservations, "qty": qty}
@@ -1,19 +1,18 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.api.v1.deps import require_admin_or_supervisor
+from app.core.config import settings
 from app.db.session import get_db
-from app.models.inventory_reservation import InventoryReservation
-from app.models.location import Location
 from app.models.outbound import OutboundOrder
-from app.models.picking import PickingTask, PickingTaskLine
-from app.models.product_batch import ProductBatch
-from app.models.warehouse_zone import WarehouseZone
+from app.models.picking import PickingTaskOrder
 from app.models.user import User
+from app.schemas.picking import PickWaveCreate, PickWaveOrderOut, PickWaveOut
 from app.services.audit_service import audit_log
+from app.services.picking_service import create_pick_wave, create_picking_task, create_zone_picking_tasks
 
 router = APIRouter(prefix="/outbound", tags=["outbound"])
 
@@ -22,6 +21,7 @@ router = APIRouter(prefix="/outbound", tags=["outbound"])
 def generate_picks(
     outbound_id: str,
     request: Request,
+    split_zones: bool | None = Query(default=None),
     db: Session = Depends(get_db),
     user: User = Depends(require_admin_or_supervisor),
 ) -> dict[str, str]:
@@ -30,49 +30,24 @@ def generate_picks(
     except Exception:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outbound not found")
 
-    o = db.scalar(select(OutboundOrder).where(OutboundOrder.id == oid, OutboundOrder.tenant_id == user.tenant_id))
+    # Locked so the reservation sweeper cannot release this order while its picks are generated
+    o = db.scalar(
+        select(OutboundOrder).where(OutboundOrder.id == oid, OutboundOrder.tenant_id == user.tenant_id).with_for_update()
+    )
     if o is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outbound not found")
     if o.status != "APPROVED":
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Outbound not approved")
 
-    existing = db.scalar(select(PickingTask).where(PickingTask.outbound_id == o.id))
+    existing = db.scalar(select(PickingTaskOrder.id).where(PickingTaskOrder.outbound_id == o.id).limit(1))
     if existing is not None:
         return {"status": "ok"}
 
-    # Route/group + FEFO ordering: prefer earlier-expiring batches, then zone/location code
-    reservations = db.scalars(
-        select(InventoryReservation)
-        .join(Location, InventoryReservation.location_id == Location.id)
-        .join(WarehouseZone, Location.zone_id == WarehouseZone.id)
-        .outerjoin(ProductBatch, InventoryReservation.batch_id == ProductBatch.id)
-        .where(InventoryReservation.outbound_id == o.id)
-        .order_by(
-            ProductBatch.expiry_date.asc().nulls_last(),
-            WarehouseZone.zone_type.asc(),
-            Location.code.asc(),
-        )
-    ).all()
-    if not reservations:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="No reservations to pick")
-
-    task = PickingTask(outbound_id=o.id, assigned_to_user_id=None, status="OPEN")
-    db.add(task)
-    db.flush()
-
-    for r in reservations:
-        db.add(
-            PickingTaskLine(
-                picking_task_id=task.id,
-                product_id=r.product_id,
-                batch_id=r.batch_id,
-                from_location_id=r.location_id,
-                qty_to_pick=r.qty_reserved,
-                qty_picked=0,
-            )
-        )
-
-    o.status = "PICKING"
+    # Batches were chosen FEFO at reservation time; the task only decides the walking order.
+    if settings.pick_split_by_zone if split_zones is None else split_zones:
+        tasks = create_zone_picking_tasks(db, tenant_id=user.tenant_id, order=o)
+    else:
+        tasks = [create_picking_task(db, tenant_id=user.tenant_id, orders=[o], totes=[None])]
     audit_log(
         db,
         tenant_id=user.tenant_id,
@@ -80,7 +55,7 @@ def generate_picks(
         action="outbound.generate_picks",
         entity_type="OutboundOrder",
         entity_id=str(o.id),
-        after={"status": o.status, "picking_task_id": str(task.id)},
+        after={"status": o.status, "picking_task_ids": [str(t.id) for t in tasks]},
         ip_address=request.client.host if request and request.client else None,
         user_agent=request.headers.get("user-agent") if request else None,
     )
@@ -88,3 +63,35 @@ def generate_picks(
     return {"status": "ok"}
 
 
+@router.post("/pick-waves", response_model=PickWaveOut, status_code=status.HTTP_201_CREATED)
+def create_wave(
+    payload: PickWaveCreate,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin_or_supervisor),
+) -> PickWaveOut:
+    """Cluster picking: one task (merged lines, one tote per order) for several approved orders."""
+    task, totes = create_pick_wave(
+        db,
+        tenant_id=user.tenant_id,
+        outbound_ids=payload.outbound_ids,
+        totes=payload.tote_codes,
+    )
+    lines = len(task.lines)
+    audit_log(
+        db,
+        tenant_id=user.tenant_id,
+        actor_user_id=user.id,
+        action="outbound.pick_wave_create",
+        entity_type="PickingTask",
+        entity_id=str(task.id),
+        after={"orders": {str(oid): tote for oid, tote in totes}, "lines": lines},
+        ip_address=request.client.host if request and request.client else None,
+        user_agent=request.headers.get("user-agent") if request else None,
+    )
+    db.commit()
+    return PickWaveOut(
+        task_id=task.id,
+        orders=[PickWaveOrderOut(outbound_id=oid, tote_code=tote) for oid, tote in totes],
+        lines=lines,
+    )
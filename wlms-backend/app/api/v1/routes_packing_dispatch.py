@@ -12,15 +12,12 @@ from app.db.session import get_db
 from app.models.inventory import InventoryLedger
 from app.models.location import Location
 from app.models.outbound import OutboundOrder
-from app.models.picking import PickingTask
 from app.models.user import User
 from app.models.file import File
-from app.models.outbound import OutboundLine
-from app.models.client import Client
-from app.services.inventory_service import LedgerCreate, add_ledger_and_apply_on_hand
+from app.services.inventory_service import LedgerCreate, apply_ledger_batch
+from app.services.picking_service import order_picking_done
 from app.services.billing_service import create_billing_event
-from app.services.document_service import render_dispatch_pdf, render_packing_slip_pdf
-from app.services.storage_service import save_bytes, load_bytes
+from app.services.document_jobs import document_language, document_response, queue_document
 from app.services.audit_service import audit_log
 from app.services.notification_service import queue_outbound_dispatched_email
 
@@ -51,9 +48,8 @@ def packing_confirm(
     if o is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outbound not found")
 
-    # Must have completed picking
-    task = db.scalar(select(PickingTask).where(PickingTask.outbound_id == o.id))
-    if task is None or task.status != "DONE":
+    # Must have completed picking (every task the order is part of, waves included)
+    if not order_picking_done(db, outbound_id=o.id):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Picking not completed")
 
     before_status = o.status
@@ -66,32 +62,18 @@ def packing_confirm(
         "carrier": payload.carrier,
     }
 
-    # Generate and store Packing Slip PDF (idempotent)
+    # Queue the Packing Slip PDF (idempotent); the document worker renders it unless it is disabled
     if o.packing_slip_file_id is None:
-        client = db.scalar(select(Client).where(Client.id == o.client_id, Client.tenant_id == user.tenant_id))
-        lang = (client.preferred_language if client else None) or user.language_pref or "en"
-        lines = db.scalars(select(OutboundLine).where(OutboundLine.outbound_id == o.id)).all()
-        pdf = render_packing_slip_pdf(
-            outbound_id=str(o.id),
-            order_number=o.order_number,
-            lines=[{"product_id": str(l.product_id), "qty": l.requested_qty} for l in lines],
-            packing=o.packing_json,
-            language=lang,
-        )
-        key, size = save_bytes(data=pdf, filename=f"packing_{o.id}.pdf")
-        f = File(
+        f = queue_document(
+            db,
             tenant_id=user.tenant_id,
             client_id=o.client_id,
             file_type="PACKING_SLIP_PDF",
-            storage_provider=settings.file_storage_provider,
-            storage_key=key,
+            reference_id=o.id,
             original_name=f"packing_{o.order_number}.pdf",
-            mime_type="application/pdf",
-            size_bytes=size,
+            language=document_language(db, tenant_id=user.tenant_id, client_id=o.client_id, user=user),
             created_by_user_id=user.id,
         )
-        db.add(f)
-        db.flush()
         o.packing_slip_file_id = f.id
 
         # Optional billing event for printing labels/slips (priced via price list printing.per_label)
@@ -134,8 +116,7 @@ def get_packing_slip(outbound_id: str, db: Session = Depends(get_db), user: User
     f = db.scalar(select(File).where(File.id == o.packing_slip_file_id, File.tenant_id == user.tenant_id))
     if f is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    data = load_bytes(storage_provider=f.storage_provider, storage_key=f.storage_key)
-    return Response(content=data, media_type=f.mime_type, headers={"Content-Disposition": f'attachment; filename="{f.original_name}"'})
+    return document_response(f)
 
 
 class DispatchConfirmBody(BaseModel):
@@ -165,8 +146,11 @@ def dispatch_confirm(
 
     # For v1: dispatch decrements all picked quantities from packing location via ledger entries.
     # We infer items by ledger movements into this packing location for this outbound reference.
+    # Ledger rows for this order cannot predate it: the created_at bound lets Postgres prune older partitions.
     inbound_moves = db.scalars(
         select(InventoryLedger).where(
+            InventoryLedger.tenant_id == o.tenant_id,
+            InventoryLedger.created_at >= o.created_at,
             InventoryLedger.reference_type == "OUTBOUND",
             InventoryLedger.reference_id == str(o.id),
             InventoryLedger.to_location_id == payload.packing_location_id,
@@ -176,10 +160,10 @@ def dispatch_confirm(
     if not inbound_moves:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Nothing to dispatch from packing location")
 
-    for m in inbound_moves:
-        add_ledger_and_apply_on_hand(
-            db,
-            entry=LedgerCreate(
+    apply_ledger_batch(
+        db,
+        entries=[
+            LedgerCreate(
                 tenant_id=o.tenant_id,
                 client_id=o.client_id,
                 warehouse_id=o.warehouse_id,
@@ -192,8 +176,10 @@ def dispatch_confirm(
                 reference_type="OUTBOUND",
                 reference_id=str(o.id),
                 performed_by_user_id=user.id,
-            ),
-        )
+            )
+            for m in inbound_moves
+        ],
+    )
 
     before_status = o.status
     o.status = "DISPATCHED"
@@ -211,31 +197,18 @@ def dispatch_confirm(
         event_date=o.dispatched_at.date(),
     )
 
-    # Generate and store Dispatch PDF (idempotent)
+    # Queue the Dispatch PDF (idempotent); the document worker renders it unless it is disabled
     if o.dispatch_pdf_file_id is None:
-        client = db.scalar(select(Client).where(Client.id == o.client_id, Client.tenant_id == user.tenant_id))
-        lang = (client.preferred_language if client else None) or user.language_pref or "en"
-        lines = db.scalars(select(OutboundLine).where(OutboundLine.outbound_id == o.id)).all()
-        pdf = render_dispatch_pdf(
-            outbound_id=str(o.id),
-            order_number=o.order_number,
-            lines=[{"product_id": str(l.product_id), "picked_qty": l.picked_qty} for l in lines],
-            language=lang,
-        )
-        key, size = save_bytes(data=pdf, filename=f"dispatch_{o.id}.pdf")
-        f = File(
+        f = queue_document(
+            db,
             tenant_id=user.tenant_id,
             client_id=o.client_id,
             file_type="DISPATCH_PDF",
-            storage_provider=settings.file_storage_provider,
-            storage_key=key,
+            reference_id=o.id,
             original_name=f"dispatch_{o.order_number}.pdf",
-            mime_type="application/pdf",
-            size_bytes=size,
+            language=document_language(db, tenant_id=user.tenant_id, client_id=o.client_id, user=user),
             created_by_user_id=user.id,
         )
-        db.add(f)
-        db.flush()
         o.dispatch_pdf_file_id = f.id
     audit_log(
         db,
@@ -281,7 +254,6 @@ def get_dispatch_document(outbound_id: str, db: Session = Depends(get_db), user:
     f = db.scalar(select(File).where(File.id == o.dispatch_pdf_file_id, File.tenant_id == user.tenant_id))
     if f is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    data = load_bytes(storage_provider=f.storage_provider, storage_key=f.storage_key)
-    return Response(content=data, media_type=f.mime_type, headers={"Content-Disposition": f'attachment; filename="{f.original_name}"'})
+    return document_response(f)
 
 
@@ -1,48 +1,89 @@
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.v1.deps import require_warehouse_staff
+from app.api.v1.deps import require_admin_or_supervisor, require_warehouse_staff
 from app.db.session import get_db
-from app.models.inventory_reservation import InventoryReservation
 from app.models.location import Location
-from app.models.outbound import OutboundLine, OutboundOrder
 from app.models.picking import PickingTask, PickingTaskLine
 from app.models.product import Product
 from app.models.product_batch import ProductBatch
 from app.models.user import User
 from app.models.warehouse_zone import WarehouseZone
+from app.schemas.picking import PickScanBatch, PickScanBatchOut, PickScanResultOut
 from app.schemas.putaway import PutawayConfirm
-from app.services.inventory_service import move_on_hand
-from app.services.reservation_service import consume_reservation
+from app.services.picking_service import (
+    PickScan,
+    apply_pick_scan,
+    apply_pick_scans,
+    consolidate_orders,
+    zone_queue_depth,
+)
 from app.services.audit_service import audit_log
 
 router = APIRouter(prefix="/picking", tags=["picking"])
 
 
-@router.get("/tasks", response_model=list[dict])
-def list_tasks(db: Session = Depends(get_db), user: User = Depends(require_warehouse_staff)) -> list[dict]:
-    tasks = db.scalars(select(PickingTask).join(OutboundOrder).where(OutboundOrder.tenant_id == user.tenant_id)).all()
-    return [{"id": str(t.id), "outbound_id": str(t.outbound_id), "status": t.status} for t in tasks]
-
-
-@router.get("/tasks/{task_id}/lines", response_model=list[dict])
-def list_task_lines(task_id: str, db: Session = Depends(get_db), user: User = Depends(require_warehouse_staff)) -> list[dict]:
+def _load_task(db: Session, task_id: str, user: User, *, lock: bool = False) -> PickingTask:
     try:
         tid = uuid.UUID(task_id)
     except Exception:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-    task = db.scalar(select(PickingTask).where(PickingTask.id == tid))
+    stmt = select(PickingTask).where(PickingTask.id == tid, PickingTask.tenant_id == user.tenant_id)
+    task = db.scalar(stmt.with_for_update() if lock else stmt)
     if task is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return task
 
-    outbound = db.scalar(select(OutboundOrder).where(OutboundOrder.id == task.outbound_id, OutboundOrder.tenant_id == user.tenant_id))
-    if outbound is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+@router.get("/tasks", response_model=list[dict])
+def list_tasks(
+    zone_id: int | None = Query(default=None),
+    task_status: str | None = Query(default=None, alias="status"),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> list[dict]:
+    q = select(PickingTask).where(PickingTask.tenant_id == user.tenant_id)
+    if zone_id is not None:
+        q = q.where(PickingTask.zone_id == zone_id)
+    if task_status is not None:
+        q = q.where(PickingTask.status == task_status)
+    tasks = db.scalars(q).all()
+    return [
+        {
+            "id": str(t.id),
+            "outbound_id": str(t.outbound_id) if t.outbound_id else None,
+            "wave": t.outbound_id is None,
+            "zone_id": t.zone_id,
+            "status": t.status,
+        }
+        for t in tasks
+    ]
+
+
+@router.get("/queue", response_model=list[dict])
+def zone_queue(
+    warehouse_id: str | None = Query(default=None),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin_or_supervisor),
+) -> list[dict]:
+    """Supervisor view: unfinished picking tasks, lines and units per zone."""
+    wid = None
+    if warehouse_id is not None:
+        try:
+            wid = uuid.UUID(warehouse_id)
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Warehouse not found")
+    return zone_queue_depth(db, tenant_id=user.tenant_id, warehouse_id=wid)
+
+
+@router.get("/tasks/{task_id}/lines", response_model=list[dict])
+def list_task_lines(task_id: str, db: Session = Depends(get_db), user: User = Depends(require_warehouse_staff)) -> list[dict]:
+    task = _load_task(db, task_id, user)
 
     rows = db.execute(
         select(PickingTaskLine, Location, WarehouseZone, ProductBatch)
@@ -51,6 +92,7 @@ def list_task_lines(task_id: str, db: Session = Depends(get_db), user: User = De
         .outerjoin(ProductBatch, PickingTaskLine.batch_id == ProductBatch.id)
         .where(PickingTaskLine.picking_task_id == task.id)
         .order_by(
+            PickingTaskLine.pick_seq.asc().nulls_last(),
             ProductBatch.expiry_date.asc().nulls_last(),
             WarehouseZone.zone_type.asc(),
             Location.code.asc(),
@@ -67,6 +109,7 @@ def list_task_lines(task_id: str, db: Session = Depends(get_db), user: User = De
             "expiry_date": batch.expiry_date.isoformat() if batch and batch.expiry_date else None,
             "qty_to_pick": l.qty_to_pick,
             "qty_picked": l.qty_picked,
+            "pick_seq": l.pick_seq,
         }
         for l, loc, zone, batch in rows
     ]
@@ -79,18 +122,7 @@ def start_task(
     db: Session = Depends(get_db),
     user: User = Depends(require_warehouse_staff),
 ) -> dict[str, str]:
-    try:
-        tid = uuid.UUID(task_id)
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-
-    task = db.scalar(select(PickingTask).where(PickingTask.id == tid))
-    if task is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-
-    outbound = db.scalar(select(OutboundOrder).where(OutboundOrder.id == task.outbound_id, OutboundOrder.tenant_id == user.tenant_id))
-    if outbound is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    task = _load_task(db, task_id, user)
 
     task.status = "IN_PROGRESS"
     task.assigned_to_user_id = user.id
@@ -113,8 +145,11 @@ class PickingScanBody(PutawayConfirm):
     """
     Reuse fields for: product_id, batch_id?, qty, from_location_id, to_location_id.
     Here: from_location_id = pick location, to_location_id = packing staging location.
+    In a wave, tote_code names the order the units were put in (default: first order still needing them).
     """
 
+    tote_code: str | None = None
+
 
 @router.post("/tasks/{task_id}/scan")
 def scan_pick(
@@ -129,68 +164,22 @@ def scan_pick(
     except Exception:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-    task = db.scalar(select(PickingTask).where(PickingTask.id == tid))
-    if task is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-
-    outbound = db.scalar(select(OutboundOrder).where(OutboundOrder.id == task.outbound_id, OutboundOrder.tenant_id == user.tenant_id))
-    if outbound is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-
-    if payload.qty <= 0:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="qty must be > 0")
-
-    line = db.scalar(
-        select(PickingTaskLine).where(
-            PickingTaskLine.picking_task_id == task.id,
-            PickingTaskLine.product_id == payload.product_id,
-            PickingTaskLine.batch_id == payload.batch_id,
-            PickingTaskLine.from_location_id == payload.from_location_id,
-        )
-    )
-    if line is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pick line not found")
-    if line.qty_picked + payload.qty > line.qty_to_pick:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Over-pick not allowed")
-
-    # Consume matching reservation for this outbound/product/batch/location
-    res = db.scalar(
-        select(InventoryReservation).where(
-            InventoryReservation.outbound_id == outbound.id,
-            InventoryReservation.product_id == payload.product_id,
-            InventoryReservation.batch_id == payload.batch_id,
-            InventoryReservation.location_id == payload.from_location_id,
-        )
-    )
-    if res is None:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No reservation found for this pick")
-    consume_reservation(db, reservation=res, qty=payload.qty)
-
-    # Move on-hand from pick location -> packing staging
-    move_on_hand(
+    # Hot path: task, line, reservations and balance come from one locking query (see apply_pick_scan).
+    task, picked = apply_pick_scan(
         db,
-        tenant_id=outbound.tenant_id,
-        client_id=outbound.client_id,
-        warehouse_id=outbound.warehouse_id,
-        product_id=payload.product_id,
-        batch_id=payload.batch_id,
-        from_location_id=payload.from_location_id,
-        to_location_id=payload.to_location_id,
-        qty=payload.qty,
-        reference_type="OUTBOUND",
-        reference_id=str(outbound.id),
+        task_id=tid,
+        tenant_id=user.tenant_id,
+        scan=PickScan(
+            product_id=payload.product_id,
+            batch_id=payload.batch_id,
+            from_location_id=payload.from_location_id,
+            to_location_id=payload.to_location_id,
+            qty=payload.qty,
+            tote_code=payload.tote_code,
+        ),
         performed_by_user_id=user.id,
-        event_type="PICK",
     )
 
-    line.qty_picked += payload.qty
-    db.flush()
-
-    # Update outbound line picked qty
-    oline = db.scalar(select(OutboundLine).where(OutboundLine.outbound_id == outbound.id, OutboundLine.product_id == payload.product_id))
-    if oline is not None:
-        oline.picked_qty += payload.qty
-
     audit_log(
         db,
         tenant_id=user.tenant_id,
@@ -204,6 +193,7 @@ def scan_pick(
             "qty": payload.qty,
             "from_location_id": str(payload.from_location_id),
             "to_location_id": str(payload.to_location_id),
+            "orders": {str(o.id): qty for o, qty in picked},
         },
         ip_address=request.client.host if request and request.client else None,
         user_agent=request.headers.get("user-agent") if request else None,
@@ -212,6 +202,60 @@ def scan_pick(
     return {"status": "ok"}
 
 
+@router.post("/tasks/{task_id}/scans:batch", response_model=PickScanBatchOut)
+def scan_pick_batch(
+    task_id: str,
+    payload: PickScanBatch,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> PickScanBatchOut:
+    """Replay a handheld's offline scan queue in one transaction; per-scan results, idempotent by client_scan_id."""
+    # Locked so two replays of the same queue are applied one after the other
+    task = _load_task(db, task_id, user, lock=True)
+    results = apply_pick_scans(
+        db,
+        task=task,
+        scans=[
+            PickScan(
+                client_scan_id=sc.client_scan_id,
+                product_id=sc.product_id,
+                batch_id=sc.batch_id,
+                from_location_id=sc.from_location_id,
+                to_location_id=sc.to_location_id,
+                qty=sc.qty,
+                tote_code=sc.tote_code,
+            )
+            for sc in payload.scans
+        ],
+        performed_by_user_id=user.id,
+    )
+    out = PickScanBatchOut(
+        applied=sum(r.status == "APPLIED" for r in results),
+        duplicates=sum(r.status == "DUPLICATE" for r in results),
+        rejected=sum(r.status == "REJECTED" for r in results),
+        results=[PickScanResultOut(client_scan_id=r.client_scan_id, status=r.status, detail=r.detail) for r in results],
+    )
+    if out.applied:
+        audit_log(
+            db,
+            tenant_id=user.tenant_id,
+            actor_user_id=user.id,
+            action="picking.scan_batch",
+            entity_type="PickingTask",
+            entity_id=str(task.id),
+            after={
+                "applied": [r.client_scan_id for r in results if r.status == "APPLIED"],
+                "duplicates": out.duplicates,
+                "rejected": out.rejected,
+            },
+            ip_address=request.client.host if request and request.client else None,
+            user_agent=request.headers.get("user-agent") if request else None,
+        )
+    db.commit()
+    return out
+
+
 @router.post("/tasks/{task_id}/complete")
 def complete_task(
     task_id: str,
@@ -219,18 +263,7 @@ def complete_task(
     db: Session = Depends(get_db),
     user: User = Depends(require_warehouse_staff),
 ) -> dict[str, str]:
-    try:
-        tid = uuid.UUID(task_id)
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-
-    task = db.scalar(select(PickingTask).where(PickingTask.id == tid))
-    if task is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-
-    outbound = db.scalar(select(OutboundOrder).where(OutboundOrder.id == task.outbound_id, OutboundOrder.tenant_id == user.tenant_id))
-    if outbound is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    task = _load_task(db, task_id, user)
 
     # ensure all lines picked
     lines = db.scalars(select(PickingTaskLine).where(PickingTaskLine.picking_task_id == task.id)).all()
@@ -239,7 +272,8 @@ def complete_task(
 
     task.status = "DONE"
     task.completed_at = datetime.now(timezone.utc)
-    outbound.status = "PACKING"
+    # Orders go to PACKING once every task they are part of (zone sub-tasks, waves) is DONE
+    packing = [str(o.id) for o in consolidate_orders(db, task=task)]
     audit_log(
         db,
         tenant_id=user.tenant_id,
@@ -247,7 +281,7 @@ def complete_task(
         action="picking.complete",
         entity_type="PickingTask",
         entity_id=str(task.id),
-        after={"status": task.status, "outbound_status": outbound.status},
+        after={"status": task.status, "packing_outbound_ids": packing},
         ip_address=request.client.host if request and request.client else None,
         user_agent=request.headers.get("user-agent") if request else None,
     )
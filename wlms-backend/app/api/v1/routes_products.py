@@ -15,6 +15,7 @@ from app.models.client import Client
 from app.models.product import Product
 from app.models.user import User
 from app.schemas.product import ProductCreate, ProductOut, ProductUpdate
+from app.services import product_cache
 from app.services.audit_service import audit_log
 
 router = APIRouter(prefix="/products", tags=["products"])
@@ -104,6 +105,7 @@ def create_product(
     db.add(p)
     try:
         db.flush()
+        product_cache.invalidate(db, [p])
         audit_log(
             db,
             tenant_id=user.tenant_id,
@@ -160,6 +162,7 @@ def import_products_csv(
     reader = csv.DictReader(io.StringIO(text))
     errors: list[dict] = []
     created = 0
+    new_products: list[Product] = []
 
     for idx, row in enumerate(reader, start=2):
         sku = (row.get("sku") or "").strip()
@@ -195,10 +198,12 @@ def import_products_csv(
                 db.add(p)
                 db.flush()
                 created += 1
+                new_products.append(p)
         except IntegrityError:
             errors.append({"row": idx, "field": "sku/barcode", "message": "conflict"})
             continue
 
+    product_cache.invalidate(db, new_products)
     audit_log(
         db,
         tenant_id=user.tenant_id,
@@ -214,6 +219,14 @@ def import_products_csv(
     return {"created": created, "errors": errors}
 
 
+@router.get("/cache/stats")
+def product_cache_stats(user: User = Depends(get_current_user)) -> dict:
+    """Hit/miss counters of this worker's product cache (for sizing PRODUCT_CACHE_MAX_ENTRIES / TTL)."""
+    if user.role not in {ROLE_WAREHOUSE_ADMIN, ROLE_WAREHOUSE_SUPERVISOR}:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+    return product_cache.stats()
+
+
 @router.get("/{product_id}", response_model=ProductOut)
 def get_product(
     product_id: str,
@@ -264,9 +277,12 @@ def update_product(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
     before = _to_out(p).model_dump()
+    # Old barcode key too, in case the barcode changes
+    cached_before = product_cache.CachedProduct.from_model(p)
     data = payload.model_dump(exclude_unset=True)
     for k, v in data.items():
         setattr(p, k, v)
+    product_cache.invalidate(db, [cached_before, p])
 
     try:
         audit_log(
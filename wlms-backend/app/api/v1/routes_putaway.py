@@ -1,62 +1,113 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import Session
 
 from app.api.v1.deps import require_warehouse_staff
 from app.db.session import get_db
 from app.models.inventory import InventoryBalance
 from app.models.location import Location
-from app.models.product import Product
 from app.models.user import User
 from app.models.warehouse import Warehouse
 from app.models.warehouse_zone import WarehouseZone
-from app.schemas.putaway import PutawayConfirm, PutawayTask
+from app.schemas.putaway import PutawayConfirm, PutawayTask, PutawayTaskPage
+from app.services import product_cache
 from app.services.inventory_service import move_on_hand
+from app.services.slotting_service import SlotRequest, suggest_locations
 from app.services.audit_service import audit_log
 
 router = APIRouter(prefix="/putaway", tags=["putaway"])
 
 
-@router.get("/tasks", response_model=list[PutawayTask])
-def list_putaway_tasks(db: Session = Depends(get_db), user: User = Depends(require_warehouse_staff)) -> list[PutawayTask]:
-    # All balances in STAGING zones with on_hand > 0 are put-away tasks.
-    # Join via Location -> Zone and filter by tenant via warehouse tenant_id.
-    # (Location doesn't have tenant_id, so we gate by user.tenant_id through Warehouse.)
-    stmt = (
-        select(InventoryBalance, Location)
-        .join(Location, InventoryBalance.location_id == Location.id)
+def _parse_cursor(after: str) -> tuple[uuid.UUID, uuid.UUID]:
+    try:
+        location_id, balance_id = after.split(":", 1)
+        return uuid.UUID(location_id), uuid.UUID(balance_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+@router.get("/tasks", response_model=PutawayTaskPage)
+def list_putaway_tasks(
+    warehouse_id: str | None = Query(default=None),
+    zone_id: int | None = Query(default=None),
+    client_id: str | None = Query(default=None),
+    after: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=500),
+    count_only: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> PutawayTaskPage:
+    """
+    Balances in STAGING zones with on_hand > 0, one page at a time, ordered by (location, balance).
+
+    Pass the returned next_cursor as ?after= for the following page. count_only=true returns just the
+    number of tasks matching the filters. Suggestions are computed for the returned page only.
+    """
+    # Staging locations of the tenant's warehouses (Location has no tenant_id, so gate through Warehouse).
+    staging = (
+        select(Location.id)
         .join(WarehouseZone, Location.zone_id == WarehouseZone.id)
         .join(Warehouse, Location.warehouse_id == Warehouse.id)
         .where(Warehouse.tenant_id == user.tenant_id)
         .where(WarehouseZone.zone_type == "STAGING")
-        .where(InventoryBalance.on_hand_qty > 0)
     )
+    if warehouse_id:
+        try:
+            wid = uuid.UUID(warehouse_id)
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid warehouse_id")
+        staging = staging.where(Location.warehouse_id == wid)
+    if zone_id is not None:
+        staging = staging.where(Location.zone_id == zone_id)
+
+    conds = [
+        InventoryBalance.tenant_id == user.tenant_id,
+        InventoryBalance.on_hand_qty > 0,  # matches ix_inv_bal_location_positive
+        InventoryBalance.available_qty > 0,  # cross-docked (reserved) staging stock waits for its picker
+        InventoryBalance.location_id.in_(staging),
+    ]
+    if client_id:
+        try:
+            cid = uuid.UUID(client_id)
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid client_id")
+        conds.append(InventoryBalance.client_id == cid)
+
+    if count_only:
+        count = db.scalar(select(func.count()).select_from(InventoryBalance).where(*conds))
+        return PutawayTaskPage(items=[], count=int(count or 0))
+
+    stmt = (
+        select(InventoryBalance, Location)
+        .join(Location, InventoryBalance.location_id == Location.id)
+        .where(*conds)
+        .order_by(InventoryBalance.location_id, InventoryBalance.id)
+        .limit(limit + 1)
+    )
+    if after:
+        stmt = stmt.where(tuple_(InventoryBalance.location_id, InventoryBalance.id) > tuple_(*_parse_cursor(after)))
 
     rows = db.execute(stmt).all()
-    # Suggest a storage destination per warehouse (simple v1 heuristic: first STORAGE location by code).
-    wh_ids = sorted({str(loc.warehouse_id) for _bal, loc in rows})
-    suggested: dict[str, tuple[uuid.UUID, str]] = {}
-    if wh_ids:
-        for wh_id in wh_ids:
-            try:
-                wid = uuid.UUID(wh_id)
-            except Exception:
-                continue
-            sug = db.execute(
-                select(Location.id, Location.code)
-                .join(WarehouseZone, Location.zone_id == WarehouseZone.id)
-                .where(Location.warehouse_id == wid, WarehouseZone.zone_type == "STORAGE")
-                .order_by(Location.code.asc())
-                .limit(1)
-            ).first()
-            if sug is not None:
-                suggested[wh_id] = (sug[0], sug[1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = f"{last.location_id}:{last.id}"
+
+    # Destination per staging balance from the slotting engine (consolidation, occupancy, velocity/distance).
+    suggestions = suggest_locations(
+        db,
+        tenant_id=user.tenant_id,
+        requests=[
+            SlotRequest(warehouse_id=loc.warehouse_id, product_id=bal.product_id, batch_id=bal.batch_id)
+            for bal, loc in rows
+        ],
+    )
 
     tasks: list[PutawayTask] = []
-    for bal, loc in rows:
-        sug = suggested.get(str(loc.warehouse_id))
+    for (bal, loc), sug in zip(rows, suggestions, strict=True):
         tasks.append(
             PutawayTask(
                 client_id=bal.client_id,
@@ -64,12 +115,13 @@ def list_putaway_tasks(db: Session = Depends(get_db), user: User = Depends(requi
                 product_id=bal.product_id,
                 batch_id=bal.batch_id,
                 from_location_id=loc.id,
-                on_hand_qty=bal.on_hand_qty,
-                suggested_to_location_id=sug[0] if sug else None,
-                suggested_to_location_code=sug[1] if sug else None,
+                on_hand_qty=bal.available_qty,
+                suggested_to_location_id=sug.location_id if sug else None,
+                suggested_to_location_code=sug.location_code if sug else None,
+                suggestion_reason=sug.reason if sug else None,
             )
         )
-    return tasks
+    return PutawayTaskPage(items=tasks, next_cursor=next_cursor)
 
 
 @router.post("/confirm")
@@ -104,8 +156,8 @@ def confirm_putaway(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="to_location must be STORAGE")
 
     # Validate product exists under this tenant (client scoping comes from balance)
-    product = db.scalar(select(Product).where(Product.id == payload.product_id))
-    if product is None or product.tenant_id != user.tenant_id:
+    product = product_cache.get_by_id(db, tenant_id=user.tenant_id, product_id=payload.product_id)
+    if product is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product")
 
     # Determine client_id from the source balance row (authoritative)
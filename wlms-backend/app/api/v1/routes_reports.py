@@ -1,7 +1,7 @@
 import csv
 import io
 import uuid
-from datetime import date
+from datetime import date, datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import func, select
@@ -17,6 +17,8 @@ from app.models.inventory import InventoryBalance, InventoryLedger
 from app.models.outbound import OutboundOrder
 from app.models.product_batch import ProductBatch
 from app.models.user import User
+from app.services.checkpoint_service import StockScope, ledger_on_hand, ledger_touched
+from app.services.ledger_partition_service import ledger_time_bounds
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
@@ -102,10 +104,19 @@ def expiry_report(
 def movement_history(
     format: str = Query(default="json"),
     limit: int = Query(default=200, ge=1, le=5000),
+    date_from: str | None = Query(default=None),
+    date_to: str | None = Query(default=None),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ) -> object:
-    stmt = select(InventoryLedger).where(InventoryLedger.tenant_id == user.tenant_id).order_by(InventoryLedger.created_at.desc()).limit(limit)
+    start, end = ledger_time_bounds(date_from=date_from, date_to=date_to)
+    stmt = (
+        select(InventoryLedger)
+        .where(InventoryLedger.tenant_id == user.tenant_id)
+        .where(InventoryLedger.created_at >= start, InventoryLedger.created_at < end)
+        .order_by(InventoryLedger.created_at.desc())
+        .limit(limit)
+    )
     if is_client_user(user) and user.client_id is not None:
         stmt = stmt.where(InventoryLedger.client_id == user.client_id)
     rows = db.scalars(stmt).all()
@@ -231,80 +242,71 @@ def inventory_reconcile(
     warehouse_id: str | None = Query(default=None),
     product_id: str | None = Query(default=None),
     location_id: str | None = Query(default=None),
+    touched_only: bool = Query(default=False),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ) -> object:
     """
-    Reconcile current InventoryBalance.on_hand_qty against the sum of InventoryLedger.qty_delta.
+    Reconcile current InventoryBalance.on_hand_qty against the ledger-derived on-hand.
     This is a diagnostic report to prove ledger-first inventory is reconcilable.
-    """
-    # Aggregate ledger deltas by item+location
-    ledger_stmt = select(
-        InventoryLedger.client_id.label("client_id"),
-        InventoryLedger.warehouse_id.label("warehouse_id"),
-        InventoryLedger.location_id.label("location_id"),
-        InventoryLedger.product_id.label("product_id"),
-        InventoryLedger.batch_id.label("batch_id"),
-        func.sum(InventoryLedger.qty_delta).label("ledger_on_hand_qty"),
-    ).where(InventoryLedger.tenant_id == user.tenant_id)
 
+    The ledger side starts from the latest inventory checkpoint and only sums deltas after it.
+    touched_only=true limits the report to keys with ledger movements since that checkpoint.
+    """
     # Apply optional filters (and client isolation for client users)
+    cid = wid = pid = lid = None
     if is_client_user(user):
         if user.client_id is None:
             return [] if format == "json" else _csv_response([], "inventory_reconcile.csv")
-        ledger_stmt = ledger_stmt.where(InventoryLedger.client_id == user.client_id)
+        cid = user.client_id
     elif client_id:
         try:
             cid = uuid.UUID(client_id)
         except Exception:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid client_id")
-        ledger_stmt = ledger_stmt.where(InventoryLedger.client_id == cid)
 
     if warehouse_id:
         try:
             wid = uuid.UUID(warehouse_id)
         except Exception:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid warehouse_id")
-        ledger_stmt = ledger_stmt.where(InventoryLedger.warehouse_id == wid)
 
     if product_id:
         try:
             pid = uuid.UUID(product_id)
         except Exception:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product_id")
-        ledger_stmt = ledger_stmt.where(InventoryLedger.product_id == pid)
 
     if location_id:
         try:
             lid = uuid.UUID(location_id)
         except Exception:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid location_id")
-        ledger_stmt = ledger_stmt.where(InventoryLedger.location_id == lid)
-
-    ledger_stmt = ledger_stmt.group_by(
-        InventoryLedger.client_id,
-        InventoryLedger.warehouse_id,
-        InventoryLedger.location_id,
-        InventoryLedger.product_id,
-        InventoryLedger.batch_id,
+
+    # Upper bound taken once so the ledger and balance reads describe the same point in time
+    # (also keeps future, pre-created ledger partitions out of the scan).
+    until = datetime.now(timezone.utc)
+    ledger = ledger_on_hand(
+        db,
+        scope=StockScope(tenant_id=user.tenant_id, client_id=cid, warehouse_id=wid, product_id=pid, location_id=lid),
+        until=until,
+        touched_only=touched_only,
     )
-    ledger_rows = {  # key: (client, wh, loc, product, batch)
-        (r.client_id, r.warehouse_id, r.location_id, r.product_id, r.batch_id): float(r.ledger_on_hand_qty or 0)
-        for r in db.execute(ledger_stmt).all()
-    }
+    ledger_rows = {key: float(qty) for key, qty in ledger.on_hand.items()}  # key: (client, wh, loc, product, batch)
 
     # Load balances for same scope and compare
     bal_stmt = select(InventoryBalance).where(InventoryBalance.tenant_id == user.tenant_id)
-    if is_client_user(user) and user.client_id is not None:
-        bal_stmt = bal_stmt.where(InventoryBalance.client_id == user.client_id)
-    elif client_id:
-        bal_stmt = bal_stmt.where(InventoryBalance.client_id == cid)  # cid set above if provided
-    if warehouse_id:
-        bal_stmt = bal_stmt.where(InventoryBalance.warehouse_id == wid)  # wid set above if provided
-    if product_id:
-        bal_stmt = bal_stmt.where(InventoryBalance.product_id == pid)  # pid set above if provided
-    if location_id:
-        bal_stmt = bal_stmt.where(InventoryBalance.location_id == lid)  # lid set above if provided
+    if cid is not None:
+        bal_stmt = bal_stmt.where(InventoryBalance.client_id == cid)
+    if wid is not None:
+        bal_stmt = bal_stmt.where(InventoryBalance.warehouse_id == wid)
+    if pid is not None:
+        bal_stmt = bal_stmt.where(InventoryBalance.product_id == pid)
+    if lid is not None:
+        bal_stmt = bal_stmt.where(InventoryBalance.location_id == lid)
+    if touched_only:
+        since = ledger.checkpoint.high_water_mark if ledger.checkpoint is not None else None
+        bal_stmt = bal_stmt.where(ledger_touched(InventoryBalance, InventoryBalance.location_id, since=since, until=until))
 
     balances = db.scalars(bal_stmt).all()
 
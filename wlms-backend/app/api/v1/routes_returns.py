@@ -4,19 +4,17 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.api.v1.deps import get_current_user, is_client_user, require_warehouse_staff
-from app.core.config import settings
 from app.db.session import get_db
 from app.models.client import Client
 from app.models.location import Location
-from app.models.product import Product
 from app.models.return_ import Return, ReturnLine
 from app.models.user import User
 from app.models.warehouse import Warehouse
 from app.models.file import File
 from app.schemas.return_ import ReturnCreate, ReturnOut, ReturnScanLine
-from app.services.document_service import render_return_pdf
-from app.services.inventory_service import LedgerCreate, add_ledger_and_apply_on_hand
-from app.services.storage_service import save_bytes, load_bytes
+from app.services import product_cache
+from app.services.document_jobs import document_language, document_response, queue_document
+from app.services.inventory_service import LedgerCreate, apply_ledger_batch
 from app.services.audit_service import audit_log
 
 router = APIRouter(prefix="/returns", tags=["returns"])
@@ -112,8 +110,8 @@ def scan_line(
     if payload.disposition not in {"RESTOCK", "QUARANTINE", "SCRAP"}:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid disposition")
 
-    p = db.scalar(select(Product).where(Product.id == payload.product_id, Product.tenant_id == user.tenant_id, Product.client_id == r.client_id))
-    if p is None:
+    p = product_cache.get_by_id(db, tenant_id=user.tenant_id, product_id=payload.product_id)
+    if p is None or p.client_id != r.client_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product_id")
 
     to_loc_id = payload.to_location_id
@@ -124,22 +122,24 @@ def scan_line(
         if loc is None:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid to_location_id")
 
-        add_ledger_and_apply_on_hand(
+        apply_ledger_batch(
             db,
-            entry=LedgerCreate(
-                tenant_id=r.tenant_id,
-                client_id=r.client_id,
-                warehouse_id=r.warehouse_id,
-                product_id=p.id,
-                batch_id=payload.batch_id,
-                from_location_id=None,
-                to_location_id=to_loc_id,
-                qty_delta=payload.qty,
-                event_type="RETURN_RECEIVE",
-                reference_type="RETURN",
-                reference_id=str(r.id),
-                performed_by_user_id=user.id,
-            ),
+            entries=[
+                LedgerCreate(
+                    tenant_id=r.tenant_id,
+                    client_id=r.client_id,
+                    warehouse_id=r.warehouse_id,
+                    product_id=p.id,
+                    batch_id=payload.batch_id,
+                    from_location_id=None,
+                    to_location_id=to_loc_id,
+                    qty_delta=payload.qty,
+                    event_type="RETURN_RECEIVE",
+                    reference_type="RETURN",
+                    reference_id=str(r.id),
+                    performed_by_user_id=user.id,
+                )
+            ],
         )
 
     db.add(
@@ -190,30 +190,18 @@ def complete_return(
     before_status = r.status
     r.status = "CLOSED"
 
-    # Generate and store Return PDF (idempotent)
+    # Queue the Return PDF (idempotent); the document worker renders it unless it is disabled
     if r.return_pdf_file_id is None:
-        client = db.scalar(select(Client).where(Client.id == r.client_id, Client.tenant_id == user.tenant_id))
-        lang = (client.preferred_language if client else None) or user.language_pref or "en"
-        lines = db.scalars(select(ReturnLine).where(ReturnLine.return_id == r.id)).all()
-        pdf = render_return_pdf(
-            return_id=str(r.id),
-            lines=[{"product_id": str(l.product_id), "qty": l.qty, "disposition": l.disposition} for l in lines],
-            language=lang,
-        )
-        key, size = save_bytes(data=pdf, filename=f"return_{r.id}.pdf")
-        f = File(
+        f = queue_document(
+            db,
             tenant_id=user.tenant_id,
             client_id=r.client_id,
             file_type="RETURN_PDF",
-            storage_provider=settings.file_storage_provider,
-            storage_key=key,
+            reference_id=r.id,
             original_name=f"return_{r.id}.pdf",
-            mime_type="application/pdf",
-            size_bytes=size,
+            language=document_language(db, tenant_id=user.tenant_id, client_id=r.client_id, user=user),
             created_by_user_id=user.id,
         )
-        db.add(f)
-        db.flush()
         r.return_pdf_file_id = f.id
     audit_log(
         db,
@@ -245,9 +233,6 @@ def get_return_document(return_id: str, db: Session = Depends(get_db), user: Use
     f = db.scalar(select(File).where(File.id == r.return_pdf_file_id, File.tenant_id == user.tenant_id))
     if f is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
-    data = load_bytes(storage_provider=f.storage_provider, storage_key=f.storage_key)
-    from fastapi import Response
-
-    return Response(content=data, media_type=f.mime_type, headers={"Content-Disposition": f'attachment; filename="{f.original_name}"'})
+    return document_response(f)
 
 
@@ -2,6 +2,7 @@ import uuid
 
 import csv
 import io
+from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File as UploadFileParam, status
 from fastapi import Request
@@ -14,16 +15,19 @@ from app.models.location import Location
 from app.models.user import User
 from app.models.warehouse import Warehouse
 from app.models.warehouse_zone import WarehouseZone
+from app.services import occupancy_service, slotting_service
 from app.services.audit_service import audit_log
 from app.services.label_service import render_location_labels_pdf
 from app.schemas.warehouse import (
     LocationCreate,
     LocationOut,
     WarehouseCreate,
+    WarehouseOccupancyOut,
     WarehouseOut,
     WarehouseUpdate,
     WarehouseZoneCreate,
     WarehouseZoneOut,
+    ZoneOccupancyOut,
 )
 
 router = APIRouter(prefix="/warehouses", tags=["warehouses"])
@@ -155,6 +159,49 @@ def create_zone(
     return WarehouseZoneOut(id=z.id, warehouse_id=z.warehouse_id, name=z.name, zone_type=z.zone_type)
 
 
+@router.get("/{warehouse_id}/occupancy", response_model=WarehouseOccupancyOut)
+def warehouse_occupancy(
+    warehouse_id: str,
+    zone_id: int | None = None,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_warehouse_staff),
+) -> WarehouseOccupancyOut:
+    """Occupied/free positions per zone (optionally one zone) and overall utilisation, from location_occupancy."""
+    try:
+        wid = uuid.UUID(warehouse_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Warehouse not found")
+
+    w = db.scalar(select(Warehouse.id).where(Warehouse.id == wid, Warehouse.tenant_id == user.tenant_id))
+    if w is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Warehouse not found")
+
+    zones = occupancy_service.zone_occupancy(db, warehouse_id=wid, zone_id=zone_id)
+    if zone_id is not None and not zones:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Zone not found")
+    locations = sum(z.locations for z in zones)
+    occupied = sum(min(z.occupied, z.locations) for z in zones)
+    return WarehouseOccupancyOut(
+        warehouse_id=wid,
+        locations=locations,
+        occupied=occupied,
+        free=locations - occupied,
+        utilisation=round(occupied / locations, 4) if locations else 0.0,
+        zones=[
+            ZoneOccupancyOut(
+                zone_id=z.zone_id,
+                zone_name=z.zone_name,
+                zone_type=z.zone_type,
+                locations=z.locations,
+                occupied=z.occupied,
+                free=z.free,
+                pallet_positions=z.pallet_positions,
+            )
+            for z in zones
+        ],
+    )
+
+
 @router.get("/{warehouse_id}/locations", response_model=list[LocationOut])
 def list_locations(
     warehouse_id: str, db: Session = Depends(get_db), user: User = Depends(require_warehouse_staff)
@@ -181,6 +228,9 @@ def list_locations(
             level=l.level,
             bin=l.bin,
             is_active=l.is_active,
+            capacity_pallets=l.capacity_pallets,
+            capacity_volume_m3=l.capacity_volume_m3,
+            capacity_weight_kg=l.capacity_weight_kg,
         )
         for l in locs
     ]
@@ -217,6 +267,9 @@ def create_location(
         rack=payload.rack,
         level=payload.level,
         bin=payload.bin,
+        capacity_pallets=payload.capacity_pallets,
+        capacity_volume_m3=payload.capacity_volume_m3,
+        capacity_weight_kg=payload.capacity_weight_kg,
     )
     db.add(l)
     db.flush()
@@ -232,6 +285,7 @@ def create_location(
         user_agent=request.headers.get("user-agent") if request else None,
     )
     db.commit()
+    slotting_service.invalidate(wid)
     db.refresh(l)
     return LocationOut(
         id=l.id,
@@ -244,9 +298,34 @@ def create_location(
         level=l.level,
         bin=l.bin,
         is_active=l.is_active,
+        capacity_pallets=l.capacity_pallets,
+        capacity_volume_m3=l.capacity_volume_m3,
+        capacity_weight_kg=l.capacity_weight_kg,
     )
 
 
+_CAPACITY_PARSERS = {"capacity_pallets": int, "capacity_volume_m3": Decimal, "capacity_weight_kg": Decimal}
+
+
+def _csv_capacity(row: dict, idx: int, errors: list[dict]) -> dict | None:
+    """Optional capacity columns of an import row; None (with an error recorded) if one is invalid."""
+    out: dict = {}
+    for field, parse in _CAPACITY_PARSERS.items():
+        raw = (row.get(field) or "").strip()
+        if not raw:
+            continue
+        try:
+            value = parse(raw)
+            valid = 0 < value < 10**7  # fits the Numeric columns; rejects NaN/Infinity
+        except (ValueError, ArithmeticError):
+            valid = False
+        if not valid:
+            errors.append({"row": idx, "field": field, "message": "must be a positive number"})
+            return None
+        out[field] = value
+    return out
+
+
 @router.post("/{warehouse_id}/locations/import-csv")
 def import_locations_csv(
     warehouse_id: str,
@@ -299,6 +378,9 @@ def import_locations_csv(
             continue
 
         barcode_value = (row.get("barcode_value") or "").strip() or code
+        capacity = _csv_capacity(row, idx, errors)
+        if capacity is None:
+            continue
         l = Location(
             warehouse_id=wid,
             zone_id=zone_id,
@@ -308,6 +390,7 @@ def import_locations_csv(
             rack=(row.get("rack") or "").strip() or None,
             level=(row.get("level") or "").strip() or None,
             bin=(row.get("bin") or "").strip() or None,
+            **capacity,
         )
         db.add(l)
         db.flush()
@@ -326,6 +409,7 @@ def import_locations_csv(
         user_agent=request.headers.get("user-agent") if request else None,
     )
     db.commit()
+    slotting_service.invalidate(wid)
     return {"created": created, "errors": errors}
 
 
@@ -16,12 +16,18 @@ def _request_id() -> str | None:
 
 def http_exception_handler(_request: Request, exc: HTTPException) -> JSONResponse:
     rid = _request_id()
+    message = str(exc.detail)
+    details = None
+    # Batch operations raise detail={"message": ..., "errors": [...]} to report per-entry failures.
+    if isinstance(exc.detail, dict):
+        message = str(exc.detail.get("message") or "")
+        details = exc.detail.get("errors")
     payload = ApiErrorResponse(
         error={
             "code": "http_error",
-            "message": str(exc.detail),
+            "message": message,
             "request_id": rid,
-            "details": None,
+            "details": details,
         }
     )
     return JSONResponse(status_code=exc.status_code, content=payload.model_dump())
@@ -12,6 +12,8 @@ from app.models import client  # noqa: F401
 from app.models import discrepancy  # noqa: F401
 from app.models import inbound  # noqa: F401
 from app.models import inventory  # noqa: F401
+from app.models import inventory_availability  # noqa: F401
+from app.models import inventory_checkpoint  # noqa: F401
 from app.models import inventory_reservation  # noqa: F401
 from app.models import billing  # noqa: F401
 from app.models import audit  # noqa: F401
@@ -19,6 +21,8 @@ from app.models import auth_tokens  # noqa: F401
 from app.models import file  # noqa: F401
 from app.models import notification  # noqa: F401
 from app.models import location  # noqa: F401
+from app.models import license_plate  # noqa: F401
+from app.models import location_occupancy  # noqa: F401
 from app.models import product  # noqa: F401
 from app.models import product_batch  # noqa: F401
 from app.models import outbound  # noqa: F401
@@ -0,0 +1,35 @@
+"""inventory_balances unique key: NULLS NOT DISTINCT (for batch upserts)
+
+Revision ID: 0019_inventory_balance_nulls_not_distinct
+Revises: 0018_product_pallet_qty
+Create Date: 2026-02-02 00:00:00.000000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0019_inventory_balance_nulls_not_distinct"
+down_revision = "0018_product_pallet_qty"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Requires Postgres 15+. Un-batched rows (batch_id NULL) must be unique per location so that
+    # INSERT ... ON CONFLICT (tenant_id, product_id, batch_id, location_id) DO UPDATE can target them.
+    op.drop_constraint("uq_inv_bal_tenant_prod_batch_loc", "inventory_balances", type_="unique")
+    op.create_unique_constraint(
+        "uq_inv_bal_tenant_prod_batch_loc",
+        "inventory_balances",
+        ["tenant_id", "product_id", "batch_id", "location_id"],
+        postgresql_nulls_not_distinct=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_inv_bal_tenant_prod_batch_loc", "inventory_balances", type_="unique")
+    op.create_unique_constraint(
+        "uq_inv_bal_tenant_prod_batch_loc",
+        "inventory_balances",
+        ["tenant_id", "product_id", "batch_id", "location_id"],
+    )
@@ -0,0 +1,34 @@
+"""inventory_reservations unique key: NULLS NOT DISTINCT (for bulk reservation upserts)
+
+Revision ID: 0020_inventory_reservation_nulls_not_distinct
+Revises: 0019_inventory_balance_nulls_not_distinct
+Create Date: 2026-02-03 00:00:00.000000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0020_inventory_reservation_nulls_not_distinct"
+down_revision = "0019_inventory_balance_nulls_not_distinct"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Requires Postgres 15+ (see 0019).
+    op.drop_constraint("uq_inv_res_out_prod_batch_loc", "inventory_reservations", type_="unique")
+    op.create_unique_constraint(
+        "uq_inv_res_out_prod_batch_loc",
+        "inventory_reservations",
+        ["outbound_id", "product_id", "batch_id", "location_id"],
+        postgresql_nulls_not_distinct=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_inv_res_out_prod_batch_loc", "inventory_reservations", type_="unique")
+    op.create_unique_constraint(
+        "uq_inv_res_out_prod_batch_loc",
+        "inventory_reservations",
+        ["outbound_id", "product_id", "batch_id", "location_id"],
+    )
@@ -0,0 +1,124 @@
+"""partition inventory_ledger by month on created_at
+
+Revision ID: 0021_inventory_ledger_partitioning
+Revises: 0020_inventory_reservation_nulls_not_distinct
+Create Date: 2026-02-04 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0021_inventory_ledger_partitioning"
+down_revision = "0020_inventory_reservation_nulls_not_distinct"
+branch_labels = None
+depends_on = None
+
+_INDEXED_COLUMNS = [
+    "tenant_id",
+    "client_id",
+    "warehouse_id",
+    "product_id",
+    "batch_id",
+    "from_location_id",
+    "to_location_id",
+]
+
+# Creates missing monthly partitions inventory_ledger_pYYYYMM (UTC month boundaries) from the month of
+# p_from up to p_months_ahead months after the current one. Idempotent; returns the number created.
+_ENSURE_PARTITIONS_FN = """
+CREATE OR REPLACE FUNCTION inventory_ledger_ensure_partitions(p_from date, p_months_ahead integer)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    m date := date_trunc('month', p_from)::date;
+    stop date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead + 1))::date;
+    part text;
+    created integer := 0;
+BEGIN
+    WHILE m < stop LOOP
+        part := 'inventory_ledger_p' || to_char(m, 'YYYYMM');
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF inventory_ledger FOR VALUES FROM (%L) TO (%L)',
+                part,
+                m::timestamp AT TIME ZONE 'UTC',
+                (m + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        m := (m + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END
+$$;
+"""
+
+
+def _ledger_columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("warehouse_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("warehouses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("batch_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("product_batches.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("from_location_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("locations.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("to_location_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("locations.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("qty_delta", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=32), nullable=False),
+        sa.Column("reference_type", sa.String(length=16), nullable=False),
+        sa.Column("reference_id", sa.String(length=64), nullable=False),
+        sa.Column("performed_by_user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    ]
+
+
+def _swap_ledger(*, partitioned: bool) -> None:
+    op.execute("ALTER TABLE inventory_ledger RENAME TO inventory_ledger_old")
+    op.execute("ALTER INDEX inventory_ledger_pkey RENAME TO inventory_ledger_old_pkey")
+    for col in _INDEXED_COLUMNS:
+        op.execute(f"ALTER INDEX ix_inventory_ledger_{col} RENAME TO ix_inventory_ledger_old_{col}")
+
+    if partitioned:
+        op.create_table(
+            "inventory_ledger",
+            *_ledger_columns(),
+            sa.PrimaryKeyConstraint("id", "created_at", name="inventory_ledger_pkey"),
+            postgresql_partition_by="RANGE (created_at)",
+        )
+        op.execute(_ENSURE_PARTITIONS_FN)
+        op.execute(
+            "SELECT inventory_ledger_ensure_partitions("
+            "COALESCE((SELECT min(created_at) FROM inventory_ledger_old), now())::date, 3)"
+        )
+        # Safety net for rows outside the prepared months (e.g. the maintenance job did not run).
+        op.execute("CREATE TABLE inventory_ledger_default PARTITION OF inventory_ledger DEFAULT")
+    else:
+        op.create_table(
+            "inventory_ledger",
+            *_ledger_columns(),
+            sa.PrimaryKeyConstraint("id", name="inventory_ledger_pkey"),
+        )
+
+    # Single pass copy; on large ledgers run this migration in a maintenance window.
+    op.execute("INSERT INTO inventory_ledger SELECT * FROM inventory_ledger_old")
+    op.drop_table("inventory_ledger_old")
+
+    # On the partitioned table these are partitioned indexes (created on every partition).
+    for col in _INDEXED_COLUMNS:
+        op.create_index(f"ix_inventory_ledger_{col}", "inventory_ledger", [col])
+
+
+def upgrade() -> None:
+    _swap_ledger(partitioned=True)
+    op.create_index("ix_inventory_ledger_tenant_created_at", "inventory_ledger", ["tenant_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventory_ledger_tenant_created_at", table_name="inventory_ledger")
+    # Detached (archived) partitions are not folded back in.
+    _swap_ledger(partitioned=False)
+    op.execute("DROP FUNCTION IF EXISTS inventory_ledger_ensure_partitions(date, integer)")
@@ -0,0 +1,54 @@
+"""inventory checkpoints (ledger on-hand snapshots)
+
+Revision ID: 0022_inventory_checkpoints
+Revises: 0021_inventory_ledger_partitioning
+Create Date: 2026-02-05 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0022_inventory_checkpoints"
+down_revision = "0021_inventory_ledger_partitioning"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_checkpoints",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("high_water_mark", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("line_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.UniqueConstraint("high_water_mark", name="inventory_checkpoints_high_water_mark_key"),
+    )
+
+    op.create_table(
+        "inventory_checkpoint_lines",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True, nullable=False),
+        sa.Column(
+            "checkpoint_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("inventory_checkpoints.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("warehouse_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("location_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("batch_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("on_hand_qty", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_inv_cp_lines_checkpoint_tenant", "inventory_checkpoint_lines", ["checkpoint_id", "tenant_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inv_cp_lines_checkpoint_tenant", table_name="inventory_checkpoint_lines")
+    op.drop_table("inventory_checkpoint_lines")
+    op.drop_table("inventory_checkpoints")
@@ -0,0 +1,61 @@
+"""inventory_availability summary (per tenant/client/warehouse/product)
+
+Revision ID: 0023_inventory_availability
+Revises: 0022_inventory_checkpoints
+Create Date: 2026-02-06 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0023_inventory_availability"
+down_revision = "0022_inventory_checkpoints"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_availability",
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("warehouse_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("warehouses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("pickable_on_hand_qty", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pickable_reserved_qty", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pickable_available_qty", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("staging_on_hand_qty", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("staging_reserved_qty", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("staging_available_qty", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("tenant_id", "client_id", "warehouse_id", "product_id", name="inventory_availability_pkey"),
+    )
+
+    # Backfill from current balances
+    op.execute(
+        """
+        INSERT INTO inventory_availability (
+            tenant_id, client_id, warehouse_id, product_id,
+            pickable_on_hand_qty, pickable_reserved_qty, pickable_available_qty,
+            staging_on_hand_qty, staging_reserved_qty, staging_available_qty
+        )
+        SELECT
+            b.tenant_id, b.client_id, b.warehouse_id, b.product_id,
+            SUM(CASE WHEN z.zone_type = 'STAGING' THEN 0 ELSE b.on_hand_qty END),
+            SUM(CASE WHEN z.zone_type = 'STAGING' THEN 0 ELSE b.reserved_qty END),
+            SUM(CASE WHEN z.zone_type = 'STAGING' THEN 0 ELSE b.on_hand_qty - b.reserved_qty END),
+            SUM(CASE WHEN z.zone_type = 'STAGING' THEN b.on_hand_qty ELSE 0 END),
+            SUM(CASE WHEN z.zone_type = 'STAGING' THEN b.reserved_qty ELSE 0 END),
+            SUM(CASE WHEN z.zone_type = 'STAGING' THEN b.on_hand_qty - b.reserved_qty ELSE 0 END)
+        FROM inventory_balances b
+        JOIN locations l ON l.id = b.location_id
+        JOIN warehouse_zones z ON z.id = l.zone_id
+        GROUP BY b.tenant_id, b.client_id, b.warehouse_id, b.product_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_availability")
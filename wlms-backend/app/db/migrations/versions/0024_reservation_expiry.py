@@ -0,0 +1,31 @@
+"""inventory_reservations.expires_at (reservation TTL + sweeper)
+
+Revision ID: 0024_reservation_expiry
+Revises: 0023_inventory_availability
+Create Date: 2026-02-07 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0024_reservation_expiry"
+down_revision = "0023_inventory_availability"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing reservations keep NULL (no expiry).
+    op.add_column("inventory_reservations", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_inv_res_expires_at",
+        "inventory_reservations",
+        ["expires_at"],
+        postgresql_where=sa.text("expires_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inv_res_expires_at", table_name="inventory_reservations")
+    op.drop_column("inventory_reservations", "expires_at")
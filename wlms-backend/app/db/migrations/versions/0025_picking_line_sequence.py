@@ -0,0 +1,23 @@
+"""picking_task_lines.pick_seq (walking route order)
+
+Revision ID: 0025_picking_line_sequence
+Revises: 0024_reservation_expiry
+Create Date: 2026-02-08 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0025_picking_line_sequence"
+down_revision = "0024_reservation_expiry"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("picking_task_lines", sa.Column("pick_seq", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("picking_task_lines", "pick_seq")
@@ -0,0 +1,68 @@
+"""pick waves: picking_task_orders, picking_tasks.tenant_id, nullable picking_tasks.outbound_id
+
+Revision ID: 0026_pick_waves
+Revises: 0025_picking_line_sequence
+Create Date: 2026-02-09 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0026_pick_waves"
+down_revision = "0025_picking_line_sequence"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("picking_tasks", sa.Column("tenant_id", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE picking_tasks t SET tenant_id = o.tenant_id FROM outbound_orders o WHERE o.id = t.outbound_id"
+    )
+    op.alter_column("picking_tasks", "tenant_id", nullable=False)
+    op.create_foreign_key(
+        "fk_picking_tasks_tenant_id", "picking_tasks", "tenants", ["tenant_id"], ["id"], ondelete="CASCADE"
+    )
+    op.create_index("ix_picking_tasks_tenant_id", "picking_tasks", ["tenant_id"])
+    op.alter_column("picking_tasks", "outbound_id", nullable=True)
+
+    op.create_table(
+        "picking_task_orders",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "picking_task_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("picking_tasks.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "outbound_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("outbound_orders.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("tote_code", sa.String(length=64), nullable=True),
+        sa.Column("seq", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint("picking_task_id", "outbound_id", name="uq_picking_task_orders_task_outbound"),
+        sa.UniqueConstraint("picking_task_id", "tote_code", name="uq_picking_task_orders_task_tote"),
+    )
+    op.create_index("ix_picking_task_orders_picking_task_id", "picking_task_orders", ["picking_task_id"])
+    op.create_index("ix_picking_task_orders_outbound_id", "picking_task_orders", ["outbound_id"])
+    # Existing single-order tasks
+    op.execute(
+        "INSERT INTO picking_task_orders (picking_task_id, outbound_id, seq) SELECT id, outbound_id, 0 FROM picking_tasks"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_picking_task_orders_outbound_id", table_name="picking_task_orders")
+    op.drop_index("ix_picking_task_orders_picking_task_id", table_name="picking_task_orders")
+    op.drop_table("picking_task_orders")
+    # Wave tasks cannot be represented without the link table.
+    op.execute("DELETE FROM picking_tasks WHERE outbound_id IS NULL")
+    op.alter_column("picking_tasks", "outbound_id", nullable=False)
+    op.drop_index("ix_picking_tasks_tenant_id", table_name="picking_tasks")
+    op.drop_constraint("fk_picking_tasks_tenant_id", "picking_tasks", type_="foreignkey")
+    op.drop_column("picking_tasks", "tenant_id")
@@ -0,0 +1,35 @@
+"""picking_tasks.zone_id (zone-split sub-tasks) and open-task queue index
+
+Revision ID: 0027_picking_task_zones
+Revises: 0026_pick_waves
+Create Date: 2026-02-10 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0027_picking_task_zones"
+down_revision = "0026_pick_waves"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("picking_tasks", sa.Column("zone_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_picking_tasks_zone_id", "picking_tasks", "warehouse_zones", ["zone_id"], ["id"], ondelete="SET NULL"
+    )
+    # Supervisor queue depth only looks at unfinished tasks
+    op.create_index(
+        "ix_picking_tasks_open_zone",
+        "picking_tasks",
+        ["tenant_id", "zone_id"],
+        postgresql_where=sa.text("status <> 'DONE'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_picking_tasks_open_zone", table_name="picking_tasks")
+    op.drop_constraint("fk_picking_tasks_zone_id", "picking_tasks", type_="foreignkey")
+    op.drop_column("picking_tasks", "zone_id")
@@ -0,0 +1,48 @@
+"""picking_scans (idempotent offline scan replay)
+
+Revision ID: 0028_picking_scans
+Revises: 0027_picking_task_zones
+Create Date: 2026-02-11 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0028_picking_scans"
+down_revision = "0027_picking_task_zones"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "picking_scans",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "picking_task_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("picking_tasks.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("client_scan_id", sa.String(length=64), nullable=False),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("from_location_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("qty", sa.Integer(), nullable=False),
+        sa.Column(
+            "performed_by_user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("picking_task_id", "client_scan_id", name="uq_picking_scans_task_client_scan"),
+    )
+    op.create_index("ix_picking_scans_tenant_id", "picking_scans", ["tenant_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_picking_scans_tenant_id", table_name="picking_scans")
+    op.drop_table("picking_scans")
@@ -0,0 +1,68 @@
+"""location capacity + location_occupancy (incremental occupied-position index)
+
+Revision ID: 0029_location_capacity
+Revises: 0028_picking_scans
+Create Date: 2026-02-12 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0029_location_capacity"
+down_revision = "0028_picking_scans"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("locations", sa.Column("capacity_pallets", sa.Integer(), nullable=True))
+    op.add_column("locations", sa.Column("capacity_volume_m3", sa.Numeric(10, 3), nullable=True))
+    op.add_column("locations", sa.Column("capacity_weight_kg", sa.Numeric(10, 2), nullable=True))
+
+    op.create_table(
+        "location_occupancy",
+        sa.Column(
+            "location_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("locations.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "warehouse_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("warehouses.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("zone_id", sa.Integer(), sa.ForeignKey("warehouse_zones.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("on_hand_qty", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_location_occupancy_tenant_id", "location_occupancy", ["tenant_id"])
+    op.create_index(
+        "ix_location_occupancy_occupied",
+        "location_occupancy",
+        ["warehouse_id", "zone_id"],
+        postgresql_where=sa.text("on_hand_qty > 0"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO location_occupancy (location_id, tenant_id, warehouse_id, zone_id, on_hand_qty)
+        SELECT b.location_id, b.tenant_id, l.warehouse_id, l.zone_id, SUM(b.on_hand_qty)
+        FROM inventory_balances b
+        JOIN locations l ON l.id = b.location_id
+        GROUP BY b.location_id, b.tenant_id, l.warehouse_id, l.zone_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_location_occupancy_occupied", table_name="location_occupancy")
+    op.drop_index("ix_location_occupancy_tenant_id", table_name="location_occupancy")
+    op.drop_table("location_occupancy")
+    op.drop_column("locations", "capacity_weight_kg")
+    op.drop_column("locations", "capacity_volume_m3")
+    op.drop_column("locations", "capacity_pallets")
@@ -0,0 +1,28 @@
+"""partial index for the put-away queue (positive balances per location)
+
+Revision ID: 0030_putaway_queue_index
+Revises: 0029_location_capacity
+Create Date: 2026-02-13 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0030_putaway_queue_index"
+down_revision = "0029_location_capacity"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_inv_bal_location_positive",
+        "inventory_balances",
+        ["location_id", "id"],
+        postgresql_where=sa.text("on_hand_qty > 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inv_bal_location_positive", table_name="inventory_balances")
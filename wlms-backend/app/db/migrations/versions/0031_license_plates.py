@@ -0,0 +1,122 @@
+"""license plates (LPN containers, their items and container moves)
+
+Revision ID: 0031_license_plates
+Revises: 0030_putaway_queue_index
+Create Date: 2026-02-14 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0031_license_plates"
+down_revision = "0030_putaway_queue_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "license_plates",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "client_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("clients.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column(
+            "warehouse_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("warehouses.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "location_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("locations.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("code", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("tenant_id", "code", name="uq_license_plates_tenant_code"),
+    )
+    op.create_index("ix_license_plates_tenant_id", "license_plates", ["tenant_id"])
+    op.create_index("ix_license_plates_client_id", "license_plates", ["client_id"])
+    op.create_index("ix_license_plates_location_id", "license_plates", ["location_id"])
+
+    op.create_table(
+        "license_plate_items",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "license_plate_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("license_plates.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column(
+            "batch_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("product_batches.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("qty", sa.Integer(), nullable=False),
+        sa.UniqueConstraint(
+            "license_plate_id",
+            "product_id",
+            "batch_id",
+            name="uq_license_plate_items_plate_product_batch",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    op.create_table(
+        "license_plate_moves",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "license_plate_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("license_plates.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "from_location_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("locations.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column(
+            "to_location_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("locations.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("event_type", sa.String(length=32), nullable=False),
+        sa.Column("lines", sa.Integer(), nullable=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column(
+            "performed_by_user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_license_plate_moves_tenant_id", "license_plate_moves", ["tenant_id"])
+    op.create_index("ix_license_plate_moves_license_plate_id", "license_plate_moves", ["license_plate_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_license_plate_moves_license_plate_id", table_name="license_plate_moves")
+    op.drop_index("ix_license_plate_moves_tenant_id", table_name="license_plate_moves")
+    op.drop_table("license_plate_moves")
+    op.drop_table("license_plate_items")
+    op.drop_index("ix_license_plates_location_id", table_name="license_plates")
+    op.drop_index("ix_license_plates_client_id", table_name="license_plates")
+    op.drop_index("ix_license_plates_tenant_id", table_name="license_plates")
+    op.drop_table("license_plates")
@@ -0,0 +1,31 @@
+"""ASN reference on inbound shipments
+
+Revision ID: 0032_inbound_asn
+Revises: 0031_license_plates
+Create Date: 2026-02-15 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0032_inbound_asn"
+down_revision = "0031_license_plates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("inbound_shipments", sa.Column("asn_reference", sa.String(length=64), nullable=True))
+    op.create_index(
+        "uq_inbound_shipments_client_asn",
+        "inbound_shipments",
+        ["tenant_id", "client_id", "asn_reference"],
+        unique=True,
+        postgresql_where=sa.text("asn_reference IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_inbound_shipments_client_asn", table_name="inbound_shipments")
+    op.drop_column("inbound_shipments", "asn_reference")
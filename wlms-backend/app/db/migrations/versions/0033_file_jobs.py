@@ -0,0 +1,38 @@
+"""document generation jobs on files (PENDING/READY/FAILED)
+
+Revision ID: 0033_file_jobs
+Revises: 0032_inbound_asn
+Create Date: 2026-02-16 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0033_file_jobs"
+down_revision = "0032_inbound_asn"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("files", sa.Column("status", sa.String(length=16), nullable=False, server_default="READY"))
+    op.add_column("files", sa.Column("reference_id", sa.String(length=64), nullable=True))
+    op.add_column("files", sa.Column("language", sa.String(length=8), nullable=True))
+    op.add_column("files", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("files", sa.Column("error", sa.Text(), nullable=True))
+    op.create_index(
+        "ix_files_pending",
+        "files",
+        ["created_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_files_pending", table_name="files")
+    op.drop_column("files", "error")
+    op.drop_column("files", "attempts")
+    op.drop_column("files", "language")
+    op.drop_column("files", "reference_id")
+    op.drop_column("files", "status")
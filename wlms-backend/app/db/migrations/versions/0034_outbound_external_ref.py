@@ -0,0 +1,31 @@
+"""external (marketplace) order reference on outbound orders
+
+Revision ID: 0034_outbound_external_ref
+Revises: 0033_file_jobs
+Create Date: 2026-02-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0034_outbound_external_ref"
+down_revision = "0033_file_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("outbound_orders", sa.Column("external_reference", sa.String(length=64), nullable=True))
+    op.create_index(
+        "uq_outbound_orders_client_external_ref",
+        "outbound_orders",
+        ["tenant_id", "client_id", "external_reference"],
+        unique=True,
+        postgresql_where=sa.text("external_reference IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_outbound_orders_client_external_ref", table_name="outbound_orders")
+    op.drop_column("outbound_orders", "external_reference")
@@ -0,0 +1,106 @@
+"""ledger partition maintenance moves rows out of the default partition
+
+Revision ID: 0035_ledger_partitions_from_default
+Revises: 0034_outbound_external_ref
+Create Date: 2026-02-18 00:00:00.000000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0035_ledger_partitions_from_default"
+down_revision = "0034_outbound_external_ref"
+branch_labels = None
+depends_on = None
+
+# Same contract as in 0021. A month that already has rows in inventory_ledger_default (written while its
+# partition was missing) cannot be created with PARTITION OF: Postgres rejects it because DEFAULT holds rows
+# in that range. Its rows are moved into a new table that is then attached as the month's partition. The
+# default partition is locked first so no row for the month can land there in between.
+_ENSURE_PARTITIONS_FN = """
+CREATE OR REPLACE FUNCTION inventory_ledger_ensure_partitions(p_from date, p_months_ahead integer)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    m date := date_trunc('month', p_from)::date;
+    stop date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead + 1))::date;
+    part text;
+    lo timestamptz;
+    hi timestamptz;
+    created integer := 0;
+BEGIN
+    WHILE m < stop LOOP
+        part := 'inventory_ledger_p' || to_char(m, 'YYYYMM');
+        lo := m::timestamp AT TIME ZONE 'UTC';
+        hi := (m + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+        IF to_regclass(part) IS NULL THEN
+            IF to_regclass('inventory_ledger_default') IS NOT NULL THEN
+                LOCK TABLE inventory_ledger_default IN EXCLUSIVE MODE;
+            END IF;
+            IF to_regclass('inventory_ledger_default') IS NOT NULL
+               AND EXISTS (SELECT 1 FROM inventory_ledger_default WHERE created_at >= lo AND created_at < hi) THEN
+                EXECUTE format('CREATE TABLE %I (LIKE inventory_ledger INCLUDING DEFAULTS)', part);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM inventory_ledger_default WHERE created_at >= %L AND created_at < %L '
+                    'RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                    lo, hi, part
+                );
+                EXECUTE format(
+                    'ALTER TABLE inventory_ledger ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', part, lo, hi
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF inventory_ledger FOR VALUES FROM (%L) TO (%L)', part, lo, hi
+                );
+            END IF;
+            created := created + 1;
+        END IF;
+        m := (m + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END
+$$;
+"""
+
+_ENSURE_PARTITIONS_FN_0021 = """
+CREATE OR REPLACE FUNCTION inventory_ledger_ensure_partitions(p_from date, p_months_ahead integer)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    m date := date_trunc('month', p_from)::date;
+    stop date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead + 1))::date;
+    part text;
+    created integer := 0;
+BEGIN
+    WHILE m < stop LOOP
+        part := 'inventory_ledger_p' || to_char(m, 'YYYYMM');
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF inventory_ledger FOR VALUES FROM (%L) TO (%L)',
+                part,
+                m::timestamp AT TIME ZONE 'UTC',
+                (m + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        m := (m + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute(_ENSURE_PARTITIONS_FN)
+    # Move rows that already fell into DEFAULT into their monthly partitions.
+    op.execute(
+        "SELECT inventory_ledger_ensure_partitions("
+        "LEAST(now(), (SELECT min(created_at) FROM inventory_ledger_default))::date, 3)"
+    )
+
+
+def downgrade() -> None:
+    op.execute(_ENSURE_PARTITIONS_FN_0021)
@@ -0,0 +1,39 @@
+"""outbound order of a license plate dispatch
+
+Revision ID: 0036_license_plate_move_outbound
+Revises: 0035_ledger_partitions_from_default
+Create Date: 2026-02-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0036_license_plate_move_outbound"
+down_revision = "0035_ledger_partitions_from_default"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "license_plate_moves",
+        sa.Column(
+            "outbound_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("outbound_orders.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_license_plate_moves_outbound_id",
+        "license_plate_moves",
+        ["outbound_id"],
+        postgresql_where=sa.text("outbound_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_license_plate_moves_outbound_id", table_name="license_plate_moves")
+    op.drop_column("license_plate_moves", "outbound_id")
@@ -0,0 +1,35 @@
+import random
+import time
+from collections.abc import Callable
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Postgres SQLSTATEs that mean "transaction lost a race, safe to replay":
+# 40001 serialization_failure, 40P01 deadlock_detected.
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    orig = getattr(exc, "orig", None)
+    return getattr(orig, "sqlstate", None) in RETRYABLE_SQLSTATES
+
+
+def run_with_retry(db: Session, fn: Callable[[], None], *, attempts: int | None = None) -> None:
+    """
+    Run a unit of work (which must commit itself) and replay it on serialization/deadlock errors.
+    The session is rolled back between attempts, so `fn` must re-load everything it touches.
+    """
+    max_attempts = attempts or settings.db_retry_attempts
+    for attempt in range(1, max_attempts + 1):
+        try:
+            fn()
+            return
+        except DBAPIError as e:
+            if not is_retryable_error(e) or attempt >= max_attempts:
+                raise
+            db.rollback()
+            # Small jittered backoff so competing transactions do not collide again in lockstep.
+            time.sleep(random.uniform(0, settings.db_retry_backoff_ms / 1000.0) * attempt)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,6 +10,10 @@ from app.models.base import Base
 
 class File(Base):
     __tablename__ = "files"
+    __table_args__ = (
+        # Document worker queue: oldest PENDING files first
+        Index("ix_files_pending", "created_at", postgresql_where=text("status = 'PENDING'")),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[int] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -24,6 +28,13 @@ class File(Base):
     mime_type: Mapped[str] = mapped_column(String(128), nullable=False)
     size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
 
+    # Generated documents are queued as PENDING (empty storage_key) and rendered by the document worker
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="READY", server_default="READY")  # PENDING/READY/FAILED
+    reference_id: Mapped[str | None] = mapped_column(String(64), nullable=True)  # document subject (inbound/outbound/return id)
+    language: Mapped[str | None] = mapped_column(String(8), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
     created_by_user_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
     )
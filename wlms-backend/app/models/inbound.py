@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,6 +10,17 @@ from app.models.base import Base
 
 class InboundShipment(Base):
     __tablename__ = "inbound_shipments"
+    __table_args__ = (
+        # One shipment per supplier ASN and client: re-importing an ASN file does not duplicate it.
+        Index(
+            "uq_inbound_shipments_client_asn",
+            "tenant_id",
+            "client_id",
+            "asn_reference",
+            unique=True,
+            postgresql_where=text("asn_reference IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[int] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -24,6 +35,8 @@ class InboundShipment(Base):
     status: Mapped[str] = mapped_column(String(16), nullable=False, default="DRAFT")  # DRAFT/RECEIVING/RECEIVED/CLOSED
 
     supplier: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Supplier's advance shipping notice reference, when the shipment was created by an ASN import
+    asn_reference: Mapped[str | None] = mapped_column(String(64), nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     created_by_user_id: Mapped[uuid.UUID] = mapped_column(
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint, func
+from sqlalchemy import DDL, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, event, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -11,7 +11,23 @@ from app.models.base import Base
 class InventoryBalance(Base):
     __tablename__ = "inventory_balances"
     __table_args__ = (
-        UniqueConstraint("tenant_id", "product_id", "batch_id", "location_id", name="uq_inv_bal_tenant_prod_batch_loc"),
+        # NULLS NOT DISTINCT so un-batched stock has one row per location and ON CONFLICT upserts match it.
+        UniqueConstraint(
+            "tenant_id",
+            "product_id",
+            "batch_id",
+            "location_id",
+            name="uq_inv_bal_tenant_prod_batch_loc",
+            postgresql_nulls_not_distinct=True,
+        ),
+        # Put-away queue keyset: positive balances per location. Staging rows emptied by put-away stay behind
+        # at zero, so the predicate keeps the index to the stock actually waiting.
+        Index(
+            "ix_inv_bal_location_positive",
+            "location_id",
+            "id",
+            postgresql_where=text("on_hand_qty > 0"),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -47,7 +63,18 @@ class InventoryBalance(Base):
 
 
 class InventoryLedger(Base):
+    """
+    Append-only stock movements.
+
+    Range-partitioned by month on created_at (migration 0021), so created_at is part of the primary key
+    and queries should always bound created_at to let Postgres prune partitions.
+    """
+
     __tablename__ = "inventory_ledger"
+    __table_args__ = (
+        Index("ix_inventory_ledger_tenant_created_at", "tenant_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[int] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -78,6 +105,13 @@ class InventoryLedger(Base):
     performed_by_user_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
     )
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
 
+# Base.metadata.create_all() (tests, benchmarks) creates the partitioned parent only; give it a catch-all
+# partition so inserts work. Migrations create the monthly partitions (see inventory_ledger_ensure_partitions).
+event.listen(
+    InventoryLedger.__table__,
+    "after_create",
+    DDL("CREATE TABLE inventory_ledger_default PARTITION OF inventory_ledger DEFAULT").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class InventoryAvailability(Base):
+    """
+    Per-SKU stock summary, maintained transactionally by the inventory/reservation services.
+
+    "pickable" = non-STAGING locations (what outbound can reserve); "staging" = STAGING locations
+    (received, not yet put away). Equals SUM() over inventory_balances grouped by the primary key.
+    """
+
+    __tablename__ = "inventory_availability"
+
+    tenant_id: Mapped[int] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    client_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("clients.id", ondelete="CASCADE"), primary_key=True
+    )
+    warehouse_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("warehouses.id", ondelete="CASCADE"), primary_key=True
+    )
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    pickable_on_hand_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pickable_reserved_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pickable_available_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    staging_on_hand_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    staging_reserved_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    staging_available_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
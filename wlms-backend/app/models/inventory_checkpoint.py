@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class InventoryCheckpoint(Base):
+    """
+    Ledger-derived on-hand snapshot.
+
+    Lines hold SUM(qty_delta) per (tenant, client, warehouse, location, product, batch) over every
+    inventory_ledger row with created_at < high_water_mark; ledger-based reads only add later deltas.
+    """
+
+    __tablename__ = "inventory_checkpoints"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    high_water_mark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, unique=True)
+    line_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class InventoryCheckpointLine(Base):
+    __tablename__ = "inventory_checkpoint_lines"
+    __table_args__ = (Index("ix_inv_cp_lines_checkpoint_tenant", "checkpoint_id", "tenant_id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    checkpoint_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("inventory_checkpoints.id", ondelete="CASCADE"), nullable=False
+    )
+    tenant_id: Mapped[int] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    # Snapshot keys are plain values (no FKs): a checkpoint must not change when master data is edited.
+    client_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    warehouse_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    location_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    product_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    batch_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+
+    on_hand_qty: Mapped[int] = mapped_column(Integer, nullable=False)
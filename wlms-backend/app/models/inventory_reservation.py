@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, UniqueConstraint, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -23,6 +23,14 @@ class InventoryReservation(Base):
             "batch_id",
             "location_id",
             name="uq_inv_res_out_prod_batch_loc",
+            # batch_id is nullable; treat NULLs as equal so the bulk reservation upsert can target them
+            postgresql_nulls_not_distinct=True,
+        ),
+        # Sweeper lookup; most rows never expire (no TTL configured, or already picking)
+        Index(
+            "ix_inv_res_expires_at",
+            "expires_at",
+            postgresql_where=text("expires_at IS NOT NULL"),
         ),
     )
 
@@ -48,6 +56,8 @@ class InventoryReservation(Base):
     )
 
     qty_reserved: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Released by the sweeper after this time (NULL = held until picked / cancelled)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     outbound = relationship("OutboundOrder", backref="reservations")
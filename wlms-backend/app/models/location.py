@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Numeric, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -27,6 +27,11 @@ class Location(Base):
     level: Mapped[str | None] = mapped_column(String(32), nullable=True)
     bin: Mapped[str | None] = mapped_column(String(32), nullable=True)
 
+    # Capacity (NULL = not tracked); a location counts as one pallet position unless capacity_pallets says otherwise
+    capacity_pallets: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    capacity_volume_m3: Mapped[float | None] = mapped_column(Numeric(10, 3), nullable=True)
+    capacity_weight_kg: Mapped[float | None] = mapped_column(Numeric(10, 2), nullable=True)
+
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="true")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class LocationOccupancy(Base):
+    """
+    Units on hand per location, maintained incrementally alongside inventory_availability.
+
+    Equals SUM(on_hand_qty) over inventory_balances grouped by location; a location is occupied when
+    on_hand_qty > 0. warehouse_id/zone_id are copied from the location so occupied-position counts
+    per zone are answered from the partial index alone.
+    """
+
+    __tablename__ = "location_occupancy"
+    __table_args__ = (
+        Index(
+            "ix_location_occupancy_occupied",
+            "warehouse_id",
+            "zone_id",
+            postgresql_where=text("on_hand_qty > 0"),
+        ),
+    )
+
+    location_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True
+    )
+    tenant_id: Mapped[int] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    warehouse_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("warehouses.id", ondelete="CASCADE"), nullable=False
+    )
+    zone_id: Mapped[int] = mapped_column(ForeignKey("warehouse_zones.id", ondelete="CASCADE"), nullable=False)
+
+    on_hand_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
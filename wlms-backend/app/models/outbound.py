@@ -1,7 +1,7 @@
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,6 +10,17 @@ from app.models.base import Base
 
 class OutboundOrder(Base):
     __tablename__ = "outbound_orders"
+    __table_args__ = (
+        # One order per marketplace order reference and client: re-sent import batches do not duplicate it.
+        Index(
+            "uq_outbound_orders_client_external_ref",
+            "tenant_id",
+            "client_id",
+            "external_reference",
+            unique=True,
+            postgresql_where=text("external_reference IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[int] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -21,6 +32,8 @@ class OutboundOrder(Base):
     )
 
     order_number: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    # Client's own order reference (marketplace order id), set by the bulk order import
+    external_reference: Mapped[str | None] = mapped_column(String(64), nullable=True)
     status: Mapped[str] = mapped_column(
         String(16), nullable=False, default="DRAFT"
     )  # DRAFT/SUBMITTED/APPROVED/PICKING/PACKING/DISPATCHED/CANCELLED
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -9,20 +9,32 @@ from app.models.base import Base
 
 
 class PickingTask(Base):
+    """
+    A walk for one picker. Its orders are listed in picking_task_orders; outbound_id is set for
+    single-order tasks and NULL for multi-order pick waves. zone_id is set for zone-split sub-tasks,
+    which only cover the order's reservations in that zone.
+    """
+
     __tablename__ = "picking_tasks"
+    __table_args__ = (
+        Index("ix_picking_tasks_open_zone", "tenant_id", "zone_id", postgresql_where=text("status <> 'DONE'")),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    outbound_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("outbound_orders.id", ondelete="CASCADE"), nullable=False, index=True
+    tenant_id: Mapped[int] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    outbound_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("outbound_orders.id", ondelete="CASCADE"), nullable=True, index=True
     )
     assigned_to_user_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True
     )
+    zone_id: Mapped[int | None] = mapped_column(ForeignKey("warehouse_zones.id", ondelete="SET NULL"), nullable=True)
     status: Mapped[str] = mapped_column(String(16), nullable=False, default="OPEN")  # OPEN/IN_PROGRESS/DONE
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     outbound = relationship("OutboundOrder", backref="picking_tasks")
+    zone = relationship("WarehouseZone")
 
 
 class PickingTaskLine(Base):
@@ -43,8 +55,52 @@ class PickingTaskLine(Base):
     )
     qty_to_pick: Mapped[int] = mapped_column(Integer, nullable=False)
     qty_picked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Position on the task's walking route (set by generate_picks; NULL for tasks created before routing)
+    pick_seq: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     task = relationship("PickingTask", backref="lines")
     product = relationship("Product")
 
 
+class PickingTaskOrder(Base):
+    """Order picked by a task; in a wave, tote_code is the container the picker fills for that order."""
+
+    __tablename__ = "picking_task_orders"
+    __table_args__ = (
+        UniqueConstraint("picking_task_id", "outbound_id", name="uq_picking_task_orders_task_outbound"),
+        UniqueConstraint("picking_task_id", "tote_code", name="uq_picking_task_orders_task_tote"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    picking_task_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("picking_tasks.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    outbound_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("outbound_orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    tote_code: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Position in the wave: scans without a tote are attributed to orders in this order
+    seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    task = relationship("PickingTask", backref="orders")
+
+
+class PickingScan(Base):
+    """Applied scan from a handheld's offline queue; client_scan_id makes replays idempotent."""
+
+    __tablename__ = "picking_scans"
+    __table_args__ = (UniqueConstraint("picking_task_id", "client_scan_id", name="uq_picking_scans_task_client_scan"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    tenant_id: Mapped[int] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    picking_task_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("picking_tasks.id", ondelete="CASCADE"), nullable=False
+    )
+    client_scan_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    product_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    from_location_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    qty: Mapped[int] = mapped_column(Integer, nullable=False)
+    performed_by_user_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
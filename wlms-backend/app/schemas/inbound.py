@@ -20,6 +20,7 @@ class InboundOut(BaseModel):
     status: str
     supplier: str | None
     notes: str | None
+    asn_reference: str | None = None
 
 
 class InboundScanLine(BaseModel):
@@ -31,6 +32,59 @@ class InboundScanLine(BaseModel):
     location_staging_id: uuid.UUID
 
 
+class InboundScanBatch(BaseModel):
+    # Receiving scans in scan order
+    scans: list[InboundScanLine] = Field(min_length=1, max_length=500)
+
+
+class InboundScanResultOut(BaseModel):
+    index: int
+    status: str  # RECEIVED / REJECTED
+    detail: str | None = None
+    product_id: uuid.UUID | None = None
+    batch_id: uuid.UUID | None = None
+    line_id: int | None = None
+    qty_pieces: int = 0
+
+
+class InboundScanBatchOut(BaseModel):
+    received: int
+    rejected: int
+    qty_pieces: int
+    results: list[InboundScanResultOut]
+
+
+class AsnImportShipmentOut(BaseModel):
+    asn_reference: str
+    inbound_id: uuid.UUID
+
+
+class AsnImportOut(BaseModel):
+    created: int
+    lines: int
+    shipments: list[AsnImportShipmentOut]
+    errors: list[dict]
+
+
+class InboundVarianceLineOut(BaseModel):
+    product_id: uuid.UUID
+    sku: str
+    name: str
+    expected_qty: int
+    received_qty: int
+    variance: int  # received - expected
+    status: str  # MATCH / SHORT / OVER / UNEXPECTED
+
+
+class InboundVarianceOut(BaseModel):
+    inbound_id: uuid.UUID
+    expected_qty: int
+    received_qty: int
+    variance: int
+    discrepancies: int  # lines that are not MATCH
+    lines: list[InboundVarianceLineOut]
+
+
 class InboundLineOut(BaseModel):
     id: int
     inbound_id: uuid.UUID
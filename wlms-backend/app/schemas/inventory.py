@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime
 
 from pydantic import BaseModel
 
@@ -16,3 +17,27 @@ class InventoryBalanceOut(BaseModel):
     available_qty: int
 
 
+
+
+class InventoryBalanceAsOfOut(BaseModel):
+    """Historical on-hand (ledger-derived); reservations are not historized."""
+
+    as_of: datetime
+    client_id: uuid.UUID
+    warehouse_id: uuid.UUID
+    product_id: uuid.UUID
+    batch_id: uuid.UUID | None
+    location_id: uuid.UUID | None
+    on_hand_qty: int
+
+
+class StockLevelOut(BaseModel):
+    client_id: uuid.UUID
+    warehouse_id: uuid.UUID
+    product_id: uuid.UUID
+    pickable_on_hand_qty: int
+    pickable_reserved_qty: int
+    pickable_available_qty: int
+    staging_on_hand_qty: int
+    staging_reserved_qty: int
+    staging_available_qty: int
@@ -0,0 +1,56 @@
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class LicensePlateCreate(BaseModel):
+    code: str = Field(min_length=1, max_length=64)
+    client_id: uuid.UUID
+    location_id: uuid.UUID
+
+
+class LicensePlateItemIn(BaseModel):
+    product_id: uuid.UUID
+    batch_id: uuid.UUID | None = None
+    qty: int = Field(ge=1)
+
+
+class LicensePlateItemsAdd(BaseModel):
+    items: list[LicensePlateItemIn] = Field(min_length=1, max_length=500)
+
+
+class LicensePlateMoveIn(BaseModel):
+    to_location_id: uuid.UUID
+
+
+class LicensePlateDispatchIn(BaseModel):
+    outbound_id: uuid.UUID
+
+
+class LicensePlateItemOut(BaseModel):
+    product_id: uuid.UUID
+    batch_id: uuid.UUID | None
+    qty: int
+
+
+class LicensePlateOut(BaseModel):
+    id: uuid.UUID
+    code: str
+    client_id: uuid.UUID
+    warehouse_id: uuid.UUID
+    location_id: uuid.UUID | None
+    status: str
+    items: list[LicensePlateItemOut]
+
+
+class LicensePlateMoveOut(BaseModel):
+    id: uuid.UUID
+    license_plate_id: uuid.UUID
+    from_location_id: uuid.UUID | None
+    to_location_id: uuid.UUID | None
+    event_type: str
+    lines: int
+    units: int
+    outbound_id: uuid.UUID | None = None
+    created_at: datetime | None = None
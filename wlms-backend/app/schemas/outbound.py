@@ -1,5 +1,6 @@
 import uuid
 from datetime import date
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -35,6 +36,22 @@ class OutboundOut(BaseModel):
     status: str
     destination_json: dict
     requested_ship_date: date | None
+    external_reference: str | None = None
+
+
+class OutboundImportResultOut(BaseModel):
+    row: int  # CSV line / NDJSON line of the order's first row
+    order_ref: str | None
+    status: str  # CREATED / REJECTED
+    detail: str | None = None
+    outbound_id: uuid.UUID | None = None
+    order_number: str | None = None
+
+
+class OutboundImportOut(BaseModel):
+    created: int
+    rejected: int
+    results: list[OutboundImportResultOut]
 
 
 class OutboundLineOut(BaseModel):
@@ -46,3 +63,21 @@ class OutboundLineOut(BaseModel):
     picked_qty: int
 
 
+class OutboundWaveReserve(BaseModel):
+    outbound_ids: list[uuid.UUID] = Field(min_length=1, max_length=5000)
+    # ship_date: earliest requested_ship_date first; priority: the order of outbound_ids
+    sort: Literal["ship_date", "priority"] = "ship_date"
+    allow_partial: bool = True
+
+
+class OutboundWaveReserveOut(BaseModel):
+    wave_id: uuid.UUID
+    fully_allocated: list[uuid.UUID]
+    partially_allocated: list[uuid.UUID]
+    not_allocated: list[uuid.UUID]
+    skipped: list[uuid.UUID]
+    reservations: int
+
+
+class ReservationReleaseExpiredBody(BaseModel):
+    batch_size: int | None = Field(default=None, ge=1, le=10000)  # default RESERVATION_RELEASE_BATCH_SIZE
@@ -0,0 +1,48 @@
+import uuid
+
+from pydantic import BaseModel, Field
+
+
+class PickWaveCreate(BaseModel):
+    outbound_ids: list[uuid.UUID] = Field(min_length=1, max_length=200)
+    # One per order, same order as outbound_ids; defaults to T01, T02, ...
+    tote_codes: list[str] | None = None
+
+
+class PickWaveOrderOut(BaseModel):
+    outbound_id: uuid.UUID
+    tote_code: str
+
+
+class PickWaveOut(BaseModel):
+    task_id: uuid.UUID
+    orders: list[PickWaveOrderOut]
+    lines: int
+
+
+class PickScanIn(BaseModel):
+    client_scan_id: str = Field(min_length=1, max_length=64)
+    product_id: uuid.UUID
+    batch_id: uuid.UUID | None = None
+    from_location_id: uuid.UUID
+    to_location_id: uuid.UUID
+    qty: int
+    tote_code: str | None = None
+
+
+class PickScanBatch(BaseModel):
+    # Device offline queue, in scan order
+    scans: list[PickScanIn] = Field(min_length=1, max_length=500)
+
+
+class PickScanResultOut(BaseModel):
+    client_scan_id: str
+    status: str  # APPLIED / DUPLICATE / REJECTED
+    detail: str | None = None
+
+
+class PickScanBatchOut(BaseModel):
+    applied: int
+    duplicates: int
+    rejected: int
+    results: list[PickScanResultOut]
@@ -9,9 +9,16 @@ class PutawayTask(BaseModel):
     product_id: uuid.UUID
     batch_id: uuid.UUID | None
     from_location_id: uuid.UUID
-    on_hand_qty: int
+    on_hand_qty: int  # unreserved qty to put away; cross-docked stock is picked from staging
     suggested_to_location_id: uuid.UUID | None = None
     suggested_to_location_code: str | None = None
+    suggestion_reason: str | None = None  # CONSOLIDATE / EMPTY / SHARED
+
+
+class PutawayTaskPage(BaseModel):
+    items: list[PutawayTask]
+    next_cursor: str | None = None  # pass as ?after= for the next page; None on the last page
+    count: int | None = None  # set by ?count_only=true (items is then empty)
 
 
 class PutawayConfirm(BaseModel):
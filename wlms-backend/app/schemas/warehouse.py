@@ -1,6 +1,7 @@
 import uuid
+from decimal import Decimal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class WarehouseCreate(BaseModel):
@@ -43,6 +44,9 @@ class LocationCreate(BaseModel):
     rack: str | None = None
     level: str | None = None
     bin: str | None = None
+    capacity_pallets: int | None = Field(default=None, ge=1)
+    capacity_volume_m3: Decimal | None = Field(default=None, gt=0, lt=10_000_000)
+    capacity_weight_kg: Decimal | None = Field(default=None, gt=0, lt=10_000_000)
 
 
 class LocationOut(BaseModel):
@@ -56,5 +60,25 @@ class LocationOut(BaseModel):
     level: str | None
     bin: str | None
     is_active: bool
+    capacity_pallets: int | None = None
+    capacity_volume_m3: Decimal | None = None
+    capacity_weight_kg: Decimal | None = None
 
 
+class ZoneOccupancyOut(BaseModel):
+    zone_id: int
+    zone_name: str
+    zone_type: str
+    locations: int
+    occupied: int
+    free: int
+    pallet_positions: int
+
+
+class WarehouseOccupancyOut(BaseModel):
+    warehouse_id: uuid.UUID
+    locations: int
+    occupied: int
+    free: int
+    utilisation: float  # occupied / locations, 0..1
+    zones: list[ZoneOccupancyOut]
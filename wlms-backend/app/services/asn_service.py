@@ -0,0 +1,237 @@
+import csv
+import io
+import json
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import BinaryIO
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.inbound import InboundLine, InboundShipment
+from app.models.product import Product
+
+# Largest ASN file (expected lines across all its shipments) accepted in one import
+MAX_ASN_LINES = 50_000
+
+
+def new_reference_number() -> str:
+    return f"INB-{datetime.now(timezone.utc).strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+
+
+@dataclass(frozen=True)
+class AsnLine:
+    row: int  # CSV line number, or 1-based position of the line in a JSON document (error reports)
+    asn_reference: str
+    sku: str
+    expected_qty: int
+    supplier: str | None = None
+
+
+@dataclass(frozen=True)
+class AsnImportResult:
+    shipments: list[tuple[str, uuid.UUID]]  # (asn_reference, inbound id), in file order
+    lines: int
+    errors: list[dict]
+
+
+def _line(row: int, raw: dict, errors: list[dict], *, asn_reference=None, supplier=None) -> AsnLine | None:
+    ref = str(asn_reference if asn_reference is not None else raw.get("asn_reference") or "").strip()
+    sku = str(raw.get("sku") or "").strip()
+    qty_raw = str(raw.get("expected_qty") if raw.get("expected_qty") is not None else "").strip()
+    if not ref or len(ref) > 64:
+        errors.append({"row": row, "field": "asn_reference", "message": "required, at most 64 characters"})
+        return None
+    if not sku:
+        errors.append({"row": row, "field": "sku", "message": "required"})
+        return None
+    if not qty_raw.isdigit() or int(qty_raw) <= 0:
+        errors.append({"row": row, "field": "expected_qty", "message": "must be a positive integer"})
+        return None
+    sup = str(supplier if supplier is not None else raw.get("supplier") or "").strip() or None
+    return AsnLine(row=row, asn_reference=ref, sku=sku, expected_qty=int(qty_raw), supplier=sup)
+
+
+def parse_asn_csv(stream: BinaryIO, errors: list[dict]) -> Iterator[AsnLine]:
+    """
+    Lines of a CSV ASN file (asn_reference, sku, expected_qty[, supplier]), read incrementally.
+    Invalid rows are reported in `errors` and skipped.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    try:
+        for idx, raw in enumerate(reader, start=2):
+            line = _line(idx, raw, errors)
+            if line is not None:
+                yield line
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV must be UTF-8")
+
+
+def parse_asn_json(stream: BinaryIO, errors: list[dict]) -> Iterator[AsnLine]:
+    """
+    Lines of a JSON ASN document: a list of {"asn_reference", "supplier", "lines": [{"sku", "expected_qty"}]}.
+    Invalid lines are reported in `errors` (row = position of the line in the document) and skipped.
+    """
+    try:
+        doc = json.load(io.TextIOWrapper(stream, encoding="utf-8-sig"))
+    except (UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
+    if not isinstance(doc, list) or not all(isinstance(a, dict) and isinstance(a.get("lines"), list) for a in doc):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a list of ASNs with lines")
+
+    row = 0
+    for asn in doc:
+        for raw in asn["lines"]:
+            row += 1
+            if not isinstance(raw, dict):
+                errors.append({"row": row, "field": "lines", "message": "must be an object"})
+                continue
+            line = _line(row, raw, errors, asn_reference=asn.get("asn_reference") or "", supplier=asn.get("supplier"))
+            if line is not None:
+                yield line
+
+
+def import_asn(
+    db: Session,
+    *,
+    tenant_id: int,
+    client_id: uuid.UUID,
+    warehouse_id: uuid.UUID,
+    lines: Iterable[AsnLine],
+    errors: list[dict],
+    created_by_user_id: uuid.UUID | None,
+) -> AsnImportResult:
+    """
+    Create one DRAFT inbound shipment per ASN reference with its expected lines.
+
+    SKUs are resolved with one query and already imported ASN references with another; lines for the
+    same SKU in one ASN are summed. Shipments and lines are written with one bulk INSERT each. Lines
+    with an unknown SKU and ASNs imported before are reported in `errors` and skipped.
+    """
+    # asn_reference -> (supplier, first row, sku -> (expected qty, first row)), in file order
+    asns: dict[str, tuple[str | None, int, dict[str, list[int]]]] = {}
+    n = 0
+    for line in lines:
+        n += 1
+        if n > MAX_ASN_LINES:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Too many lines in one ASN import")
+        _supplier, _first_row, skus = asns.setdefault(line.asn_reference, (line.supplier, line.row, {}))
+        skus.setdefault(line.sku, [0, line.row])[0] += line.expected_qty
+    if not asns:
+        return AsnImportResult(shipments=[], lines=0, errors=errors)
+
+    all_skus = sorted({sku for _sup, _row, skus in asns.values() for sku in skus})
+    products = dict(
+        db.execute(
+            select(Product.sku, Product.id).where(
+                Product.tenant_id == tenant_id, Product.client_id == client_id, Product.sku.in_(all_skus)
+            )
+        ).all()
+    )
+    imported = set(
+        db.scalars(
+            select(InboundShipment.asn_reference).where(
+                InboundShipment.tenant_id == tenant_id,
+                InboundShipment.client_id == client_id,
+                InboundShipment.asn_reference.in_(list(asns)),
+            )
+        ).all()
+    )
+
+    shipments: list[dict] = []
+    line_rows: list[dict] = []
+    for ref, (supplier, first_row, skus) in asns.items():
+        if ref in imported:
+            errors.append({"row": first_row, "field": "asn_reference", "message": f"ASN {ref} already imported"})
+            continue
+        inbound_id = uuid.uuid4()
+        rows = []
+        for sku, (qty, row) in skus.items():
+            if sku not in products:
+                errors.append({"row": row, "field": "sku", "message": f"Unknown SKU {sku}"})
+                continue
+            rows.append({"inbound_id": inbound_id, "product_id": products[sku], "expected_qty": qty, "received_qty": 0})
+        if not rows:
+            continue
+        shipments.append(
+            {
+                "id": inbound_id,
+                "tenant_id": tenant_id,
+                "client_id": client_id,
+                "warehouse_id": warehouse_id,
+                "reference_number": new_reference_number(),
+                "asn_reference": ref,
+                "status": "DRAFT",
+                "supplier": supplier,
+                "created_by_user_id": created_by_user_id,
+            }
+        )
+        line_rows.extend(rows)
+
+    if shipments:
+        db.execute(insert(InboundShipment), shipments)
+        db.execute(insert(InboundLine), line_rows)
+    return AsnImportResult(
+        shipments=[(s["asn_reference"], s["id"]) for s in shipments],
+        lines=len(line_rows),
+        errors=sorted(errors, key=lambda e: e["row"]),
+    )
+
+
+@dataclass(frozen=True)
+class VarianceLine:
+    product_id: uuid.UUID
+    sku: str
+    name: str
+    expected_qty: int
+    received_qty: int
+    variance: int  # received - expected
+    status: str  # MATCH / SHORT / OVER / UNEXPECTED
+
+
+def inbound_variance(db: Session, *, inbound_id: uuid.UUID, discrepancies_only: bool = False) -> list[VarianceLine]:
+    """
+    Received vs expected per product of an inbound, aggregated and classified in one query.
+
+    Lines are summed per product, so batch lines created while receiving count against the product's
+    expected (batch-less) ASN line. UNEXPECTED: received but not on the ASN.
+    """
+    expected = func.coalesce(func.sum(InboundLine.expected_qty), 0)
+    received = func.coalesce(func.sum(InboundLine.received_qty), 0)
+    stmt = (
+        select(
+            InboundLine.product_id,
+            Product.sku,
+            Product.name,
+            expected,
+            received,
+            received - expected,
+            case(
+                (func.count(InboundLine.expected_qty) == 0, "UNEXPECTED"),
+                (received == expected, "MATCH"),
+                (received < expected, "SHORT"),
+                else_="OVER",
+            ),
+        )
+        .join(Product, Product.id == InboundLine.product_id)
+        .where(InboundLine.inbound_id == inbound_id)
+        .group_by(InboundLine.product_id, Product.sku, Product.name)
+        .order_by(Product.sku)
+    )
+    if discrepancies_only:
+        stmt = stmt.having(received != expected)
+    return [
+        VarianceLine(
+            product_id=pid,
+            sku=sku,
+            name=name,
+            expected_qty=int(exp),
+            received_qty=int(rec),
+            variance=int(var),
+            status=st,
+        )
+        for pid, sku, name, exp, rec, var, st in db.execute(stmt).all()
+    ]
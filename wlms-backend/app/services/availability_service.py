@@ -0,0 +1,163 @@
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from sqlalchemy import Integer, case, column, delete, func, select, values
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.inventory import InventoryBalance
+from app.models.inventory_availability import InventoryAvailability
+from app.models.location import Location
+from app.models.warehouse_zone import WarehouseZone
+from app.services import fefo_index
+from app.services.occupancy_service import occupancy_upsert, rebuild_occupancy
+
+_KEY_COLS = ["tenant_id", "client_id", "warehouse_id", "product_id"]
+_QTY_COLS = [
+    "pickable_on_hand_qty",
+    "pickable_reserved_qty",
+    "pickable_available_qty",
+    "staging_on_hand_qty",
+    "staging_reserved_qty",
+    "staging_available_qty",
+]
+
+
+@dataclass(frozen=True)
+class AvailabilityDelta:
+    """Change applied to one inventory_balances row (identified by its location; balance_id feeds the FEFO index)."""
+
+    tenant_id: int
+    client_id: uuid.UUID
+    warehouse_id: uuid.UUID
+    product_id: uuid.UUID
+    location_id: uuid.UUID
+    on_hand: int = 0
+    reserved: int = 0
+    balance_id: uuid.UUID | None = None
+
+
+def _split_sums(is_staging, on_hand, reserved) -> list:
+    """SUM() expressions in _QTY_COLS order, routing each quantity to the pickable or staging bucket."""
+
+    def bucket(expr, staging: bool):
+        return func.sum(case((is_staging, expr if staging else 0), else_=0 if staging else expr))
+
+    return [
+        bucket(on_hand, False),
+        bucket(reserved, False),
+        bucket(on_hand - reserved, False),
+        bucket(on_hand, True),
+        bucket(reserved, True),
+        bucket(on_hand - reserved, True),
+    ]
+
+
+def apply_availability_deltas(db: Session, deltas: Sequence[AvailabilityDelta]) -> None:
+    """
+    Add balance deltas to the summary in one INSERT ... SELECT ... ON CONFLICT DO UPDATE, with the
+    location_occupancy upsert riding along as a CTE.
+
+    The location -> zone join decides the staging/pickable bucket. Rows are written in key order so
+    concurrent transactions touching several SKUs lock summary rows in the same order.
+    Every balance change passes through here, so this is also where location_occupancy and the FEFO
+    index are told about them.
+    """
+    deltas = [d for d in deltas if d.on_hand or d.reserved]
+    if not deltas:
+        return
+
+    d = values(
+        column("tenant_id", Integer),
+        column("client_id", UUID(as_uuid=True)),
+        column("warehouse_id", UUID(as_uuid=True)),
+        column("product_id", UUID(as_uuid=True)),
+        column("location_id", UUID(as_uuid=True)),
+        column("on_hand", Integer),
+        column("reserved", Integer),
+        name="availability_deltas",
+    ).data(
+        [(x.tenant_id, x.client_id, x.warehouse_id, x.product_id, x.location_id, x.on_hand, x.reserved) for x in deltas]
+    )
+    keys = [d.c.tenant_id, d.c.client_id, d.c.warehouse_id, d.c.product_id]
+    sel = (
+        select(*keys, *_split_sums(WarehouseZone.zone_type == "STAGING", d.c.on_hand, d.c.reserved))
+        .select_from(d)
+        .join(Location, Location.id == d.c.location_id)
+        .join(WarehouseZone, WarehouseZone.id == Location.zone_id)
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    stmt = pg_insert(InventoryAvailability).from_select(_KEY_COLS + _QTY_COLS, sel)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_KEY_COLS,
+        set_={
+            **{c: getattr(InventoryAvailability, c) + stmt.excluded[c] for c in _QTY_COLS},
+            "updated_at": func.now(),
+        },
+    )
+    occupancy = occupancy_upsert((x.tenant_id, x.location_id, x.on_hand) for x in deltas)
+    if occupancy is not None:
+        stmt = stmt.add_cte(occupancy)
+    db.execute(stmt)
+
+    if settings.fefo_index_enabled:
+        fefo_index.note_changes(
+            db,
+            [
+                ((x.tenant_id, x.client_id, x.warehouse_id, x.product_id), x.balance_id, x.on_hand - x.reserved)
+                for x in deltas
+                if x.on_hand != x.reserved
+            ],
+        )
+
+
+def rebuild_availability(db: Session, *, tenant_id: int | None = None) -> int:
+    """
+    Recompute the summary (and location_occupancy) from inventory_balances (backfill / repair, e.g.
+    after zone types changed). Returns the number of summary rows written.
+    """
+    wipe = delete(InventoryAvailability)
+    if tenant_id is not None:
+        wipe = wipe.where(InventoryAvailability.tenant_id == tenant_id)
+    db.execute(wipe)
+    fefo_index.clear()  # zone types may have changed which balances are candidates
+
+    keys = [InventoryBalance.tenant_id, InventoryBalance.client_id, InventoryBalance.warehouse_id, InventoryBalance.product_id]
+    sel = (
+        select(
+            *keys,
+            *_split_sums(WarehouseZone.zone_type == "STAGING", InventoryBalance.on_hand_qty, InventoryBalance.reserved_qty),
+        )
+        .join(Location, Location.id == InventoryBalance.location_id)
+        .join(WarehouseZone, WarehouseZone.id == Location.zone_id)
+        .group_by(*keys)
+    )
+    if tenant_id is not None:
+        sel = sel.where(InventoryBalance.tenant_id == tenant_id)
+    res = db.execute(pg_insert(InventoryAvailability).from_select(_KEY_COLS + _QTY_COLS, sel))
+    rebuild_occupancy(db, tenant_id=tenant_id)
+    return res.rowcount
+
+
+def pickable_available(
+    db: Session,
+    *,
+    tenant_id: int,
+    client_id: uuid.UUID,
+    warehouse_id: uuid.UUID,
+    product_ids: Sequence[uuid.UUID],
+) -> dict[uuid.UUID, int]:
+    """Available qty in non-STAGING locations per product (primary-key lookups on the summary)."""
+    rows = db.execute(
+        select(InventoryAvailability.product_id, InventoryAvailability.pickable_available_qty).where(
+            InventoryAvailability.tenant_id == tenant_id,
+            InventoryAvailability.client_id == client_id,
+            InventoryAvailability.warehouse_id == warehouse_id,
+            InventoryAvailability.product_id.in_(list(product_ids)),
+        )
+    ).all()
+    found = {pid: int(qty) for pid, qty in rows}
+    return {pid: found.get(pid, 0) for pid in product_ids}
@@ -0,0 +1,215 @@
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, exists, func, insert, literal, select, union_all
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.inventory import InventoryBalance, InventoryLedger
+from app.models.inventory_checkpoint import InventoryCheckpoint, InventoryCheckpointLine
+from app.services.inventory_service import ledger_location_id
+
+# (client_id, warehouse_id, location_id, product_id, batch_id)
+StockKey = tuple[uuid.UUID, uuid.UUID, uuid.UUID | None, uuid.UUID, uuid.UUID | None]
+
+
+@dataclass(frozen=True)
+class StockScope:
+    tenant_id: int
+    client_id: uuid.UUID | None = None
+    warehouse_id: uuid.UUID | None = None
+    product_id: uuid.UUID | None = None
+    location_id: uuid.UUID | None = None
+
+
+@dataclass(frozen=True)
+class LedgerOnHand:
+    checkpoint: InventoryCheckpoint | None
+    on_hand: dict[StockKey, int]
+    # Keys with ledger movements after the checkpoint (all keys when there is no checkpoint)
+    touched: set[StockKey]
+
+
+def latest_checkpoint(db: Session, *, at_or_before: datetime | None = None) -> InventoryCheckpoint | None:
+    stmt = select(InventoryCheckpoint).order_by(InventoryCheckpoint.high_water_mark.desc()).limit(1)
+    if at_or_before is not None:
+        stmt = stmt.where(InventoryCheckpoint.high_water_mark <= at_or_before)
+    return db.scalar(stmt)
+
+
+def create_checkpoint(db: Session) -> tuple[InventoryCheckpoint, bool]:
+    """
+    Roll the latest checkpoint forward to now - settings.inventory_checkpoint_settle_seconds.
+
+    New lines = previous lines + ledger deltas in [previous mark, new mark), computed in one
+    INSERT ... SELECT, so the job only reads the ledger partitions written since the last run.
+    The settle margin keeps rows from still-open transactions (created_at = their start time)
+    out of the window. Returns (checkpoint, created).
+    """
+    mark = db.scalar(select(func.now())) - timedelta(seconds=settings.inventory_checkpoint_settle_seconds)
+    prev = latest_checkpoint(db)
+    if prev is not None and prev.high_water_mark >= mark:
+        return prev, False
+
+    cp = InventoryCheckpoint(id=uuid.uuid4(), high_water_mark=mark, line_count=0)
+    db.add(cp)
+    db.flush()
+
+    L = InventoryCheckpointLine
+    deltas = select(
+        InventoryLedger.tenant_id,
+        InventoryLedger.client_id,
+        InventoryLedger.warehouse_id,
+        ledger_location_id().label("location_id"),
+        InventoryLedger.product_id,
+        InventoryLedger.batch_id,
+        InventoryLedger.qty_delta.label("qty"),
+    ).where(InventoryLedger.created_at < mark)
+    if prev is not None:
+        deltas = deltas.where(InventoryLedger.created_at >= prev.high_water_mark)
+        carried = select(
+            L.tenant_id, L.client_id, L.warehouse_id, L.location_id, L.product_id, L.batch_id, L.on_hand_qty.label("qty")
+        ).where(L.checkpoint_id == prev.id)
+        src = union_all(carried, deltas).subquery()
+    else:
+        src = deltas.subquery()
+
+    keys = [src.c.tenant_id, src.c.client_id, src.c.warehouse_id, src.c.location_id, src.c.product_id, src.c.batch_id]
+    agg = (
+        select(literal(cp.id, UUID(as_uuid=True)), *keys, func.sum(src.c.qty))
+        .group_by(*keys)
+        .having(func.sum(src.c.qty) != 0)
+    )
+    res = db.execute(
+        insert(L).from_select(
+            ["checkpoint_id", "tenant_id", "client_id", "warehouse_id", "location_id", "product_id", "batch_id", "on_hand_qty"],
+            agg,
+        )
+    )
+    cp.line_count = res.rowcount
+
+    # Retention: keep enough history for point-in-time queries, always keep the newest checkpoint.
+    db.execute(
+        delete(InventoryCheckpoint).where(
+            InventoryCheckpoint.high_water_mark < mark - timedelta(days=settings.inventory_checkpoint_retention_days)
+        )
+    )
+    db.flush()
+    return cp, True
+
+
+def _scoped(stmt, cols, scope: StockScope):
+    stmt = stmt.where(cols.tenant_id == scope.tenant_id)
+    if scope.client_id is not None:
+        stmt = stmt.where(cols.client_id == scope.client_id)
+    if scope.warehouse_id is not None:
+        stmt = stmt.where(cols.warehouse_id == scope.warehouse_id)
+    if scope.product_id is not None:
+        stmt = stmt.where(cols.product_id == scope.product_id)
+    return stmt
+
+
+def ledger_touched(cols, location_col, *, since: datetime | None, until: datetime):
+    """
+    EXISTS clause for the key of `cols` (checkpoint lines or balances): a ledger row for the same key with
+    since <= created_at < until. Correlated to the outer query, so keys are filtered in SQL.
+    """
+    led = InventoryLedger
+    clause = exists().where(
+        led.tenant_id == cols.tenant_id,
+        led.client_id == cols.client_id,
+        led.warehouse_id == cols.warehouse_id,
+        led.product_id == cols.product_id,
+        led.batch_id.is_not_distinct_from(cols.batch_id),
+        ledger_location_id() == location_col,
+        led.created_at < until,
+    )
+    return clause.where(led.created_at >= since) if since is not None else clause
+
+
+def _ledger_deltas(
+    db: Session, *, scope: StockScope, since: datetime | None, until: datetime | None
+) -> dict[StockKey, int]:
+    """SUM(qty_delta) per key for ledger rows with since <= created_at < until (either bound optional)."""
+    loc = ledger_location_id()
+    stmt = select(
+        InventoryLedger.client_id,
+        InventoryLedger.warehouse_id,
+        loc.label("location_id"),
+        InventoryLedger.product_id,
+        InventoryLedger.batch_id,
+        func.sum(InventoryLedger.qty_delta).label("qty"),
+    )
+    if since is not None:
+        stmt = stmt.where(InventoryLedger.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(InventoryLedger.created_at < until)
+    stmt = _scoped(stmt, InventoryLedger, scope)
+    if scope.location_id is not None:
+        stmt = stmt.where(loc == scope.location_id)
+    stmt = stmt.group_by(
+        InventoryLedger.client_id, InventoryLedger.warehouse_id, loc, InventoryLedger.product_id, InventoryLedger.batch_id
+    )
+    return {
+        (r.client_id, r.warehouse_id, r.location_id, r.product_id, r.batch_id): int(r.qty or 0)
+        for r in db.execute(stmt).all()
+    }
+
+
+def ledger_on_hand(db: Session, *, scope: StockScope, until: datetime, touched_only: bool = False) -> LedgerOnHand:
+    """
+    Ledger-derived on-hand per key for ledger rows with created_at < `until`.
+
+    Starts from the newest checkpoint at or before `until` and only sums the ledger deltas after it
+    (a time-bounded, partition-pruned scan). touched_only=True returns just the keys that moved since
+    the checkpoint; untouched checkpoint lines are left out by the query.
+    """
+    cp = latest_checkpoint(db, at_or_before=until)
+    deltas = _ledger_deltas(db, scope=scope, since=cp.high_water_mark if cp is not None else None, until=until)
+
+    on_hand: dict[StockKey, int] = defaultdict(int, deltas)
+    touched: set[StockKey] = set(deltas)
+    if cp is not None:
+        L = InventoryCheckpointLine
+        base = _scoped(select(L).where(L.checkpoint_id == cp.id), L, scope)
+        if scope.location_id is not None:
+            base = base.where(L.location_id == scope.location_id)
+        if touched_only:
+            base = base.where(ledger_touched(L, L.location_id, since=cp.high_water_mark, until=until))
+        for line in db.scalars(base).all():
+            key = (line.client_id, line.warehouse_id, line.location_id, line.product_id, line.batch_id)
+            on_hand[key] += line.on_hand_qty
+
+    return LedgerOnHand(checkpoint=cp, on_hand=dict(on_hand), touched=touched)
+
+
+def on_hand_as_of(db: Session, *, scope: StockScope, as_of: datetime) -> dict[StockKey, int]:
+    """
+    On-hand per key as of `as_of` (ledger rows with created_at < as_of); zero keys are omitted.
+
+    Replays from whichever end is closer in time: forward from the newest checkpoint at or before
+    `as_of`, or backward from the current balances (subtracting deltas since `as_of`). Either way only
+    the ledger partitions between the two points are scanned.
+    """
+    now = db.scalar(select(func.now()))
+    if as_of >= now:
+        as_of = now
+    cp = latest_checkpoint(db, at_or_before=as_of)
+
+    result: dict[StockKey, int]
+    if cp is not None and as_of - cp.high_water_mark <= now - as_of:
+        result = ledger_on_hand(db, scope=scope, until=as_of).on_hand
+    else:
+        bal_stmt = _scoped(select(InventoryBalance), InventoryBalance, scope)
+        if scope.location_id is not None:
+            bal_stmt = bal_stmt.where(InventoryBalance.location_id == scope.location_id)
+        result = defaultdict(int)
+        for b in db.scalars(bal_stmt).all():
+            result[(b.client_id, b.warehouse_id, b.location_id, b.product_id, b.batch_id)] += b.on_hand_qty
+        for key, qty in _ledger_deltas(db, scope=scope, since=as_of, until=None).items():
+            result[key] -= qty
+
+    return {key: qty for key, qty in result.items() if qty != 0}
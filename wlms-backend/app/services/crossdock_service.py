@@ -0,0 +1,143 @@
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.inbound import InboundShipment
+from app.models.inventory import InventoryBalance, InventoryLedger
+from app.models.outbound import OutboundLine, OutboundOrder
+from app.models.picking import PickingTask
+from app.models.product_batch import ProductBatch
+from app.services.picking_service import MAX_WAVE_ORDERS, create_picking_task
+from app.services.reservation_service import allocate_orders
+
+
+@dataclass(frozen=True)
+class CrossDockResult:
+    # Orders that got staging stock, in allocation order
+    orders: list[uuid.UUID]
+    # Of those, the ones now fully reserved (APPROVED, then PICKING when a task was created; still SUBMITTED
+    # when the caller may not approve orders)
+    completed: list[uuid.UUID]
+    units: int
+    picking_task_id: uuid.UUID | None
+    approved: bool = False
+
+
+_EMPTY = CrossDockResult(orders=[], completed=[], units=0, picking_task_id=None)
+
+
+def _received_stock_stmt(inbound: InboundShipment):
+    """
+    Staging balances holding what this inbound received, FEFO ordered.
+
+    A balance qualifies when the inbound's INBOUND_RECEIVE ledger rows put that product/batch into its
+    location; the ledger lookup is bounded by the inbound's created_at so only recent partitions are read.
+    """
+    received = (
+        select(InventoryLedger.id)
+        .where(
+            InventoryLedger.tenant_id == inbound.tenant_id,
+            InventoryLedger.reference_type == "INBOUND",
+            InventoryLedger.reference_id == str(inbound.id),
+            InventoryLedger.event_type == "INBOUND_RECEIVE",
+            InventoryLedger.created_at >= inbound.created_at,
+            InventoryLedger.product_id == InventoryBalance.product_id,
+            InventoryLedger.batch_id.is_not_distinct_from(InventoryBalance.batch_id),
+            InventoryLedger.to_location_id == InventoryBalance.location_id,
+        )
+        .exists()
+    )
+    return (
+        select(InventoryBalance)
+        .outerjoin(ProductBatch, InventoryBalance.batch_id == ProductBatch.id)
+        .where(
+            InventoryBalance.tenant_id == inbound.tenant_id,
+            InventoryBalance.client_id == inbound.client_id,
+            InventoryBalance.warehouse_id == inbound.warehouse_id,
+            InventoryBalance.available_qty > 0,
+            received,
+        )
+        .order_by(ProductBatch.expiry_date.asc().nulls_last(), InventoryBalance.id.asc())
+        .with_for_update(of=InventoryBalance)
+    )
+
+
+def crossdock_inbound(
+    db: Session, *, inbound: InboundShipment, can_approve: bool, create_tasks: bool = True
+) -> CrossDockResult:
+    """
+    Allocate what an inbound just received straight to waiting outbound demand.
+
+    Staging balances of the receipt (locked) are handed out with reserve_wave's allocation to SUBMITTED
+    orders of the same client and warehouse that still have unreserved lines for those products, earliest
+    requested_ship_date first (at most MAX_WAVE_ORDERS; orders locked elsewhere are skipped). The
+    reservations point at the staging location, so that stock is picked from the dock instead of being
+    put away and picked again. Orders completed by the receipt go to one picking task (totes T01, T02, ...
+    when there are several); partially covered orders keep their status like any backorder.
+
+    Approving is an admin/supervisor decision: without `can_approve` the stock is only reserved, and completed
+    orders stay SUBMITTED until someone approves them (approval then finds nothing left to reserve).
+    """
+    stock: dict[tuple[uuid.UUID, uuid.UUID, uuid.UUID], list[InventoryBalance]] = defaultdict(list)
+    for bal in db.scalars(_received_stock_stmt(inbound), execution_options={"populate_existing": True}).all():
+        stock[(bal.client_id, bal.warehouse_id, bal.product_id)].append(bal)
+    if not stock:
+        return _EMPTY
+
+    product_ids = sorted({pid for _c, _w, pid in stock})
+    open_line = (
+        select(OutboundLine.id)
+        .where(
+            OutboundLine.outbound_id == OutboundOrder.id,
+            OutboundLine.product_id.in_(product_ids),
+            OutboundLine.requested_qty > OutboundLine.reserved_qty,
+        )
+        .exists()
+    )
+    orders = db.scalars(
+        select(OutboundOrder)
+        .where(
+            OutboundOrder.tenant_id == inbound.tenant_id,
+            OutboundOrder.client_id == inbound.client_id,
+            OutboundOrder.warehouse_id == inbound.warehouse_id,
+            OutboundOrder.status == "SUBMITTED",
+            open_line,
+        )
+        .order_by(
+            OutboundOrder.requested_ship_date.asc().nulls_last(), OutboundOrder.created_at.asc(), OutboundOrder.id.asc()
+        )
+        .limit(MAX_WAVE_ORDERS)
+        # SKIP LOCKED: completing a receipt never waits on an order being edited or reserved elsewhere.
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not orders:
+        return _EMPTY
+
+    lines_by_order: dict[uuid.UUID, list[OutboundLine]] = defaultdict(list)
+    for line in db.scalars(
+        select(OutboundLine).where(OutboundLine.outbound_id.in_([o.id for o in orders])).order_by(OutboundLine.id)
+    ).all():
+        lines_by_order[line.outbound_id].append(line)
+
+    wave = allocate_orders(
+        db, orders=list(orders), lines_by_order=lines_by_order, stock=stock, allow_partial=True, approve=can_approve
+    )
+    fully = set(wave.fully_allocated)
+    touched = fully | set(wave.partially_allocated)
+
+    task: PickingTask | None = None
+    completed = [o for o in orders if o.id in fully]
+    if can_approve and create_tasks and completed:
+        totes = [None] if len(completed) == 1 else [f"T{i + 1:02d}" for i in range(len(completed))]
+        task = create_picking_task(db, tenant_id=inbound.tenant_id, orders=completed, totes=totes)
+
+    return CrossDockResult(
+        orders=[o.id for o in orders if o.id in touched],
+        completed=[o.id for o in completed],
+        units=wave.units,
+        picking_task_id=task.id if task else None,
+        approved=can_approve,
+    )
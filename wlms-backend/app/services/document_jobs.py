@@ -0,0 +1,221 @@
+import argparse
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.db.session import SessionLocal
+from app.models.client import Client
+from app.models.file import File
+from app.models.inbound import InboundLine, InboundShipment
+from app.models.outbound import OutboundLine, OutboundOrder
+from app.models.return_ import Return, ReturnLine
+from app.models.user import User
+from app.services.document_service import (
+    render_dispatch_pdf,
+    render_inbound_pdf,
+    render_packing_slip_pdf,
+    render_return_pdf,
+)
+from app.services.storage_service import load_bytes, save_bytes
+
+logger = logging.getLogger(__name__)
+
+# file_type -> storage file name prefix
+DOCUMENT_TYPES = {
+    "RECEIVING_PDF": "receiving",
+    "PACKING_SLIP_PDF": "packing",
+    "DISPATCH_PDF": "dispatch",
+    "RETURN_PDF": "return",
+}
+
+
+def document_language(db: Session, *, tenant_id: int, client_id: uuid.UUID, user: User) -> str:
+    """Client's preferred language, else the acting user's, else English."""
+    client = db.scalar(select(Client).where(Client.id == client_id, Client.tenant_id == tenant_id))
+    return (client.preferred_language if client else None) or user.language_pref or "en"
+
+
+def queue_document(
+    db: Session,
+    *,
+    tenant_id: int,
+    client_id: uuid.UUID,
+    file_type: str,
+    reference_id: uuid.UUID,
+    original_name: str,
+    language: str,
+    created_by_user_id: uuid.UUID | None,
+) -> File:
+    """
+    Record a PENDING document file for `reference_id`; the caller links it to its document (e.g.
+    receiving_pdf_file_id) in the same transaction.
+
+    With settings.document_worker_enabled the document worker renders it after the commit; otherwise it is
+    rendered and stored right away, inside the request.
+    """
+    if file_type not in DOCUMENT_TYPES:
+        raise ValueError(f"Unknown document type {file_type}")
+    f = File(
+        tenant_id=tenant_id,
+        client_id=client_id,
+        file_type=file_type,
+        storage_provider=settings.file_storage_provider,
+        storage_key="",
+        original_name=original_name,
+        mime_type="application/pdf",
+        size_bytes=0,
+        status="PENDING",
+        reference_id=str(reference_id),
+        language=language,
+        attempts=0,
+        created_by_user_id=created_by_user_id,
+    )
+    db.add(f)
+    db.flush()
+    if not settings.document_worker_enabled:
+        build_document(db, f)
+    return f
+
+
+def _render(db: Session, f: File) -> bytes:
+    ref = uuid.UUID(f.reference_id)
+    lang = f.language or "en"
+    if f.file_type == "RECEIVING_PDF":
+        inbound = db.scalar(select(InboundShipment).where(InboundShipment.id == ref, InboundShipment.tenant_id == f.tenant_id))
+        if inbound is None:
+            raise LookupError(f"Inbound {ref} not found")
+        lines = db.scalars(select(InboundLine).where(InboundLine.inbound_id == ref)).all()
+        return render_inbound_pdf(
+            inbound_id=str(ref),
+            reference_number=inbound.reference_number,
+            lines=[{"product_id": str(ln.product_id), "received_qty": ln.received_qty} for ln in lines],
+            language=lang,
+        )
+    if f.file_type in {"PACKING_SLIP_PDF", "DISPATCH_PDF"}:
+        o = db.scalar(select(OutboundOrder).where(OutboundOrder.id == ref, OutboundOrder.tenant_id == f.tenant_id))
+        if o is None:
+            raise LookupError(f"Outbound {ref} not found")
+        lines = db.scalars(select(OutboundLine).where(OutboundLine.outbound_id == ref)).all()
+        if f.file_type == "PACKING_SLIP_PDF":
+            return render_packing_slip_pdf(
+                outbound_id=str(ref),
+                order_number=o.order_number,
+                lines=[{"product_id": str(ln.product_id), "qty": ln.requested_qty} for ln in lines],
+                packing=o.packing_json,
+                language=lang,
+            )
+        return render_dispatch_pdf(
+            outbound_id=str(ref),
+            order_number=o.order_number,
+            lines=[{"product_id": str(ln.product_id), "picked_qty": ln.picked_qty} for ln in lines],
+            language=lang,
+        )
+    r = db.scalar(select(Return).where(Return.id == ref, Return.tenant_id == f.tenant_id))
+    if r is None:
+        raise LookupError(f"Return {ref} not found")
+    lines = db.scalars(select(ReturnLine).where(ReturnLine.return_id == ref)).all()
+    return render_return_pdf(
+        return_id=str(ref),
+        lines=[{"product_id": str(ln.product_id), "qty": ln.qty, "disposition": ln.disposition} for ln in lines],
+        language=lang,
+    )
+
+
+def build_document(db: Session, f: File) -> None:
+    """Render a PENDING file from the current state of its document, store it and mark it READY."""
+    pdf = _render(db, f)
+    key, size = save_bytes(data=pdf, filename=f"{DOCUMENT_TYPES[f.file_type]}_{f.reference_id}.pdf")
+    f.storage_key = key
+    f.size_bytes = size
+    f.status = "READY"
+    f.error = None
+
+
+def process_pending(db: Session, *, limit: int) -> int:
+    """
+    Build up to `limit` PENDING files, oldest first, and commit. Rows are claimed FOR UPDATE SKIP LOCKED, so
+    several workers share the queue without building a file twice. A failed build is retried on a later
+    pass until settings.document_worker_max_attempts, then the file is FAILED. Returns the files claimed.
+    """
+    files = db.scalars(
+        select(File)
+        .where(File.status == "PENDING")
+        .order_by(File.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    for f in files:
+        try:
+            with db.begin_nested():
+                build_document(db, f)
+        except Exception as exc:
+            logger.exception("document build failed", extra={"file_id": str(f.id)})
+            f.attempts = (f.attempts or 0) + 1
+            f.error = str(exc)[:1000]
+            if f.attempts >= settings.document_worker_max_attempts:
+                f.status = "FAILED"
+    db.commit()
+    return len(files)
+
+
+def document_response(f: File) -> Response:
+    """
+    The file's bytes when READY; 202 with its status and a Retry-After header while the worker has not built it
+    yet; 409 with the stored error once it FAILED (set it back to PENDING to retry).
+    """
+    if f.status == "PENDING":
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"status": "PENDING", "file_id": str(f.id)},
+            headers={"Retry-After": str(max(1, round(settings.document_worker_poll_seconds)))},
+        )
+    if f.status == "FAILED":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Document generation failed: {f.error or 'unknown error'}"
+        )
+    data = load_bytes(storage_provider=f.storage_provider, storage_key=f.storage_key)
+    return Response(content=data, media_type=f.mime_type, headers={"Content-Disposition": f'attachment; filename="{f.original_name}"'})
+
+
+def _worker_loop(*, batch_size: int, poll_seconds: float) -> None:
+    while True:
+        db = SessionLocal()
+        try:
+            claimed = process_pending(db, limit=batch_size)
+        except Exception:
+            logger.exception("document worker pass failed")
+            db.rollback()
+            claimed = 0
+        finally:
+            db.close()
+        if claimed < batch_size:
+            time.sleep(poll_seconds)
+
+
+def run_worker(*, threads: int, batch_size: int, poll_seconds: float) -> None:
+    """Run `threads` workers, each with its own session, polling the PENDING queue until interrupted."""
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="document-worker") as pool:
+        for _ in range(threads):
+            pool.submit(_worker_loop, batch_size=batch_size, poll_seconds=poll_seconds)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Render and store queued document PDFs")
+    ap.add_argument("--threads", type=int, default=settings.document_worker_threads)
+    ap.add_argument("--batch-size", type=int, default=settings.document_worker_batch_size)
+    ap.add_argument("--poll-seconds", type=float, default=settings.document_worker_poll_seconds)
+    args = ap.parse_args()
+    configure_logging()
+    run_worker(threads=args.threads, batch_size=args.batch_size, poll_seconds=args.poll_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, replace
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# (tenant_id, client_id, warehouse_id, product_id)
+FefoKey = tuple[int, uuid.UUID, uuid.UUID, uuid.UUID]
+
+_PENDING = "fefo_index_pending"
+
+
+@dataclass(frozen=True)
+class FefoCandidate:
+    balance_id: uuid.UUID
+    location_id: uuid.UUID
+    batch_id: uuid.UUID | None
+    available_qty: int
+
+
+@dataclass
+class _Entry:
+    loaded_at: float
+    candidates: list[FefoCandidate]
+    pos: dict[uuid.UUID, int]
+
+
+class FefoIndex:
+    """
+    Per-process cache of FEFO-sorted reservation candidates per SKU.
+
+    The list is a hint, not the source of truth: callers lock the balances they pick and re-check
+    them, so a stale entry costs a fallback to the SQL path, not a wrong reservation. Changes made
+    in this process are applied after commit (see note_changes); changes from other processes are
+    only picked up on reload, which the TTL bounds.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_keys: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[FefoKey, _Entry] = OrderedDict()
+        # Bumped on every change to a key, so a load that raced with a commit is not stored
+        self._versions: dict[FefoKey, int] = {}
+
+    def candidates(
+        self, key: FefoKey, load: Callable[[], list[FefoCandidate]], *, store: bool = True
+    ) -> list[FefoCandidate]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.loaded_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return list(entry.candidates)
+            version = self._versions.get(key, 0)
+
+        loaded = load()
+        if not store:
+            return loaded
+        with self._lock:
+            if self._versions.get(key, 0) == version:
+                self._entries[key] = _Entry(
+                    loaded_at=now, candidates=loaded, pos={c.balance_id: i for i, c in enumerate(loaded)}
+                )
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_keys:
+                    evicted, _entry = self._entries.popitem(last=False)
+                    self._versions.pop(evicted, None)
+        return list(loaded)
+
+    def apply(self, changes: Iterable[tuple[FefoKey, uuid.UUID | None, int]]) -> None:
+        """Apply committed (key, balance_id, available delta) changes; unknown balances drop the key."""
+        with self._lock:
+            for key, balance_id, delta in changes:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                i = entry.pos.get(balance_id) if balance_id is not None else None
+                if i is None:
+                    # New (or unknown) balance: it may rank anywhere in FEFO order, reload on next use
+                    if delta > 0 or balance_id is None:
+                        del self._entries[key]
+                    continue
+                c = entry.candidates[i]
+                entry.candidates[i] = replace(c, available_qty=c.available_qty + delta)
+
+    def invalidate(self, keys: Iterable[FefoKey]) -> None:
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+_index = FefoIndex(ttl_seconds=settings.fefo_index_ttl_seconds, max_keys=settings.fefo_index_max_keys)
+
+
+def candidates(db: Session, key: FefoKey, load: Callable[[], list[FefoCandidate]]) -> list[FefoCandidate]:
+    """FEFO-ordered candidates for `key`; `load` runs through `db`, whose own uncommitted changes are never cached."""
+    return _index.candidates(key, load, store=not has_pending(db, key))
+
+
+def invalidate(keys: Iterable[FefoKey]) -> None:
+    _index.invalidate(keys)
+
+
+def clear() -> None:
+    _index.clear()
+
+
+def note_changes(db: Session, changes: Iterable[tuple[FefoKey, uuid.UUID | None, int]]) -> None:
+    """Queue (key, balance_id, available delta) changes; they reach the index when `db` commits."""
+    db.info.setdefault(_PENDING, []).extend(changes)
+
+
+def has_pending(db: Session, key: FefoKey) -> bool:
+    """True if `db` has uncommitted changes for `key` (a load through it would see them early)."""
+    return any(k == key for k, _balance_id, _delta in db.info.get(_PENDING, ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        _index.apply(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_after_rollback(session: Session, previous_transaction) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending and previous_transaction.nested:
+        # A savepoint rolled back part of the queued work: drop the keys when the outer transaction commits.
+        session.info[_PENDING] = [(key, None, 0) for key in {k for k, _balance_id, _delta in pending}]
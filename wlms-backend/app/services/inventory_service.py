@@ -1,11 +1,15 @@
 import uuid
+from collections.abc import Sequence
 from dataclasses import dataclass
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.models.inventory import InventoryBalance, InventoryLedger
+from app.models.license_plate import LicensePlate, LicensePlateItem
+from app.services.availability_service import AvailabilityDelta, apply_availability_deltas
 
 
 @dataclass(frozen=True)
@@ -24,6 +28,17 @@ class LedgerCreate:
     performed_by_user_id: uuid.UUID | None
 
 
+@dataclass(frozen=True)
+class LedgerEntryError:
+    index: int
+    detail: str
+
+
+def ledger_location_id():
+    """SQL expression for the location a ledger row changes: to_location_id if qty_delta > 0, else from_location_id."""
+    return case((InventoryLedger.qty_delta > 0, InventoryLedger.to_location_id), else_=InventoryLedger.from_location_id)
+
+
 def _recalc_available(bal: InventoryBalance) -> None:
     bal.available_qty = bal.on_hand_qty - bal.reserved_qty
 
@@ -58,6 +73,20 @@ def adjust_reserved(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient available qty")
     bal.reserved_qty += delta_reserved
     _recalc_available(bal)
+    apply_availability_deltas(
+        db,
+        [
+            AvailabilityDelta(
+                tenant_id=tenant_id,
+                client_id=client_id,
+                warehouse_id=warehouse_id,
+                product_id=product_id,
+                location_id=location_id,
+                reserved=delta_reserved,
+                balance_id=bal.id,
+            )
+        ],
+    )
     db.flush()
 
 
@@ -154,6 +183,20 @@ def add_ledger_and_apply_on_hand(db: Session, *, entry: LedgerCreate) -> Invento
         bal.on_hand_qty = new_on_hand
         _recalc_available(bal)
 
+    apply_availability_deltas(
+        db,
+        [
+            AvailabilityDelta(
+                tenant_id=entry.tenant_id,
+                client_id=entry.client_id,
+                warehouse_id=entry.warehouse_id,
+                product_id=entry.product_id,
+                location_id=bal.location_id,
+                on_hand=entry.qty_delta,
+                balance_id=bal.id,
+            )
+        ],
+    )
     db.flush()
     return ledger
 
@@ -174,9 +217,43 @@ def move_on_hand(
     performed_by_user_id: uuid.UUID | None,
     event_type: str = "PUTAWAY_MOVE",
 ) -> None:
+    """
+    Move loose units between locations (put-away confirm, manual transfer).
+
+    Units on an active license plate at the source only move with their plate: the source balance is
+    locked and the move is rejected if it would leave less on hand than the plates there hold.
+    """
     if qty <= 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="qty must be > 0")
 
+    plated = (
+        select(func.coalesce(func.sum(LicensePlateItem.qty), 0))
+        .join(LicensePlate, LicensePlate.id == LicensePlateItem.license_plate_id)
+        .where(
+            LicensePlate.tenant_id == tenant_id,
+            LicensePlate.location_id == from_location_id,
+            LicensePlate.status == "ACTIVE",
+            LicensePlateItem.product_id == product_id,
+            LicensePlateItem.batch_id.is_not_distinct_from(batch_id),
+        )
+        .scalar_subquery()
+    )
+    src = db.execute(
+        select(InventoryBalance.on_hand_qty, plated.label("plated"))
+        .where(
+            InventoryBalance.tenant_id == tenant_id,
+            InventoryBalance.product_id == product_id,
+            InventoryBalance.batch_id == batch_id,
+            InventoryBalance.location_id == from_location_id,
+        )
+        .with_for_update(of=InventoryBalance)
+    ).first()
+    if src is not None and src.plated and src.on_hand_qty - qty < src.plated:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Stock is on a license plate at the source location; move or unpack the plate",
+        )
+
     add_ledger_and_apply_on_hand(
         db,
         entry=LedgerCreate(
@@ -213,3 +290,142 @@ def move_on_hand(
     )
 
 
+def _balance_key(entry: LedgerCreate) -> tuple[int, uuid.UUID, uuid.UUID | None, uuid.UUID]:
+    location_id = entry.to_location_id if entry.qty_delta > 0 else entry.from_location_id
+    assert location_id is not None
+    return (entry.tenant_id, entry.product_id, entry.batch_id, location_id)
+
+
+def _balance_sort_key(key: tuple) -> tuple:
+    tenant_id, product_id, batch_id, location_id = key
+    return (tenant_id, product_id, batch_id is not None, batch_id or product_id, location_id)
+
+
+def _ledger_batch_error(errors: list[LedgerEntryError]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "message": errors[0].detail if len(errors) == 1 else "Ledger batch rejected",
+            "errors": [{"index": e.index, "detail": e.detail} for e in errors],
+        },
+    )
+
+
+def apply_ledger_batch(db: Session, *, entries: Sequence[LedgerCreate]) -> list[InventoryBalance]:
+    """
+    Set-based variant of add_ledger_and_apply_on_hand.
+
+    Ledger rows are bulk-inserted and the on-hand deltas (summed per balance key) are applied
+    with a single INSERT ... ON CONFLICT DO UPDATE on inventory_balances. Negative-stock and
+    below-reserved checks run against the resulting balances; any violation rejects the whole
+    batch with a 400 whose details list the offending entry indexes.
+    """
+    if not entries:
+        return []
+
+    errors: list[LedgerEntryError] = []
+    for idx, e in enumerate(entries):
+        if e.qty_delta == 0:
+            errors.append(LedgerEntryError(index=idx, detail="qty_delta cannot be 0"))
+        elif e.qty_delta > 0 and e.to_location_id is None:
+            errors.append(LedgerEntryError(index=idx, detail="Missing to_location_id"))
+        elif e.qty_delta < 0 and e.from_location_id is None:
+            errors.append(LedgerEntryError(index=idx, detail="Missing from_location_id"))
+    if errors:
+        raise _ledger_batch_error(errors)
+
+    # key -> (client_id, warehouse_id, summed delta); entry indexes per key for error reporting
+    deltas: dict[tuple, tuple[uuid.UUID, uuid.UUID, int]] = {}
+    key_entries: dict[tuple, list[int]] = {}
+    for idx, e in enumerate(entries):
+        key = _balance_key(e)
+        prev = deltas.get(key)
+        deltas[key] = (e.client_id, e.warehouse_id, (prev[2] if prev else 0) + e.qty_delta)
+        key_entries.setdefault(key, []).append(idx)
+
+    # Push pending ORM changes first so the upsert sees (and refreshes) the current balances.
+    db.flush()
+
+    # Upsert in key order so concurrent batches touching the same balances take their row locks in the
+    # same order (e.g. dispatch and returns on one packing location) instead of deadlocking.
+    ordered = sorted(deltas.items(), key=lambda kv: _balance_sort_key(kv[0]))
+
+    db.execute(
+        insert(InventoryLedger),
+        [
+            {
+                "tenant_id": e.tenant_id,
+                "client_id": e.client_id,
+                "warehouse_id": e.warehouse_id,
+                "product_id": e.product_id,
+                "batch_id": e.batch_id,
+                "from_location_id": e.from_location_id,
+                "to_location_id": e.to_location_id,
+                "qty_delta": e.qty_delta,
+                "event_type": e.event_type,
+                "reference_type": e.reference_type,
+                "reference_id": e.reference_id,
+                "performed_by_user_id": e.performed_by_user_id,
+            }
+            for e in entries
+        ],
+    )
+
+    stmt = pg_insert(InventoryBalance).values(
+        [
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": tenant_id,
+                "client_id": client_id,
+                "warehouse_id": warehouse_id,
+                "product_id": product_id,
+                "batch_id": batch_id,
+                "location_id": location_id,
+                "on_hand_qty": delta,
+                "reserved_qty": 0,
+                "available_qty": delta,
+            }
+            for (tenant_id, product_id, batch_id, location_id), (client_id, warehouse_id, delta) in ordered
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_inv_bal_tenant_prod_batch_loc",
+        set_={
+            "on_hand_qty": InventoryBalance.on_hand_qty + stmt.excluded.on_hand_qty,
+            "available_qty": InventoryBalance.on_hand_qty + stmt.excluded.on_hand_qty - InventoryBalance.reserved_qty,
+            "updated_at": func.now(),
+        },
+    )
+    balances = list(db.scalars(stmt.returning(InventoryBalance), execution_options={"populate_existing": True}).all())
+
+    for bal in balances:
+        key = (bal.tenant_id, bal.product_id, bal.batch_id, bal.location_id)
+        if bal.on_hand_qty < 0:
+            detail = "Insufficient on-hand qty"
+        elif bal.on_hand_qty < bal.reserved_qty:
+            detail = "Cannot reduce on-hand below reserved qty"
+        else:
+            continue
+        errors.extend(
+            LedgerEntryError(index=idx, detail=detail) for idx in key_entries.get(key, []) if entries[idx].qty_delta < 0
+        )
+    if errors:
+        raise _ledger_batch_error(sorted(errors, key=lambda e: e.index))
+
+    balance_ids = {(b.tenant_id, b.product_id, b.batch_id, b.location_id): b.id for b in balances}
+    apply_availability_deltas(
+        db,
+        [
+            AvailabilityDelta(
+                tenant_id=key[0],
+                client_id=client_id,
+                warehouse_id=warehouse_id,
+                product_id=key[1],
+                location_id=key[3],
+                on_hand=delta,
+                balance_id=balance_ids.get(key),
+            )
+            for key, (client_id, warehouse_id, delta) in deltas.items()
+        ],
+    )
+    return balances
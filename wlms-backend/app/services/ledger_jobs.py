@@ -0,0 +1,91 @@
+import argparse
+import logging
+from datetime import date
+
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.db.retry import run_with_retry
+from app.db.session import SessionLocal
+from app.services.checkpoint_service import create_checkpoint
+from app.services.ledger_partition_service import detach_ledger_partitions, ensure_ledger_partitions
+from app.services.reservation_service import ReleaseResult, release_expired_reservations
+
+logger = logging.getLogger(__name__)
+
+
+def _ensure_partitions(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        created = ensure_ledger_partitions(db, months_ahead=args.months_ahead)
+        db.commit()
+    logger.info("ledger partitions ensured", extra={"created": created})
+
+
+def _detach_partitions(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        detached = detach_ledger_partitions(db, before=args.before)
+        db.commit()
+    logger.info("ledger partitions detached", extra={"detached": detached})
+
+
+def _checkpoint(_args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        cp, created = create_checkpoint(db)
+        db.commit()
+    logger.info(
+        "inventory checkpoint run",
+        extra={"created": created, "high_water_mark": cp.high_water_mark.isoformat(), "lines": cp.line_count},
+    )
+
+
+def _release_expired(args: argparse.Namespace) -> None:
+    results: list[ReleaseResult] = []
+    with SessionLocal() as db:
+        # One transaction per batch keeps lock time short; a batch that deadlocks with an approval is replayed.
+        def _batch() -> None:
+            result = release_expired_reservations(db, tenant_id=None, limit=args.batch_size)
+            db.commit()
+            results.append(result)
+
+        while True:
+            run_with_retry(db, _batch)
+            if len(results[-1].outbound_ids) < args.batch_size:
+                break
+    logger.info(
+        "expired reservations released",
+        extra={
+            "orders": sum(len(r.outbound_ids) for r in results),
+            "reservations": sum(r.reservations for r in results),
+            "qty": sum(r.qty for r in results),
+        },
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Operator jobs on the shared inventory ledger (all tenants), run from cron or the ledger-jobs service:
+
+        python -m app.services.ledger_jobs ensure-partitions [--months-ahead 3]
+        python -m app.services.ledger_jobs detach-partitions --before 2025-01-01
+        python -m app.services.ledger_jobs checkpoint
+        python -m app.services.ledger_jobs release-expired [--batch-size 500]
+    """
+    ap = argparse.ArgumentParser(description="Inventory ledger maintenance")
+    sub = ap.add_subparsers(dest="job", required=True)
+    ensure = sub.add_parser("ensure-partitions", help="Create upcoming monthly ledger partitions (run daily)")
+    ensure.add_argument("--months-ahead", type=int, default=settings.ledger_partitions_months_ahead)
+    ensure.set_defaults(run=_ensure_partitions)
+    detach = sub.add_parser("detach-partitions", help="Detach monthly partitions ending on or before --before")
+    detach.add_argument("--before", type=date.fromisoformat, required=True)
+    detach.set_defaults(run=_detach_partitions)
+    checkpoint = sub.add_parser("checkpoint", help="Roll the ledger on-hand checkpoint forward (run nightly)")
+    checkpoint.set_defaults(run=_checkpoint)
+    release = sub.add_parser("release-expired", help="Release reservations past their TTL (run every few minutes)")
+    release.add_argument("--batch-size", type=int, default=settings.reservation_release_batch_size)
+    release.set_defaults(run=_release_expired)
+    args = ap.parse_args(argv)
+    configure_logging()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import re
+from datetime import date, datetime, time, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+_PARTITION_NAME = re.compile(r"^inventory_ledger_p(\d{4})(\d{2})$")
+
+
+def ledger_time_bounds(*, date_from: str | None, date_to: str | None) -> tuple[datetime, datetime]:
+    """
+    Half-open UTC [start, end) created_at bounds for ledger queries.
+
+    inventory_ledger is partitioned by month on created_at; bounding both ends lets Postgres prune
+    partitions. Without dates the last settings.ledger_query_default_days days are used.
+    """
+    try:
+        d_to = date.fromisoformat(date_to) if date_to else datetime.now(timezone.utc).date()
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid date_to")
+    try:
+        d_from = date.fromisoformat(date_from) if date_from else d_to - timedelta(days=settings.ledger_query_default_days - 1)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid date_from")
+    if d_from > d_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must be <= date_to")
+    start = datetime.combine(d_from, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(d_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    return start, end
+
+
+def ensure_ledger_partitions(db: Session, *, months_ahead: int | None = None) -> int:
+    """
+    Create missing monthly partitions up to `months_ahead` months from now. Returns how many were created.
+
+    Starts at the oldest month found in inventory_ledger_default, so rows written while the job did not run are
+    moved into their new partitions (see migration 0035).
+    """
+    ahead = settings.ledger_partitions_months_ahead if months_ahead is None else months_ahead
+    created = db.scalar(
+        text(
+            "SELECT inventory_ledger_ensure_partitions("
+            "CAST(LEAST(now(), (SELECT min(created_at) FROM inventory_ledger_default)) AS date), :ahead)"
+        ),
+        {"ahead": ahead},
+    )
+    return int(created or 0)
+
+
+def _month_after(d: date) -> date:
+    return date(d.year + 1, 1, 1) if d.month == 12 else date(d.year, d.month + 1, 1)
+
+
+def detach_ledger_partitions(db: Session, *, before: date) -> list[str]:
+    """
+    Detach monthly partitions that end on or before `before`.
+
+    Detaching is a catalog change only (no rows are copied or deleted); the partition stays as a plain
+    table inventory_ledger_pYYYYMM that can be dumped/archived and dropped separately.
+    """
+    names = db.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'inventory_ledger'::regclass ORDER BY c.relname"
+        )
+    ).all()
+    detached: list[str] = []
+    for name in names:
+        m = _PARTITION_NAME.match(name)
+        if m is None:  # default partition
+            continue
+        if _month_after(date(int(m.group(1)), int(m.group(2)), 1)) > before:
+            continue
+        # Name comes from the catalog and matched the strict pattern above.
+        db.execute(text(f'ALTER TABLE inventory_ledger DETACH PARTITION "{name}"'))
+        detached.append(name)
+    return detached
@@ -0,0 +1,333 @@
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.models.inventory import InventoryBalance
+from app.models.inventory_reservation import InventoryReservation
+from app.models.license_plate import LicensePlate, LicensePlateItem, LicensePlateMove
+from app.models.location import Location
+from app.models.outbound import OutboundLine, OutboundOrder
+from app.models.warehouse import Warehouse
+from app.models.warehouse_zone import WarehouseZone
+from app.services.inventory_service import LedgerCreate, apply_ledger_batch
+from app.services.reservation_service import consume_reservations
+
+# Orders whose reserved stock can leave on a plate: picked loose units of later statuses leave via dispatch_confirm.
+DISPATCHABLE_STATUSES = ("APPROVED",)
+
+
+@dataclass(frozen=True)
+class PlateItem:
+    product_id: uuid.UUID
+    batch_id: uuid.UUID | None
+    qty: int
+
+
+def get_license_plate(db: Session, *, tenant_id: int, code: str, lock: bool = False) -> LicensePlate:
+    stmt = select(LicensePlate).where(LicensePlate.tenant_id == tenant_id, LicensePlate.code == code)
+    if lock:
+        stmt = stmt.with_for_update()
+    plate = db.scalar(stmt)
+    if plate is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="License plate not found")
+    return plate
+
+
+def plate_items(db: Session, *, plate: LicensePlate) -> list[LicensePlateItem]:
+    return list(
+        db.scalars(
+            select(LicensePlateItem)
+            .where(LicensePlateItem.license_plate_id == plate.id)
+            .order_by(LicensePlateItem.id)
+        ).all()
+    )
+
+
+def _require_active(plate: LicensePlate) -> None:
+    if plate.status != "ACTIVE" or plate.location_id is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"License plate is {plate.status}")
+
+
+def create_license_plate(
+    db: Session,
+    *,
+    tenant_id: int,
+    client_id: uuid.UUID,
+    location_id: uuid.UUID,
+    code: str,
+) -> LicensePlate:
+    loc = db.scalar(
+        select(Location)
+        .join(Warehouse, Location.warehouse_id == Warehouse.id)
+        .where(Location.id == location_id, Warehouse.tenant_id == tenant_id)
+    )
+    if loc is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid location")
+    if db.scalar(select(Client.id).where(Client.id == client_id, Client.tenant_id == tenant_id)) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid client")
+    exists = db.scalar(select(LicensePlate.id).where(LicensePlate.tenant_id == tenant_id, LicensePlate.code == code))
+    if exists is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="License plate code already exists")
+
+    plate = LicensePlate(
+        tenant_id=tenant_id,
+        client_id=client_id,
+        warehouse_id=loc.warehouse_id,
+        location_id=loc.id,
+        code=code,
+        status="ACTIVE",
+    )
+    db.add(plate)
+    db.flush()
+    return plate
+
+
+def add_items(db: Session, *, plate: LicensePlate, items: Sequence[PlateItem]) -> None:
+    """
+    Put loose stock at the plate's location onto the plate.
+
+    Each (product, batch) needs enough on-hand at that location that is not already on another active
+    plate there. Quantities for an item already on the plate are added to it. The source balances are
+    locked first, so two plates at the same location cannot both claim the same loose units.
+    """
+    _require_active(plate)
+    wanted: dict[tuple[uuid.UUID, uuid.UUID | None], int] = {}
+    for it in items:
+        if it.qty <= 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="qty must be > 0")
+        key = (it.product_id, it.batch_id)
+        wanted[key] = wanted.get(key, 0) + it.qty
+
+    product_ids = sorted({p for p, _b in wanted})
+    on_hand = {
+        (p, b): int(q)
+        for p, b, q in db.execute(
+            select(InventoryBalance.product_id, InventoryBalance.batch_id, InventoryBalance.on_hand_qty)
+            .where(
+                InventoryBalance.tenant_id == plate.tenant_id,
+                InventoryBalance.client_id == plate.client_id,
+                InventoryBalance.location_id == plate.location_id,
+                InventoryBalance.product_id.in_(product_ids),
+            )
+            # Same order as apply_ledger_batch's balance upsert
+            .order_by(InventoryBalance.product_id, InventoryBalance.batch_id.nulls_first())
+            .with_for_update()
+        ).all()
+    }
+    on_plates = {
+        (p, b): int(q)
+        for p, b, q in db.execute(
+            select(LicensePlateItem.product_id, LicensePlateItem.batch_id, func.sum(LicensePlateItem.qty))
+            .join(LicensePlate, LicensePlate.id == LicensePlateItem.license_plate_id)
+            .where(
+                LicensePlate.tenant_id == plate.tenant_id,
+                LicensePlate.location_id == plate.location_id,
+                LicensePlate.status == "ACTIVE",
+                LicensePlateItem.product_id.in_(product_ids),
+            )
+            .group_by(LicensePlateItem.product_id, LicensePlateItem.batch_id)
+        ).all()
+    }
+    for key, qty in wanted.items():
+        if on_hand.get(key, 0) - on_plates.get(key, 0) < qty:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Not enough loose stock at the plate's location for product {key[0]}",
+            )
+
+    stmt = pg_insert(LicensePlateItem).values(
+        [
+            {"license_plate_id": plate.id, "product_id": p, "batch_id": b, "qty": qty}
+            for (p, b), qty in sorted(wanted.items(), key=lambda kv: (kv[0][0], kv[0][1] or uuid.UUID(int=0)))
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_license_plate_items_plate_product_batch",
+        set_={"qty": LicensePlateItem.qty + stmt.excluded.qty},
+    )
+    db.execute(stmt)
+
+
+def unpack(db: Session, *, plate: LicensePlate) -> int:
+    """Take everything off the plate; the stock stays at the location as loose units."""
+    _require_active(plate)
+    res = db.execute(delete(LicensePlateItem).where(LicensePlateItem.license_plate_id == plate.id))
+    return res.rowcount
+
+
+def _move(
+    db: Session,
+    *,
+    plate: LicensePlate,
+    to_location_id: uuid.UUID | None,
+    event_type: str,
+    performed_by_user_id: uuid.UUID | None,
+    items: Sequence[LicensePlateItem] | None = None,
+    outbound_id: uuid.UUID | None = None,
+) -> LicensePlateMove:
+    if items is None:
+        items = plate_items(db, plate=plate)
+    if not items:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="License plate is empty")
+
+    move = LicensePlateMove(
+        id=uuid.uuid4(),
+        tenant_id=plate.tenant_id,
+        license_plate_id=plate.id,
+        from_location_id=plate.location_id,
+        to_location_id=to_location_id,
+        event_type=event_type,
+        outbound_id=outbound_id,
+        lines=len(items),
+        units=sum(it.qty for it in items),
+        performed_by_user_id=performed_by_user_id,
+    )
+
+    def entry(it: LicensePlateItem, *, qty_delta: int, from_id, to_id) -> LedgerCreate:
+        return LedgerCreate(
+            tenant_id=plate.tenant_id,
+            client_id=plate.client_id,
+            warehouse_id=plate.warehouse_id,
+            product_id=it.product_id,
+            batch_id=it.batch_id,
+            from_location_id=from_id,
+            to_location_id=to_id,
+            qty_delta=qty_delta,
+            event_type=event_type,
+            reference_type="LPN",
+            reference_id=str(move.id),
+            performed_by_user_id=performed_by_user_id,
+        )
+
+    entries = [entry(it, qty_delta=-it.qty, from_id=plate.location_id, to_id=None) for it in items]
+    if to_location_id is not None:
+        entries += [entry(it, qty_delta=it.qty, from_id=None, to_id=to_location_id) for it in items]
+    # One ledger insert, one balance upsert and one availability upsert, whatever the number of SKUs.
+    apply_ledger_batch(db, entries=entries)
+
+    db.add(move)
+    return move
+
+
+def move_license_plate(
+    db: Session,
+    *,
+    plate: LicensePlate,
+    to_location_id: uuid.UUID,
+    performed_by_user_id: uuid.UUID | None,
+) -> LicensePlateMove:
+    """
+    Move a whole plate to another location of its warehouse.
+
+    Recorded as PUTAWAY_MOVE when it goes from a STAGING to a STORAGE zone, TRANSFER otherwise.
+    Reserved stock at the source location blocks the move (apply_ledger_batch's below-reserved check).
+    """
+    _require_active(plate)
+    if to_location_id == plate.location_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="License plate is already there")
+
+    zones = {
+        loc.id: (loc, zone_type)
+        for loc, zone_type in db.execute(
+            select(Location, WarehouseZone.zone_type)
+            .join(WarehouseZone, Location.zone_id == WarehouseZone.id)
+            .where(Location.id.in_([plate.location_id, to_location_id]))
+        ).all()
+    }
+    to = zones.get(to_location_id)
+    if to is None or to[0].warehouse_id != plate.warehouse_id or not to[0].is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid to_location_id")
+    from_zone_type = zones[plate.location_id][1] if plate.location_id in zones else None
+    event_type = "PUTAWAY_MOVE" if from_zone_type == "STAGING" and to[1] == "STORAGE" else "TRANSFER"
+
+    move = _move(
+        db, plate=plate, to_location_id=to_location_id, event_type=event_type, performed_by_user_id=performed_by_user_id
+    )
+    plate.location_id = to_location_id
+    return move
+
+
+def dispatch_license_plate(
+    db: Session, *, plate: LicensePlate, order: OutboundOrder, performed_by_user_id: uuid.UUID | None
+) -> LicensePlateMove:
+    """
+    Ship the whole plate for `order` (locked by the caller): its contents leave stock in one batch and the plate
+    is closed.
+
+    Every item must be covered by the order's reservations at the plate's location; those are consumed and
+    the units count as picked on the order's lines. Once the order has nothing left to pick or reserve it is
+    DISPATCHED (dispatched_at set); the caller then records the dispatch like dispatch_confirm does.
+    """
+    _require_active(plate)
+    if order.client_id != plate.client_id or order.warehouse_id != plate.warehouse_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Outbound belongs to another client or warehouse")
+    if order.status not in DISPATCHABLE_STATUSES:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Outbound is {order.status}")
+    items = plate_items(db, plate=plate)
+    if not items:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="License plate is empty")
+
+    reservations = db.scalars(
+        select(InventoryReservation)
+        .where(
+            InventoryReservation.outbound_id == order.id,
+            InventoryReservation.location_id == plate.location_id,
+            InventoryReservation.product_id.in_({it.product_id for it in items}),
+        )
+        .order_by(InventoryReservation.id)
+        .with_for_update()
+    ).all()
+    takes: list[tuple[InventoryReservation, int]] = []
+    for it in items:
+        need = it.qty
+        for r in reservations:
+            if need == 0:
+                break
+            if r.product_id != it.product_id or r.batch_id != it.batch_id:
+                continue
+            take = min(need, r.qty_reserved - sum(q for rr, q in takes if rr is r))
+            if take > 0:
+                takes.append((r, take))
+                need -= take
+        if need:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"License plate holds product {it.product_id} not reserved for this outbound at its location",
+            )
+    # Reserved units leave the balances first, so the DISPATCH entries pass the below-reserved check.
+    consume_reservations(db, takes=takes)
+
+    move = _move(
+        db,
+        plate=plate,
+        to_location_id=None,
+        event_type="DISPATCH",
+        performed_by_user_id=performed_by_user_id,
+        items=items,
+        outbound_id=order.id,
+    )
+    plate.status = "DISPATCHED"
+    plate.location_id = None
+
+    lines = db.scalars(select(OutboundLine).where(OutboundLine.outbound_id == order.id).order_by(OutboundLine.id)).all()
+    by_product: dict[uuid.UUID, OutboundLine] = {}
+    for ol in lines:
+        by_product.setdefault(ol.product_id, ol)
+    for it in items:
+        ol = by_product.get(it.product_id)
+        if ol is not None:
+            ol.picked_qty += it.qty
+    reserved_left = db.scalar(
+        select(func.count()).select_from(InventoryReservation).where(InventoryReservation.outbound_id == order.id)
+    )
+    if not reserved_left and all(ol.picked_qty >= ol.requested_qty for ol in lines):
+        order.status = "DISPATCHED"
+        order.dispatched_at = datetime.now(timezone.utc)
+    return move
@@ -0,0 +1,129 @@
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import Integer, column, delete, func, select, values
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.selectable import CTE
+
+from app.models.inventory import InventoryBalance
+from app.models.location import Location
+from app.models.location_occupancy import LocationOccupancy
+from app.models.warehouse_zone import WarehouseZone
+
+_COLS = ["location_id", "tenant_id", "warehouse_id", "zone_id", "on_hand_qty"]
+
+
+@dataclass(frozen=True)
+class ZoneOccupancy:
+    zone_id: int
+    zone_name: str
+    zone_type: str
+    locations: int  # active locations
+    occupied: int  # locations holding stock
+    free: int
+    pallet_positions: int  # SUM(capacity_pallets), a location without capacity counting as one
+
+
+def occupancy_upsert(changes: Iterable[tuple[int, uuid.UUID, int]]) -> CTE | None:
+    """
+    Upsert adding (tenant_id, location_id, on_hand delta) changes to location_occupancy, as a CTE.
+
+    availability_service.apply_availability_deltas attaches it to the summary upsert, so every balance
+    change reaches location_occupancy without an extra round trip (Postgres runs data-modifying CTEs
+    whether or not they are referenced). Deltas are summed per location and written in location order.
+    None when no location's on-hand quantity changes.
+    """
+    per_location: dict[uuid.UUID, list[int]] = {}
+    for tenant_id, location_id, on_hand in changes:
+        if on_hand:
+            per_location.setdefault(location_id, [tenant_id, 0])[1] += on_hand
+    rows = sorted((loc_id, t, qty) for loc_id, (t, qty) in per_location.items() if qty)
+    if not rows:
+        return None
+
+    d = values(
+        column("location_id", UUID(as_uuid=True)),
+        column("tenant_id", Integer),
+        column("on_hand", Integer),
+        name="occupancy_deltas",
+    ).data(rows)
+    sel = (
+        select(d.c.location_id, d.c.tenant_id, Location.warehouse_id, Location.zone_id, d.c.on_hand)
+        .select_from(d)
+        .join(Location, Location.id == d.c.location_id)
+        .order_by(d.c.location_id)
+    )
+    stmt = pg_insert(LocationOccupancy).from_select(_COLS, sel)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["location_id"],
+        set_={"on_hand_qty": LocationOccupancy.on_hand_qty + stmt.excluded.on_hand_qty, "updated_at": func.now()},
+    )
+    return stmt.cte("occupancy_upsert")
+
+
+def rebuild_occupancy(db: Session, *, tenant_id: int | None = None) -> int:
+    """Recompute location_occupancy from inventory_balances (backfill / repair). Returns rows written."""
+    wipe = delete(LocationOccupancy)
+    if tenant_id is not None:
+        wipe = wipe.where(LocationOccupancy.tenant_id == tenant_id)
+    db.execute(wipe)
+
+    keys = [InventoryBalance.location_id, InventoryBalance.tenant_id, Location.warehouse_id, Location.zone_id]
+    sel = (
+        select(*keys, func.sum(InventoryBalance.on_hand_qty))
+        .join(Location, Location.id == InventoryBalance.location_id)
+        .group_by(*keys)
+    )
+    if tenant_id is not None:
+        sel = sel.where(InventoryBalance.tenant_id == tenant_id)
+    res = db.execute(pg_insert(LocationOccupancy).from_select(_COLS, sel))
+    return res.rowcount
+
+
+def zone_occupancy(db: Session, *, warehouse_id: uuid.UUID, zone_id: int | None = None) -> list[ZoneOccupancy]:
+    """
+    Location counts, occupied/free positions and pallet capacity per zone of a warehouse.
+
+    Occupied counts come from the partial index on location_occupancy (on_hand_qty > 0), not from
+    inventory_balances. The caller has already checked the warehouse belongs to the tenant.
+    """
+    zones = (
+        select(
+            WarehouseZone.id,
+            WarehouseZone.name,
+            WarehouseZone.zone_type,
+            func.count(Location.id),
+            func.coalesce(func.sum(func.coalesce(Location.capacity_pallets, 1)), 0),
+        )
+        .outerjoin(Location, (Location.zone_id == WarehouseZone.id) & Location.is_active.is_(True))
+        .where(WarehouseZone.warehouse_id == warehouse_id)
+        .group_by(WarehouseZone.id, WarehouseZone.name, WarehouseZone.zone_type)
+        .order_by(WarehouseZone.id)
+    )
+    occupied_q = (
+        select(LocationOccupancy.zone_id, func.count())
+        .where(LocationOccupancy.warehouse_id == warehouse_id, LocationOccupancy.on_hand_qty > 0)
+        .group_by(LocationOccupancy.zone_id)
+    )
+    if zone_id is not None:
+        zones = zones.where(WarehouseZone.id == zone_id)
+        occupied_q = occupied_q.where(LocationOccupancy.zone_id == zone_id)
+
+    occupied = {zid: int(n) for zid, n in db.execute(occupied_q).all()}
+    out: list[ZoneOccupancy] = []
+    for zid, name, zone_type, n_locations, pallets in db.execute(zones).all():
+        n_occupied = occupied.get(zid, 0)
+        out.append(
+            ZoneOccupancy(
+                zone_id=zid,
+                zone_name=name,
+                zone_type=zone_type,
+                locations=int(n_locations),
+                occupied=n_occupied,
+                free=max(int(n_locations) - n_occupied, 0),
+                pallet_positions=int(pallets),
+            )
+        )
+    return out
@@ -0,0 +1,296 @@
+import csv
+import io
+import json
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import BinaryIO
+
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.outbound import OutboundLine, OutboundOrder
+from app.models.product import Product
+from app.services.availability_service import pickable_available
+from app.services.uom_service import qty_to_pieces
+
+# Largest order import accepted in one request
+MAX_IMPORT_ORDERS = 20_000
+MAX_IMPORT_LINES = 200_000
+
+
+def new_order_number() -> str:
+    return f"OUT-{datetime.now(timezone.utc).strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+
+
+@dataclass
+class ImportOrder:
+    """One order being read from an import file; `error` rejects the whole order."""
+
+    row: int  # CSV line / NDJSON line where the order starts
+    order_ref: str | None
+    destination: dict = field(default_factory=dict)
+    requested_ship_date: date | None = None
+    notes: str | None = None
+    lines: list[tuple[str, int, str]] = field(default_factory=list)  # (sku, qty, uom)
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class OrderImportResult:
+    row: int
+    order_ref: str | None
+    status: str  # CREATED / REJECTED
+    detail: str | None = None
+    outbound_id: uuid.UUID | None = None
+    order_number: str | None = None
+
+
+def _text(v, max_len: int | None = None) -> str | None:
+    s = str(v).strip() if v is not None else ""
+    if not s:
+        return None
+    return s[:max_len] if max_len else s
+
+
+def _header(order: ImportOrder, raw: dict) -> None:
+    """Destination, ship date and notes of an order, taken from its first row."""
+    dest = raw.get("destination") if isinstance(raw.get("destination"), dict) else raw
+    order.destination = {
+        "name": _text(dest.get("name"), 255),
+        "address": _text(dest.get("address"), 1000),
+        "contact": _text(dest.get("contact")),
+        "notes": _text(dest.get("destination_notes") if dest is raw else dest.get("notes")),
+    }
+    order.notes = _text(raw.get("notes"))
+    if not order.destination["name"] or not order.destination["address"]:
+        order.error = "destination name and address required"
+        return
+    ship = _text(raw.get("requested_ship_date"))
+    if ship:
+        try:
+            order.requested_ship_date = date.fromisoformat(ship)
+        except ValueError:
+            order.error = "requested_ship_date must be YYYY-MM-DD"
+
+
+def _add_line(order: ImportOrder, raw: dict) -> None:
+    if order.error is not None:
+        return
+    sku = _text(raw.get("sku"))
+    qty_raw = _text(raw.get("qty")) or ""
+    if not sku:
+        order.error = "sku required"
+    elif not qty_raw.isdigit() or int(qty_raw) <= 0:
+        order.error = f"qty must be a positive integer (sku {sku})"
+    else:
+        order.lines.append((sku, int(qty_raw), (_text(raw.get("uom")) or "piece").lower()))
+
+
+def _check_size(orders: dict, lines: int) -> None:
+    if len(orders) > MAX_IMPORT_ORDERS or lines > MAX_IMPORT_LINES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Too many orders in one import")
+
+
+def parse_orders_csv(stream: BinaryIO) -> list[ImportOrder]:
+    """
+    Orders of a CSV file with one row per order line, read incrementally: order_ref, sku, qty[, uom,
+    requested_ship_date, name, address, contact, destination_notes, notes]. Rows with the same order_ref form
+    one order; its destination, ship date and notes come from its first row.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    orders: dict[str, ImportOrder] = {}
+    unreferenced: list[ImportOrder] = []
+    n = 0
+    try:
+        for idx, raw in enumerate(reader, start=2):
+            n += 1
+            ref = _text(raw.get("order_ref"))
+            if ref is None or len(ref) > 64:
+                unreferenced.append(ImportOrder(row=idx, order_ref=ref, error="order_ref required, at most 64 characters"))
+                continue
+            order = orders.get(ref)
+            if order is None:
+                order = orders[ref] = ImportOrder(row=idx, order_ref=ref)
+                _header(order, raw)
+            _add_line(order, raw)
+            _check_size(orders, n)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV must be UTF-8")
+    return [*orders.values(), *unreferenced]
+
+
+def parse_orders_ndjson(stream: BinaryIO) -> list[ImportOrder]:
+    """
+    Orders of an NDJSON file, one order per line, read incrementally:
+    {"order_ref", "requested_ship_date", "destination": {"name", "address", "contact", "notes"}, "notes",
+    "lines": [{"sku", "qty", "uom"}]}. An order_ref repeated later in the file is rejected.
+    """
+    orders: dict[str, ImportOrder] = {}
+    rejected: list[ImportOrder] = []
+    n = 0
+    try:
+        for idx, text in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), start=1):
+            if not text.strip():
+                continue
+            try:
+                raw = json.loads(text)
+            except ValueError:
+                rejected.append(ImportOrder(row=idx, order_ref=None, error="Invalid JSON"))
+                continue
+            if not isinstance(raw, dict) or not isinstance(raw.get("lines"), list) or not raw["lines"]:
+                rejected.append(ImportOrder(row=idx, order_ref=None, error="Expected an order object with lines"))
+                continue
+            ref = _text(raw.get("order_ref"))
+            if ref is None or len(ref) > 64:
+                rejected.append(ImportOrder(row=idx, order_ref=ref, error="order_ref required, at most 64 characters"))
+                continue
+            if ref in orders:
+                rejected.append(ImportOrder(row=idx, order_ref=ref, error="Duplicate order_ref in file"))
+                continue
+            order = orders[ref] = ImportOrder(row=idx, order_ref=ref)
+            _header(order, raw)
+            for ln in raw["lines"]:
+                _add_line(order, ln if isinstance(ln, dict) else {})
+            n += len(raw["lines"])
+            _check_size(orders, n)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="NDJSON must be UTF-8")
+    return [*orders.values(), *rejected]
+
+
+def import_orders(
+    db: Session,
+    *,
+    tenant_id: int,
+    client_id: uuid.UUID,
+    warehouse_id: uuid.UUID,
+    orders: Sequence[ImportOrder],
+    order_status: str,
+    created_by_user_id: uuid.UUID | None,
+) -> list[OrderImportResult]:
+    """
+    Create outbound orders from parsed import rows, set-based.
+
+    Already imported order references, products (by SKU) and pickable availability are each read with one
+    query for the whole file. Orders are then checked in file order against the availability left by the
+    orders accepted before them (v1 no backorders, like create_outbound), so one import cannot promise the
+    same stock twice. Accepted orders and their lines are written with one bulk INSERT each; an order with
+    an invalid row, an unknown SKU or not enough stock is REJECTED as a whole. Results are in file order.
+    """
+    results: dict[int, OrderImportResult] = {}
+
+    def reject(i: int, order: ImportOrder, detail: str) -> None:
+        results[i] = OrderImportResult(row=order.row, order_ref=order.order_ref, status="REJECTED", detail=detail)
+
+    candidates = []
+    for i, order in enumerate(orders):
+        if order.error is not None:
+            reject(i, order, order.error)
+        elif not order.lines:
+            reject(i, order, "At least 1 line is required")
+        else:
+            candidates.append(i)
+    if not candidates:
+        return sorted(results.values(), key=lambda r: r.row)
+
+    imported = set(
+        db.scalars(
+            select(OutboundOrder.external_reference).where(
+                OutboundOrder.tenant_id == tenant_id,
+                OutboundOrder.client_id == client_id,
+                OutboundOrder.external_reference.in_(sorted({orders[i].order_ref for i in candidates})),
+            )
+        ).all()
+    )
+    skus = sorted({sku for i in candidates for sku, _q, _u in orders[i].lines})
+    products = {
+        p.sku: p
+        for p in db.scalars(
+            select(Product).where(Product.tenant_id == tenant_id, Product.client_id == client_id, Product.sku.in_(skus))
+        ).all()
+    }
+
+    # Pieces per product for each order still in the running
+    wanted: dict[int, dict[uuid.UUID, int]] = {}
+    for i in candidates:
+        order = orders[i]
+        if order.order_ref in imported:
+            reject(i, order, "Order already imported")
+            continue
+        pieces: dict[uuid.UUID, int] = {}
+        for sku, qty, uom in order.lines:
+            p = products.get(sku)
+            if p is None:
+                reject(i, order, f"Unknown SKU {sku}")
+                break
+            try:
+                pieces[p.id] = pieces.get(p.id, 0) + qty_to_pieces(product=p, qty=qty, uom=uom)
+            except HTTPException as exc:
+                reject(i, order, f"{exc.detail} (sku {sku})")
+                break
+        else:
+            wanted[i] = pieces
+
+    available: dict[uuid.UUID, int] = {}
+    if wanted:
+        available = pickable_available(
+            db,
+            tenant_id=tenant_id,
+            client_id=client_id,
+            warehouse_id=warehouse_id,
+            product_ids=sorted({pid for pieces in wanted.values() for pid in pieces}),
+        )
+
+    order_rows: list[dict] = []
+    line_rows: list[dict] = []
+    numbers: set[str] = set()
+    for i, pieces in wanted.items():
+        order = orders[i]
+        if any(available[pid] < qty for pid, qty in pieces.items()):
+            reject(i, order, "Insufficient available stock")
+            continue
+        for pid, qty in pieces.items():
+            available[pid] -= qty
+        oid = uuid.uuid4()
+        number = new_order_number()
+        while number in numbers:
+            number = new_order_number()
+        numbers.add(number)
+        order_rows.append(
+            {
+                "id": oid,
+                "tenant_id": tenant_id,
+                "client_id": client_id,
+                "warehouse_id": warehouse_id,
+                "order_number": number,
+                "external_reference": order.order_ref,
+                "status": order_status,
+                "destination_json": order.destination,
+                "packing_json": {},
+                "requested_ship_date": order.requested_ship_date,
+                "notes": order.notes,
+                "created_by_user_id": created_by_user_id,
+            }
+        )
+        line_rows.extend(
+            {
+                "outbound_id": oid,
+                "product_id": pid,
+                "requested_qty": qty,
+                "reserved_qty": 0,
+                "picked_qty": 0,
+                "batch_policy": None,
+            }
+            for pid, qty in pieces.items()
+        )
+        results[i] = OrderImportResult(
+            row=order.row, order_ref=order.order_ref, status="CREATED", outbound_id=oid, order_number=number
+        )
+
+    if order_rows:
+        db.execute(insert(OutboundOrder), order_rows)
+        db.execute(insert(OutboundLine), line_rows)
+    return sorted(results.values(), key=lambda r: r.row)
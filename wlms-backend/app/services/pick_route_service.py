@@ -0,0 +1,172 @@
+import re
+import time
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.models.location import Location
+
+
+@dataclass(frozen=True)
+class RouteGeometry:
+    """
+    Walking model for a parallel-aisle floor: aisles (Location.aisle) side by side, rack positions
+    (Location.rack) along each aisle, cross-aisles at the front (rack 0, where the depot is) and just
+    past the deepest rack. Aisle/rack numbering is assumed to be warehouse-wide.
+    """
+
+    aisle_pitch_m: float = 3.0  # between aisle centre lines
+    rack_pitch_m: float = 1.2  # between rack positions along an aisle
+
+
+DEFAULT_GEOMETRY = RouteGeometry()
+
+
+@dataclass(frozen=True)
+class _Stop:
+    aisle: int
+    x: float
+    y: float
+    order: tuple  # level/bin/code tie-break at the same rack position
+
+
+_DEPOT_AISLE = -1
+
+
+def _ordinal(value: str | None) -> int | None:
+    """'12' -> 12, 'B' -> 2, 'AA' -> 27, 'B07' -> 2007; None/unparseable -> None."""
+    if value is None:
+        return None
+    m = re.fullmatch(r"\s*([A-Za-z]*)0*(\d*)\s*", value)
+    if m is None or not (m.group(1) or m.group(2)):
+        return None
+    letters = 0
+    for ch in m.group(1).upper():
+        letters = letters * 26 + ord(ch) - ord("A") + 1
+    if not m.group(2):
+        return letters
+    return letters * 1000 + int(m.group(2))
+
+
+def _stop(loc: Location, geometry: RouteGeometry) -> _Stop | None:
+    aisle, rack = _ordinal(loc.aisle), _ordinal(loc.rack)
+    if aisle is None or rack is None:
+        return None
+    return _Stop(
+        aisle=aisle,
+        x=aisle * geometry.aisle_pitch_m,
+        y=rack * geometry.rack_pitch_m,
+        order=(_ordinal(loc.level) or 0, _ordinal(loc.bin) or 0, loc.code),
+    )
+
+
+def _distance(a: _Stop, b: _Stop, aisle_length: float) -> float:
+    if a.aisle == b.aisle:
+        return abs(a.y - b.y)
+    # Leave the aisle through the front or the back cross-aisle, whichever is shorter.
+    return abs(a.x - b.x) + min(a.y + b.y, 2 * aisle_length - a.y - b.y)
+
+
+def _s_shape(stops: list[_Stop]) -> list[int]:
+    """Serpentine: aisles in ascending order, alternating up and down each aisle."""
+    by_aisle: dict[int, list[int]] = {}
+    for i, s in enumerate(stops):
+        by_aisle.setdefault(s.aisle, []).append(i)
+    route: list[int] = []
+    for k, aisle in enumerate(sorted(by_aisle)):
+        idx = sorted(by_aisle[aisle], key=lambda i: (stops[i].y, stops[i].order), reverse=k % 2 == 1)
+        route.extend(idx)
+    return route
+
+
+def _two_opt(tour: list[_Stop], aisle_length: float, *, deadline: float, window: int = 64) -> list[_Stop]:
+    """
+    Improve a closed tour (tour[0] == tour[-1] == depot) by segment reversals.
+
+    Only reversals of up to `window` stops are tried (the S-shape start is already good, long
+    reversals rarely pay off) and the search stops at `deadline`, so 1k-stop waves stay interactive.
+    """
+    n = len(tour)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, n - 2):
+            if time.perf_counter() >= deadline:
+                break
+            a, b = tour[i - 1], tour[i]
+            d_ab = _distance(a, b, aisle_length)
+            for j in range(i + 1, min(n - 1, i + window)):
+                c, d = tour[j], tour[j + 1]
+                delta = _distance(a, c, aisle_length) + _distance(b, d, aisle_length) - d_ab - _distance(c, d, aisle_length)
+                if delta < -1e-9:
+                    tour[i : j + 1] = reversed(tour[i : j + 1])
+                    b = tour[i]
+                    d_ab = _distance(a, b, aisle_length)
+                    improved = True
+    return tour
+
+
+def plan_route(
+    locations: Sequence[Location],
+    *,
+    geometry: RouteGeometry = DEFAULT_GEOMETRY,
+    optimize: bool | None = None,
+    time_budget_ms: int | None = None,
+) -> list[Location]:
+    """
+    Visiting order for distinct pick locations, starting and ending at the front of the first aisle.
+
+    S-shape route over the aisle/rack grid, refined by 2-opt (settings.pick_route_optimize) within
+    settings.pick_route_time_budget_ms. Locations without a parseable aisle/rack go last, by code.
+    """
+    use_opt = settings.pick_route_optimize if optimize is None else optimize
+    budget_ms = settings.pick_route_time_budget_ms if time_budget_ms is None else time_budget_ms
+
+    routable: list[tuple[Location, _Stop]] = []
+    unroutable: list[Location] = []
+    for loc in locations:
+        s = _stop(loc, geometry)
+        if s is None:
+            unroutable.append(loc)
+        else:
+            routable.append((loc, s))
+    unroutable.sort(key=lambda loc: loc.code)
+    if not routable:
+        return unroutable
+
+    stops = [s for _loc, s in routable]
+    order = _s_shape(stops)
+    if use_opt and len(order) > 2:
+        aisle_length = max(s.y for s in stops) + geometry.rack_pitch_m
+        depot = _Stop(aisle=_DEPOT_AISLE, x=min(s.x for s in stops), y=0.0, order=())
+        index = {id(s): i for i, s in enumerate(stops)}
+        tour = _two_opt(
+            [depot, *(stops[i] for i in order), depot],
+            aisle_length,
+            deadline=time.perf_counter() + budget_ms / 1000,
+        )
+        order = [index[id(s)] for s in tour[1:-1]]
+    return [routable[i][0] for i in order] + unroutable
+
+
+def route_length(locations: Sequence[Location], *, geometry: RouteGeometry = DEFAULT_GEOMETRY) -> float:
+    """Walking distance (m) of visiting routable `locations` in the given order, from and back to the depot."""
+    stops = [s for s in (_stop(loc, geometry) for loc in locations) if s is not None]
+    if not stops:
+        return 0.0
+    aisle_length = max(s.y for s in stops) + geometry.rack_pitch_m
+    depot = _Stop(aisle=_DEPOT_AISLE, x=min(s.x for s in stops), y=0.0, order=())
+    tour = [depot, *stops, depot]
+    return sum(_distance(a, b, aisle_length) for a, b in zip(tour, tour[1:], strict=False))
+
+
+def depot_distances(
+    locations: Sequence[Location], *, geometry: RouteGeometry = DEFAULT_GEOMETRY
+) -> dict[uuid.UUID, float]:
+    """Walking distance (m) from the depot (front of the first aisle) to each routable location, by id."""
+    stops = {loc.id: s for loc in locations if (s := _stop(loc, geometry)) is not None}
+    if not stops:
+        return {}
+    x0 = min(s.x for s in stops.values())
+    return {loc_id: s.x - x0 + s.y for loc_id, s in stops.items()}
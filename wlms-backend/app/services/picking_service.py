@@ -0,0 +1,649 @@
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, column, distinct, func, insert, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.inventory import InventoryBalance, InventoryLedger
+from app.models.inventory_reservation import InventoryReservation
+from app.models.location import Location
+from app.models.outbound import OutboundLine, OutboundOrder
+from app.models.picking import PickingScan, PickingTask, PickingTaskLine, PickingTaskOrder
+from app.models.product_batch import ProductBatch
+from app.models.warehouse_zone import WarehouseZone
+from app.services.availability_service import AvailabilityDelta, apply_availability_deltas
+from app.services.inventory_service import LedgerCreate, apply_ledger_batch
+from app.services.pick_route_service import plan_route
+from app.services.reservation_service import consume_reservations
+
+# Largest multi-order wave (one picker, one cart)
+MAX_WAVE_ORDERS = 200
+# Largest offline scan queue replayed in one request
+MAX_SCAN_BATCH = 500
+
+
+def _reservation_rows(db: Session, ids: list[uuid.UUID]) -> list[tuple[InventoryReservation, Location]]:
+    rows = db.execute(
+        select(InventoryReservation, Location)
+        .join(Location, InventoryReservation.location_id == Location.id)
+        .join(WarehouseZone, Location.zone_id == WarehouseZone.id)
+        .outerjoin(ProductBatch, InventoryReservation.batch_id == ProductBatch.id)
+        .where(InventoryReservation.outbound_id.in_(ids))
+        .order_by(
+            ProductBatch.expiry_date.asc().nulls_last(),
+            WarehouseZone.zone_type.asc(),
+            Location.code.asc(),
+        )
+    ).all()
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="No reservations to pick")
+    return rows
+
+
+def _add_task(
+    db: Session,
+    *,
+    tenant_id: int,
+    ids: list[uuid.UUID],
+    totes: Sequence[str | None],
+    rows: Sequence[tuple[InventoryReservation, Location]],
+    zone_id: int | None = None,
+) -> PickingTask:
+    merged: dict[tuple[uuid.UUID, uuid.UUID | None, uuid.UUID], int] = {}
+    for r, _loc in rows:
+        key = (r.product_id, r.batch_id, r.location_id)
+        merged[key] = merged.get(key, 0) + r.qty_reserved
+
+    # Walking route over distinct locations; lines at the same location keep FEFO order (stable sort).
+    locations = list({loc.id: loc for _r, loc in rows}.values())
+    seq = {loc.id: i for i, loc in enumerate(plan_route(locations))}
+
+    task = PickingTask(
+        tenant_id=tenant_id,
+        outbound_id=ids[0] if len(ids) == 1 else None,
+        zone_id=zone_id,
+        assigned_to_user_id=None,
+        status="OPEN",
+    )
+    db.add(task)
+    db.flush()
+
+    db.add_all(
+        PickingTaskLine(
+            picking_task_id=task.id,
+            product_id=product_id,
+            batch_id=batch_id,
+            from_location_id=location_id,
+            qty_to_pick=qty,
+            qty_picked=0,
+            pick_seq=i,
+        )
+        for i, ((product_id, batch_id, location_id), qty) in enumerate(
+            sorted(merged.items(), key=lambda item: seq[item[0][2]])
+        )
+    )
+    db.add_all(
+        PickingTaskOrder(picking_task_id=task.id, outbound_id=oid, tote_code=tote, seq=i)
+        for i, (oid, tote) in enumerate(zip(ids, totes, strict=True))
+    )
+    return task
+
+
+def _start_picking(db: Session, orders: Sequence[OutboundOrder]) -> None:
+    # Picking has started: these reservations no longer expire.
+    db.execute(
+        update(InventoryReservation)
+        .where(InventoryReservation.outbound_id.in_([o.id for o in orders]))
+        .values(expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    for o in orders:
+        o.status = "PICKING"
+    db.flush()
+
+
+def create_picking_task(
+    db: Session,
+    *,
+    tenant_id: int,
+    orders: Sequence[OutboundOrder],
+    totes: Sequence[str | None],
+) -> PickingTask:
+    """
+    One task picking all reservations of `orders` (APPROVED, locked by the caller).
+
+    Quantities for the same product/batch/location are merged into one line across orders; lines are
+    ordered by walking route (pick_seq), FEFO within a location. Orders move to PICKING and their
+    reservations stop expiring.
+    """
+    ids = [o.id for o in orders]
+    task = _add_task(db, tenant_id=tenant_id, ids=ids, totes=totes, rows=_reservation_rows(db, ids))
+    _start_picking(db, orders)
+    return task
+
+
+def create_zone_picking_tasks(db: Session, *, tenant_id: int, order: OutboundOrder) -> list[PickingTask]:
+    """
+    One sub-task per warehouse zone holding reservations of `order` (APPROVED, locked by the caller),
+    so several pickers can work the order in parallel. Each sub-task is routed on its own; the order is
+    picked once all of them are DONE (see order_picking_done).
+    """
+    by_zone: dict[int, list[tuple[InventoryReservation, Location]]] = {}
+    for r, loc in _reservation_rows(db, [order.id]):
+        by_zone.setdefault(loc.zone_id, []).append((r, loc))
+    tasks = [
+        _add_task(db, tenant_id=tenant_id, ids=[order.id], totes=[None], rows=rows, zone_id=zone_id)
+        for zone_id, rows in sorted(by_zone.items())
+    ]
+    _start_picking(db, [order])
+    return tasks
+
+
+def create_pick_wave(
+    db: Session,
+    *,
+    tenant_id: int,
+    outbound_ids: Sequence[uuid.UUID],
+    totes: Sequence[str] | None = None,
+) -> tuple[PickingTask, list[tuple[uuid.UUID, str]]]:
+    """
+    Cluster picking: one task for several APPROVED orders of one warehouse.
+
+    `totes` (one per order, same order as `outbound_ids`) defaults to T01, T02, ...
+    Returns the task and the (outbound_id, tote_code) assignment.
+    """
+    ids = list(dict.fromkeys(outbound_ids))
+    if len(ids) > MAX_WAVE_ORDERS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Too many orders for one wave")
+    if totes is None:
+        totes = [f"T{i + 1:02d}" for i in range(len(ids))]
+    if len(totes) != len(ids) or len(set(totes)) != len(totes):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="One distinct tote per order required")
+
+    orders = db.scalars(
+        select(OutboundOrder)
+        .where(OutboundOrder.tenant_id == tenant_id, OutboundOrder.id.in_(ids))
+        .order_by(OutboundOrder.id)
+        .with_for_update()
+    ).all()
+    by_id = {o.id: o for o in orders}
+    if len(by_id) != len(ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outbound not found")
+    if any(o.status != "APPROVED" for o in orders):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Outbound not approved")
+    if len({o.warehouse_id for o in orders}) > 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Wave orders must share a warehouse")
+
+    task = create_picking_task(db, tenant_id=tenant_id, orders=[by_id[oid] for oid in ids], totes=totes)
+    return task, list(zip(ids, totes, strict=True))
+
+
+def task_orders(db: Session, *, task: PickingTask) -> list[tuple[OutboundOrder, str | None]]:
+    """(order, tote_code) for every order of `task`, in wave order."""
+    return [
+        (o, tote)
+        for o, tote in db.execute(
+            select(OutboundOrder, PickingTaskOrder.tote_code)
+            .join(PickingTaskOrder, PickingTaskOrder.outbound_id == OutboundOrder.id)
+            .where(PickingTaskOrder.picking_task_id == task.id, OutboundOrder.tenant_id == task.tenant_id)
+            .order_by(PickingTaskOrder.seq)
+        ).all()
+    ]
+
+
+@dataclass(frozen=True)
+class PickScan:
+    product_id: uuid.UUID
+    batch_id: uuid.UUID | None
+    from_location_id: uuid.UUID
+    to_location_id: uuid.UUID
+    qty: int
+    tote_code: str | None = None
+    # Device-generated id of a queued offline scan (apply_pick_scans)
+    client_scan_id: str | None = None
+
+
+@dataclass(frozen=True)
+class PickScanResult:
+    client_scan_id: str
+    status: str  # APPLIED / DUPLICATE / REJECTED
+    detail: str | None = None
+
+
+def apply_pick_scans(
+    db: Session,
+    *,
+    task: PickingTask,
+    scans: Sequence[PickScan],
+    performed_by_user_id: uuid.UUID | None,
+) -> list[PickScanResult]:
+    """
+    Replay a handheld's offline scan queue against `task` (locked by the caller) in one transaction.
+
+    Scans are checked in order against the task lines and the orders' reservations, all loaded with
+    one query each; a scan already applied (same client_scan_id) is reported DUPLICATE and an invalid
+    one REJECTED without affecting the others. Accepted scans are written set-based: reservations via
+    consume_reservations, stock moves via apply_ledger_batch, then line counters and the scan log.
+    """
+    if len(scans) > MAX_SCAN_BATCH:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Too many scans in one batch")
+    if not scans:
+        return []
+
+    orders = task_orders(db, task=task)
+    by_id = {o.id: o for o, _tote in orders}
+    tote_order = {tote: o.id for o, tote in orders if tote is not None}
+    rank = {o.id: i for i, (o, _tote) in enumerate(orders)}
+
+    seen = set(
+        db.scalars(
+            select(PickingScan.client_scan_id).where(
+                PickingScan.picking_task_id == task.id,
+                PickingScan.client_scan_id.in_({sc.client_scan_id for sc in scans}),
+            )
+        ).all()
+    )
+    lines = {
+        (line.product_id, line.batch_id, line.from_location_id): line
+        for line in db.scalars(
+            select(PickingTaskLine)
+            .where(PickingTaskLine.picking_task_id == task.id)
+            .order_by(PickingTaskLine.id)
+            .with_for_update()
+        ).all()
+    }
+    reservations: dict[tuple, list[InventoryReservation]] = {}
+    for r in db.scalars(
+        select(InventoryReservation)
+        .where(
+            InventoryReservation.outbound_id.in_(list(by_id)),
+            tuple_(InventoryReservation.product_id, InventoryReservation.location_id).in_(
+                list({(sc.product_id, sc.from_location_id) for sc in scans})
+            ),
+            InventoryReservation.qty_reserved > 0,
+        )
+        .order_by(InventoryReservation.id)
+        .with_for_update()
+    ).all():
+        reservations.setdefault((r.product_id, r.batch_id, r.location_id), []).append(r)
+    for rs in reservations.values():
+        rs.sort(key=lambda r: rank[r.outbound_id])
+
+    # In-memory replay: remaining reservation qty and picked line qty as of the previous scans.
+    left = {r.id: r.qty_reserved for rs in reservations.values() for r in rs}
+    picked = {key: line.qty_picked for key, line in lines.items()}
+    results: list[PickScanResult] = []
+    takes: list[tuple[InventoryReservation, int]] = []
+    moves: list[tuple[PickScan, OutboundOrder, int]] = []
+    applied: list[PickScan] = []
+
+    def reject(sc: PickScan, detail: str) -> None:
+        results.append(PickScanResult(client_scan_id=sc.client_scan_id, status="REJECTED", detail=detail))
+
+    for sc in scans:
+        if sc.client_scan_id in seen:
+            results.append(PickScanResult(client_scan_id=sc.client_scan_id, status="DUPLICATE"))
+            continue
+        key = (sc.product_id, sc.batch_id, sc.from_location_id)
+        if sc.qty <= 0:
+            reject(sc, "qty must be > 0")
+            continue
+        if key not in lines:
+            reject(sc, "Pick line not found")
+            continue
+        if picked[key] + sc.qty > lines[key].qty_to_pick:
+            reject(sc, "Over-pick not allowed")
+            continue
+        if sc.tote_code is not None and sc.tote_code not in tote_order:
+            reject(sc, "Tote not found")
+            continue
+        candidates = [
+            r
+            for r in reservations.get(key, [])
+            if left[r.id] > 0 and (sc.tote_code is None or r.outbound_id == tote_order[sc.tote_code])
+        ]
+        if sum(left[r.id] for r in candidates) < sc.qty:
+            reject(sc, "No reservation found for this pick")
+            continue
+
+        remaining = sc.qty
+        for r in candidates:
+            take = min(remaining, left[r.id])
+            left[r.id] -= take
+            takes.append((r, take))
+            moves.append((sc, by_id[r.outbound_id], take))
+            remaining -= take
+            if remaining == 0:
+                break
+        picked[key] += sc.qty
+        seen.add(sc.client_scan_id)
+        applied.append(sc)
+        results.append(PickScanResult(client_scan_id=sc.client_scan_id, status="APPLIED"))
+
+    if not applied:
+        return results
+
+    consume_reservations(db, takes=takes)
+    entries: list[LedgerCreate] = []
+    for sc, order, qty in moves:
+        for from_location_id, to_location_id, delta in (
+            (sc.from_location_id, None, -qty),
+            (None, sc.to_location_id, qty),
+        ):
+            entries.append(
+                LedgerCreate(
+                    tenant_id=order.tenant_id,
+                    client_id=order.client_id,
+                    warehouse_id=order.warehouse_id,
+                    product_id=sc.product_id,
+                    batch_id=sc.batch_id,
+                    from_location_id=from_location_id,
+                    to_location_id=to_location_id,
+                    qty_delta=delta,
+                    event_type="PICK",
+                    reference_type="OUTBOUND",
+                    reference_id=str(order.id),
+                    performed_by_user_id=performed_by_user_id,
+                )
+            )
+    apply_ledger_batch(db, entries=entries)
+
+    for key, qty in picked.items():
+        lines[key].qty_picked = qty
+    order_lines: dict[tuple[uuid.UUID, uuid.UUID], OutboundLine] = {}
+    for ol in db.scalars(
+        select(OutboundLine)
+        .where(
+            OutboundLine.outbound_id.in_({order.id for _sc, order, _qty in moves}),
+            OutboundLine.product_id.in_({sc.product_id for sc in applied}),
+        )
+        .order_by(OutboundLine.id)
+    ).all():
+        order_lines.setdefault((ol.outbound_id, ol.product_id), ol)
+    for sc, order, qty in moves:
+        oline = order_lines.get((order.id, sc.product_id))
+        if oline is not None:
+            oline.picked_qty += qty
+
+    db.execute(
+        insert(PickingScan),
+        [
+            {
+                "tenant_id": task.tenant_id,
+                "picking_task_id": task.id,
+                "client_scan_id": sc.client_scan_id,
+                "product_id": sc.product_id,
+                "from_location_id": sc.from_location_id,
+                "qty": sc.qty,
+                "performed_by_user_id": performed_by_user_id,
+            }
+            for sc in applied
+        ],
+    )
+    db.flush()
+    return results
+
+
+def apply_pick_scan(
+    db: Session,
+    *,
+    task_id: uuid.UUID,
+    tenant_id: int,
+    scan: PickScan,
+    performed_by_user_id: uuid.UUID | None,
+) -> tuple[PickingTask, list[tuple[OutboundOrder, int]]]:
+    """
+    Scan hot path: apply one pick to a (possibly multi-order) task with a fixed statement count.
+
+    One joined SELECT ... FOR UPDATE loads and locks the task, the pick line, the orders' matching
+    reservations and the pick-location balance. The picked qty is attributed to the order owning
+    scan.tote_code if given, otherwise in wave order. Writes: one balance upsert (pick and destination
+    locations), one ledger insert, one availability upsert, one outbound line update, then the task
+    line and reservations on flush. Returns the task and (order, qty) per attributed order.
+    """
+    if scan.qty <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="qty must be > 0")
+
+    L, R, B = PickingTaskLine, InventoryReservation, InventoryBalance
+    first_order_line = (
+        select(func.min(OutboundLine.id))
+        .where(OutboundLine.outbound_id == R.outbound_id, OutboundLine.product_id == L.product_id)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(PickingTask, L, R, OutboundOrder, B, first_order_line)
+        .join(
+            L,
+            (L.picking_task_id == PickingTask.id)
+            & (L.product_id == scan.product_id)
+            & L.batch_id.is_not_distinct_from(scan.batch_id)
+            & (L.from_location_id == scan.from_location_id),
+        )
+        .join(PickingTaskOrder, PickingTaskOrder.picking_task_id == PickingTask.id)
+        .join(OutboundOrder, OutboundOrder.id == PickingTaskOrder.outbound_id)
+        .join(
+            R,
+            (R.outbound_id == OutboundOrder.id)
+            & (R.product_id == L.product_id)
+            & R.batch_id.is_not_distinct_from(L.batch_id)
+            & (R.location_id == L.from_location_id)
+            & (R.qty_reserved > 0),
+        )
+        .join(
+            B,
+            (B.tenant_id == PickingTask.tenant_id)
+            & (B.product_id == L.product_id)
+            & B.batch_id.is_not_distinct_from(L.batch_id)
+            & (B.location_id == L.from_location_id),
+        )
+        .where(PickingTask.id == task_id, PickingTask.tenant_id == tenant_id)
+        .order_by(PickingTaskOrder.seq)
+        .with_for_update(of=(PickingTask, L, R, B))
+    )
+    if scan.tote_code is not None:
+        stmt = stmt.where(PickingTaskOrder.tote_code == scan.tote_code)
+    rows = db.execute(stmt).all()
+    if not rows:
+        _raise_scan_not_found(db, task_id=task_id, tenant_id=tenant_id, scan=scan)
+
+    task, line, _r, _o, from_bal, _ol = rows[0]
+    if line.qty_picked + scan.qty > line.qty_to_pick:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Over-pick not allowed")
+
+    shares: list[tuple[InventoryReservation, OutboundOrder, int | None, int]] = []
+    remaining = scan.qty
+    for _t, _l, r, order, _b, order_line_id in rows:
+        take = min(remaining, r.qty_reserved)
+        shares.append((r, order, order_line_id, take))
+        remaining -= take
+        if remaining == 0:
+            break
+    if remaining > 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No reservation found for this pick")
+
+    # Both balances in one upsert: the pick location loses on-hand and reserved, the destination gains on-hand.
+    # (Same location: the keys merge, on-hand nets to zero.)
+    bal_deltas: dict[uuid.UUID, list[int]] = {scan.from_location_id: [-scan.qty, -scan.qty]}
+    bal_deltas.setdefault(scan.to_location_id, [0, 0])[0] += scan.qty
+    ins = pg_insert(B).values(
+        [
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": tenant_id,
+                "client_id": from_bal.client_id,
+                "warehouse_id": from_bal.warehouse_id,
+                "product_id": scan.product_id,
+                "batch_id": scan.batch_id,
+                "location_id": location_id,
+                "on_hand_qty": on_hand,
+                "reserved_qty": reserved,
+                "available_qty": on_hand - reserved,
+            }
+            for location_id, (on_hand, reserved) in bal_deltas.items()
+        ]
+    )
+    ins = ins.on_conflict_do_update(
+        constraint="uq_inv_bal_tenant_prod_batch_loc",
+        set_={
+            "on_hand_qty": B.on_hand_qty + ins.excluded.on_hand_qty,
+            "reserved_qty": B.reserved_qty + ins.excluded.reserved_qty,
+            "available_qty": B.on_hand_qty + ins.excluded.on_hand_qty - B.reserved_qty - ins.excluded.reserved_qty,
+            "updated_at": func.now(),
+        },
+    )
+    balance_ids = {
+        b.location_id: b.id for b in db.scalars(ins.returning(B), execution_options={"populate_existing": True}).all()
+    }
+
+    db.execute(
+        insert(InventoryLedger).values(
+            [
+                {
+                    "tenant_id": tenant_id,
+                    "client_id": order.client_id,
+                    "warehouse_id": order.warehouse_id,
+                    "product_id": scan.product_id,
+                    "batch_id": scan.batch_id,
+                    "from_location_id": from_location_id,
+                    "to_location_id": to_location_id,
+                    "qty_delta": delta,
+                    "event_type": "PICK",
+                    "reference_type": "OUTBOUND",
+                    "reference_id": str(order.id),
+                    "performed_by_user_id": performed_by_user_id,
+                }
+                for _r, order, _ol, take in shares
+                for from_location_id, to_location_id, delta in (
+                    (scan.from_location_id, None, -take),
+                    (None, scan.to_location_id, take),
+                )
+            ]
+        )
+    )
+    apply_availability_deltas(
+        db,
+        [
+            AvailabilityDelta(
+                tenant_id=tenant_id,
+                client_id=from_bal.client_id,
+                warehouse_id=from_bal.warehouse_id,
+                product_id=scan.product_id,
+                location_id=location_id,
+                on_hand=on_hand,
+                reserved=reserved,
+                balance_id=balance_ids.get(location_id),
+            )
+            for location_id, (on_hand, reserved) in bal_deltas.items()
+        ],
+    )
+
+    order_line_deltas = [(ol_id, take) for _r, _o, ol_id, take in shares if ol_id is not None]
+    if order_line_deltas:
+        v = values(column("id", Integer), column("delta", Integer), name="picked_deltas").data(order_line_deltas)
+        db.execute(
+            update(OutboundLine)
+            .where(OutboundLine.id == v.c.id)
+            .values(picked_qty=OutboundLine.picked_qty + v.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+
+    for r, _o, _ol, take in shares:
+        r.qty_reserved -= take
+        if r.qty_reserved == 0:
+            db.delete(r)
+    line.qty_picked += scan.qty
+    db.flush()
+    return task, [(order, take) for _r, order, _ol, take in shares]
+
+
+def _raise_scan_not_found(db: Session, *, task_id: uuid.UUID, tenant_id: int, scan: PickScan) -> None:
+    """Error path of apply_pick_scan: find out which part of the scan did not match."""
+    task = db.scalar(select(PickingTask).where(PickingTask.id == task_id, PickingTask.tenant_id == tenant_id))
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    line = db.scalar(
+        select(PickingTaskLine.id).where(
+            PickingTaskLine.picking_task_id == task.id,
+            PickingTaskLine.product_id == scan.product_id,
+            PickingTaskLine.batch_id.is_not_distinct_from(scan.batch_id),
+            PickingTaskLine.from_location_id == scan.from_location_id,
+        )
+    )
+    if line is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pick line not found")
+    if scan.tote_code is not None and scan.tote_code not in {tote for _o, tote in task_orders(db, task=task)}:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tote not found")
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No reservation found for this pick")
+
+
+def order_picking_done(db: Session, *, outbound_id: uuid.UUID) -> bool:
+    """True if the order has picking tasks and all of them (zone sub-tasks, waves) are DONE."""
+    statuses = db.scalars(
+        select(PickingTask.status)
+        .join(PickingTaskOrder, PickingTaskOrder.picking_task_id == PickingTask.id)
+        .where(PickingTaskOrder.outbound_id == outbound_id)
+    ).all()
+    return bool(statuses) and all(s == "DONE" for s in statuses)
+
+
+def consolidate_orders(db: Session, *, task: PickingTask) -> list[OutboundOrder]:
+    """
+    After `task` is DONE: move each of its orders whose picking is complete (all sub-tasks / waves
+    DONE) to PACKING. Orders are locked so two sub-tasks finishing together cannot both miss the
+    other's completion. Returns the orders moved.
+    """
+    db.flush()
+    orders = db.scalars(
+        select(OutboundOrder)
+        .join(PickingTaskOrder, PickingTaskOrder.outbound_id == OutboundOrder.id)
+        .where(PickingTaskOrder.picking_task_id == task.id, OutboundOrder.tenant_id == task.tenant_id)
+        .order_by(OutboundOrder.id)
+        .with_for_update(of=OutboundOrder)
+    ).all()
+    packing = []
+    for o in orders:
+        if o.status == "PICKING" and order_picking_done(db, outbound_id=o.id):
+            o.status = "PACKING"
+            packing.append(o)
+    return packing
+
+
+def zone_queue_depth(db: Session, *, tenant_id: int, warehouse_id: uuid.UUID | None = None) -> list[dict]:
+    """
+    Unfinished picking work per zone: OPEN / IN_PROGRESS task counts, lines and units still to pick.
+    Tasks that were not zone-split are reported under zone_id None (omitted when filtering by warehouse).
+    """
+    remaining = PickingTaskLine.qty_to_pick - PickingTaskLine.qty_picked
+    q = (
+        select(
+            PickingTask.zone_id,
+            WarehouseZone.name,
+            WarehouseZone.zone_type,
+            func.count(distinct(PickingTask.id)).filter(PickingTask.status == "OPEN"),
+            func.count(distinct(PickingTask.id)).filter(PickingTask.status == "IN_PROGRESS"),
+            func.count(PickingTaskLine.id).filter(remaining > 0),
+            func.coalesce(func.sum(remaining), 0),
+        )
+        .outerjoin(WarehouseZone, PickingTask.zone_id == WarehouseZone.id)
+        .outerjoin(PickingTaskLine, PickingTaskLine.picking_task_id == PickingTask.id)
+        .where(PickingTask.tenant_id == tenant_id, PickingTask.status != "DONE")
+        .group_by(PickingTask.zone_id, WarehouseZone.name, WarehouseZone.zone_type)
+        .order_by(WarehouseZone.name.asc().nulls_last())
+    )
+    if warehouse_id is not None:
+        q = q.where(WarehouseZone.warehouse_id == warehouse_id)
+    return [
+        {
+            "zone_id": zone_id,
+            "zone_name": name,
+            "zone_type": zone_type,
+            "open_tasks": open_tasks,
+            "in_progress_tasks": in_progress,
+            "open_lines": lines,
+            "units_to_pick": int(units),
+        }
+        for zone_id, name, zone_type, open_tasks, in_progress, lines, units in db.execute(q).all()
+    ]
@@ -0,0 +1,318 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+
+try:
+    import redis  # type: ignore
+except Exception:  # pragma: no cover
+    redis = None  # type: ignore
+
+_PENDING = "product_cache_pending"
+
+
+@dataclass(frozen=True)
+class CachedProduct:
+    """Detached snapshot of the Product fields scan flows need (safe to share across sessions and workers)."""
+
+    id: uuid.UUID
+    tenant_id: int
+    client_id: uuid.UUID
+    sku: str
+    name: str
+    barcode: str | None
+    uom: str
+    carton_qty: int | None
+    pallet_qty: int | None
+    lot_tracking_enabled: bool
+    expiry_tracking_enabled: bool
+
+    @classmethod
+    def from_model(cls, p: Product) -> "CachedProduct":
+        return cls(
+            id=p.id,
+            tenant_id=p.tenant_id,
+            client_id=p.client_id,
+            sku=p.sku,
+            name=p.name,
+            barcode=p.barcode,
+            uom=p.uom,
+            carton_qty=p.carton_qty,
+            pallet_qty=p.pallet_qty,
+            lot_tracking_enabled=bool(p.lot_tracking_enabled),
+            expiry_tracking_enabled=bool(p.expiry_tracking_enabled),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "id": str(self.id), "client_id": str(self.client_id)})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "CachedProduct":
+        d = json.loads(raw)
+        return cls(**{**d, "id": uuid.UUID(d["id"]), "client_id": uuid.UUID(d["client_id"])})
+
+
+def id_key(tenant_id: int, product_id: uuid.UUID) -> str:
+    return f"pc:{tenant_id}:id:{product_id}"
+
+
+def barcode_key(tenant_id: int, client_id: uuid.UUID, barcode: str) -> str:
+    return f"pc:{tenant_id}:bc:{client_id}:{barcode}"
+
+
+def keys_for(p: CachedProduct | Product) -> list[str]:
+    keys = [id_key(p.tenant_id, p.id)]
+    if p.barcode:
+        keys.append(barcode_key(p.tenant_id, p.client_id, p.barcode))
+    return keys
+
+
+class ProductCache:
+    """
+    Two-tier product master-data cache: an in-process LRU with TTL, optionally backed by Redis.
+
+    Each product is stored under its id key and its (client, barcode) key. Misses are not cached, so a
+    new barcode resolves as soon as its product commits. Invalidation drops keys from this process and
+    from Redis; other processes' LRU entries expire after ttl_seconds, which bounds staleness there.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        redis_ttl_seconds: int = 0,
+        redis_client: Callable[[], object | None] | None = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._redis_client = redis_client
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, CachedProduct]] = OrderedDict()
+        # Bumped on every invalidation, so a load that raced with a product change is not stored
+        self._generation = 0
+        self._counters = dict.fromkeys(
+            ("local_hits", "redis_hits", "misses", "stores", "evictions", "invalidations", "redis_errors"), 0
+        )
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, CachedProduct]:
+        now = time.monotonic()
+        found: dict[str, CachedProduct] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[0] < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+                elif entry is not None:
+                    del self._entries[key]
+            self._counters["local_hits"] += len(found)
+
+        rest = [k for k in keys if k not in found]
+        r = self._redis()
+        if rest and r is not None:
+            try:
+                raw = r.mget(rest)
+            except Exception:
+                raw = [None] * len(rest)
+                self._count("redis_errors")
+            remote = {k: CachedProduct.from_json(v) for k, v in zip(rest, raw, strict=True) if v}
+            if remote:
+                self._store_local(remote.items())
+                found.update(remote)
+                self._count("redis_hits", len(remote))
+        self._count("misses", len(keys) - len(found))
+        return found
+
+    def put_many(self, products: Iterable[CachedProduct], *, generation: int) -> None:
+        """Store products loaded from the database, unless something was invalidated since `generation`."""
+        items = [(key, p) for p in products for key in keys_for(p)]
+        if not items:
+            return
+        with self._lock:
+            if self._generation != generation:
+                return
+        self._store_local(items)
+        self._count("stores", len(items))
+        r = self._redis()
+        if r is not None:
+            try:
+                pipe = r.pipeline()
+                for key, p in items:
+                    pipe.set(key, p.to_json(), ex=self.redis_ttl_seconds or None)
+                pipe.execute()
+            except Exception:
+                self._count("redis_errors")
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+            self._counters["invalidations"] += len(keys)
+        r = self._redis()
+        if r is not None:
+            try:
+                r.delete(*keys)
+            except Exception:
+                self._count("redis_errors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        lookups = counters["local_hits"] + counters["redis_hits"] + counters["misses"]
+        return {
+            **counters,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hit_ratio": round((counters["local_hits"] + counters["redis_hits"]) / lookups, 4) if lookups else None,
+            "redis": self._redis_client is not None,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._counters = dict.fromkeys(self._counters, 0)
+
+    def _store_local(self, items: Iterable[tuple[str, CachedProduct]]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key, p in items:
+                self._entries[key] = (now, p)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _count(self, name: str, n: int = 1) -> None:
+        if n:
+            with self._lock:
+                self._counters[name] += n
+
+    def _redis(self):
+        return self._redis_client() if self._redis_client is not None else None
+
+
+_redis_conn = None
+
+
+def _get_redis():
+    """Shared Redis tier (settings.product_cache_redis); None when redis is missing or unreachable."""
+    global _redis_conn
+    if _redis_conn is not None:
+        return _redis_conn
+    if redis is None:
+        return None
+    try:
+        _redis_conn = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        _redis_conn.ping()
+        return _redis_conn
+    except Exception:
+        _redis_conn = None
+        return None
+
+
+_cache = ProductCache(
+    ttl_seconds=settings.product_cache_ttl_seconds,
+    max_entries=settings.product_cache_max_entries,
+    redis_ttl_seconds=settings.product_cache_redis_ttl_seconds,
+    redis_client=_get_redis if settings.product_cache_redis else None,
+)
+
+
+def _load(db: Session, stmt, keys_of: Callable[[CachedProduct], str | None]) -> dict[str, CachedProduct]:
+    generation = _cache.generation()
+    loaded = [CachedProduct.from_model(p) for p in db.scalars(stmt).all()]
+    if settings.product_cache_enabled:
+        # Products this session changed but has not committed yet must not leak to other sessions.
+        pending = set(db.info.get(_PENDING, ()))
+        if not any(k in pending for p in loaded for k in keys_for(p)):
+            _cache.put_many(loaded, generation=generation)
+    return {k: p for p in loaded if (k := keys_of(p)) is not None}
+
+
+def get_by_barcodes(
+    db: Session, *, tenant_id: int, client_id: uuid.UUID, barcodes: Iterable[str]
+) -> dict[str, CachedProduct]:
+    """Products of a client by barcode; barcodes not found are left out. One query for all cache misses."""
+    wanted = {barcode_key(tenant_id, client_id, bc): bc for bc in dict.fromkeys(barcodes)}
+    if not wanted:
+        return {}
+    found = _cache.get_many(list(wanted)) if settings.product_cache_enabled else {}
+    missing = [bc for key, bc in wanted.items() if key not in found]
+    if missing:
+        found.update(
+            _load(
+                db,
+                select(Product).where(
+                    Product.tenant_id == tenant_id, Product.client_id == client_id, Product.barcode.in_(missing)
+                ),
+                lambda p: barcode_key(tenant_id, client_id, p.barcode) if p.barcode else None,
+            )
+        )
+    return {wanted[key]: p for key, p in found.items() if key in wanted}
+
+
+def get_by_barcode(db: Session, *, tenant_id: int, client_id: uuid.UUID, barcode: str) -> CachedProduct | None:
+    return get_by_barcodes(db, tenant_id=tenant_id, client_id=client_id, barcodes=[barcode]).get(barcode)
+
+
+def get_by_id(db: Session, *, tenant_id: int, product_id: uuid.UUID) -> CachedProduct | None:
+    """Product of the tenant by id (the caller checks the client when it matters)."""
+    key = id_key(tenant_id, product_id)
+    if settings.product_cache_enabled:
+        hit = _cache.get_many([key]).get(key)
+        if hit is not None:
+            return hit
+    loaded = _load(
+        db,
+        select(Product).where(Product.id == product_id, Product.tenant_id == tenant_id),
+        lambda p: id_key(p.tenant_id, p.id),
+    )
+    return loaded.get(key)
+
+
+def invalidate(db: Session, products: Iterable[CachedProduct | Product]) -> None:
+    """
+    Drop `products` (created/updated through `db`) from the cache now, and again once `db` commits, so a
+    lookup by another session between the two cannot keep the old version. Pass the product as it was
+    before an update as well when its barcode changed.
+    """
+    keys = [k for p in products for k in keys_for(p)]
+    _cache.invalidate(keys)
+    db.info.setdefault(_PENDING, []).extend(keys)
+
+
+def stats() -> dict:
+    return {"enabled": settings.product_cache_enabled, **_cache.stats()}
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        _cache.invalidate(pending)
+
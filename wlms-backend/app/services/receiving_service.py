@@ -0,0 +1,212 @@
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, column, insert, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.inbound import InboundLine, InboundShipment
+from app.models.location import Location
+from app.models.product_batch import ProductBatch
+from app.models.warehouse_zone import WarehouseZone
+from app.services import product_cache
+from app.services.inventory_service import LedgerCreate, apply_ledger_batch
+from app.services.uom_service import qty_to_pieces
+
+# Largest receiving scan batch accepted in one request
+MAX_RECEIVE_BATCH = 500
+
+
+@dataclass(frozen=True)
+class ReceiveScan:
+    barcode: str
+    qty: int
+    location_staging_id: uuid.UUID
+    uom: str | None = None
+    batch_number: str | None = None
+    expiry_date: date | None = None
+
+
+@dataclass(frozen=True)
+class ReceiveScanResult:
+    index: int
+    status: str  # RECEIVED / REJECTED
+    detail: str | None = None
+    product_id: uuid.UUID | None = None
+    batch_id: uuid.UUID | None = None
+    line_id: int | None = None
+    qty_pieces: int = 0
+
+
+def _resolve_batches(
+    db: Session, wanted: set[tuple[uuid.UUID, str, date | None]]
+) -> dict[tuple[uuid.UUID, str, date | None], uuid.UUID]:
+    """Batch ids for (product, batch_number, expiry); missing batches are created with one INSERT."""
+    if not wanted:
+        return {}
+    found = {
+        (b.product_id, b.batch_number, b.expiry_date): b.id
+        for b in db.scalars(
+            select(ProductBatch).where(
+                tuple_(ProductBatch.product_id, ProductBatch.batch_number).in_(sorted({(p, n) for p, n, _e in wanted}))
+            )
+        ).all()
+    }
+    missing = sorted(wanted - found.keys(), key=lambda k: (k[0], k[1], k[2] or date.min))
+    if missing:
+        ins = pg_insert(ProductBatch).values(
+            [{"id": uuid.uuid4(), "product_id": p, "batch_number": n, "expiry_date": e} for p, n, e in missing]
+        )
+        # A concurrent receipt may create the same batch: take its row instead.
+        ins = ins.on_conflict_do_update(
+            constraint="uq_product_batches_product_batch_expiry", set_={"batch_number": ins.excluded.batch_number}
+        )
+        for bid, p, n, e in db.execute(
+            ins.returning(ProductBatch.id, ProductBatch.product_id, ProductBatch.batch_number, ProductBatch.expiry_date)
+        ).all():
+            found[(p, n, e)] = bid
+    return found
+
+
+def receive_scans(
+    db: Session,
+    *,
+    inbound: InboundShipment,
+    scans: Sequence[ReceiveScan],
+    performed_by_user_id: uuid.UUID | None,
+) -> list[ReceiveScanResult]:
+    """
+    Receive many scans into staging for `inbound` (locked by the caller) in one transaction.
+
+    Staging locations, products (by barcode) and batches are resolved with one query each, inbound lines
+    with one more; each scan is validated like scan_line and an invalid one is REJECTED without affecting
+    the others. Accepted scans are written set-based: one UPDATE for existing inbound lines, one INSERT for
+    new ones, and apply_ledger_batch for ledger rows and balances.
+    """
+    if len(scans) > MAX_RECEIVE_BATCH:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Too many scans in one batch")
+    if inbound.status not in {"RECEIVING", "DRAFT"}:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Inbound not in receiving state")
+    if not scans:
+        return []
+
+    staging = set(
+        db.scalars(
+            select(Location.id)
+            .join(WarehouseZone, Location.zone_id == WarehouseZone.id)
+            .where(
+                Location.id.in_({sc.location_staging_id for sc in scans}),
+                Location.warehouse_id == inbound.warehouse_id,
+                WarehouseZone.zone_type == "STAGING",
+            )
+        ).all()
+    )
+    products = product_cache.get_by_barcodes(
+        db, tenant_id=inbound.tenant_id, client_id=inbound.client_id, barcodes=[sc.barcode for sc in scans]
+    )
+
+    # Validate every scan before touching batches, so rejected scans never create one.
+    results: list[ReceiveScanResult | None] = [None] * len(scans)
+    accepted: list[tuple[int, ReceiveScan, product_cache.CachedProduct, tuple | None, int]] = []
+    for idx, sc in enumerate(scans):
+        product = products.get(sc.barcode)
+        detail = None
+        batch_key = None
+        qty_pieces = 0
+        if sc.location_staging_id not in staging:
+            detail = "Invalid staging location"
+        elif product is None:
+            detail = "Unknown product barcode"
+        elif (product.lot_tracking_enabled or product.expiry_tracking_enabled) and not sc.batch_number:
+            detail = "batch_number required"
+        elif product.expiry_tracking_enabled and sc.expiry_date is None:
+            detail = "expiry_date required"
+        else:
+            if product.lot_tracking_enabled or product.expiry_tracking_enabled:
+                batch_key = (product.id, sc.batch_number, sc.expiry_date)
+            try:
+                qty_pieces = qty_to_pieces(product=product, qty=sc.qty, uom=sc.uom or "piece")
+            except HTTPException as exc:
+                detail = exc.detail
+        if detail is not None:
+            results[idx] = ReceiveScanResult(index=idx, status="REJECTED", detail=detail)
+        else:
+            accepted.append((idx, sc, product, batch_key, qty_pieces))
+    if not accepted:
+        return [r for r in results if r is not None]
+
+    batch_ids = _resolve_batches(db, {key for _i, _sc, _p, key, _q in accepted if key is not None})
+
+    # Received pieces per inbound line key (product, batch)
+    received: dict[tuple[uuid.UUID, uuid.UUID | None], int] = {}
+    for _idx, _sc, product, key, qty_pieces in accepted:
+        line_key = (product.id, batch_ids[key] if key else None)
+        received[line_key] = received.get(line_key, 0) + qty_pieces
+
+    line_ids: dict[tuple[uuid.UUID, uuid.UUID | None], int] = {}
+    for line_id, product_id, batch_id in db.execute(
+        select(InboundLine.id, InboundLine.product_id, InboundLine.batch_id)
+        .where(InboundLine.inbound_id == inbound.id)
+        .order_by(InboundLine.id)
+    ).all():
+        line_ids.setdefault((product_id, batch_id), line_id)
+
+    existing = [(line_ids[k], qty) for k, qty in received.items() if k in line_ids]
+    if existing:
+        lv = values(column("id", Integer), column("qty", Integer), name="received_deltas").data(sorted(existing))
+        db.execute(
+            update(InboundLine)
+            .where(InboundLine.id == lv.c.id)
+            .values(received_qty=InboundLine.received_qty + lv.c.qty)
+            .execution_options(synchronize_session=False)
+        )
+    new = [(k, qty) for k, qty in received.items() if k not in line_ids]
+    if new:
+        rows = db.execute(
+            insert(InboundLine)
+            .values(
+                [
+                    {"inbound_id": inbound.id, "product_id": p, "batch_id": b, "expected_qty": None, "received_qty": qty}
+                    for (p, b), qty in new
+                ]
+            )
+            .returning(InboundLine.id, InboundLine.product_id, InboundLine.batch_id)
+        ).all()
+        for line_id, product_id, batch_id in rows:
+            line_ids[(product_id, batch_id)] = line_id
+
+    entries: list[LedgerCreate] = []
+    for idx, sc, product, key, qty_pieces in accepted:
+        batch_id = batch_ids[key] if key else None
+        entries.append(
+            LedgerCreate(
+                tenant_id=inbound.tenant_id,
+                client_id=inbound.client_id,
+                warehouse_id=inbound.warehouse_id,
+                product_id=product.id,
+                batch_id=batch_id,
+                from_location_id=None,
+                to_location_id=sc.location_staging_id,
+                qty_delta=qty_pieces,
+                event_type="INBOUND_RECEIVE",
+                reference_type="INBOUND",
+                reference_id=str(inbound.id),
+                performed_by_user_id=performed_by_user_id,
+            )
+        )
+        results[idx] = ReceiveScanResult(
+            index=idx,
+            status="RECEIVED",
+            product_id=product.id,
+            batch_id=batch_id,
+            line_id=line_ids[(product.id, batch_id)],
+            qty_pieces=qty_pieces,
+        )
+    # One ledger insert, one balance upsert and one availability upsert for the whole batch.
+    apply_ledger_batch(db, entries=entries)
+
+    inbound.status = "RECEIVING"
+    return [r for r in results if r is not None]
@@ -1,14 +1,23 @@
 import uuid
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Integer, column, delete, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.inventory import InventoryBalance
 from app.models.inventory_reservation import InventoryReservation
 from app.models.location import Location
+from app.models.outbound import OutboundLine, OutboundOrder
 from app.models.product_batch import ProductBatch
 from app.models.warehouse_zone import WarehouseZone
+from app.services import fefo_index
+from app.services.availability_service import AvailabilityDelta, apply_availability_deltas
 from app.services.inventory_service import adjust_reserved
 
 
@@ -17,7 +26,7 @@ def _candidate_balances_stmt(
     tenant_id: int,
     client_id: uuid.UUID,
     warehouse_id: uuid.UUID,
-    product_id: uuid.UUID,
+    product_ids: Sequence[uuid.UUID],
 ) :
     # Reserve from non-STAGING locations in this warehouse.
     # (We allow STORAGE/PACKING/etc; caller can tighten later.)
@@ -29,11 +38,164 @@ def _candidate_balances_stmt(
         .where(InventoryBalance.tenant_id == tenant_id)
         .where(InventoryBalance.client_id == client_id)
         .where(InventoryBalance.warehouse_id == warehouse_id)
-        .where(InventoryBalance.product_id == product_id)
+        .where(InventoryBalance.product_id.in_(product_ids))
         .where(InventoryBalance.available_qty > 0)
         .where(WarehouseZone.zone_type != "STAGING")
-        .order_by(ProductBatch.expiry_date.asc().nulls_last(), InventoryBalance.updated_at.asc())
+        # id as final tie-breaker: row locks are always taken in the same order (no lock-order deadlocks)
+        .order_by(ProductBatch.expiry_date.asc().nulls_last(), InventoryBalance.updated_at.asc(), InventoryBalance.id.asc())
+    )
+
+
+def _covers(balances: Sequence[InventoryBalance], demand: dict[uuid.UUID, int]) -> bool:
+    available: dict[uuid.UUID, int] = defaultdict(int)
+    for b in balances:
+        available[b.product_id] += b.available_qty
+    return all(available[pid] >= qty for pid, qty in demand.items())
+
+
+def _locked_candidates(db: Session, stmt, *, demand: dict[uuid.UUID, int]) -> list[InventoryBalance]:
+    """
+    Lock candidate balances in FEFO order.
+
+    Rows currently held by concurrent approvers are skipped first (SKIP LOCKED) so hot SKUs spread
+    across locations; if the unlocked rows cannot cover `demand` (qty per product), fall back to
+    waiting on the full FEFO set.
+    """
+    opts = {"populate_existing": True}
+    rows = db.execute(stmt.with_for_update(of=InventoryBalance, skip_locked=True), execution_options=opts).all()
+    balances = [bal for bal, _zone, _batch in rows]
+    if _covers(balances, demand):
+        return balances
+    rows = db.execute(stmt.with_for_update(of=InventoryBalance), execution_options=opts).all()
+    return [bal for bal, _zone, _batch in rows]
+
+
+def _load_fefo_candidates(db: Session, key: fefo_index.FefoKey) -> list[fefo_index.FefoCandidate]:
+    tenant_id, client_id, warehouse_id, product_id = key
+    stmt = _candidate_balances_stmt(
+        tenant_id=tenant_id, client_id=client_id, warehouse_id=warehouse_id, product_ids=[product_id]
+    ).with_only_columns(
+        InventoryBalance.id, InventoryBalance.location_id, InventoryBalance.batch_id, InventoryBalance.available_qty
+    )
+    return [
+        fefo_index.FefoCandidate(balance_id=r.id, location_id=r.location_id, batch_id=r.batch_id, available_qty=r.available_qty)
+        for r in db.execute(stmt).all()
+    ]
+
+
+def _indexed_candidates(
+    db: Session,
+    *,
+    tenant_id: int,
+    client_id: uuid.UUID,
+    warehouse_id: uuid.UUID,
+    demand: dict[uuid.UUID, int],
+) -> list[InventoryBalance] | None:
+    """
+    Pick balances from the in-process FEFO index and lock only those rows (one query, id order).
+
+    The locked rows are re-checked: keys whose cached quantities were off are dropped from the index,
+    and None is returned if the picked rows no longer cover `demand` (caller falls back to SQL).
+    """
+    picked: list[uuid.UUID] = []
+    cached: dict[uuid.UUID, tuple[fefo_index.FefoKey, int]] = {}
+    for product_id, qty in demand.items():
+        key = (tenant_id, client_id, warehouse_id, product_id)
+        covered = 0
+        for c in fefo_index.candidates(db, key, lambda key=key: _load_fefo_candidates(db, key)):
+            if covered >= qty:
+                break
+            if c.available_qty <= 0:
+                continue
+            picked.append(c.balance_id)
+            cached[c.balance_id] = (key, c.available_qty)
+            covered += c.available_qty
+        if covered < qty:
+            return None
+
+    rows = db.scalars(
+        select(InventoryBalance).where(InventoryBalance.id.in_(picked)).order_by(InventoryBalance.id).with_for_update(),
+        execution_options={"populate_existing": True},
+    ).all()
+    by_id = {b.id: b for b in rows}
+    stale = {key for bid, (key, qty) in cached.items() if bid not in by_id or by_id[bid].available_qty != qty}
+    if stale:
+        fefo_index.invalidate(stale)
+    balances = [by_id[bid] for bid in picked if bid in by_id]
+    return balances if _covers(balances, demand) else None
+
+
+def _candidates(
+    db: Session,
+    *,
+    tenant_id: int,
+    client_id: uuid.UUID,
+    warehouse_id: uuid.UUID,
+    demand: dict[uuid.UUID, int],
+    locking: bool,
+) -> list[InventoryBalance]:
+    """Candidate balances in FEFO order (per product); locked when `locking`."""
+    if locking and settings.fefo_index_enabled:
+        balances = _indexed_candidates(
+            db, tenant_id=tenant_id, client_id=client_id, warehouse_id=warehouse_id, demand=demand
+        )
+        if balances is not None:
+            return balances
+    stmt = _candidate_balances_stmt(
+        tenant_id=tenant_id,
+        client_id=client_id,
+        warehouse_id=warehouse_id,
+        product_ids=list(demand),
+    )
+    if locking:
+        return _locked_candidates(db, stmt, demand=demand)
+    return [bal for bal, _zone, _batch in db.execute(stmt).all()]
+
+
+def reservation_expiry() -> datetime | None:
+    """expires_at for reservations made now (None when settings.reservation_ttl_minutes is 0)."""
+    if settings.reservation_ttl_minutes <= 0:
+        return None
+    return datetime.now(timezone.utc) + timedelta(minutes=settings.reservation_ttl_minutes)
+
+
+def _upsert_reservation(
+    db: Session,
+    *,
+    tenant_id: int,
+    outbound_id: uuid.UUID,
+    client_id: uuid.UUID,
+    warehouse_id: uuid.UUID,
+    product_id: uuid.UUID,
+    batch_id: uuid.UUID | None,
+    location_id: uuid.UUID,
+    qty: int,
+) -> InventoryReservation:
+    # Upsert reservation row for this outbound/product/batch/location
+    r = db.scalar(
+        select(InventoryReservation).where(
+            InventoryReservation.outbound_id == outbound_id,
+            InventoryReservation.product_id == product_id,
+            InventoryReservation.batch_id == batch_id,
+            InventoryReservation.location_id == location_id,
+        )
     )
+    if r is None:
+        r = InventoryReservation(
+            tenant_id=tenant_id,
+            outbound_id=outbound_id,
+            client_id=client_id,
+            warehouse_id=warehouse_id,
+            product_id=product_id,
+            batch_id=batch_id,
+            location_id=location_id,
+            qty_reserved=0,
+        )
+        db.add(r)
+        db.flush()
+    r.qty_reserved += qty
+    r.expires_at = reservation_expiry()
+    return r
 
 
 def reserve_for_outbound_line(
@@ -45,52 +207,71 @@ def reserve_for_outbound_line(
     warehouse_id: uuid.UUID,
     product_id: uuid.UUID,
     qty: int,
+    locking: bool | None = None,
 ) -> list[InventoryReservation]:
+    """
+    Reserve `qty` FEFO-first from non-STAGING balances.
+
+    locking=True (default via settings.reservation_row_locking) locks the candidate rows so concurrent
+    approvals of the same SKU serialize on the balances instead of losing updates; callers should run
+    the surrounding transaction through app.db.retry.run_with_retry. With settings.fefo_index_enabled
+    the candidates come from the in-process FEFO index and only the chosen rows are locked.
+    """
     if qty <= 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="qty must be > 0")
 
+    use_locking = settings.reservation_row_locking if locking is None else locking
     remaining = qty
     created: list[InventoryReservation] = []
+    summary_deltas: list[AvailabilityDelta] = []  # locking mode; adjust_reserved maintains it otherwise
 
-    rows = db.execute(
-        _candidate_balances_stmt(
-            tenant_id=tenant_id,
-            client_id=client_id,
-            warehouse_id=warehouse_id,
-            product_id=product_id,
-        )
-    ).all()
+    balances = _candidates(
+        db,
+        tenant_id=tenant_id,
+        client_id=client_id,
+        warehouse_id=warehouse_id,
+        demand={product_id: qty},
+        locking=use_locking,
+    )
 
-    for bal, _zone, _batch in rows:
+    for bal in balances:
         if remaining <= 0:
             break
         take = min(remaining, bal.available_qty)
         if take <= 0:
             continue
 
-        # Update aggregate reserved in balances
-        adjust_reserved(
-            db,
-            tenant_id=tenant_id,
-            client_id=client_id,
-            warehouse_id=warehouse_id,
-            product_id=product_id,
-            batch_id=bal.batch_id,
-            location_id=bal.location_id,
-            delta_reserved=take,
-        )
-
-        # Upsert reservation row for this outbound/product/batch/location
-        r = db.scalar(
-            select(InventoryReservation).where(
-                InventoryReservation.outbound_id == outbound_id,
-                InventoryReservation.product_id == product_id,
-                InventoryReservation.batch_id == bal.batch_id,
-                InventoryReservation.location_id == bal.location_id,
+        if use_locking:
+            # Row is locked by this transaction: update it in place instead of re-reading it.
+            bal.reserved_qty += take
+            bal.available_qty = bal.on_hand_qty - bal.reserved_qty
+            summary_deltas.append(
+                AvailabilityDelta(
+                    tenant_id=tenant_id,
+                    client_id=client_id,
+                    warehouse_id=warehouse_id,
+                    product_id=product_id,
+                    location_id=bal.location_id,
+                    reserved=take,
+                    balance_id=bal.id,
+                )
             )
-        )
-        if r is None:
-            r = InventoryReservation(
+        else:
+            # Update aggregate reserved in balances
+            adjust_reserved(
+                db,
+                tenant_id=tenant_id,
+                client_id=client_id,
+                warehouse_id=warehouse_id,
+                product_id=product_id,
+                batch_id=bal.batch_id,
+                location_id=bal.location_id,
+                delta_reserved=take,
+            )
+
+        created.append(
+            _upsert_reservation(
+                db,
                 tenant_id=tenant_id,
                 outbound_id=outbound_id,
                 client_id=client_id,
@@ -98,21 +279,485 @@ def reserve_for_outbound_line(
                 product_id=product_id,
                 batch_id=bal.batch_id,
                 location_id=bal.location_id,
-                qty_reserved=0,
+                qty=take,
             )
-            db.add(r)
-            db.flush()
-        r.qty_reserved += take
-        created.append(r)
+        )
         remaining -= take
 
     if remaining > 0:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Insufficient available inventory to reserve")
 
+    apply_availability_deltas(db, summary_deltas)
     db.flush()
     return created
 
 
+def _write_takes(
+    db: Session, takes: Sequence[tuple[OutboundOrder, InventoryBalance, int]]
+) -> list[InventoryReservation]:
+    """
+    Persist allocations (order, balance, qty) with one statement each for balances, the availability
+    summary and reservations. Raises 409 if a balance no longer has the qty available.
+    """
+    per_balance: dict[uuid.UUID, tuple[OutboundOrder, InventoryBalance, int]] = {}
+    per_reservation: dict[tuple[uuid.UUID, uuid.UUID], tuple[OutboundOrder, InventoryBalance, int]] = {}
+    for order, bal, take in takes:
+        prev = per_balance.get(bal.id)
+        per_balance[bal.id] = (order, bal, take + (prev[2] if prev else 0))
+        prev = per_reservation.get((order.id, bal.id))
+        per_reservation[(order.id, bal.id)] = (order, bal, take + (prev[2] if prev else 0))
+
+    # Reserved deltas in one UPDATE ... FROM (VALUES ...). The available_qty guard makes the optimistic
+    # (non-locking) mode safe too: a concurrent approver that got there first makes the rowcount short.
+    deltas = values(
+        column("id", UUID(as_uuid=True)), column("delta", Integer), name="reserve_deltas"
+    ).data([(bal_id, take) for bal_id, (_order, _bal, take) in per_balance.items()])
+    res = db.execute(
+        update(InventoryBalance)
+        .where(InventoryBalance.id == deltas.c.id)
+        .where(InventoryBalance.on_hand_qty - InventoryBalance.reserved_qty >= deltas.c.delta)
+        .values(
+            reserved_qty=InventoryBalance.reserved_qty + deltas.c.delta,
+            available_qty=InventoryBalance.on_hand_qty - InventoryBalance.reserved_qty - deltas.c.delta,
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if res.rowcount != len(per_balance):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Insufficient available inventory to reserve")
+    for _order, bal, _take in per_balance.values():
+        db.expire(bal, ["reserved_qty", "available_qty", "updated_at"])
+    apply_availability_deltas(
+        db,
+        [
+            AvailabilityDelta(
+                tenant_id=order.tenant_id,
+                client_id=order.client_id,
+                warehouse_id=order.warehouse_id,
+                product_id=bal.product_id,
+                location_id=bal.location_id,
+                reserved=take,
+                balance_id=bal.id,
+            )
+            for order, bal, take in per_balance.values()
+        ],
+    )
+
+    expires_at = reservation_expiry()
+    ins = pg_insert(InventoryReservation).values(
+        [
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": order.tenant_id,
+                "outbound_id": order.id,
+                "client_id": order.client_id,
+                "warehouse_id": order.warehouse_id,
+                "product_id": bal.product_id,
+                "batch_id": bal.batch_id,
+                "location_id": bal.location_id,
+                "qty_reserved": take,
+                "expires_at": expires_at,
+            }
+            for order, bal, take in per_reservation.values()
+        ]
+    )
+    ins = ins.on_conflict_do_update(
+        constraint="uq_inv_res_out_prod_batch_loc",
+        set_={
+            "qty_reserved": InventoryReservation.qty_reserved + ins.excluded.qty_reserved,
+            "expires_at": ins.excluded.expires_at,
+        },
+    )
+    return list(db.scalars(ins.returning(InventoryReservation), execution_options={"populate_existing": True}).all())
+
+
+def reserve_for_outbound(
+    db: Session,
+    *,
+    order: OutboundOrder,
+    lines: Sequence[OutboundLine],
+    locking: bool | None = None,
+) -> list[InventoryReservation]:
+    """
+    Reserve every open line of `order` in one pass.
+
+    Candidates for all products are fetched with a single query and allocated FEFO in memory;
+    reservations, balance deltas, the availability summary and line reserved_qty are then written
+    with one statement each, so the statement count does not grow with the number of lines.
+    All-or-nothing: raises 409 if any product cannot be fully reserved.
+    """
+    demand: dict[uuid.UUID, int] = defaultdict(int)
+    for line in lines:
+        remaining = line.requested_qty - line.reserved_qty
+        if remaining > 0:
+            demand[line.product_id] += remaining
+    if not demand:
+        return []
+
+    use_locking = settings.reservation_row_locking if locking is None else locking
+    balances = _candidates(
+        db,
+        tenant_id=order.tenant_id,
+        client_id=order.client_id,
+        warehouse_id=order.warehouse_id,
+        demand=demand,
+        locking=use_locking,
+    )
+
+    # FEFO allocation in memory (rows arrive in FEFO order per product)
+    remaining = dict(demand)
+    takes: list[tuple[InventoryBalance, int]] = []
+    for bal in balances:
+        need = remaining.get(bal.product_id, 0)
+        take = min(need, bal.available_qty)
+        if take <= 0:
+            continue
+        takes.append((bal, take))
+        remaining[bal.product_id] = need - take
+    if any(qty > 0 for qty in remaining.values()):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Insufficient available inventory to reserve")
+
+    created = _write_takes(db, [(order, bal, take) for bal, take in takes])
+
+    db.execute(
+        update(OutboundLine)
+        .where(OutboundLine.outbound_id == order.id)
+        .where(OutboundLine.reserved_qty < OutboundLine.requested_qty)
+        .values(reserved_qty=OutboundLine.requested_qty)
+        .execution_options(synchronize_session="fetch")
+    )
+    return created
+
+
+WAVE_SORTS = ("ship_date", "priority")
+
+
+@dataclass(frozen=True)
+class WaveResult:
+    fully_allocated: list[uuid.UUID]
+    partially_allocated: list[uuid.UUID]
+    not_allocated: list[uuid.UUID]
+    # Unknown ids and orders that are not SUBMITTED/DRAFT
+    skipped: list[uuid.UUID]
+    reservations: list[InventoryReservation]
+    # Units reserved by this pass (reservation rows carry running totals)
+    units: int = 0
+
+
+def reserve_wave(
+    db: Session,
+    *,
+    tenant_id: int,
+    outbound_ids: Sequence[uuid.UUID],
+    sort: str = "ship_date",
+    allow_partial: bool = True,
+    locking: bool | None = None,
+) -> WaveResult:
+    """
+    Reserve many orders in one set-based pass.
+
+    Orders (locked in id order) and their lines are loaded with one query each, candidate stock with
+    one query per (client, warehouse). Stock is handed out FEFO to orders in wave order: earliest
+    requested_ship_date first (undated last, then oldest order), or with sort="priority" the order
+    of `outbound_ids`. Writes use the bulk statements of reserve_for_outbound plus one UPDATE for
+    line reserved_qty and one moving fully allocated orders to APPROVED; partially allocated orders
+    keep their status and can be approved later for the remainder. allow_partial=False leaves orders
+    that cannot be completed untouched, so their stock stays available to later orders in the wave.
+    """
+    if sort not in WAVE_SORTS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sort")
+
+    ids = list(dict.fromkeys(outbound_ids))
+    orders = db.scalars(
+        select(OutboundOrder)
+        .where(OutboundOrder.tenant_id == tenant_id)
+        .where(OutboundOrder.id.in_(ids))
+        .where(OutboundOrder.status.in_(["SUBMITTED", "DRAFT"]))
+        .order_by(OutboundOrder.id)
+        .with_for_update()
+    ).all()
+    found = {o.id for o in orders}
+    skipped = [oid for oid in ids if oid not in found]
+    if not orders:
+        return WaveResult(fully_allocated=[], partially_allocated=[], not_allocated=[], skipped=skipped, reservations=[])
+
+    lines_by_order: dict[uuid.UUID, list[OutboundLine]] = defaultdict(list)
+    for line in db.scalars(
+        select(OutboundLine).where(OutboundLine.outbound_id.in_(list(found))).order_by(OutboundLine.id)
+    ).all():
+        lines_by_order[line.outbound_id].append(line)
+
+    if sort == "priority":
+        rank = {oid: i for i, oid in enumerate(ids)}
+        orders = sorted(orders, key=lambda o: rank[o.id])
+    else:
+        orders = sorted(
+            orders,
+            key=lambda o: (o.requested_ship_date is None, o.requested_ship_date or date.min, o.created_at, o.id),
+        )
+
+    demand: dict[tuple[uuid.UUID, uuid.UUID], dict[uuid.UUID, int]] = defaultdict(lambda: defaultdict(int))
+    for o in orders:
+        for line in lines_by_order[o.id]:
+            if line.requested_qty > line.reserved_qty:
+                demand[(o.client_id, o.warehouse_id)][line.product_id] += line.requested_qty - line.reserved_qty
+
+    use_locking = settings.reservation_row_locking if locking is None else locking
+    stock: dict[tuple[uuid.UUID, uuid.UUID, uuid.UUID], list[InventoryBalance]] = defaultdict(list)
+    for client_id, warehouse_id in sorted(demand):
+        stmt = _candidate_balances_stmt(
+            tenant_id=tenant_id,
+            client_id=client_id,
+            warehouse_id=warehouse_id,
+            product_ids=list(demand[(client_id, warehouse_id)]),
+        )
+        if use_locking:
+            # A wave wants the whole FEFO set (demand usually exceeds stock): lock it in one pass
+            # rather than trying SKIP LOCKED first.
+            stmt = stmt.with_for_update(of=InventoryBalance)
+        for bal, _zone, _batch in db.execute(stmt, execution_options={"populate_existing": True}).all():
+            stock[(client_id, warehouse_id, bal.product_id)].append(bal)
+
+    return allocate_orders(
+        db, orders=orders, lines_by_order=lines_by_order, stock=stock, allow_partial=allow_partial, skipped=skipped
+    )
+
+
+def allocate_orders(
+    db: Session,
+    *,
+    orders: Sequence[OutboundOrder],
+    lines_by_order: dict[uuid.UUID, list[OutboundLine]],
+    stock: dict[tuple[uuid.UUID, uuid.UUID, uuid.UUID], list[InventoryBalance]],
+    allow_partial: bool = True,
+    skipped: Sequence[uuid.UUID] = (),
+    approve: bool = True,
+) -> WaveResult:
+    """
+    Hand out `stock` ((client, warehouse, product) -> balances in FEFO order, locked by the caller) to
+    `orders` in the given order, then write everything with the bulk statements of reserve_wave.
+    Shared by reserve_wave and cross-docking (which passes staging balances as stock). Fully allocated
+    orders become APPROVED unless approve=False (the caller may not approve orders).
+    """
+    left: dict[uuid.UUID, int] = {b.id: b.available_qty for bals in stock.values() for b in bals}
+    takes: list[tuple[OutboundOrder, InventoryBalance, int]] = []
+    line_deltas: dict[int, int] = {}
+    cursor: dict[tuple[uuid.UUID, uuid.UUID, uuid.UUID], int] = {}  # first balance with stock left, per SKU
+    fully: list[uuid.UUID] = []
+    partially: list[uuid.UUID] = []
+    not_allocated: list[uuid.UUID] = []
+    for o in orders:
+        open_lines = [line for line in lines_by_order[o.id] if line.requested_qty > line.reserved_qty]
+        if not allow_partial:
+            need: dict[uuid.UUID, int] = defaultdict(int)
+            for line in open_lines:
+                need[line.product_id] += line.requested_qty - line.reserved_qty
+            if any(
+                sum(left[b.id] for b in stock[(o.client_id, o.warehouse_id, pid)]) < qty for pid, qty in need.items()
+            ):
+                not_allocated.append(o.id)
+                continue
+
+        short = False
+        order_takes = 0
+        for line in open_lines:
+            key = (o.client_id, o.warehouse_id, line.product_id)
+            bals, i = stock[key], cursor.get(key, 0)
+            remaining = line.requested_qty - line.reserved_qty
+            while remaining > 0 and i < len(bals):
+                bal = bals[i]
+                take = min(remaining, left[bal.id])
+                if take > 0:
+                    left[bal.id] -= take
+                    remaining -= take
+                    takes.append((o, bal, take))
+                    line_deltas[line.id] = line_deltas.get(line.id, 0) + take
+                    order_takes += 1
+                if left[bal.id] == 0:
+                    i += 1
+            cursor[key] = i
+            short = short or remaining > 0
+
+        if not short:
+            fully.append(o.id)
+        elif order_takes:
+            partially.append(o.id)
+        else:
+            not_allocated.append(o.id)
+
+    reservations = _write_takes(db, takes) if takes else []
+    if line_deltas:
+        lv = values(column("id", Integer), column("delta", Integer), name="line_deltas").data(list(line_deltas.items()))
+        db.execute(
+            update(OutboundLine)
+            .where(OutboundLine.id == lv.c.id)
+            .values(reserved_qty=OutboundLine.reserved_qty + lv.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+        for o in orders:
+            for line in lines_by_order[o.id]:
+                if line.id in line_deltas:
+                    db.expire(line, ["reserved_qty"])
+    if fully and approve:
+        db.execute(
+            update(OutboundOrder)
+            .where(OutboundOrder.id.in_(fully))
+            .values(status="APPROVED")
+            .execution_options(synchronize_session=False)
+        )
+        approved = set(fully)
+        for o in orders:
+            if o.id in approved:
+                db.expire(o, ["status"])
+
+    return WaveResult(
+        fully_allocated=fully,
+        partially_allocated=partially,
+        not_allocated=not_allocated,
+        skipped=list(skipped),
+        reservations=reservations,
+        units=sum(line_deltas.values()),
+    )
+
+
+def _release_reserved(db: Session, per_balance: dict[tuple, tuple[uuid.UUID, uuid.UUID, int]]) -> None:
+    """
+    Give reserved qty back to balances: per_balance maps (tenant, product, batch, location) to
+    (client, warehouse, qty). One UPDATE of the balances and one availability summary upsert.
+    """
+    if not per_balance:
+        return
+
+    B = InventoryBalance
+    v = values(
+        column("tenant_id", Integer),
+        column("product_id", UUID(as_uuid=True)),
+        column("batch_id", UUID(as_uuid=True)),
+        column("location_id", UUID(as_uuid=True)),
+        column("delta", Integer),
+        name="release_deltas",
+    ).data([(*key, qty) for key, (_client_id, _warehouse_id, qty) in per_balance.items()])
+    balance_ids = {
+        (b.tenant_id, b.product_id, b.batch_id, b.location_id): b.id
+        for b in db.execute(
+            update(B)
+            .where(B.tenant_id == v.c.tenant_id)
+            .where(B.product_id == v.c.product_id)
+            .where(B.batch_id.is_not_distinct_from(v.c.batch_id))
+            .where(B.location_id == v.c.location_id)
+            .values(
+                reserved_qty=B.reserved_qty - v.c.delta,
+                available_qty=B.on_hand_qty - B.reserved_qty + v.c.delta,
+                updated_at=func.now(),
+            )
+            .returning(B.id, B.tenant_id, B.product_id, B.batch_id, B.location_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+    }
+    apply_availability_deltas(
+        db,
+        [
+            AvailabilityDelta(
+                tenant_id=tenant_id,
+                client_id=client_id,
+                warehouse_id=warehouse_id,
+                product_id=product_id,
+                location_id=location_id,
+                reserved=-qty,
+                balance_id=balance_ids.get((tenant_id, product_id, batch_id, location_id)),
+            )
+            for (tenant_id, product_id, batch_id, location_id), (client_id, warehouse_id, qty) in per_balance.items()
+        ],
+    )
+
+
+# Orders whose reservations may be released (picking has not started)
+RELEASABLE_STATUSES = ("DRAFT", "SUBMITTED", "APPROVED")
+
+
+@dataclass(frozen=True)
+class ReleaseResult:
+    outbound_ids: list[uuid.UUID]
+    reservations: int
+    qty: int
+
+
+def release_order_reservations(db: Session, *, orders: Sequence[OutboundOrder]) -> ReleaseResult:
+    """
+    Drop every reservation of `orders` (locked by the caller) and give the stock back.
+
+    Set-based: one DELETE ... RETURNING, one UPDATE of the balances, one availability summary
+    upsert and one UPDATE resetting the orders' line reserved_qty. Order status is left to the caller.
+    """
+    ids = [o.id for o in orders]
+    if not ids:
+        return ReleaseResult(outbound_ids=[], reservations=0, qty=0)
+
+    R = InventoryReservation
+    released = db.execute(
+        delete(R)
+        .where(R.outbound_id.in_(ids))
+        .returning(R.tenant_id, R.client_id, R.warehouse_id, R.product_id, R.batch_id, R.location_id, R.qty_reserved)
+    ).all()
+
+    # balance key (tenant, product, batch, location) -> (client, warehouse, qty)
+    per_balance: dict[tuple, tuple[uuid.UUID, uuid.UUID, int]] = {}
+    for r in released:
+        key = (r.tenant_id, r.product_id, r.batch_id, r.location_id)
+        prev = per_balance.get(key)
+        per_balance[key] = (r.client_id, r.warehouse_id, r.qty_reserved + (prev[2] if prev else 0))
+
+    _release_reserved(db, per_balance)
+
+    db.execute(
+        update(OutboundLine)
+        .where(OutboundLine.outbound_id.in_(ids))
+        .where(OutboundLine.reserved_qty > 0)
+        .values(reserved_qty=0)
+        .execution_options(synchronize_session="fetch")
+    )
+    return ReleaseResult(
+        outbound_ids=ids,
+        reservations=len(released),
+        qty=sum(qty for _client_id, _warehouse_id, qty in per_balance.values()),
+    )
+
+
+def release_expired_reservations(db: Session, *, tenant_id: int | None = None, limit: int | None = None) -> ReleaseResult:
+    """
+    One sweeper batch: release all reservations of up to `limit` orders holding an expired one.
+
+    Orders are locked with SKIP LOCKED, so an order being approved or cancelled right now is left
+    for the next batch. APPROVED orders go back to SUBMITTED (they can be approved again). Callers
+    commit after each batch and repeat while a full batch came back.
+    """
+    expired = select(InventoryReservation.outbound_id).where(
+        InventoryReservation.expires_at.is_not(None), InventoryReservation.expires_at <= func.now()
+    )
+    stmt = (
+        select(OutboundOrder)
+        .where(OutboundOrder.id.in_(expired))
+        .where(OutboundOrder.status.in_(RELEASABLE_STATUSES))
+        .order_by(OutboundOrder.id)
+        .limit(limit or settings.reservation_release_batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    if tenant_id is not None:
+        stmt = stmt.where(OutboundOrder.tenant_id == tenant_id)
+    orders = db.scalars(stmt).all()
+
+    result = release_order_reservations(db, orders=orders)
+    approved = [o.id for o in orders if o.status == "APPROVED"]
+    if approved:
+        db.execute(
+            update(OutboundOrder)
+            .where(OutboundOrder.id.in_(approved))
+            .values(status="SUBMITTED")
+            .execution_options(synchronize_session="fetch")
+        )
+    return result
+
+
 def consume_reservation(
     db: Session,
     *,
@@ -142,3 +787,49 @@ def consume_reservation(
     db.flush()
 
 
+def consume_reservations(db: Session, *, takes: Sequence[tuple[InventoryReservation, int]]) -> None:
+    """
+    Set-based consume_reservation for many (reservation, qty) pairs (reservations locked by the caller).
+
+    Reserved qty goes back to the balances (one UPDATE plus the availability upsert), reservations are
+    decremented with one UPDATE and the emptied ones removed with one DELETE.
+    """
+    per_reservation: dict[uuid.UUID, tuple[InventoryReservation, int]] = {}
+    for r, qty in takes:
+        if qty <= 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="qty must be > 0")
+        prev = per_reservation.get(r.id)
+        per_reservation[r.id] = (r, qty + (prev[1] if prev else 0))
+    if not per_reservation:
+        return
+    if any(r.qty_reserved < qty for r, qty in per_reservation.values()):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Reservation qty insufficient")
+
+    per_balance: dict[tuple, tuple[uuid.UUID, uuid.UUID, int]] = {}
+    for r, qty in per_reservation.values():
+        key = (r.tenant_id, r.product_id, r.batch_id, r.location_id)
+        prev = per_balance.get(key)
+        per_balance[key] = (r.client_id, r.warehouse_id, qty + (prev[2] if prev else 0))
+    _release_reserved(db, per_balance)
+
+    deltas = values(
+        column("id", UUID(as_uuid=True)), column("delta", Integer), name="consume_deltas"
+    ).data([(rid, qty) for rid, (_r, qty) in per_reservation.items()])
+    db.execute(
+        update(InventoryReservation)
+        .where(InventoryReservation.id == deltas.c.id)
+        .values(qty_reserved=InventoryReservation.qty_reserved - deltas.c.delta)
+        .execution_options(synchronize_session=False)
+    )
+    emptied = [r for r, qty in per_reservation.values() if r.qty_reserved == qty]
+    if emptied:
+        db.execute(
+            delete(InventoryReservation)
+            .where(InventoryReservation.id.in_([r.id for r in emptied]))
+            .execution_options(synchronize_session=False)
+        )
+    for r, qty in per_reservation.values():
+        if r.qty_reserved == qty:
+            db.expunge(r)
+        else:
+            db.expire(r, ["qty_reserved"])
@@ -0,0 +1,212 @@
+import bisect
+import threading
+import time
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.inventory import InventoryBalance, InventoryLedger
+from app.models.location import Location
+from app.models.warehouse_zone import WarehouseZone
+from app.services.pick_route_service import depot_distances
+
+# Score weights: consolidation beats an empty bin, an empty bin beats sharing one; distance fit breaks ties.
+W_CONSOLIDATE = 100.0
+W_SHARED_SKU = 50.0
+W_DISTANCE = 20.0
+
+
+@dataclass(frozen=True)
+class SlotLocation:
+    id: uuid.UUID
+    code: str
+    zone_id: int
+    distance: float  # 0 (pick face) .. 1 (farthest routable location); unroutable locations count as 1
+
+
+@dataclass
+class _WarehouseSlots:
+    loaded_at: float
+    # Sorted by distance, then code
+    locations: list[SlotLocation]
+    # product_id -> 0 (slowest) .. 1 (fastest mover in the warehouse)
+    velocity: dict[uuid.UUID, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SlotRequest:
+    warehouse_id: uuid.UUID
+    product_id: uuid.UUID
+    batch_id: uuid.UUID | None
+
+
+@dataclass(frozen=True)
+class SlotSuggestion:
+    location_id: uuid.UUID
+    location_code: str
+    reason: str  # CONSOLIDATE / EMPTY / SHARED
+    score: float
+
+
+_lock = threading.Lock()
+_cache: dict[uuid.UUID, _WarehouseSlots] = {}
+
+
+def invalidate(warehouse_id: uuid.UUID | None = None) -> None:
+    """Drop cached candidates (after locations/zones change); None clears every warehouse."""
+    with _lock:
+        if warehouse_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(warehouse_id, None)
+
+
+def _order(s: SlotLocation) -> tuple[float, str]:
+    return (s.distance, s.code)
+
+
+def _load(db: Session, warehouse_id: uuid.UUID) -> _WarehouseSlots:
+    locs = db.scalars(
+        select(Location)
+        .join(WarehouseZone, Location.zone_id == WarehouseZone.id)
+        .where(
+            Location.warehouse_id == warehouse_id,
+            Location.is_active.is_(True),
+            WarehouseZone.zone_type == "STORAGE",
+        )
+    ).all()
+    dist = depot_distances(locs)
+    far = max(dist.values(), default=0.0) or 1.0
+    locations = sorted(
+        (
+            SlotLocation(id=loc.id, code=loc.code, zone_id=loc.zone_id, distance=min(dist.get(loc.id, far) / far, 1.0))
+            for loc in locs
+        ),
+        key=_order,
+    )
+
+    days = max(settings.slotting_velocity_days, 1)
+    picks = db.execute(
+        select(InventoryLedger.product_id, func.count())
+        .where(
+            InventoryLedger.warehouse_id == warehouse_id,
+            InventoryLedger.event_type == "PICK",
+            InventoryLedger.qty_delta < 0,
+            InventoryLedger.created_at >= datetime.now(timezone.utc) - timedelta(days=days),
+        )
+        .group_by(InventoryLedger.product_id)
+    ).all()
+    fastest = max((n for _p, n in picks), default=0) or 1
+    return _WarehouseSlots(
+        loaded_at=time.monotonic(),
+        locations=locations,
+        velocity={product_id: n / fastest for product_id, n in picks},
+    )
+
+
+def _slots(db: Session, warehouse_id: uuid.UUID) -> _WarehouseSlots:
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(warehouse_id)
+        if entry is not None and now - entry.loaded_at < settings.slotting_cache_ttl_seconds:
+            return entry
+    entry = _load(db, warehouse_id)
+    with _lock:
+        _cache[warehouse_id] = entry
+    return entry
+
+
+def _nearest(locations: Sequence[SlotLocation], target: float) -> int | None:
+    """Index of the location whose distance is closest to `target` (locations sorted by distance)."""
+    if not locations:
+        return None
+    i = bisect.bisect_left(locations, target, key=lambda s: s.distance)
+    return min((j for j in (i - 1, i) if 0 <= j < len(locations)), key=lambda j: abs(locations[j].distance - target))
+
+
+def suggest_locations(
+    db: Session, *, tenant_id: int, requests: Sequence[SlotRequest]
+) -> list[SlotSuggestion | None]:
+    """
+    Put-away destination per request (a staging balance), None if the warehouse has no STORAGE location.
+
+    Candidates are the warehouse's active STORAGE locations, scored by:
+      - consolidation: a location already holding the same product/batch wins (W_CONSOLIDATE);
+      - occupancy: empty locations beat ones holding other SKUs (W_SHARED_SKU per SKU present);
+      - velocity vs distance: fast movers (picks/day) go close to the pick face, slow movers further
+        back (W_DISTANCE * |distance - (1 - velocity)|).
+    Candidates and velocity come from a per-process cache; occupancy is read once per call. Requests are
+    slotted in order and each suggestion counts as occupying its location for the following ones.
+    """
+    warehouse_ids = sorted({r.warehouse_id for r in requests})
+    if not warehouse_ids:
+        return []
+    slots = {wid: _slots(db, wid) for wid in warehouse_ids}
+
+    # location -> SKUs (product, batch) stored there now
+    occupied: dict[uuid.UUID, set[tuple[uuid.UUID, uuid.UUID | None]]] = {}
+    for location_id, product_id, batch_id in db.execute(
+        select(InventoryBalance.location_id, InventoryBalance.product_id, InventoryBalance.batch_id).where(
+            InventoryBalance.tenant_id == tenant_id,
+            InventoryBalance.warehouse_id.in_(warehouse_ids),
+            InventoryBalance.on_hand_qty > 0,
+        )
+    ).all():
+        occupied.setdefault(location_id, set()).add((product_id, batch_id))
+
+    # Per warehouse: SKU -> locations holding it, and free locations (sorted by distance)
+    by_sku: dict[uuid.UUID, dict[tuple, list[SlotLocation]]] = {}
+    free: dict[uuid.UUID, list[SlotLocation]] = {}
+    for wid, ws in slots.items():
+        by_sku[wid] = {}
+        free[wid] = []
+        for loc in ws.locations:
+            skus = occupied.get(loc.id)
+            if not skus:
+                free[wid].append(loc)
+            for sku in skus or ():
+                by_sku[wid].setdefault(sku, []).append(loc)
+
+    out: list[SlotSuggestion | None] = []
+    for r in requests:
+        ws = slots[r.warehouse_id]
+        target = 1.0 - ws.velocity.get(r.product_id, 0.0)
+        sku = (r.product_id, r.batch_id)
+
+        holding = by_sku[r.warehouse_id].get(sku, [])
+        i = _nearest(holding, target)
+        if i is not None:
+            loc, reason, base = holding[i], "CONSOLIDATE", W_CONSOLIDATE
+        else:
+            i = _nearest(free[r.warehouse_id], target)
+            if i is not None:
+                loc, reason, base = free[r.warehouse_id].pop(i), "EMPTY", 0.0
+                bisect.insort(by_sku[r.warehouse_id].setdefault(sku, []), loc, key=_order)
+                occupied[loc.id] = {sku}
+            else:
+                # Every location holds stock: share the one with the best score
+                loc = max(
+                    ws.locations,
+                    key=lambda s: -W_SHARED_SKU * len(occupied.get(s.id, ())) - W_DISTANCE * abs(s.distance - target),
+                    default=None,
+                )
+                if loc is None:
+                    out.append(None)
+                    continue
+                reason, base = "SHARED", -W_SHARED_SKU * len(occupied.get(loc.id, ()))
+                occupied.setdefault(loc.id, set()).add(sku)
+                bisect.insort(by_sku[r.warehouse_id].setdefault(sku, []), loc, key=_order)
+        out.append(
+            SlotSuggestion(
+                location_id=loc.id,
+                location_code=loc.code,
+                reason=reason,
+                score=round(base - W_DISTANCE * abs(loc.distance - target), 3),
+            )
+        )
+    return out
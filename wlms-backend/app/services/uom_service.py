@@ -1,9 +1,10 @@
 from fastapi import HTTPException, status
 
 from app.models.product import Product
+from app.services.product_cache import CachedProduct
 
 
-def qty_to_pieces(*, product: Product, qty: int, uom: str) -> int:
+def qty_to_pieces(*, product: Product | CachedProduct, qty: int, uom: str) -> int:
     """
     v1 policy: store all inventory quantities internally as integer "pieces".
     Supports converting carton/pallet to pieces when product has conversion factors.
@@ -0,0 +1,6 @@
+"""
+Performance benchmarks (not collected by pytest).
+
+Run from wlms-backend/, e.g. `python -m benchmarks.bench_reservation_concurrency`.
+DB-backed benchmarks DROP and recreate all tables: point BENCH_DATABASE_URL at a scratch database.
+"""
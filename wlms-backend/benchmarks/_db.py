@@ -0,0 +1,93 @@
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.main  # noqa: F401  (imports every model so Base.metadata is complete)
+from app.models.base import Base
+from app.models.client import Client
+from app.models.inventory import InventoryBalance
+from app.models.location import Location
+from app.models.product import Product
+from app.models.tenant import Tenant
+from app.models.warehouse import Warehouse
+from app.models.warehouse_zone import WarehouseZone
+from app.services.availability_service import rebuild_availability
+
+
+def bench_engine(*, pool_size: int = 20) -> Engine:
+    url = os.getenv("BENCH_DATABASE_URL") or os.getenv("TEST_DATABASE_URL")
+    if not url:
+        sys.exit("Set BENCH_DATABASE_URL (scratch Postgres database; all tables are dropped).")
+    eng = create_engine(url, pool_size=pool_size, max_overflow=pool_size)
+    Base.metadata.drop_all(eng)
+    Base.metadata.create_all(eng)
+    return eng
+
+
+def bench_sessionmaker(eng: Engine) -> sessionmaker[Session]:
+    return sessionmaker(bind=eng, autoflush=False, autocommit=False, expire_on_commit=False)
+
+
+def seed_warehouse(db: Session, *, locations: int, zone_type: str = "STORAGE") -> dict:
+    """Tenant + client + warehouse with `locations` locations in one zone. Returns ids."""
+    t = Tenant(name=f"bench-{uuid.uuid4().hex[:6]}")
+    db.add(t)
+    db.flush()
+    c = Client(tenant_id=t.id, name="Bench client", billing_currency="EUR", preferred_language="en")
+    w = Warehouse(tenant_id=t.id, name="Bench WH")
+    db.add_all([c, w])
+    db.flush()
+    z = WarehouseZone(warehouse_id=w.id, name=zone_type, zone_type=zone_type)
+    db.add(z)
+    db.flush()
+    locs = []
+    for i in range(locations):
+        code = f"A{i // 40 + 1:02d}-{i % 40 + 1:02d}-01"
+        loc = Location(
+            warehouse_id=w.id,
+            zone_id=z.id,
+            code=code,
+            barcode_value=code,
+            aisle=str(i // 40 + 1),
+            rack=str(i % 40 + 1),
+            level="1",
+            bin="1",
+        )
+        db.add(loc)
+        locs.append(loc)
+    db.flush()
+    return {
+        "tenant_id": t.id,
+        "client_id": c.id,
+        "warehouse_id": w.id,
+        "zone_id": z.id,
+        "location_ids": [loc.id for loc in locs],
+    }
+
+
+def seed_product_stock(db: Session, ctx: dict, *, sku: str, qty_per_location: int, location_ids=None) -> uuid.UUID:
+    p = Product(tenant_id=ctx["tenant_id"], client_id=ctx["client_id"], sku=sku, name=sku, barcode=f"BC-{sku}")
+    db.add(p)
+    db.flush()
+    for lid in location_ids if location_ids is not None else ctx["location_ids"]:
+        db.add(
+            InventoryBalance(
+                tenant_id=ctx["tenant_id"],
+                client_id=ctx["client_id"],
+                warehouse_id=ctx["warehouse_id"],
+                product_id=p.id,
+                batch_id=None,
+                location_id=lid,
+                on_hand_qty=qty_per_location,
+                reserved_qty=0,
+                available_qty=qty_per_location,
+            )
+        )
+    db.flush()
+    # Balances were written directly: bring the availability summary in line.
+    rebuild_availability(db, tenant_id=ctx["tenant_id"])
+    return p.id
@@ -0,0 +1,68 @@
+"""
+FEFO allocation: SQL candidate scan vs. the in-process FEFO index.
+
+One product is stocked across many locations; single-line orders are approved (locking mode) with
+settings.fefo_index_enabled off and on. For each worker count we report approvals/s, SQL statements
+per approval and "lost" reserved units (must stay 0 in both modes).
+
+    BENCH_DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_fefo_allocation
+"""
+
+import argparse
+import threading
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.services import fefo_index
+from benchmarks._db import bench_engine, bench_sessionmaker, seed_product_stock, seed_warehouse
+from benchmarks.bench_reservation_concurrency import _reset, _run
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--orders", type=int, default=1000)
+    ap.add_argument("--locations", type=int, default=500)
+    ap.add_argument("--qty", type=int, default=1)
+    ap.add_argument("--workers", default="1,4,8")
+    args = ap.parse_args()
+    workers = [int(w) for w in args.workers.split(",")]
+
+    eng = bench_engine(pool_size=max(workers) + 2)
+    statements = {"n": 0}
+    lock = threading.Lock()
+
+    @event.listens_for(eng, "before_cursor_execute")
+    def _count(*_args) -> None:
+        with lock:
+            statements["n"] += 1
+
+    SessionLocal = bench_sessionmaker(eng)
+    with SessionLocal() as db:
+        ctx = seed_warehouse(db, locations=args.locations)
+        per_loc = (args.orders * args.qty) // args.locations + 1
+        product_id = seed_product_stock(db, ctx, sku="FEFO-SKU", qty_per_location=per_loc)
+        db.commit()
+
+    print(f"{'path':<8}{'N':>4}{'orders':>8}{'secs':>8}{'appr/s':>9}{'stmts/appr':>12}{'409s':>6}{'lost':>6}")
+    enabled = settings.fefo_index_enabled
+    try:
+        for use_index in (False, True):
+            settings.fefo_index_enabled = use_index
+            for n in workers:
+                order_ids = _reset(SessionLocal, ctx, product_id, orders=args.orders)
+                fefo_index.clear()  # _reset rewrote balances behind the index
+                statements["n"] = 0
+                r = _run(SessionLocal, ctx, product_id, order_ids, workers=n, qty=args.qty, locking=True)
+                per_appr = statements["n"] / r["ok"] if r["ok"] else 0.0
+                path = "index" if use_index else "sql"
+                print(
+                    f"{path:<8}{n:>4}{r['ok']:>8}{r['seconds']:>8.2f}{r['per_sec']:>9.1f}"
+                    f"{per_appr:>12.1f}{r['errors']:>6}{r['lost_units']:>6}"
+                )
+    finally:
+        settings.fefo_index_enabled = enabled
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Bulk outbound import: orders/s for marketplace-sized NDJSON batches.
+
+A client with --skus stocked products imports --orders generated orders (1-4 lines each). We report
+parse and import+commit time, orders/s and SQL statements for the whole batch (constant in the
+number of orders).
+
+    BENCH_DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_outbound_import --orders 10000
+"""
+
+import argparse
+import io
+import json
+import random
+import time
+
+from sqlalchemy import event
+
+from app.services.outbound_import_service import import_orders, parse_orders_ndjson
+from benchmarks._db import bench_engine, bench_sessionmaker, seed_product_stock, seed_warehouse
+
+
+def _ndjson(rng: random.Random, *, orders: int, skus: list[str]) -> bytes:
+    out = io.StringIO()
+    for i in range(orders):
+        lines = [{"sku": sku, "qty": rng.randint(1, 3)} for sku in rng.sample(skus, rng.randint(1, min(4, len(skus))))]
+        order = {
+            "order_ref": f"MP-{i:07d}",
+            "destination": {"name": f"Customer {i}", "address": f"Street {i}, City"},
+            "lines": lines,
+        }
+        out.write(json.dumps(order) + "\n")
+    return out.getvalue().encode()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--orders", type=int, default=10000)
+    ap.add_argument("--skus", type=int, default=200)
+    ap.add_argument("--locations", type=int, default=20)
+    args = ap.parse_args()
+    rng = random.Random(42)
+
+    eng = bench_engine(pool_size=2)
+    statements = {"n": 0}
+
+    @event.listens_for(eng, "before_cursor_execute")
+    def _count(*_args) -> None:
+        statements["n"] += 1
+
+    SessionLocal = bench_sessionmaker(eng)
+    with SessionLocal() as db:
+        ctx = seed_warehouse(db, locations=args.locations)
+        skus = [f"SKU-{i:05d}" for i in range(args.skus)]
+        # Enough stock for every order: at most 4 lines x 3 pieces each
+        per_loc = args.orders * 12 // (args.skus * args.locations) + 12
+        for sku in skus:
+            seed_product_stock(db, ctx, sku=sku, qty_per_location=per_loc)
+        db.commit()
+
+    payload = _ndjson(rng, orders=args.orders, skus=skus)
+    with SessionLocal() as db:
+        t0 = time.perf_counter()
+        orders = parse_orders_ndjson(io.BytesIO(payload))
+        t1 = time.perf_counter()
+        statements["n"] = 0
+        results = import_orders(
+            db,
+            tenant_id=ctx["tenant_id"],
+            client_id=ctx["client_id"],
+            warehouse_id=ctx["warehouse_id"],
+            orders=orders,
+            order_status="SUBMITTED",
+            created_by_user_id=None,
+        )
+        db.commit()
+        t2 = time.perf_counter()
+
+    created = sum(1 for r in results if r.status == "CREATED")
+    print(f"{'orders':>8}{'created':>9}{'parse s':>9}{'import s':>10}{'orders/s':>10}{'stmts':>7}")
+    print(
+        f"{len(orders):>8}{created:>9}{t1 - t0:>9.2f}{t2 - t1:>10.2f}"
+        f"{len(orders) / (t2 - t0):>10.0f}{statements['n']:>7}"
+    )
+
+
+if __name__ == "__main__":
+    main()
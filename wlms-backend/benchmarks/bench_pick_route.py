@@ -0,0 +1,65 @@
+"""
+Pick path routing: walking distance and compute time per wave size.
+
+Random waves over a synthetic aisle/rack grid (no database needed). For each wave size we report
+route length (m) for the legacy location-code order, the S-shape route and S-shape + 2-opt, and
+the time spent planning the optimized route.
+
+    python -m benchmarks.bench_pick_route --lines 100,500,1000
+"""
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+
+from app.services.pick_route_service import plan_route, route_length
+
+
+def _wave(rng: random.Random, *, lines: int, aisles: int, racks: int, levels: int) -> list[SimpleNamespace]:
+    # A wave's lines collapse to distinct locations before routing, as in generate_picks.
+    seen: dict[tuple[int, int, int], SimpleNamespace] = {}
+    while len(seen) < min(lines, aisles * racks * levels):
+        a, r, lv = rng.randint(1, aisles), rng.randint(1, racks), rng.randint(1, levels)
+        seen.setdefault(
+            (a, r, lv),
+            SimpleNamespace(
+                id=uuid.uuid4(), aisle=str(a), rack=f"{r:02d}", level=str(lv), bin="1", code=f"A{a:02d}-{r:02d}-{lv:02d}"
+            ),
+        )
+    return list(seen.values())
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", default="100,500,1000")
+    ap.add_argument("--aisles", type=int, default=40)
+    ap.add_argument("--racks", type=int, default=60)
+    ap.add_argument("--levels", type=int, default=4)
+    ap.add_argument("--waves", type=int, default=5)
+    ap.add_argument("--budget-ms", type=int, default=200)
+    args = ap.parse_args()
+    rng = random.Random(42)
+
+    print(f"{'lines':>6}{'code m':>10}{'s-shape m':>11}{'2-opt m':>10}{'saved':>8}{'plan ms':>9}")
+    for n in (int(x) for x in args.lines.split(",")):
+        code_m, s_m, opt_m, ms = [], [], [], []
+        for _ in range(args.waves):
+            locs = _wave(rng, lines=n, aisles=args.aisles, racks=args.racks, levels=args.levels)
+            code_m.append(route_length(sorted(locs, key=lambda loc: loc.code)))
+            s_m.append(route_length(plan_route(locs, optimize=False)))
+            t0 = time.perf_counter()
+            route = plan_route(locs, optimize=True, time_budget_ms=args.budget_ms)
+            ms.append((time.perf_counter() - t0) * 1000)
+            opt_m.append(route_length(route))
+        code, opt = statistics.mean(code_m), statistics.mean(opt_m)
+        print(
+            f"{n:>6}{code:>10.0f}{statistics.mean(s_m):>11.0f}{opt:>10.0f}"
+            f"{(1 - opt / code) * 100:>7.1f}%{statistics.mean(ms):>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Concurrent approvals against one hot SKU.
+
+N worker threads (each with its own session/connection) approve single-line orders for the same
+product. For each N we report approvals/s, retries, business errors (409s) and "lost" reserved
+units (sum of balance.reserved_qty vs. sum of reservation rows), for both reservation modes.
+
+    BENCH_DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_reservation_concurrency
+"""
+
+import argparse
+import queue
+import threading
+import time
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select, update
+
+from app.db.retry import run_with_retry
+from app.models.inventory import InventoryBalance
+from app.models.inventory_reservation import InventoryReservation
+from app.models.outbound import OutboundOrder
+from app.services.reservation_service import reserve_for_outbound_line
+from benchmarks._db import bench_engine, bench_sessionmaker, seed_product_stock, seed_warehouse
+
+
+def _reset(SessionLocal, ctx: dict, product_id: uuid.UUID, *, orders: int) -> list[uuid.UUID]:
+    with SessionLocal() as db:
+        db.execute(delete(InventoryReservation))
+        db.execute(delete(OutboundOrder))
+        db.execute(
+            update(InventoryBalance)
+            .where(InventoryBalance.product_id == product_id)
+            .values(reserved_qty=0, available_qty=InventoryBalance.on_hand_qty)
+        )
+        ids = []
+        for i in range(orders):
+            o = OutboundOrder(
+                id=uuid.uuid4(),
+                tenant_id=ctx["tenant_id"],
+                client_id=ctx["client_id"],
+                warehouse_id=ctx["warehouse_id"],
+                order_number=f"BENCH-{i}",
+                status="SUBMITTED",
+                destination_json={},
+                packing_json={},
+            )
+            db.add(o)
+            ids.append(o.id)
+        db.commit()
+        return ids
+
+
+def _run(SessionLocal, ctx: dict, product_id: uuid.UUID, order_ids, *, workers: int, qty: int, locking: bool) -> dict:
+    work: queue.Queue = queue.Queue()
+    for oid in order_ids:
+        work.put(oid)
+    stats = {"ok": 0, "errors": 0, "attempts": 0}
+    lock = threading.Lock()
+
+    def worker() -> None:
+        db = SessionLocal()
+        try:
+            while True:
+                try:
+                    oid = work.get_nowait()
+                except queue.Empty:
+                    return
+
+                def unit(oid=oid) -> None:
+                    with lock:
+                        stats["attempts"] += 1
+                    reserve_for_outbound_line(
+                        db,
+                        tenant_id=ctx["tenant_id"],
+                        outbound_id=oid,
+                        client_id=ctx["client_id"],
+                        warehouse_id=ctx["warehouse_id"],
+                        product_id=product_id,
+                        qty=qty,
+                        locking=locking,
+                    )
+                    db.commit()
+
+                try:
+                    run_with_retry(db, unit)
+                    with lock:
+                        stats["ok"] += 1
+                except HTTPException:
+                    db.rollback()
+                    with lock:
+                        stats["errors"] += 1
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    with SessionLocal() as db:
+        bal_reserved = db.scalar(
+            select(func.coalesce(func.sum(InventoryBalance.reserved_qty), 0)).where(
+                InventoryBalance.product_id == product_id
+            )
+        )
+        res_reserved = db.scalar(select(func.coalesce(func.sum(InventoryReservation.qty_reserved), 0)))
+    return {
+        "seconds": elapsed,
+        "per_sec": stats["ok"] / elapsed if elapsed else 0.0,
+        "ok": stats["ok"],
+        "errors": stats["errors"],
+        "retries": stats["attempts"] - stats["ok"] - stats["errors"],
+        "lost_units": int(res_reserved) - int(bal_reserved),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--orders", type=int, default=400)
+    ap.add_argument("--locations", type=int, default=20)
+    ap.add_argument("--qty", type=int, default=1)
+    ap.add_argument("--workers", default="1,2,4,8,16")
+    args = ap.parse_args()
+    workers = [int(w) for w in args.workers.split(",")]
+
+    eng = bench_engine(pool_size=max(workers) + 2)
+    SessionLocal = bench_sessionmaker(eng)
+    with SessionLocal() as db:
+        ctx = seed_warehouse(db, locations=args.locations)
+        # Enough stock for every order, spread so that contention is on a handful of rows.
+        per_loc = (args.orders * args.qty) // args.locations + 1
+        product_id = seed_product_stock(db, ctx, sku="HOT-SKU", qty_per_location=per_loc)
+        db.commit()
+
+    print(f"{'mode':<10}{'N':>4}{'orders':>8}{'secs':>8}{'appr/s':>9}{'retries':>9}{'409s':>6}{'lost':>6}")
+    for locking in (False, True):
+        for n in workers:
+            order_ids = _reset(SessionLocal, ctx, product_id, orders=args.orders)
+            r = _run(SessionLocal, ctx, product_id, order_ids, workers=n, qty=args.qty, locking=locking)
+            mode = "locking" if locking else "optimistic"
+            print(
+                f"{mode:<10}{n:>4}{r['ok']:>8}{r['seconds']:>8.2f}{r['per_sec']:>9.1f}"
+                f"{r['retries']:>9}{r['errors']:>6}{r['lost_units']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
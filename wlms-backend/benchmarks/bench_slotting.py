@@ -0,0 +1,54 @@
+"""
+Put-away slotting: suggestion latency for a batch of staging balances.
+
+A STORAGE area with some stocked locations is seeded; we then time suggest_locations for N requests
+with a cold cache (candidates + velocity loaded) and a warm one (occupancy query only).
+
+    BENCH_DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_slotting --requests 100,500
+"""
+
+import argparse
+import time
+import uuid
+
+from app.services import slotting_service
+from app.services.slotting_service import SlotRequest, suggest_locations
+from benchmarks._db import bench_engine, bench_sessionmaker, seed_product_stock, seed_warehouse
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--locations", type=int, default=2000)
+    ap.add_argument("--stocked", type=int, default=500)
+    ap.add_argument("--requests", default="100,500")
+    args = ap.parse_args()
+
+    SessionLocal = bench_sessionmaker(bench_engine(pool_size=2))
+    with SessionLocal() as db:
+        ctx = seed_warehouse(db, locations=args.locations)
+        product_ids = [
+            seed_product_stock(db, ctx, sku=f"SLOT-{i}", qty_per_location=5, location_ids=[lid])
+            for i, lid in enumerate(ctx["location_ids"][: args.stocked])
+        ]
+        db.commit()
+
+        print(f"{'requests':>9}{'cold ms':>10}{'warm ms':>10}{'consolidated':>14}")
+        for n in (int(x) for x in args.requests.split(",")):
+            # Half the requests match stocked SKUs, half are new products
+            requests = [
+                SlotRequest(ctx["warehouse_id"], product_ids[i % len(product_ids)] if i % 2 else uuid.uuid4(), None)
+                for i in range(n)
+            ]
+            slotting_service.invalidate()
+            t0 = time.perf_counter()
+            suggest_locations(db, tenant_id=ctx["tenant_id"], requests=requests)
+            cold = (time.perf_counter() - t0) * 1000
+            t0 = time.perf_counter()
+            out = suggest_locations(db, tenant_id=ctx["tenant_id"], requests=requests)
+            warm = (time.perf_counter() - t0) * 1000
+            consolidated = sum(1 for s in out if s is not None and s.reason == "CONSOLIDATE")
+            print(f"{n:>9}{cold:>10.1f}{warm:>10.1f}{consolidated:>14}")
+
+
+if __name__ == "__main__":
+    main()
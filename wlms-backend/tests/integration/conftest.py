@@ -18,10 +18,14 @@ from app.models.discrepancy import DiscrepancyReport  # noqa: F401
 from app.models.file import File  # noqa: F401
 from app.models.inbound import InboundLine, InboundShipment  # noqa: F401
 from app.models.inventory import InventoryBalance, InventoryLedger  # noqa: F401
+from app.models.inventory_availability import InventoryAvailability  # noqa: F401
+from app.models.inventory_checkpoint import InventoryCheckpoint, InventoryCheckpointLine  # noqa: F401
 from app.models.inventory_reservation import InventoryReservation  # noqa: F401
+from app.models.license_plate import LicensePlate, LicensePlateItem, LicensePlateMove  # noqa: F401
 from app.models.location import Location  # noqa: F401
+from app.models.location_occupancy import LocationOccupancy  # noqa: F401
 from app.models.outbound import OutboundLine, OutboundOrder  # noqa: F401
-from app.models.picking import PickingTask, PickingTaskLine  # noqa: F401
+from app.models.picking import PickingScan, PickingTask, PickingTaskLine, PickingTaskOrder  # noqa: F401
 from app.models.product import Product  # noqa: F401
 from app.models.product_batch import ProductBatch  # noqa: F401
 from app.models.return_ import Return, ReturnLine  # noqa: F401
@@ -2,6 +2,7 @@ import uuid
 from datetime import date, timedelta
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 from app.core.security import create_access_token, hash_password
 from app.models.client import Client
@@ -153,18 +154,30 @@ def test_outbound_pick_pack_dispatch_invoice(client: TestClient, db):
     assert res.status_code == 200, res.text
     line = res.json()[0]
 
-    res = client.post(
-        f"/api/v1/picking/tasks/{task_id}/scan",
-        headers=_auth_headers(user=worker),
-        json={
-            "product_id": line["product_id"],
-            "batch_id": None,
-            "qty": 2,
-            "from_location_id": line["from_location_id"],
-            "to_location_id": str(loc_packing.id),
-        },
-    )
+    statements: list[str] = []
+
+    def _count(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", _count)
+    try:
+        res = client.post(
+            f"/api/v1/picking/tasks/{task_id}/scan",
+            headers=_auth_headers(user=worker),
+            json={
+                "product_id": line["product_id"],
+                "batch_id": None,
+                "qty": 2,
+                "from_location_id": line["from_location_id"],
+                "to_location_id": str(loc_packing.id),
+            },
+        )
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", _count)
     assert res.status_code == 200, res.text
+    # Scan hot path: locking read, balances, ledger, availability, outbound line, task line, reservation, audit
+    # (plus the auth user lookup).
+    assert len([s for s in statements if "FROM users" not in s]) == 8, statements
     res = client.post(f"/api/v1/picking/tasks/{task_id}/complete", headers=_auth_headers(user=worker))
     assert res.status_code == 200, res.text
 
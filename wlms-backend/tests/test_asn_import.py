@@ -0,0 +1,120 @@
+import io
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class before models are built)
+from app.services.asn_service import AsnLine, import_asn, inbound_variance, parse_asn_csv, parse_asn_json
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class AsnFakeSession:
+    """Serves SKU -> product id rows, imported ASN references and variance rows; records every statement."""
+
+    def __init__(self, *, products=None, imported=(), variance=()):
+        self.products = products or {}
+        self.imported = imported
+        self.variance = variance
+        self.statements = []
+        self.inserts = []
+
+    def scalars(self, stmt, execution_options=None):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Rows(self.imported)
+
+    def execute(self, stmt, params=None, execution_options=None):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        if params is not None:
+            self.inserts.append((stmt.table.name, params))
+            return _Rows([])
+        if sql.startswith("SELECT products.sku"):
+            return _Rows(self.products.items())
+        return _Rows(self.variance)
+
+
+def test_csv_and_json_parsing_report_bad_rows():
+    errors: list[dict] = []
+    csv_bytes = (
+        "\ufeffasn_reference,sku,expected_qty,supplier\n"
+        "ASN-1,A,10,Acme\n"
+        ",A,1,\n"
+        "ASN-1,B,zero,\n"
+        "ASN-2,B,3,\n"
+    ).encode()
+    lines = list(parse_asn_csv(io.BytesIO(csv_bytes), errors))
+    assert lines == [
+        AsnLine(row=2, asn_reference="ASN-1", sku="A", expected_qty=10, supplier="Acme"),
+        AsnLine(row=5, asn_reference="ASN-2", sku="B", expected_qty=3, supplier=None),
+    ]
+    assert [(e["row"], e["field"]) for e in errors] == [(3, "asn_reference"), (4, "expected_qty")]
+
+    errors = []
+    doc = [{"asn_reference": "ASN-9", "supplier": "Acme", "lines": [{"sku": "A", "expected_qty": 4}, {"sku": ""}]}]
+    lines = list(parse_asn_json(io.BytesIO(json.dumps(doc).encode()), errors))
+    assert lines == [AsnLine(row=1, asn_reference="ASN-9", sku="A", expected_qty=4, supplier="Acme")]
+    assert errors == [{"row": 2, "field": "sku", "message": "required"}]
+
+    with pytest.raises(HTTPException) as exc:
+        list(parse_asn_json(io.BytesIO(b'{"lines": []}'), []))
+    assert exc.value.status_code == 400
+
+
+def test_import_resolves_skus_once_and_inserts_in_bulk():
+    pa, pb = uuid.uuid4(), uuid.uuid4()
+    db = AsnFakeSession(products={"A": pa, "B": pb}, imported=["ASN-OLD"])
+    lines = [
+        AsnLine(row=2, asn_reference="ASN-1", sku="A", expected_qty=10, supplier="Acme"),
+        AsnLine(row=3, asn_reference="ASN-1", sku="B", expected_qty=5),
+        AsnLine(row=4, asn_reference="ASN-1", sku="A", expected_qty=2),
+        AsnLine(row=5, asn_reference="ASN-OLD", sku="A", expected_qty=1),
+        AsnLine(row=6, asn_reference="ASN-2", sku="NOPE", expected_qty=1),
+        AsnLine(row=7, asn_reference="ASN-3", sku="B", expected_qty=7),
+    ]
+
+    result = import_asn(
+        db,
+        tenant_id=1,
+        client_id=uuid.UUID(int=1),
+        warehouse_id=uuid.UUID(int=2),
+        lines=iter(lines),
+        errors=[],
+        created_by_user_id=None,
+    )
+
+    assert [ref for ref, _id in result.shipments] == ["ASN-1", "ASN-3"]
+    assert result.lines == 3
+    assert [(e["row"], e["field"]) for e in result.errors] == [(5, "asn_reference"), (6, "sku")]
+    # one SKU lookup, one imported-ASN lookup, one INSERT per table
+    assert len(db.statements) == 4
+    assert "products.sku IN (" in db.statements[0]
+    assert [table for table, _rows in db.inserts] == ["inbound_shipments", "inbound_lines"]
+    shipments, line_rows = db.inserts[0][1], db.inserts[1][1]
+    assert {s["asn_reference"]: s["supplier"] for s in shipments} == {"ASN-1": "Acme", "ASN-3": None}
+    assert {(r["product_id"], r["expected_qty"]) for r in line_rows if r["inbound_id"] == shipments[0]["id"]} == {
+        (pa, 12),
+        (pb, 5),
+    }
+
+
+def test_variance_is_classified_in_sql():
+    pid = uuid.uuid4()
+    db = AsnFakeSession(variance=[(pid, "A", "Widget", 10, 8, -2, "SHORT")])
+
+    lines = inbound_variance(db, inbound_id=uuid.uuid4(), discrepancies_only=True)
+
+    assert [(l.sku, l.variance, l.status) for l in lines] == [("A", -2, "SHORT")]
+    sql = db.statements[0]
+    assert "CASE WHEN (count(inbound_lines.expected_qty) = " in sql
+    assert "GROUP BY inbound_lines.product_id" in sql
+    assert "HAVING coalesce(sum(inbound_lines.received_qty)" in sql
@@ -0,0 +1,75 @@
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.availability_service import AvailabilityDelta, apply_availability_deltas
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _delta(**kw) -> AvailabilityDelta:
+    base = dict(
+        tenant_id=1,
+        client_id=uuid.UUID(int=1),
+        warehouse_id=uuid.UUID(int=2),
+        product_id=uuid.uuid4(),
+        location_id=uuid.uuid4(),
+    )
+    return AvailabilityDelta(**{**base, **kw})
+
+
+def test_summary_upsert_is_one_statement_split_by_zone():
+    db = FakeSession()
+
+    apply_availability_deltas(db, [_delta(on_hand=5), _delta(reserved=2), _delta(on_hand=-1)])
+
+    assert len(db.statements) == 1
+    sql = str(db.statements[0])
+    assert "\n INSERT INTO inventory_availability" in sql
+    assert "JOIN warehouse_zones ON warehouse_zones.id = locations.zone_id" in sql
+    assert "ON CONFLICT (tenant_id, client_id, warehouse_id, product_id) DO UPDATE" in sql
+    # Deterministic lock order across concurrent multi-SKU transactions
+    assert "ORDER BY availability_deltas.tenant_id" in sql
+
+
+def test_occupancy_rides_along_and_nets_per_location():
+    db = FakeSession()
+    shelf, staging = uuid.uuid4(), uuid.uuid4()
+
+    apply_availability_deltas(
+        db,
+        [
+            _delta(location_id=shelf, on_hand=5),
+            _delta(location_id=shelf, on_hand=-2),
+            _delta(location_id=staging, on_hand=3),
+            _delta(location_id=staging, on_hand=-3),
+            _delta(reserved=4),
+        ],
+    )
+
+    assert len(db.statements) == 1
+    compiled = db.statements[0]
+    sql = str(compiled)
+    assert sql.startswith("WITH occupancy_upsert AS \n(INSERT INTO location_occupancy")
+    assert "ON CONFLICT (location_id) DO UPDATE SET on_hand_qty = (location_occupancy.on_hand_qty + excluded.on_hand_qty)" in sql
+    # Only the net change per location is written; the staging move and the reservation cancel out
+    assert "(VALUES (%(param_1)s::UUID, %(param_2)s, %(param_3)s)) AS occupancy_deltas" in sql
+    assert [compiled.params[f"param_{i}"] for i in (1, 2, 3)] == [shelf, 1, 3]
+
+
+def test_reservation_only_deltas_skip_occupancy():
+    db = FakeSession()
+    apply_availability_deltas(db, [_delta(reserved=2)])
+    assert "location_occupancy" not in str(db.statements[0])
+
+
+def test_summary_skips_noop_deltas():
+    db = FakeSession()
+    apply_availability_deltas(db, [_delta(on_hand=0, reserved=0)])
+    assert db.statements == []
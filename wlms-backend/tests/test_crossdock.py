@@ -0,0 +1,192 @@
+import itertools
+import uuid
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class before models are built)
+from app.models.picking import PickingTask, PickingTaskOrder
+from app.services.crossdock_service import crossdock_inbound
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class CrossDockFakeSession:
+    """Serves staging balances, orders, lines and the pick task's reservation rows; records every statement."""
+
+    def __init__(self, *, balances=(), orders=(), lines=(), pick_rows=()):
+        self.balances = balances
+        self.orders = orders
+        self.lines = lines
+        self.pick_rows = pick_rows
+        self.statements = []
+        self.added = []
+
+    def _sql(self, stmt):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        return sql
+
+    def execute(self, stmt, execution_options=None):
+        sql = self._sql(stmt)
+        rows = self.pick_rows if sql.startswith("SELECT inventory_reservations") else []
+        return SimpleNamespace(all=lambda: list(rows), rowcount=len(self.balances))
+
+    def scalars(self, stmt, execution_options=None):
+        sql = self._sql(stmt)
+        if sql.startswith("SELECT inventory_balances"):
+            return _Rows(self.balances)
+        if sql.startswith("SELECT outbound_orders"):
+            return _Rows(self.orders)
+        if sql.startswith("SELECT outbound_lines"):
+            return _Rows(self.lines)
+        return _Rows([])
+
+    def expire(self, obj, attrs=None):
+        return None
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def add_all(self, objs):
+        self.added.extend(objs)
+
+    def flush(self):
+        for obj in self.added:
+            if isinstance(obj, PickingTask) and obj.id is None:
+                obj.id = uuid.uuid4()
+
+
+_ids = itertools.count(1)
+CLIENT, WAREHOUSE = uuid.UUID(int=1), uuid.UUID(int=2)
+
+
+def _inbound():
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        tenant_id=1,
+        client_id=CLIENT,
+        warehouse_id=WAREHOUSE,
+        created_at=datetime(2026, 2, 15, 8, 0, tzinfo=timezone.utc),
+    )
+
+
+def _staging_bal(product_id, qty):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        client_id=CLIENT,
+        warehouse_id=WAREHOUSE,
+        product_id=product_id,
+        batch_id=None,
+        location_id=uuid.uuid4(),
+        on_hand_qty=qty,
+        reserved_qty=0,
+        available_qty=qty,
+    )
+
+
+def _order(ship):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        tenant_id=1,
+        client_id=CLIENT,
+        warehouse_id=WAREHOUSE,
+        status="SUBMITTED",
+        requested_ship_date=ship,
+        created_at=datetime(2026, 2, 1, tzinfo=timezone.utc),
+    )
+
+
+def _line(order, product_id, qty, reserved=0):
+    return SimpleNamespace(
+        id=next(_ids), outbound_id=order.id, product_id=product_id, requested_qty=qty, reserved_qty=reserved
+    )
+
+
+def test_receipt_is_reserved_for_waiting_orders_and_picked_from_staging():
+    p, other = uuid.uuid4(), uuid.uuid4()
+    bal = _staging_bal(p, 5)
+    early, late = _order(date(2026, 2, 16)), _order(date(2026, 2, 20))
+    # `early` already has `other` reserved in storage; the receipt completes it. `late` is a backorder.
+    lines = [_line(early, p, 4), _line(early, other, 2, reserved=2), _line(late, p, 3)]
+    dock = SimpleNamespace(id=bal.location_id, code="DOCK-1", aisle=None, rack=None, level=None, bin=None)
+    res = SimpleNamespace(
+        outbound_id=early.id, product_id=p, batch_id=None, location_id=dock.id, qty_reserved=4
+    )
+    db = CrossDockFakeSession(balances=[bal], orders=[early, late], lines=lines, pick_rows=[(res, dock)])
+
+    result = crossdock_inbound(db, inbound=_inbound(), can_approve=True)
+
+    assert result.orders == [early.id, late.id]
+    assert result.completed == [early.id]
+    assert result.units == 5
+    task = next(a for a in db.added if isinstance(a, PickingTask))
+    assert result.picking_task_id == task.id and task.outbound_id == early.id
+    assert [a.tote_code for a in db.added if isinstance(a, PickingTaskOrder)] == [None]
+    assert (early.status, late.status) == ("PICKING", "SUBMITTED")
+
+    stock_sql, orders_sql = db.statements[0], db.statements[1]
+    assert "EXISTS (SELECT inventory_ledger.id" in stock_sql
+    assert "inventory_ledger.batch_id IS NOT DISTINCT FROM inventory_balances.batch_id" in stock_sql
+    assert "inventory_ledger.created_at >= " in stock_sql
+    assert stock_sql.rstrip().endswith("FOR UPDATE OF inventory_balances")
+    assert "outbound_lines.requested_qty > outbound_lines.reserved_qty" in orders_sql
+    assert orders_sql.rstrip().endswith("FOR UPDATE SKIP LOCKED")
+    # stock, orders, lines, balances, summary, reservations, line reserved_qty, order status, pick rows,
+    # reservation expiry
+    assert len(db.statements) == 10
+    assert db.statements[3].startswith("UPDATE inventory_balances")
+
+
+def test_staff_without_approval_rights_only_reserve_the_receipt():
+    p = uuid.uuid4()
+    bal = _staging_bal(p, 5)
+    order = _order(date(2026, 2, 16))
+    db = CrossDockFakeSession(balances=[bal], orders=[order], lines=[_line(order, p, 4)])
+
+    result = crossdock_inbound(db, inbound=_inbound(), can_approve=False)
+
+    assert result.completed == [order.id] and result.units == 4 and not result.approved
+    assert result.picking_task_id is None and db.added == []
+    assert order.status == "SUBMITTED"
+    assert not any(s.startswith("UPDATE outbound_orders") for s in db.statements)
+    assert any(s.startswith("INSERT INTO inventory_reservations") for s in db.statements)
+
+
+def test_nothing_received_or_nothing_waiting_is_a_no_op():
+    db = CrossDockFakeSession()
+    result = crossdock_inbound(db, inbound=_inbound(), can_approve=True)
+    assert (result.orders, result.units, result.picking_task_id) == ([], 0, None)
+    assert len(db.statements) == 1
+
+    db = CrossDockFakeSession(balances=[_staging_bal(uuid.uuid4(), 3)])
+    result = crossdock_inbound(db, inbound=_inbound(), can_approve=True)
+    assert result.orders == [] and len(db.statements) == 2
+    assert db.added == []
+
+
+def test_several_completed_orders_share_one_wave_task():
+    p = uuid.uuid4()
+    bal = _staging_bal(p, 5)
+    a, b = _order(date(2026, 2, 16)), _order(None)
+    dock = SimpleNamespace(id=bal.location_id, code="DOCK-1", aisle=None, rack=None, level=None, bin=None)
+    rows = [
+        (SimpleNamespace(outbound_id=o.id, product_id=p, batch_id=None, location_id=dock.id, qty_reserved=q), dock)
+        for o, q in ((a, 2), (b, 3))
+    ]
+    db = CrossDockFakeSession(balances=[bal], orders=[a, b], lines=[_line(a, p, 2), _line(b, p, 3)], pick_rows=rows)
+
+    result = crossdock_inbound(db, inbound=_inbound(), can_approve=True)
+
+    assert result.completed == [a.id, b.id]
+    assert [a.tote_code for a in db.added if isinstance(a, PickingTaskOrder)] == ["T01", "T02"]
+
+    db = CrossDockFakeSession(balances=[bal], orders=[a, b], lines=[_line(a, p, 2), _line(b, p, 3)])
+    assert crossdock_inbound(db, inbound=_inbound(), can_approve=True, create_tasks=False).picking_task_id is None
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.db.retry import run_with_retry
+
+
+class _PgError(Exception):
+    def __init__(self, sqlstate: str):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+class FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def _db_error(sqlstate: str) -> OperationalError:
+    return OperationalError("SELECT 1", {}, _PgError(sqlstate))
+
+
+def test_run_with_retry_replays_deadlocks_and_serialization_failures(monkeypatch):
+    monkeypatch.setattr("app.db.retry.time.sleep", lambda _s: None)
+    db = FakeSession()
+    errors = [_db_error("40P01"), _db_error("40001")]
+
+    done = []
+
+    def unit():
+        if errors:
+            raise errors.pop(0)
+        done.append(1)
+
+    run_with_retry(db, unit, attempts=3)
+    assert done == [1]
+    assert db.rollbacks == 2
+
+
+def test_run_with_retry_does_not_retry_other_errors():
+    db = FakeSession()
+    calls = []
+
+    def unit():
+        calls.append(1)
+        raise _db_error("23505")  # unique_violation
+
+    with pytest.raises(OperationalError):
+        run_with_retry(db, unit, attempts=3)
+    assert len(calls) == 1 and db.rollbacks == 0
+
+
+def test_run_with_retry_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr("app.db.retry.time.sleep", lambda _s: None)
+    db = FakeSession()
+
+    def unit():
+        raise _db_error("40P01")
+
+    with pytest.raises(OperationalError):
+        run_with_retry(db, unit, attempts=2)
+    assert db.rollbacks == 1
@@ -0,0 +1,108 @@
+import uuid
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class before models are built)
+from app.services import document_jobs
+from app.services.document_jobs import document_response, process_pending, queue_document
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class JobFakeSession:
+    """Hands out the given PENDING files to the claim query; records adds and commits."""
+
+    def __init__(self, pending=()):
+        self.pending = pending
+        self.added = []
+        self.claim_sql = None
+        self.commits = 0
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def flush(self):
+        return None
+
+    def scalars(self, stmt, execution_options=None):
+        self.claim_sql = str(stmt.compile(dialect=postgresql.dialect()))
+        return _Rows(self.pending)
+
+    def begin_nested(self):
+        return nullcontext()
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def built(monkeypatch):
+    calls = []
+    monkeypatch.setattr(document_jobs, "_render", lambda _db, f: calls.append(f.id) or b"%PDF")
+    monkeypatch.setattr(document_jobs, "save_bytes", lambda *, data, filename: (f"k_{filename}", len(data)))
+    return calls
+
+
+def _queue(db):
+    return queue_document(
+        db,
+        tenant_id=1,
+        client_id=uuid.UUID(int=1),
+        file_type="RECEIVING_PDF",
+        reference_id=uuid.UUID(int=5),
+        original_name="receiving_INB-1.pdf",
+        language="en",
+        created_by_user_id=None,
+    )
+
+
+def test_queue_renders_inline_only_without_the_worker(monkeypatch, built):
+    db = JobFakeSession()
+    f = _queue(db)
+    assert (f.status, f.storage_key, f.size_bytes) == ("READY", f"k_receiving_{uuid.UUID(int=5)}.pdf", 4)
+
+    monkeypatch.setattr(document_jobs.settings, "document_worker_enabled", True)
+    f = _queue(db)
+    assert (f.status, f.storage_key, f.reference_id) == ("PENDING", "", str(uuid.UUID(int=5)))
+    assert len(built) == 1 and db.added[-1] is f
+
+
+def test_worker_claims_with_skip_locked_and_retries_failures(monkeypatch):
+    ok = SimpleNamespace(id=1, file_type="RETURN_PDF", reference_id="r1", status="PENDING", attempts=0, error=None)
+    bad = SimpleNamespace(id=2, file_type="RETURN_PDF", reference_id="r2", status="PENDING", attempts=2, error=None)
+
+    def _render(_db, f):
+        if f is bad:
+            raise RuntimeError("storage down")
+        return b"%PDF"
+
+    monkeypatch.setattr(document_jobs, "_render", _render)
+    monkeypatch.setattr(document_jobs, "save_bytes", lambda *, data, filename: ("key", len(data)))
+    monkeypatch.setattr(document_jobs.settings, "document_worker_max_attempts", 3)
+    db = JobFakeSession([ok, bad])
+
+    assert process_pending(db, limit=10) == 2
+    assert "FOR UPDATE SKIP LOCKED" in db.claim_sql
+    assert (ok.status, ok.storage_key) == ("READY", "key")
+    assert (bad.status, bad.attempts, bad.error) == ("FAILED", 3, "storage down")
+    assert db.commits == 1
+
+
+def test_document_response_is_202_until_ready():
+    pending = SimpleNamespace(id=uuid.UUID(int=9), status="PENDING")
+    resp = document_response(pending)
+    assert resp.status_code == 202 and b'"PENDING"' in resp.body and "retry-after" in resp.headers
+
+    with pytest.raises(HTTPException) as exc:
+        document_response(SimpleNamespace(id=uuid.UUID(int=9), status="FAILED", error="storage down"))
+    assert (exc.value.status_code, exc.value.detail) == (409, "Document generation failed: storage down")
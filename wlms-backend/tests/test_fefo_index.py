@@ -0,0 +1,167 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services import fefo_index
+from app.services.fefo_index import FefoCandidate, FefoIndex
+from app.services.reservation_service import reserve_for_outbound_line
+
+KEY = (1, uuid.uuid4(), uuid.uuid4(), uuid.uuid4())
+
+
+def _cand(qty):
+    return FefoCandidate(balance_id=uuid.uuid4(), location_id=uuid.uuid4(), batch_id=None, available_qty=qty)
+
+
+def test_index_applies_committed_deltas_in_place():
+    idx = FefoIndex(ttl_seconds=60, max_keys=10)
+    c1, c2 = _cand(3), _cand(5)
+    assert idx.candidates(KEY, lambda: [c1, c2]) == [c1, c2]
+
+    idx.apply([(KEY, c1.balance_id, -3), (KEY, c2.balance_id, -1)])
+    cached = idx.candidates(KEY, lambda: pytest.fail("should be cached"))
+    assert [c.available_qty for c in cached] == [0, 4]
+
+    # Stock showing up on a balance the list does not know about drops the entry (FEFO rank unknown).
+    idx.apply([(KEY, uuid.uuid4(), 2)])
+    assert idx.candidates(KEY, lambda: [c2]) == [c2]
+
+
+def test_index_does_not_store_a_load_that_raced_with_a_commit():
+    idx = FefoIndex(ttl_seconds=60, max_keys=10)
+    c1 = _cand(3)
+
+    def load():
+        idx.apply([(KEY, c1.balance_id, -1)])  # committed while the load was running
+        return [c1]
+
+    idx.candidates(KEY, load)
+    assert idx.candidates(KEY, lambda: [_cand(7)])[0].available_qty == 7
+
+
+def test_index_evicts_least_recently_used_keys():
+    idx = FefoIndex(ttl_seconds=60, max_keys=1)
+    other = (1, uuid.uuid4(), uuid.uuid4(), uuid.uuid4())
+    idx.candidates(KEY, lambda: [_cand(1)])
+    idx.candidates(other, lambda: [_cand(1)])
+    reloaded = _cand(9)
+    assert idx.candidates(KEY, lambda: [reloaded]) == [reloaded]
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class IndexFakeSession:
+    """Serves the index load query from `candidate_rows` and the chosen-row lock from `balances`."""
+
+    def __init__(self, *, candidate_rows, balances, fallback_rows=()):
+        self.candidate_rows = candidate_rows
+        self.balances = balances
+        self.fallback_rows = fallback_rows
+        self.statements = []
+        self.info = {}
+
+    def _sql(self, stmt):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        return sql
+
+    def execute(self, stmt, execution_options=None):
+        sql = self._sql(stmt)
+        if "FOR UPDATE" in sql:
+            return _Rows(self.fallback_rows)
+        return _Rows(self.candidate_rows)
+
+    def scalars(self, stmt, execution_options=None):
+        self._sql(stmt)
+        return _Rows(self.balances)
+
+    def scalar(self, stmt):
+        return None
+
+    def add(self, obj):
+        return None
+
+    def flush(self):
+        return None
+
+
+def _bal(*, on_hand, product_id):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        product_id=product_id,
+        batch_id=None,
+        location_id=uuid.uuid4(),
+        on_hand_qty=on_hand,
+        reserved_qty=0,
+        available_qty=on_hand,
+    )
+
+
+def _row(bal):
+    return SimpleNamespace(id=bal.id, location_id=bal.location_id, batch_id=bal.batch_id, available_qty=bal.available_qty)
+
+
+@pytest.fixture
+def index_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "fefo_index_enabled", True)
+    fefo_index.clear()
+    yield
+    fefo_index.clear()
+
+
+def _reserve(db, *, product_id, qty, client_id, warehouse_id):
+    return reserve_for_outbound_line(
+        db,
+        tenant_id=1,
+        outbound_id=uuid.uuid4(),
+        client_id=client_id,
+        warehouse_id=warehouse_id,
+        product_id=product_id,
+        qty=qty,
+        locking=True,
+    )
+
+
+def test_indexed_reserve_locks_only_chosen_rows_and_caches_after_commit(index_enabled):
+    client_id, warehouse_id, product_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    b1, b2, b3 = (_bal(on_hand=q, product_id=product_id) for q in (3, 5, 8))
+    db = IndexFakeSession(candidate_rows=[_row(b1), _row(b2), _row(b3)], balances=[b1, b2])
+
+    created = _reserve(db, product_id=product_id, qty=4, client_id=client_id, warehouse_id=warehouse_id)
+
+    load, lock, upsert = db.statements
+    assert "FOR UPDATE" not in load
+    assert "WHERE inventory_balances.id IN" in lock and lock.endswith("FOR UPDATE")
+    assert upsert.startswith("INSERT INTO inventory_availability")
+    assert [r.qty_reserved for r in created] == [3, 1]
+
+    fefo_index._apply_after_commit(db)
+    db2 = IndexFakeSession(candidate_rows=[], balances=[b2])
+    _reserve(db2, product_id=product_id, qty=2, client_id=client_id, warehouse_id=warehouse_id)
+    assert len(db2.statements) == 2  # served from the index: lock + summary upsert
+    assert (b2.reserved_qty, b2.available_qty) == (3, 2)
+
+
+def test_indexed_reserve_falls_back_to_sql_when_cached_rows_are_stale(index_enabled):
+    client_id, warehouse_id, product_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    b1, b2 = _bal(on_hand=4, product_id=product_id), _bal(on_hand=6, product_id=product_id)
+    stale_row = _row(b1)
+    b1.reserved_qty, b1.available_qty = 4, 0  # reserved by another process since the index was loaded
+    db = IndexFakeSession(candidate_rows=[stale_row], balances=[b1], fallback_rows=[(b2, None, None)])
+
+    created = _reserve(db, product_id=product_id, qty=3, client_id=client_id, warehouse_id=warehouse_id)
+
+    assert "SKIP LOCKED" in db.statements[2]
+    assert [r.location_id for r in created] == [b2.location_id]
+    reloaded = _cand(1)
+    key = (1, client_id, warehouse_id, product_id)
+    assert fefo_index.candidates(db, key, lambda: [reloaded]) == [reloaded]
@@ -0,0 +1,170 @@
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class before models are built)
+from app.services.receiving_service import MAX_RECEIVE_BATCH, ReceiveScan, receive_scans
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class ReceiveFakeSession:
+    """Serves staging ids, products, batches and inbound lines by statement; records every statement."""
+
+    def __init__(self, *, staging=(), products=(), batches=(), lines=()):
+        self.staging = staging
+        self.products = products
+        self.batches = batches
+        self.lines = lines
+        self.statements = []
+
+    def _sql(self, stmt):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        return sql
+
+    def scalars(self, stmt, execution_options=None):
+        sql = self._sql(stmt)
+        if sql.startswith("SELECT locations.id"):
+            return _Rows(self.staging)
+        if sql.startswith("SELECT products"):
+            return _Rows(self.products)
+        return _Rows(self.batches)
+
+    def execute(self, stmt, execution_options=None):
+        sql = self._sql(stmt)
+        if sql.startswith("INSERT INTO product_batches"):
+            params = stmt.compile(dialect=postgresql.dialect()).params
+            n = sum(1 for k in params if k.startswith("product_id"))
+            rows = [
+                (uuid.uuid4(), params[f"product_id_m{i}"], params[f"batch_number_m{i}"], params[f"expiry_date_m{i}"])
+                for i in range(n)
+            ]
+            return _Rows(rows)
+        if sql.startswith("SELECT inbound_lines"):
+            return _Rows(self.lines)
+        if sql.startswith("INSERT INTO inbound_lines"):
+            params = stmt.compile(dialect=postgresql.dialect()).params
+            n = sum(1 for k in params if k.startswith("product_id"))
+            return _Rows([(100 + i, params[f"product_id_m{i}"], params[f"batch_id_m{i}"]) for i in range(n)])
+        return _Rows([])
+
+
+def _inbound(status="RECEIVING"):
+    return SimpleNamespace(
+        id=uuid.uuid4(), tenant_id=1, client_id=uuid.UUID(int=1), warehouse_id=uuid.UUID(int=2), status=status
+    )
+
+
+def _product(barcode, *, lot=False, expiry=False, carton_qty=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        tenant_id=1,
+        client_id=uuid.UUID(int=1),
+        sku=f"SKU-{barcode}",
+        name=barcode,
+        uom="piece",
+        barcode=barcode,
+        lot_tracking_enabled=lot,
+        expiry_tracking_enabled=expiry,
+        carton_qty=carton_qty,
+        pallet_qty=None,
+    )
+
+
+@pytest.fixture
+def ledger(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "app.services.receiving_service.apply_ledger_batch", lambda _db, *, entries: calls.append(list(entries))
+    )
+    return calls
+
+
+def test_batch_resolves_once_and_writes_set_based(ledger):
+    dock = uuid.uuid4()
+    plain, lot = _product("111", carton_qty=12), _product("222", lot=True, expiry=True)
+    existing_line = (7, plain.id, None)
+    db = ReceiveFakeSession(staging=[dock], products=[plain, lot], lines=[existing_line])
+    inbound = _inbound(status="DRAFT")
+    scans = [
+        ReceiveScan(barcode="111", qty=2, location_staging_id=dock, uom="carton"),
+        ReceiveScan(barcode="222", qty=5, location_staging_id=dock, batch_number="L1", expiry_date=date(2026, 9, 1)),
+        ReceiveScan(barcode="111", qty=3, location_staging_id=dock),
+        ReceiveScan(barcode="222", qty=1, location_staging_id=dock, batch_number="L1", expiry_date=date(2026, 9, 1)),
+    ]
+
+    results = receive_scans(db, inbound=inbound, scans=scans, performed_by_user_id=None)
+
+    assert [r.status for r in results] == ["RECEIVED"] * 4
+    assert [r.qty_pieces for r in results] == [24, 5, 3, 1]
+    assert [r.line_id for r in results] == [7, 100, 7, 100]
+    assert results[1].batch_id is not None and results[1].batch_id == results[3].batch_id
+    # staging, products, batches (select + insert), lines (select, update, insert)
+    assert len(db.statements) == 7
+    assert "warehouse_zones.zone_type = " in db.statements[0]
+    assert "products.barcode IN (" in db.statements[1]
+    assert "ON CONFLICT ON CONSTRAINT uq_product_batches_product_batch_expiry" in db.statements[3]
+    assert db.statements[5].startswith(
+        "UPDATE inbound_lines SET received_qty=(inbound_lines.received_qty + received_deltas.qty)"
+    )
+    assert db.statements[6].startswith("INSERT INTO inbound_lines")
+    assert len(ledger) == 1 and [e.qty_delta for e in ledger[0]] == [24, 5, 3, 1]
+    assert {e.to_location_id for e in ledger[0]} == {dock}
+    assert inbound.status == "RECEIVING"
+
+
+def test_invalid_scans_are_rejected_individually(ledger):
+    dock, not_staging = uuid.uuid4(), uuid.uuid4()
+    plain, lot = _product("111"), _product("222", lot=True)
+    db = ReceiveFakeSession(staging=[dock], products=[plain, lot])
+    scans = [
+        ReceiveScan(barcode="999", qty=1, location_staging_id=dock),
+        ReceiveScan(barcode="111", qty=1, location_staging_id=not_staging),
+        ReceiveScan(barcode="222", qty=1, location_staging_id=dock),
+        ReceiveScan(barcode="111", qty=1, location_staging_id=dock, uom="crate"),
+        ReceiveScan(barcode="111", qty=1, location_staging_id=dock, uom="carton"),
+        ReceiveScan(barcode="111", qty=4, location_staging_id=dock),
+    ]
+
+    results = receive_scans(db, inbound=_inbound(), scans=scans, performed_by_user_id=None)
+
+    assert [r.detail for r in results] == [
+        "Unknown product barcode",
+        "Invalid staging location",
+        "batch_number required",
+        "Invalid uom (piece/carton/pallet)",
+        "Product carton_qty not configured",
+        None,
+    ]
+    assert [r.index for r in results] == list(range(6))
+    assert len(ledger) == 1 and [e.qty_delta for e in ledger[0]] == [4]
+    # no batch work: the only lot-tracked scan was rejected
+    assert not any(s.startswith("SELECT product_batches") for s in db.statements)
+
+
+def test_batch_limits_and_state():
+    dock = uuid.uuid4()
+    scan = ReceiveScan(barcode="111", qty=1, location_staging_id=dock)
+    too_many = [scan] * (MAX_RECEIVE_BATCH + 1)
+    with pytest.raises(HTTPException) as exc:
+        receive_scans(ReceiveFakeSession(), inbound=_inbound(), scans=too_many, performed_by_user_id=None)
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc:
+        receive_scans(ReceiveFakeSession(), inbound=_inbound(status="RECEIVED"), scans=[scan], performed_by_user_id=None)
+    assert exc.value.status_code == 409
+
+    db = ReceiveFakeSession(staging=[dock])
+    results = receive_scans(db, inbound=_inbound(), scans=[scan], performed_by_user_id=None)
+    assert [r.status for r in results] == ["REJECTED"] and len(db.statements) == 2
@@ -0,0 +1,145 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.checkpoint_service import StockScope, create_checkpoint, ledger_on_hand, on_hand_as_of
+
+NOW = datetime(2026, 2, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class FakeSession:
+    """scalar() answers now()/latest checkpoint; execute()/scalars() serve ledger deltas and checkpoint lines."""
+
+    def __init__(self, *, checkpoint=None, deltas=(), lines=()):
+        self.checkpoint = checkpoint
+        self.deltas = deltas
+        self.lines = lines
+        self.statements = []
+        self.added = []
+
+    def scalar(self, stmt):
+        sql = _sql(stmt)
+        self.statements.append(sql)
+        return NOW if "now()" in sql else self.checkpoint
+
+    def execute(self, stmt):
+        self.statements.append(_sql(stmt))
+        return SimpleNamespace(all=lambda: list(self.deltas), rowcount=7)
+
+    def scalars(self, stmt):
+        self.statements.append(_sql(stmt))
+        return _Rows(self.lines)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def flush(self):
+        return None
+
+
+def _key():
+    return SimpleNamespace(
+        client_id=uuid.uuid4(), warehouse_id=uuid.uuid4(), location_id=uuid.uuid4(), product_id=uuid.uuid4(), batch_id=None
+    )
+
+
+def _delta(k, qty):
+    return SimpleNamespace(**vars(k), qty=qty)
+
+
+def _line(k, qty):
+    return SimpleNamespace(**vars(k), on_hand_qty=qty)
+
+
+def _as_key(k):
+    return (k.client_id, k.warehouse_id, k.location_id, k.product_id, k.batch_id)
+
+
+def test_ledger_on_hand_adds_deltas_after_checkpoint():
+    moved, idle = _key(), _key()
+    cp = SimpleNamespace(id=uuid.uuid4(), high_water_mark=NOW - timedelta(days=1))
+    db = FakeSession(checkpoint=cp, deltas=[_delta(moved, -3)], lines=[_line(moved, 10), _line(idle, 4)])
+
+    res = ledger_on_hand(db, scope=StockScope(tenant_id=1), until=NOW)
+
+    assert res.on_hand == {_as_key(moved): 7, _as_key(idle): 4}
+    assert res.touched == {_as_key(moved)}
+    ledger_sql = next(s for s in db.statements if "FROM inventory_ledger" in s)
+    assert "inventory_ledger.created_at < " in ledger_sql and "inventory_ledger.created_at >= " in ledger_sql
+
+
+def test_ledger_on_hand_touched_only_skips_untouched_keys():
+    moved = _key()
+    cp = SimpleNamespace(id=uuid.uuid4(), high_water_mark=NOW - timedelta(days=1))
+    # The EXISTS filter leaves untouched keys out of the checkpoint lines the database returns.
+    db = FakeSession(checkpoint=cp, deltas=[_delta(moved, 2)], lines=[_line(moved, 1)])
+
+    res = ledger_on_hand(db, scope=StockScope(tenant_id=1), until=NOW, touched_only=True)
+
+    assert res.on_hand == {_as_key(moved): 3}
+    lines_sql = next(s for s in db.statements if "FROM inventory_checkpoint_lines" in s)
+    assert "EXISTS (SELECT" in lines_sql
+    assert "inventory_ledger.batch_id IS NOT DISTINCT FROM inventory_checkpoint_lines.batch_id" in lines_sql
+
+
+def test_create_checkpoint_rolls_previous_forward_incrementally():
+    prev = SimpleNamespace(id=uuid.uuid4(), high_water_mark=NOW - timedelta(days=1))
+    db = FakeSession(checkpoint=prev)
+
+    cp, created = create_checkpoint(db)
+
+    assert created and db.added == [cp]
+    assert cp.line_count == 7
+    insert_sql = next(s for s in db.statements if s.startswith("INSERT INTO inventory_checkpoint_lines"))
+    assert "UNION ALL" in insert_sql
+    assert "inventory_ledger.created_at >= " in insert_sql
+
+
+def test_create_checkpoint_is_noop_within_settle_window():
+    prev = SimpleNamespace(id=uuid.uuid4(), high_water_mark=NOW)
+    db = FakeSession(checkpoint=prev)
+
+    cp, created = create_checkpoint(db)
+
+    assert cp is prev and not created
+    assert db.added == []
+
+
+def test_as_of_replays_forward_from_nearby_checkpoint():
+    k = _key()
+    cp = SimpleNamespace(id=uuid.uuid4(), high_water_mark=NOW - timedelta(days=30))
+    db = FakeSession(checkpoint=cp, deltas=[_delta(k, 5)], lines=[_line(k, 10)])
+
+    res = on_hand_as_of(db, scope=StockScope(tenant_id=1), as_of=NOW - timedelta(days=29))
+
+    assert res == {_as_key(k): 15}
+    assert any("FROM inventory_checkpoint_lines" in s for s in db.statements)
+    assert not any("FROM inventory_balances" in s for s in db.statements)
+
+
+def test_as_of_replays_backward_from_current_balances():
+    k, gone = _key(), _key()
+    cp = SimpleNamespace(id=uuid.uuid4(), high_water_mark=NOW - timedelta(days=30))
+    # Current balance 10; 4 units arrived since as_of. `gone` had 2 then (all dispatched since).
+    db = FakeSession(checkpoint=cp, deltas=[_delta(k, 4), _delta(gone, -2)], lines=[_line(k, 10)])
+
+    res = on_hand_as_of(db, scope=StockScope(tenant_id=1), as_of=NOW - timedelta(days=1))
+
+    assert res == {_as_key(k): 6, _as_key(gone): 2}
+    assert any("FROM inventory_balances" in s for s in db.statements)
+    ledger_sql = next(s for s in db.statements if "FROM inventory_ledger" in s)
+    assert "inventory_ledger.created_at >= " in ledger_sql
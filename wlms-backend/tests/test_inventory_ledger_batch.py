@@ -0,0 +1,149 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.services.inventory_service import LedgerCreate, apply_ledger_batch
+
+
+class _ScalarResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class FakeSession:
+    """
+    Records the statements apply_ledger_batch issues.
+    scalars() returns the balances the upsert would have produced (supplied by the test).
+    """
+
+    def __init__(self, *, returned_balances=None):
+        self.returned_balances = returned_balances or []
+        self.executed = []
+        self.upserts = []
+        self.flushed = 0
+
+    def flush(self):
+        self.flushed += 1
+
+    def execute(self, stmt, params=None):
+        self.executed.append((stmt, params))
+
+    def scalars(self, stmt, execution_options=None):
+        self.upserts.append((stmt, execution_options))
+        return _ScalarResult(self.returned_balances)
+
+
+def _entry(*, product_id, location_id, qty_delta, tenant_id=1, batch_id=None) -> LedgerCreate:
+    return LedgerCreate(
+        tenant_id=tenant_id,
+        client_id=uuid.UUID(int=1),
+        warehouse_id=uuid.UUID(int=2),
+        product_id=product_id,
+        batch_id=batch_id,
+        from_location_id=location_id if qty_delta < 0 else None,
+        to_location_id=location_id if qty_delta > 0 else None,
+        qty_delta=qty_delta,
+        event_type="DISPATCH",
+        reference_type="OUTBOUND",
+        reference_id="x",
+        performed_by_user_id=None,
+    )
+
+
+def test_batch_uses_one_ledger_insert_and_one_upsert():
+    product_id = uuid.uuid4()
+    loc = uuid.uuid4()
+    entries = [_entry(product_id=product_id, location_id=loc, qty_delta=-2) for _ in range(3)]
+    db = FakeSession(
+        returned_balances=[
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                tenant_id=1,
+                product_id=product_id,
+                batch_id=None,
+                location_id=loc,
+                on_hand_qty=4,
+                reserved_qty=0,
+            )
+        ]
+    )
+
+    apply_ledger_batch(db, entries=entries)
+
+    assert len(db.executed) == 2
+    _stmt, ledger_rows = db.executed[0]
+    assert len(ledger_rows) == 3
+    summary_stmt, _params = db.executed[1]
+    summary_sql = str(summary_stmt.compile(dialect=postgresql.dialect()))
+    assert summary_sql.startswith("WITH occupancy_upsert AS") and "INSERT INTO inventory_availability" in summary_sql
+
+    assert len(db.upserts) == 1
+    stmt, opts = db.upserts[0]
+    assert opts == {"populate_existing": True}
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT ON CONSTRAINT uq_inv_bal_tenant_prod_batch_loc DO UPDATE" in str(compiled)
+    # Same balance key is aggregated into a single VALUES row
+    deltas = [v for k, v in compiled.params.items() if k.startswith("on_hand_qty")]
+    assert deltas == [-6]
+
+
+def test_batch_rejects_invalid_entries_without_touching_db():
+    product_id = uuid.uuid4()
+    bad = LedgerCreate(
+        **{**_entry(product_id=product_id, location_id=uuid.uuid4(), qty_delta=3).__dict__, "to_location_id": None}
+    )
+    db = FakeSession()
+    with pytest.raises(HTTPException) as e:
+        apply_ledger_batch(db, entries=[_entry(product_id=product_id, location_id=uuid.uuid4(), qty_delta=1), bad])
+    assert e.value.status_code == 400
+    assert e.value.detail["errors"] == [{"index": 1, "detail": "Missing to_location_id"}]
+    assert db.executed == [] and db.upserts == []
+
+
+def test_batch_reports_violations_per_entry():
+    p1, p2 = uuid.uuid4(), uuid.uuid4()
+    loc = uuid.uuid4()
+    entries = [
+        _entry(product_id=p1, location_id=loc, qty_delta=-1),
+        _entry(product_id=p2, location_id=loc, qty_delta=-5),
+        _entry(product_id=p2, location_id=loc, qty_delta=-1),
+    ]
+    db = FakeSession(
+        returned_balances=[
+            SimpleNamespace(tenant_id=1, product_id=p1, batch_id=None, location_id=loc, on_hand_qty=2, reserved_qty=3),
+            SimpleNamespace(tenant_id=1, product_id=p2, batch_id=None, location_id=loc, on_hand_qty=-2, reserved_qty=0),
+        ]
+    )
+    with pytest.raises(HTTPException) as e:
+        apply_ledger_batch(db, entries=entries)
+    assert e.value.status_code == 400
+    assert e.value.detail["errors"] == [
+        {"index": 0, "detail": "Cannot reduce on-hand below reserved qty"},
+        {"index": 1, "detail": "Insufficient on-hand qty"},
+        {"index": 2, "detail": "Insufficient on-hand qty"},
+    ]
+
+
+def test_batch_upserts_balances_in_key_order():
+    p1, p2 = uuid.UUID(int=10), uuid.UUID(int=20)
+    loc_a, loc_b = uuid.UUID(int=1), uuid.UUID(int=2)
+    entries = [
+        _entry(product_id=p2, location_id=loc_a, qty_delta=1),
+        _entry(product_id=p1, location_id=loc_b, qty_delta=2),
+        _entry(product_id=p1, location_id=loc_a, qty_delta=3, batch_id=uuid.UUID(int=5)),
+        _entry(product_id=p1, location_id=loc_a, qty_delta=4),
+    ]
+    db = FakeSession()
+
+    apply_ledger_batch(db, entries=entries)
+
+    compiled = db.upserts[0][0].compile(dialect=postgresql.dialect())
+    n = sum(1 for k in compiled.params if k.startswith("on_hand_qty"))
+    # (product, batch NULL first, location): same order in every transaction touching these balances
+    assert [compiled.params[f"on_hand_qty_m{i}"] for i in range(n)] == [4, 2, 3, 1]
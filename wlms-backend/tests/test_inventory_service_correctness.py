@@ -27,6 +27,10 @@ class FakeSession:
     def flush(self):
         return None
 
+    def execute(self, stmt):
+        # Availability summary upserts are not modelled here.
+        return None
+
     def scalar(self, stmt):
         compiled = str(stmt.compile(compile_kwargs={"literal_binds": True}))
         # Extremely small matcher: select InventoryBalance where tenant_id/product_id/batch_id/location_id match
@@ -0,0 +1,70 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.ledger_partition_service import detach_ledger_partitions, ensure_ledger_partitions, ledger_time_bounds
+
+
+class _Scalars:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class FakeSession:
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.executed = []
+
+    def scalars(self, stmt):
+        return _Scalars(self.partitions)
+
+    def execute(self, stmt):
+        self.executed.append(str(stmt))
+
+    def scalar(self, stmt, params):
+        self.executed.append((str(stmt), params))
+        return 2
+
+
+def test_time_bounds_are_half_open_utc_days():
+    start, end = ledger_time_bounds(date_from="2026-01-01", date_to="2026-01-31")
+    assert start == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert end == datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+def test_time_bounds_default_window_is_always_bounded(monkeypatch):
+    monkeypatch.setattr("app.services.ledger_partition_service.settings.ledger_query_default_days", 7)
+    start, end = ledger_time_bounds(date_from=None, date_to="2026-03-10")
+    assert start == datetime(2026, 3, 4, tzinfo=timezone.utc)
+    assert end == datetime(2026, 3, 11, tzinfo=timezone.utc)
+
+
+def test_time_bounds_reject_inverted_range():
+    with pytest.raises(HTTPException) as e:
+        ledger_time_bounds(date_from="2026-02-01", date_to="2026-01-01")
+    assert e.value.status_code == 400
+
+
+def test_detach_only_whole_months_before_cutoff():
+    db = FakeSession(["inventory_ledger_default", "inventory_ledger_p202512", "inventory_ledger_p202601", "inventory_ledger_p202602"])
+
+    detached = detach_ledger_partitions(db, before=date(2026, 2, 1))
+
+    assert detached == ["inventory_ledger_p202512", "inventory_ledger_p202601"]
+    assert db.executed == [
+        'ALTER TABLE inventory_ledger DETACH PARTITION "inventory_ledger_p202512"',
+        'ALTER TABLE inventory_ledger DETACH PARTITION "inventory_ledger_p202601"',
+    ]
+
+
+def test_ensure_starts_at_oldest_month_in_default_partition():
+    db = FakeSession([])
+
+    assert ensure_ledger_partitions(db, months_ahead=5) == 2
+
+    sql, params = db.executed[0]
+    assert "min(created_at) FROM inventory_ledger_default" in sql and params == {"ahead": 5}
@@ -0,0 +1,256 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class)
+from app.models.license_plate import LicensePlateMove
+from app.services.inventory_service import move_on_hand
+from app.services.license_plate_service import PlateItem, add_items, dispatch_license_plate, move_license_plate
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class PlateFakeSession:
+    """execute() answers queued rows in call order, scalars() the plate's items; records adds."""
+
+    def __init__(self, *, rows=(), items=()):
+        self.rows = list(rows)
+        self.items = items
+        self.added = []
+        self.executed = 0
+        self.statements = []
+
+    def execute(self, stmt):
+        self.executed += 1
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Rows(self.rows.pop(0) if self.rows else [])
+
+    def scalars(self, stmt):
+        return _Rows(self.items)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+
+WH = uuid.UUID(int=2)
+
+
+def _plate(**kw):
+    return SimpleNamespace(
+        **{
+            "id": uuid.uuid4(),
+            "tenant_id": 1,
+            "client_id": uuid.UUID(int=1),
+            "warehouse_id": WH,
+            "location_id": uuid.uuid4(),
+            "code": "LP0001",
+            "status": "ACTIVE",
+            **kw,
+        }
+    )
+
+
+def _loc(location_id, warehouse_id=WH):
+    return SimpleNamespace(id=location_id, warehouse_id=warehouse_id, is_active=True)
+
+
+def _items(n):
+    return [SimpleNamespace(product_id=uuid.uuid4(), batch_id=None, qty=i + 1) for i in range(n)]
+
+
+@pytest.fixture
+def ledger(monkeypatch):
+    batches = []
+    monkeypatch.setattr(
+        "app.services.license_plate_service.apply_ledger_batch", lambda _db, *, entries: batches.append(entries)
+    )
+    return batches
+
+
+def test_pallet_move_is_one_container_move_and_one_ledger_batch(ledger):
+    plate, to = _plate(), uuid.uuid4()
+    src = plate.location_id
+    items = _items(40)
+    db = PlateFakeSession(rows=[[(_loc(src), "STAGING"), (_loc(to), "STORAGE")]], items=items)
+
+    move = move_license_plate(db, plate=plate, to_location_id=to, performed_by_user_id=None)
+
+    assert len(ledger) == 1
+    entries = ledger[0]
+    assert len(entries) == 80
+    assert {(e.event_type, e.reference_type, e.reference_id) for e in entries} == {("PUTAWAY_MOVE", "LPN", str(move.id))}
+    assert sum(e.qty_delta for e in entries) == 0
+    assert {e.from_location_id for e in entries if e.qty_delta < 0} == {src}
+    assert {e.to_location_id for e in entries if e.qty_delta > 0} == {to}
+    assert db.added == [move] and isinstance(move, LicensePlateMove)
+    assert (move.from_location_id, move.to_location_id, move.lines, move.units) == (src, to, 40, sum(range(1, 41)))
+    assert plate.location_id == to
+
+
+def test_storage_to_storage_is_a_transfer(ledger):
+    plate, to = _plate(), uuid.uuid4()
+    db = PlateFakeSession(rows=[[(_loc(plate.location_id), "STORAGE"), (_loc(to), "STORAGE")]], items=_items(1))
+    assert move_license_plate(db, plate=plate, to_location_id=to, performed_by_user_id=None).event_type == "TRANSFER"
+
+
+def test_move_validation(ledger):
+    plate, other_wh = _plate(), uuid.uuid4()
+    db = PlateFakeSession(rows=[[(_loc(other_wh, warehouse_id=uuid.uuid4()), "STORAGE")]], items=_items(1))
+    with pytest.raises(HTTPException) as exc:
+        move_license_plate(db, plate=plate, to_location_id=other_wh, performed_by_user_id=None)
+    assert exc.value.status_code == 400
+
+    to = uuid.uuid4()
+    with pytest.raises(HTTPException) as exc:
+        move_license_plate(
+            PlateFakeSession(rows=[[(_loc(to), "STORAGE")]]), plate=plate, to_location_id=to, performed_by_user_id=None
+        )
+    assert (exc.value.status_code, exc.value.detail) == (409, "License plate is empty")
+
+    with pytest.raises(HTTPException) as exc:
+        move_license_plate(
+            PlateFakeSession(), plate=_plate(status="DISPATCHED"), to_location_id=to, performed_by_user_id=None
+        )
+    assert exc.value.status_code == 409
+    assert ledger == []
+
+
+class DispatchFakeSession(PlateFakeSession):
+    """scalars() serves the plate's items, then the order's reservations, then its lines; scalar() the count left."""
+
+    def __init__(self, *, items, reservations, lines, reserved_left=0):
+        super().__init__(items=items)
+        self.queue = [items, reservations, lines]
+        self.reserved_left = reserved_left
+        self.locks = []
+
+    def scalars(self, stmt):
+        self.locks.append(stmt._for_update_arg is not None)
+        return _Rows(self.queue.pop(0))
+
+    def scalar(self, stmt):
+        return self.reserved_left
+
+
+def _order(**kw):
+    return SimpleNamespace(
+        **{"id": uuid.uuid4(), "client_id": uuid.UUID(int=1), "warehouse_id": WH, "status": "APPROVED", **kw}
+    )
+
+
+@pytest.fixture
+def consumed(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "app.services.license_plate_service.consume_reservations", lambda _db, *, takes: calls.extend(takes)
+    )
+    return calls
+
+
+def test_dispatch_consumes_the_orders_reservations_and_closes_it(ledger, consumed):
+    plate, order = _plate(), _order()
+    src = plate.location_id
+    items = _items(3)
+    reservations = [
+        SimpleNamespace(id=i, product_id=it.product_id, batch_id=None, location_id=src, qty_reserved=it.qty)
+        for i, it in enumerate(items)
+    ]
+    lines = [SimpleNamespace(product_id=it.product_id, requested_qty=it.qty, picked_qty=0) for it in items]
+    db = DispatchFakeSession(items=items, reservations=reservations, lines=lines)
+
+    move = dispatch_license_plate(db, plate=plate, order=order, performed_by_user_id=None)
+
+    assert [(r.id, q) for r, q in consumed] == [(0, 1), (1, 2), (2, 3)]
+    assert db.locks[1]  # reservations are locked
+    assert [(e.qty_delta, e.from_location_id, e.event_type) for e in ledger[0]] == [
+        (-1, src, "DISPATCH"),
+        (-2, src, "DISPATCH"),
+        (-3, src, "DISPATCH"),
+    ]
+    assert [ol.picked_qty for ol in lines] == [1, 2, 3]
+    assert (plate.status, plate.location_id, move.to_location_id, move.outbound_id) == ("DISPATCHED", None, None, order.id)
+    assert order.status == "DISPATCHED" and order.dispatched_at is not None
+
+
+def test_dispatch_needs_the_plate_reserved_for_an_approved_order(ledger, consumed):
+    plate = _plate()
+    items = _items(2)
+    # Only the first item is reserved for the order at the plate's location
+    reservations = [
+        SimpleNamespace(
+            id=0, product_id=items[0].product_id, batch_id=None, location_id=plate.location_id, qty_reserved=5
+        )
+    ]
+    db = DispatchFakeSession(items=items, reservations=reservations, lines=[])
+    with pytest.raises(HTTPException) as exc:
+        dispatch_license_plate(db, plate=plate, order=_order(), performed_by_user_id=None)
+    assert exc.value.status_code == 409
+
+    with pytest.raises(HTTPException) as exc:
+        dispatch_license_plate(
+            DispatchFakeSession(items=items, reservations=[], lines=[]),
+            plate=plate,
+            order=_order(status="PICKING"),
+            performed_by_user_id=None,
+        )
+    assert exc.value.status_code == 409
+    assert ledger == [] and consumed == [] and plate.status == "ACTIVE"
+
+
+def test_items_must_be_loose_stock_at_the_plate_location():
+    plate, p = _plate(), uuid.uuid4()
+    # 10 on hand there, 7 already on another plate
+    db = PlateFakeSession(rows=[[(p, None, 10)], [(p, None, 7)]])
+    with pytest.raises(HTTPException) as exc:
+        add_items(db, plate=plate, items=[PlateItem(product_id=p, batch_id=None, qty=2), PlateItem(p, None, 2)])
+    assert exc.value.status_code == 400
+
+    db = PlateFakeSession(rows=[[(p, None, 10)], [(p, None, 7)]])
+    add_items(db, plate=plate, items=[PlateItem(product_id=p, batch_id=None, qty=3)])
+    assert db.executed == 3  # balances, other plates, one items upsert
+    assert db.statements[0].endswith("FOR UPDATE")
+
+
+class _First:
+    def __init__(self, row):
+        self._row = row
+
+    def first(self):
+        return self._row
+
+
+def test_loose_moves_cannot_take_plated_units():
+    calls = []
+
+    class _Db:
+        def execute(self, stmt):
+            calls.append(str(stmt.compile(dialect=postgresql.dialect())))
+            # 10 on hand at the source, 8 of them on a plate
+            return _First(SimpleNamespace(on_hand_qty=10, plated=8))
+
+    with pytest.raises(HTTPException) as exc:
+        move_on_hand(
+            _Db(),
+            tenant_id=1,
+            client_id=uuid.UUID(int=1),
+            warehouse_id=WH,
+            product_id=uuid.uuid4(),
+            batch_id=None,
+            from_location_id=uuid.uuid4(),
+            to_location_id=uuid.uuid4(),
+            qty=3,
+            reference_type="MANUAL",
+            reference_id="u",
+            performed_by_user_id=None,
+        )
+    assert exc.value.status_code == 409
+    assert calls[0].endswith("FOR UPDATE OF inventory_balances")
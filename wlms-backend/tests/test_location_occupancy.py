@@ -0,0 +1,78 @@
+import uuid
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class)
+from app.api.v1.routes_warehouses import _csv_capacity
+from app.services.occupancy_service import rebuild_occupancy, zone_occupancy
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class OccupancyFakeSession:
+    """execute() answers queued rows in call order and records the compiled SQL."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.sql = []
+
+    def execute(self, stmt):
+        self.sql.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Rows(self.results.pop(0) if self.results else [])
+
+
+def test_zone_occupancy_reads_occupied_counts_from_the_occupancy_index():
+    db = OccupancyFakeSession(
+        [(3, 12)],  # occupied per zone
+        [(1, "Inbound", "STAGING", 4, 4), (3, "Reserve", "STORAGE", 20, 26)],
+    )
+
+    zones = zone_occupancy(db, warehouse_id=uuid.UUID(int=2))
+
+    assert [(z.zone_id, z.locations, z.occupied, z.free, z.pallet_positions) for z in zones] == [
+        (1, 4, 0, 4, 4),
+        (3, 20, 12, 8, 26),
+    ]
+    occupied_sql = db.sql[0]
+    assert occupied_sql.startswith("SELECT location_occupancy.zone_id, count(*)")
+    assert "location_occupancy.on_hand_qty > " in occupied_sql
+    assert "inventory_balances" not in "".join(db.sql)
+
+
+def test_zone_filter_applies_to_both_queries():
+    db = OccupancyFakeSession()
+    assert zone_occupancy(db, warehouse_id=uuid.UUID(int=2), zone_id=7) == []
+    assert "location_occupancy.zone_id = " in db.sql[0]
+    assert "warehouse_zones.id = " in db.sql[1]
+
+
+def test_rebuild_sums_balances_per_location():
+    class RebuildFakeSession(OccupancyFakeSession):
+        def execute(self, stmt):
+            self.sql.append(str(stmt.compile(dialect=postgresql.dialect())))
+            return type("R", (), {"rowcount": 5})()
+
+    db = RebuildFakeSession()
+    assert rebuild_occupancy(db, tenant_id=1) == 5
+    assert db.sql[0].startswith("DELETE FROM location_occupancy WHERE location_occupancy.tenant_id = ")
+    assert db.sql[1].startswith("INSERT INTO location_occupancy")
+    assert "sum(inventory_balances.on_hand_qty)" in db.sql[1]
+
+
+def test_csv_capacity_columns():
+    errors: list[dict] = []
+    assert _csv_capacity({"capacity_pallets": "2", "capacity_weight_kg": "1200.5"}, 2, errors) == {
+        "capacity_pallets": 2,
+        "capacity_weight_kg": Decimal("1200.5"),
+    }
+    assert _csv_capacity({"capacity_pallets": ""}, 3, errors) == {}
+    assert _csv_capacity({"capacity_volume_m3": "NaN"}, 4, errors) is None
+    assert _csv_capacity({"capacity_pallets": "0"}, 5, errors) is None
+    assert [(e["row"], e["field"]) for e in errors] == [(4, "capacity_volume_m3"), (5, "capacity_pallets")]
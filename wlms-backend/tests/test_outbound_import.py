@@ -0,0 +1,144 @@
+import io
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class before models are built)
+from app.services import outbound_import_service
+from app.services.outbound_import_service import import_orders, parse_orders_csv, parse_orders_ndjson
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class ImportFakeSession:
+    """Serves imported order refs, products and availability rows; records statements and bulk inserts."""
+
+    def __init__(self, *, imported=(), products=(), available=None):
+        self.imported = imported
+        self.products = products
+        self.available = available or {}
+        self.statements = []
+        self.inserts = []
+
+    def _sql(self, stmt):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        return sql
+
+    def scalars(self, stmt, execution_options=None):
+        sql = self._sql(stmt)
+        if sql.startswith("SELECT outbound_orders.external_reference"):
+            return _Rows(self.imported)
+        return _Rows(self.products)
+
+    def execute(self, stmt, params=None, execution_options=None):
+        self._sql(stmt)
+        if params is not None:
+            self.inserts.append((stmt.table.name, params))
+            return _Rows([])
+        return _Rows(self.available.items())
+
+
+def _product(sku, **kw):
+    return SimpleNamespace(id=uuid.uuid4(), sku=sku, carton_qty=kw.get("carton_qty"), pallet_qty=None)
+
+
+def test_csv_groups_rows_into_orders_and_rejects_whole_orders():
+    csv_bytes = (
+        b"order_ref,sku,qty,uom,requested_ship_date,name,address\n"
+        b"MP-1,A,2,,2026-03-01,Ana,Main St 1\n"
+        b",A,1,,,Bo,Side St\n"
+        b"MP-2,A,1,,,Cy,\n"
+        b"MP-1,B,1,carton,,,\n"
+        b"MP-3,A,x,,,Di,Elm 3\n"
+    )
+
+    orders = parse_orders_csv(io.BytesIO(csv_bytes))
+
+    by_ref = {o.order_ref: o for o in orders}
+    assert by_ref["MP-1"].lines == [("A", 2, "piece"), ("B", 1, "carton")]
+    assert by_ref["MP-1"].destination["name"] == "Ana" and str(by_ref["MP-1"].requested_ship_date) == "2026-03-01"
+    assert by_ref["MP-2"].error == "destination name and address required"
+    assert by_ref["MP-3"].error.startswith("qty must be a positive integer")
+    assert by_ref[None].row == 3
+
+
+def test_ndjson_reports_bad_lines_and_limits(monkeypatch):
+    good = {"order_ref": "MP-1", "destination": {"name": "Ana", "address": "Main 1"}, "lines": [{"sku": "A", "qty": 1}]}
+    data = "\n".join([json.dumps(good), "{not json", json.dumps(good), json.dumps({"order_ref": "MP-9"})]).encode()
+
+    orders = parse_orders_ndjson(io.BytesIO(data))
+
+    assert [(o.row, o.order_ref, o.error) for o in orders] == [
+        (1, "MP-1", None),
+        (2, None, "Invalid JSON"),
+        (3, "MP-1", "Duplicate order_ref in file"),
+        (4, None, "Expected an order object with lines"),
+    ]
+    monkeypatch.setattr(outbound_import_service, "MAX_IMPORT_ORDERS", 0)
+    with pytest.raises(HTTPException) as exc:
+        parse_orders_ndjson(io.BytesIO(json.dumps(good).encode()))
+    assert exc.value.status_code == 400
+
+
+def test_import_checks_availability_cumulatively_and_inserts_in_bulk():
+    a, b = _product("A"), _product("B", carton_qty=6)
+    db = ImportFakeSession(imported=["MP-OLD"], products=[a, b], available={a.id: 5, b.id: 100})
+
+    def order(row, ref, *lines):
+        return outbound_import_service.ImportOrder(
+            row=row, order_ref=ref, destination={"name": "x", "address": "y"}, lines=list(lines)
+        )
+
+    orders = [
+        order(1, "MP-1", ("A", 3, "piece"), ("B", 2, "carton"), ("A", 1, "piece")),
+        order(2, "MP-2", ("A", 2, "piece")),  # only 1 A left after MP-1
+        order(3, "MP-OLD", ("B", 1, "piece")),
+        order(4, "MP-4", ("NOPE", 1, "piece")),
+        order(5, "MP-5", ("A", 1, "pallet")),
+        order(6, "MP-6", ("A", 1, "piece"), ("B", 1, "piece")),
+    ]
+
+    results = import_orders(
+        db,
+        tenant_id=1,
+        client_id=uuid.UUID(int=1),
+        warehouse_id=uuid.UUID(int=2),
+        orders=orders,
+        order_status="SUBMITTED",
+        created_by_user_id=None,
+    )
+
+    assert [(r.order_ref, r.status) for r in results] == [
+        ("MP-1", "CREATED"),
+        ("MP-2", "REJECTED"),
+        ("MP-OLD", "REJECTED"),
+        ("MP-4", "REJECTED"),
+        ("MP-5", "REJECTED"),
+        ("MP-6", "CREATED"),
+    ]
+    assert [r.detail for r in results[1:5]] == [
+        "Insufficient available stock",
+        "Order already imported",
+        "Unknown SKU NOPE",
+        "Product pallet_qty not configured (sku A)",
+    ]
+    # imported refs, products, availability, then one INSERT per table
+    assert len(db.statements) == 5
+    assert "inventory_availability.product_id IN (" in db.statements[2]
+    assert [table for table, _rows in db.inserts] == ["outbound_orders", "outbound_lines"]
+    order_rows, line_rows = db.inserts[0][1], db.inserts[1][1]
+    assert [o["external_reference"] for o in order_rows] == ["MP-1", "MP-6"]
+    assert {o["status"] for o in order_rows} == {"SUBMITTED"}
+    mp1 = order_rows[0]["id"]
+    assert {(ln["product_id"], ln["requested_qty"]) for ln in line_rows if ln["outbound_id"] == mp1} == {(a.id, 4), (b.id, 12)}
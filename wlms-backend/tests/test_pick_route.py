@@ -0,0 +1,35 @@
+import random
+import uuid
+from types import SimpleNamespace
+
+from app.services.pick_route_service import _ordinal, plan_route, route_length
+
+
+def _loc(aisle, rack, level="1", bin="1"):
+    code = f"{aisle}-{rack}-{level}-{bin}"
+    return SimpleNamespace(id=uuid.uuid4(), aisle=aisle, rack=rack, level=level, bin=bin, code=code)
+
+
+def test_ordinal_parses_numbers_letters_and_mixed_labels():
+    assert [_ordinal(v) for v in ("07", "B", "AA", "B07", None, "1-2")] == [7, 2, 27, 2007, None, None]
+
+
+def test_s_shape_alternates_direction_per_aisle():
+    locs = [_loc("1", "5"), _loc("1", "1"), _loc("2", "1"), _loc("2", "5")]
+
+    route = plan_route(locs, optimize=False)
+
+    assert [(loc.aisle, loc.rack) for loc in route] == [("1", "1"), ("1", "5"), ("2", "5"), ("2", "1")]
+
+
+def test_optimized_route_is_not_longer_than_code_order_and_keeps_unroutable_last():
+    rng = random.Random(7)
+    locs = [_loc(str(rng.randint(1, 20)), str(rng.randint(1, 40))) for _ in range(150)]
+    odd = SimpleNamespace(id=uuid.uuid4(), aisle=None, rack=None, level=None, bin=None, code="DOCK")
+
+    route = plan_route([*locs, odd], optimize=True, time_budget_ms=500)
+
+    assert route[-1] is odd
+    assert sorted(map(id, route)) == sorted(map(id, [*locs, odd]))
+    by_code = sorted(locs, key=lambda loc: loc.code)
+    assert route_length(route) <= route_length(plan_route(locs, optimize=False)) <= route_length(by_code)
@@ -0,0 +1,133 @@
+import uuid
+from types import SimpleNamespace
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class)
+from app.services.picking_service import PickScan, apply_pick_scans
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class BatchFakeSession:
+    """scalars() answers queued results in call order; execute() answers the task's orders and records inserts."""
+
+    def __init__(self, *, orders, scalars):
+        self.orders = orders
+        self.scalars_queue = list(scalars)
+        self.inserted = []
+        self.flushed = 0
+
+    def execute(self, stmt, params=None, execution_options=None):
+        if params is not None:
+            self.inserted.extend(params)
+            return _Rows([])
+        return _Rows(self.orders)
+
+    def scalars(self, stmt, execution_options=None):
+        return _Rows(self.scalars_queue.pop(0))
+
+    def flush(self):
+        self.flushed += 1
+
+
+def _order():
+    return SimpleNamespace(id=uuid.uuid4(), tenant_id=1, client_id=uuid.UUID(int=1), warehouse_id=uuid.UUID(int=2))
+
+
+def test_offline_queue_is_validated_in_order_and_written_set_based(monkeypatch):
+    consumed, ledger = [], []
+    monkeypatch.setattr(
+        "app.services.picking_service.consume_reservations",
+        lambda _db, *, takes: consumed.extend((r.outbound_id, q) for r, q in takes),
+    )
+    monkeypatch.setattr("app.services.picking_service.apply_ledger_batch", lambda _db, *, entries: ledger.extend(entries))
+
+    o1, o2 = _order(), _order()
+    p, loc, staging = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    line = SimpleNamespace(id=1, product_id=p, batch_id=None, from_location_id=loc, qty_to_pick=5, qty_picked=0)
+    reservations = [
+        SimpleNamespace(id=uuid.uuid4(), outbound_id=o2.id, product_id=p, batch_id=None, location_id=loc, qty_reserved=3),
+        SimpleNamespace(id=uuid.uuid4(), outbound_id=o1.id, product_id=p, batch_id=None, location_id=loc, qty_reserved=2),
+    ]
+    oline1 = SimpleNamespace(outbound_id=o1.id, product_id=p, picked_qty=0)
+    oline2 = SimpleNamespace(outbound_id=o2.id, product_id=p, picked_qty=0)
+    db = BatchFakeSession(
+        orders=[(o1, "T01"), (o2, "T02")],
+        scalars=[["already-sent"], [line], reservations, [oline1, oline2]],
+    )
+
+    def scan(cid, qty, tote=None, product=p):
+        return PickScan(
+            client_scan_id=cid,
+            product_id=product,
+            batch_id=None,
+            from_location_id=loc,
+            to_location_id=staging,
+            qty=qty,
+            tote_code=tote,
+        )
+
+    results = apply_pick_scans(
+        db,
+        task=SimpleNamespace(id=uuid.uuid4(), tenant_id=1),
+        scans=[
+            scan("already-sent", 1),
+            scan("s1", 3),  # o1 (2) then o2 (1), wave order
+            scan("s1", 3),  # replayed within the same queue
+            scan("s2", 3),  # only 2 left to pick on the line
+            scan("s3", 1, tote="T02"),
+            scan("s4", 1, product=uuid.uuid4()),
+        ],
+        performed_by_user_id=None,
+    )
+
+    assert [(r.client_scan_id, r.status, r.detail) for r in results] == [
+        ("already-sent", "DUPLICATE", None),
+        ("s1", "APPLIED", None),
+        ("s1", "DUPLICATE", None),
+        ("s2", "REJECTED", "Over-pick not allowed"),
+        ("s3", "APPLIED", None),
+        ("s4", "REJECTED", "Pick line not found"),
+    ]
+    assert consumed == [(o1.id, 2), (o2.id, 1), (o2.id, 1)]
+    assert [(e.reference_id, e.qty_delta) for e in ledger] == [
+        (str(o1.id), -2),
+        (str(o1.id), 2),
+        (str(o2.id), -1),
+        (str(o2.id), 1),
+        (str(o2.id), -1),
+        (str(o2.id), 1),
+    ]
+    assert line.qty_picked == 4
+    assert (oline1.picked_qty, oline2.picked_qty) == (2, 2)
+    assert [row["client_scan_id"] for row in db.inserted] == ["s1", "s3"]
+
+
+def test_queue_with_nothing_to_apply_writes_nothing(monkeypatch):
+    monkeypatch.setattr("app.services.picking_service.consume_reservations", lambda *_a, **_k: 1 / 0)
+    o1 = _order()
+    db = BatchFakeSession(orders=[(o1, None)], scalars=[["a"], [], []])
+
+    results = apply_pick_scans(
+        db,
+        task=SimpleNamespace(id=uuid.uuid4(), tenant_id=1),
+        scans=[
+            PickScan(
+                client_scan_id="a",
+                product_id=uuid.uuid4(),
+                batch_id=None,
+                from_location_id=uuid.uuid4(),
+                to_location_id=uuid.uuid4(),
+                qty=1,
+            )
+        ],
+        performed_by_user_id=None,
+    )
+
+    assert [r.status for r in results] == ["DUPLICATE"]
+    assert db.inserted == [] and db.flushed == 0
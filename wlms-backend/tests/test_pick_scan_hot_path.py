@@ -0,0 +1,127 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class)
+from app.services.picking_service import PickScan, apply_pick_scan
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class ScanFakeSession:
+    """Answers the joined locking SELECT and the balance upsert; records every statement and flush."""
+
+    def __init__(self, *, rows):
+        self.rows = rows
+        self.statements = []
+        self.deleted = []
+
+    def _record(self, stmt):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        return sql
+
+    def execute(self, stmt, params=None, execution_options=None):
+        sql = self._record(stmt)
+        return _Rows(self.rows if sql.startswith("SELECT") else [])
+
+    def scalars(self, stmt, execution_options=None):
+        self._record(stmt)
+        return _Rows([SimpleNamespace(id=uuid.uuid4(), location_id=loc) for loc in (self.rows[0][1].from_location_id,)])
+
+    def scalar(self, stmt, execution_options=None):
+        self._record(stmt)
+        return None
+
+    def delete(self, obj):
+        self.deleted.append(obj)
+
+    def flush(self):
+        self.statements.append("FLUSH")
+
+
+def _rows(*, orders_qty, qty_to_pick=10):
+    p, loc = uuid.uuid4(), uuid.uuid4()
+    task = SimpleNamespace(id=uuid.uuid4(), tenant_id=1)
+    line = SimpleNamespace(product_id=p, batch_id=None, from_location_id=loc, qty_to_pick=qty_to_pick, qty_picked=0)
+    bal = SimpleNamespace(client_id=uuid.UUID(int=1), warehouse_id=uuid.UUID(int=2))
+    rows = []
+    for i, reserved in enumerate(orders_qty):
+        order = SimpleNamespace(id=uuid.uuid4(), client_id=bal.client_id, warehouse_id=bal.warehouse_id)
+        r = SimpleNamespace(outbound_id=order.id, qty_reserved=reserved)
+        rows.append((task, line, r, order, bal, i + 1))
+    return rows
+
+
+def _scan(rows, qty, tote=None):
+    line = rows[0][1]
+    return PickScan(
+        product_id=line.product_id,
+        batch_id=None,
+        from_location_id=line.from_location_id,
+        to_location_id=uuid.uuid4(),
+        qty=qty,
+        tote_code=tote,
+    )
+
+
+def test_scan_uses_fixed_statement_count():
+    rows = _rows(orders_qty=[5])
+    db = ScanFakeSession(rows=rows)
+
+    task, picked = apply_pick_scan(db, task_id=rows[0][0].id, tenant_id=1, scan=_scan(rows, 2), performed_by_user_id=None)
+
+    # Regression guard: one locking read, four set-based writes, one flush (task line + reservation).
+    kinds = [sql.split("\n")[0][:30] for sql in db.statements]
+    assert len(db.statements) == 6, kinds
+    select_sql, balances_sql, ledger_sql, availability_sql, lines_sql, flush = db.statements
+    assert select_sql.startswith("SELECT") and "FOR UPDATE OF picking_tasks, picking_task_lines" in select_sql
+    assert "inventory_reservations, inventory_balances" in select_sql.rsplit("FOR UPDATE", 1)[1]
+    assert balances_sql.startswith("INSERT INTO inventory_balances") and "ON CONFLICT" in balances_sql
+    assert ledger_sql.startswith("INSERT INTO inventory_ledger")
+    assert availability_sql.startswith("WITH occupancy_upsert AS") and "INSERT INTO inventory_availability" in availability_sql
+    assert lines_sql.startswith("UPDATE outbound_lines")
+    assert flush == "FLUSH"
+    assert task is rows[0][0]
+    assert [q for _o, q in picked] == [2]
+    assert (rows[0][1].qty_picked, rows[0][2].qty_reserved) == (2, 3)
+
+
+def test_scan_spills_across_wave_orders_and_deletes_emptied_reservations():
+    rows = _rows(orders_qty=[2, 3])
+    db = ScanFakeSession(rows=rows)
+
+    _task, picked = apply_pick_scan(db, task_id=rows[0][0].id, tenant_id=1, scan=_scan(rows, 4), performed_by_user_id=None)
+
+    assert [(o.id, q) for o, q in picked] == [(rows[0][3].id, 2), (rows[1][3].id, 2)]
+    assert db.deleted == [rows[0][2]]
+    assert rows[1][2].qty_reserved == 1
+    assert len(db.statements) == 6
+
+
+def test_scan_rejects_over_pick_before_writing():
+    rows = _rows(orders_qty=[5], qty_to_pick=1)
+    db = ScanFakeSession(rows=rows)
+
+    with pytest.raises(HTTPException) as exc:
+        apply_pick_scan(db, task_id=rows[0][0].id, tenant_id=1, scan=_scan(rows, 2), performed_by_user_id=None)
+
+    assert exc.value.status_code == 400
+    assert len(db.statements) == 1
+
+
+def test_scan_without_match_reports_missing_task():
+    rows = _rows(orders_qty=[1])
+    db = ScanFakeSession(rows=[])
+    with pytest.raises(HTTPException) as exc:
+        apply_pick_scan(db, task_id=uuid.uuid4(), tenant_id=1, scan=_scan(rows, 1), performed_by_user_id=None)
+    assert (exc.value.status_code, exc.value.detail) == (404, "Task not found")
@@ -0,0 +1,164 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class before models are built)
+from app.models.picking import PickingTaskLine, PickingTaskOrder
+from app.services.picking_service import (
+    consolidate_orders,
+    create_pick_wave,
+    create_picking_task,
+    create_zone_picking_tasks,
+    zone_queue_depth,
+)
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class WaveFakeSession:
+    """Returns canned rows for the reservation/location and reservation queries, records writes."""
+
+    def __init__(self, *, rows=(), scalars=(), scalar=()):
+        self.rows = rows
+        self.scalars_rows = scalars
+        self.scalar_values = list(scalar)
+        self.added = []
+        self.last_sql = None
+
+    def execute(self, stmt, execution_options=None):
+        self.last_sql = str(stmt.compile(dialect=postgresql.dialect()))
+        return _Rows(self.rows)
+
+    def scalars(self, stmt, execution_options=None):
+        return _Rows(self.scalars_rows)
+
+    def scalar(self, stmt, execution_options=None):
+        return self.scalar_values.pop(0) if self.scalar_values else None
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def add_all(self, objs):
+        self.added.extend(objs)
+
+    def flush(self):
+        for obj in self.added:
+            if getattr(obj, "id", None) is None and not isinstance(obj, (PickingTaskLine, PickingTaskOrder)):
+                obj.id = uuid.uuid4()
+
+
+def _loc(code, aisle, rack, zone_id=1):
+    return SimpleNamespace(id=uuid.uuid4(), code=code, aisle=aisle, rack=rack, level="1", bin="1", zone_id=zone_id)
+
+
+def _res(order, product_id, loc, qty):
+    return SimpleNamespace(
+        outbound_id=order.id, product_id=product_id, batch_id=None, location_id=loc.id, qty_reserved=qty
+    )
+
+
+def _order(warehouse_id=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        tenant_id=1,
+        client_id=uuid.UUID(int=1),
+        warehouse_id=warehouse_id or uuid.UUID(int=2),
+        status="APPROVED",
+    )
+
+
+def test_wave_task_merges_quantities_per_location_and_routes_lines():
+    o1, o2 = _order(), _order()
+    p = uuid.uuid4()
+    far, near = _loc("A05-10", "5", "10"), _loc("A01-02", "1", "02")
+    db = WaveFakeSession(
+        rows=[(_res(o1, p, far, 2), far), (_res(o2, p, far, 3), far), (_res(o2, p, near, 1), near)]
+    )
+
+    task = create_picking_task(db, tenant_id=1, orders=[o1, o2], totes=["T01", "T02"])
+
+    lines = [a for a in db.added if isinstance(a, PickingTaskLine)]
+    assert [(line.from_location_id, line.qty_to_pick, line.pick_seq) for line in lines] == [
+        (near.id, 1, 0),
+        (far.id, 5, 1),
+    ]
+    assert task.outbound_id is None
+    totes = [(a.outbound_id, a.tote_code) for a in db.added if isinstance(a, PickingTaskOrder)]
+    assert totes == [(o1.id, "T01"), (o2.id, "T02")]
+    assert (o1.status, o2.status) == ("PICKING", "PICKING")
+
+
+def test_wave_validation():
+    o1, o2 = _order(), _order(warehouse_id=uuid.uuid4())
+
+    with pytest.raises(HTTPException) as exc:
+        create_pick_wave(WaveFakeSession(), tenant_id=1, outbound_ids=[o1.id, o2.id], totes=["T1", "T1"])
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc:
+        create_pick_wave(WaveFakeSession(scalars=[o1]), tenant_id=1, outbound_ids=[o1.id, o2.id])
+    assert exc.value.status_code == 404
+
+    with pytest.raises(HTTPException) as exc:
+        create_pick_wave(WaveFakeSession(scalars=[o1, o2]), tenant_id=1, outbound_ids=[o1.id, o2.id])
+    assert exc.value.status_code == 400
+
+
+def test_zone_split_creates_one_routed_sub_task_per_zone():
+    o = _order()
+    p1, p2 = uuid.uuid4(), uuid.uuid4()
+    chilled, storage = _loc("C01-01", "1", "01", zone_id=7), _loc("A02-03", "2", "03", zone_id=3)
+    db = WaveFakeSession(rows=[(_res(o, p1, chilled, 2), chilled), (_res(o, p2, storage, 4), storage)])
+
+    tasks = create_zone_picking_tasks(db, tenant_id=1, order=o)
+
+    assert [(t.zone_id, t.outbound_id) for t in tasks] == [(3, o.id), (7, o.id)]
+    lines = [a for a in db.added if isinstance(a, PickingTaskLine)]
+    assert [(line.picking_task_id, line.product_id, line.pick_seq) for line in lines] == [
+        (tasks[0].id, p2, 0),
+        (tasks[1].id, p1, 0),
+    ]
+    assert [a.picking_task_id for a in db.added if isinstance(a, PickingTaskOrder)] == [t.id for t in tasks]
+    assert o.status == "PICKING"
+
+
+def test_consolidation_waits_for_all_sub_tasks(monkeypatch):
+    done, pending = _order(), _order()
+    done.status = pending.status = "PICKING"
+    monkeypatch.setattr(
+        "app.services.picking_service.order_picking_done", lambda _db, *, outbound_id: outbound_id == done.id
+    )
+    db = WaveFakeSession(scalars=[done, pending])
+
+    moved = consolidate_orders(db, task=SimpleNamespace(id=uuid.uuid4(), tenant_id=1))
+
+    assert moved == [done]
+    assert (done.status, pending.status) == ("PACKING", "PICKING")
+
+
+def test_zone_queue_depth_counts_unfinished_work_per_zone():
+    db = WaveFakeSession(rows=[(3, "Chilled", "STORAGE", 2, 1, 5, 17), (None, None, None, 1, 0, 2, 4)])
+
+    queue = zone_queue_depth(db, tenant_id=1)
+
+    assert queue[0] == {
+        "zone_id": 3,
+        "zone_name": "Chilled",
+        "zone_type": "STORAGE",
+        "open_tasks": 2,
+        "in_progress_tasks": 1,
+        "open_lines": 5,
+        "units_to_pick": 17,
+    }
+    assert queue[1]["zone_id"] is None
+    assert "picking_tasks.status != " in db.last_sql
+    assert "GROUP BY picking_tasks.zone_id" in db.last_sql
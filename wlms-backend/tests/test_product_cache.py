@@ -0,0 +1,159 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class before models are built)
+from app.services import product_cache
+from app.services.product_cache import CachedProduct, ProductCache, barcode_key, id_key
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class ProductFakeSession:
+    """Returns the given products for any product query; records the SQL."""
+
+    def __init__(self, products=()):
+        self.products = products
+        self.statements = []
+        self.info = {}
+
+    def scalars(self, stmt, execution_options=None):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Rows(self.products)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self):
+        return self
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def execute(self):
+        return None
+
+    def delete(self, *keys):
+        for k in keys:
+            self.data.pop(k, None)
+
+
+def _product(barcode="111", **kw):
+    return SimpleNamespace(
+        **{
+            "id": uuid.uuid4(),
+            "tenant_id": 1,
+            "client_id": uuid.UUID(int=1),
+            "sku": f"SKU-{barcode}",
+            "name": "Widget",
+            "barcode": barcode,
+            "uom": "piece",
+            "carton_qty": 12,
+            "pallet_qty": None,
+            "lot_tracking_enabled": False,
+            "expiry_tracking_enabled": True,
+            **kw,
+        }
+    )
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    c = ProductCache(ttl_seconds=60, max_entries=100)
+    monkeypatch.setattr(product_cache, "_cache", c)
+    monkeypatch.setattr(product_cache.settings, "product_cache_enabled", True)
+    return c
+
+
+def test_barcode_and_id_lookups_hit_after_one_query(cache):
+    p = _product()
+    db = ProductFakeSession([p])
+
+    first = product_cache.get_by_barcodes(db, tenant_id=1, client_id=p.client_id, barcodes=["111", "999"])
+    again = product_cache.get_by_barcode(db, tenant_id=1, client_id=p.client_id, barcode="111")
+    by_id = product_cache.get_by_id(db, tenant_id=1, product_id=p.id)
+
+    assert first["111"] == again == by_id == CachedProduct.from_model(p)
+    assert "999" not in first
+    assert len(db.statements) == 1 and "products.barcode IN (" in db.statements[0]
+    stats = product_cache.stats()
+    assert (stats["local_hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_invalidation_drops_both_keys_now_and_after_commit(cache):
+    p = _product()
+    db = ProductFakeSession([p])
+    product_cache.get_by_id(db, tenant_id=1, product_id=p.id)
+    assert cache.get_many([barcode_key(1, p.client_id, "111")])
+
+    writer = ProductFakeSession()
+    product_cache.invalidate(writer, [p])
+    assert cache.get_many([id_key(1, p.id), barcode_key(1, p.client_id, "111")]) == {}
+
+    # A lookup through the writing session itself is not stored (its change is not committed yet).
+    writer.products = [p]
+    product_cache.get_by_id(writer, tenant_id=1, product_id=p.id)
+    assert cache.stats()["entries"] == 0
+
+    # Another session re-caches the old row before the commit; the commit drops it again.
+    product_cache.get_by_id(db, tenant_id=1, product_id=p.id)
+    assert cache.stats()["entries"] == 2
+    product_cache._invalidate_after_commit(writer)
+    assert cache.stats()["entries"] == 0 and product_cache._PENDING not in writer.info
+
+
+def test_load_racing_an_invalidation_is_not_stored(cache):
+    p = CachedProduct.from_model(_product())
+    generation = cache.generation()
+    cache.invalidate([id_key(1, p.id)])
+    cache.put_many([p], generation=generation)
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(product_cache.time, "monotonic", lambda: now[0])
+    c = ProductCache(ttl_seconds=10, max_entries=3)
+    a, b = CachedProduct.from_model(_product("A")), CachedProduct.from_model(_product("B"))
+
+    c.put_many([a], generation=c.generation())
+    c.get_many([id_key(1, a.id)])  # a is now most recently used
+    c.put_many([b], generation=c.generation())
+    stats = c.stats()
+    assert (stats["entries"], stats["evictions"]) == (3, 1)
+    # a's barcode key was the least recently used; its id key was just read
+    a_keys = [id_key(1, a.id), barcode_key(1, a.client_id, "A")]
+    assert list(c.get_many(a_keys)) == [id_key(1, a.id)]
+
+    now[0] += 11
+    assert c.get_many([id_key(1, b.id)]) == {}
+    assert c.stats()["misses"] == 2
+
+
+def test_redis_tier_is_shared_and_invalidated():
+    r = FakeRedis()
+    worker1 = ProductCache(ttl_seconds=60, max_entries=100, redis_ttl_seconds=300, redis_client=lambda: r)
+    worker2 = ProductCache(ttl_seconds=60, max_entries=100, redis_ttl_seconds=300, redis_client=lambda: r)
+    p = CachedProduct.from_model(_product())
+
+    worker1.put_many([p], generation=worker1.generation())
+    key = barcode_key(1, p.client_id, "111")
+    assert worker2.get_many([key]) == {key: p}
+    assert worker2.stats()["redis_hits"] == 1
+
+    worker1.invalidate([key])
+    assert key not in r.data
@@ -0,0 +1,102 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.api.v1.router  # noqa: F401  (registers every mapped class)
+from app.api.v1.routes_putaway import list_putaway_tasks
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class QueueFakeSession:
+    def __init__(self, *, rows=(), count=None):
+        self.rows = rows
+        self.count = count
+        self.sql = []
+
+    def _record(self, stmt):
+        self.sql.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+    def execute(self, stmt):
+        self._record(stmt)
+        return _Rows(self.rows)
+
+    def scalar(self, stmt):
+        self._record(stmt)
+        return self.count
+
+
+def _call(db, **kw):
+    args = dict(warehouse_id=None, zone_id=None, client_id=None, after=None, limit=100, count_only=False)
+    return list_putaway_tasks(**{**args, **kw}, db=db, user=SimpleNamespace(tenant_id=1))
+
+
+def _row():
+    loc = SimpleNamespace(id=uuid.uuid4(), warehouse_id=uuid.UUID(int=2))
+    bal = SimpleNamespace(
+        id=uuid.uuid4(),
+        client_id=uuid.UUID(int=1),
+        warehouse_id=loc.warehouse_id,
+        product_id=uuid.uuid4(),
+        batch_id=None,
+        location_id=loc.id,
+        on_hand_qty=4,
+        available_qty=4,
+    )
+    return bal, loc
+
+
+def test_page_is_keyset_ordered_and_suggests_for_the_page_only(monkeypatch):
+    seen = []
+    monkeypatch.setattr(
+        "app.api.v1.routes_putaway.suggest_locations",
+        lambda _db, *, tenant_id, requests: seen.extend(requests) or [None] * len(requests),
+    )
+    rows = [_row() for _ in range(3)]
+    db = QueueFakeSession(rows=rows)
+    after = f"{uuid.UUID(int=7)}:{uuid.UUID(int=8)}"
+
+    page = _call(db, limit=2, after=after, zone_id=5, warehouse_id=str(uuid.UUID(int=2)))
+
+    assert [t.from_location_id for t in page.items] == [rows[0][1].id, rows[1][1].id]
+    assert page.next_cursor == f"{rows[1][0].location_id}:{rows[1][0].id}"
+    assert len(seen) == 2
+    sql = db.sql[0]
+    assert "(inventory_balances.location_id, inventory_balances.id) > (" in sql
+    assert "ORDER BY inventory_balances.location_id, inventory_balances.id" in sql
+    assert "\n LIMIT %(param_" in sql
+    assert "warehouse_zones.zone_type = " in sql and "locations.zone_id = " in sql
+    assert "inventory_balances.available_qty > " in sql
+
+
+def test_last_page_has_no_cursor(monkeypatch):
+    monkeypatch.setattr("app.api.v1.routes_putaway.suggest_locations", lambda _db, *, tenant_id, requests: [])
+    page = _call(QueueFakeSession())
+    assert page.items == [] and page.next_cursor is None
+
+
+def test_count_only_skips_rows_and_suggestions(monkeypatch):
+    monkeypatch.setattr("app.api.v1.routes_putaway.suggest_locations", lambda *_a, **_k: 1 / 0)
+    db = QueueFakeSession(count=1234)
+
+    page = _call(db, count_only=True, client_id=str(uuid.UUID(int=1)))
+
+    assert (page.count, page.items) == (1234, [])
+    assert db.sql[0].startswith("SELECT count(*) AS count_1 \nFROM inventory_balances")
+    assert "inventory_balances.client_id = " in db.sql[0]
+
+
+@pytest.mark.parametrize("kw", [{"after": "nope"}, {"after": "a:b"}, {"client_id": "x"}, {"warehouse_id": "x"}])
+def test_bad_filters_are_rejected(kw):
+    with pytest.raises(HTTPException) as exc:
+        _call(QueueFakeSession(), **kw)
+    assert exc.value.status_code == 400
@@ -0,0 +1,159 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services import ledger_jobs
+from app.services.reservation_service import (
+    consume_reservations,
+    release_expired_reservations,
+    release_order_reservations,
+    reservation_expiry,
+)
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class ReleaseFakeSession:
+    """Answers the DELETE ... RETURNING and balance UPDATE ... RETURNING, records every statement."""
+
+    def __init__(self, *, released, balances, orders=()):
+        self.released = released
+        self.balances = balances
+        self.orders = orders
+        self.statements = []
+
+    def execute(self, stmt, execution_options=None):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        if sql.startswith("DELETE FROM inventory_reservations"):
+            return _Rows(self.released)
+        if sql.startswith("UPDATE inventory_balances"):
+            return _Rows(self.balances)
+        return _Rows([])
+
+    def scalars(self, stmt, execution_options=None):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Rows(self.orders)
+
+    def expire(self, obj, attrs=None):
+        pass
+
+    def expunge(self, obj):
+        self.expunged = [*getattr(self, "expunged", []), obj]
+
+
+def _released(product_id, location_id, qty, batch_id=None):
+    return SimpleNamespace(
+        tenant_id=1,
+        client_id=uuid.UUID(int=1),
+        warehouse_id=uuid.UUID(int=2),
+        product_id=product_id,
+        batch_id=batch_id,
+        location_id=location_id,
+        qty_reserved=qty,
+    )
+
+
+def _order(status):
+    return SimpleNamespace(id=uuid.uuid4(), tenant_id=1, status=status)
+
+
+def test_release_is_set_based_and_returns_stock_to_balances(monkeypatch):
+    summary = []
+    monkeypatch.setattr("app.services.reservation_service.apply_availability_deltas", lambda _db, d: summary.extend(d))
+    p1, loc = uuid.uuid4(), uuid.uuid4()
+    balance_id = uuid.uuid4()
+    db = ReleaseFakeSession(
+        # Two orders holding the same balance
+        released=[_released(p1, loc, 2), _released(p1, loc, 3)],
+        balances=[SimpleNamespace(id=balance_id, tenant_id=1, product_id=p1, batch_id=None, location_id=loc)],
+    )
+
+    result = release_order_reservations(db, orders=[_order("APPROVED"), _order("SUBMITTED")])
+
+    assert (result.reservations, result.qty) == (2, 5)
+    delete_sql, balances_sql, lines_sql = db.statements
+    assert "RETURNING" in delete_sql
+    assert "IS NOT DISTINCT FROM" in balances_sql
+    assert lines_sql.startswith("UPDATE outbound_lines")
+    assert [(d.reserved, d.balance_id) for d in summary] == [(-5, balance_id)]
+
+
+def test_sweeper_skips_locked_orders_and_resubmits_approved_ones(monkeypatch):
+    monkeypatch.setattr("app.services.reservation_service.apply_availability_deltas", lambda *_a: None)
+    orders = [_order("APPROVED"), _order("SUBMITTED")]
+    db = ReleaseFakeSession(released=[], balances=[], orders=orders)
+
+    result = release_expired_reservations(db, tenant_id=1, limit=50)
+
+    assert result.outbound_ids == [o.id for o in orders]
+    select_sql = db.statements[0]
+    assert "inventory_reservations.expires_at <= now()" in select_sql
+    assert select_sql.rstrip().endswith("FOR UPDATE SKIP LOCKED")
+    assert db.statements[-1].startswith("UPDATE outbound_orders SET status")
+
+
+def test_reservation_expiry_follows_ttl_setting(monkeypatch):
+    monkeypatch.setattr(settings, "reservation_ttl_minutes", 0)
+    assert reservation_expiry() is None
+
+    monkeypatch.setattr(settings, "reservation_ttl_minutes", 30)
+    expires_at = reservation_expiry()
+    assert 29 * 60 < (expires_at - datetime.now(timezone.utc)).total_seconds() <= 30 * 60
+
+
+def test_consume_many_reservations_is_set_based(monkeypatch):
+    summary = []
+    monkeypatch.setattr("app.services.reservation_service.apply_availability_deltas", lambda _db, d: summary.extend(d))
+    p1, loc = uuid.uuid4(), uuid.uuid4()
+    emptied = SimpleNamespace(id=uuid.uuid4(), **vars(_released(p1, loc, 2)))
+    partial = SimpleNamespace(id=uuid.uuid4(), **vars(_released(p1, loc, 5)))
+    db = ReleaseFakeSession(released=[], balances=[])
+
+    consume_reservations(db, takes=[(emptied, 1), (partial, 2), (emptied, 1)])
+
+    balances_sql, reservations_sql, delete_sql = db.statements
+    assert balances_sql.startswith("UPDATE inventory_balances")
+    assert reservations_sql.startswith("UPDATE inventory_reservations")
+    assert delete_sql.startswith("DELETE FROM inventory_reservations")
+    assert [d.reserved for d in summary] == [-4]
+    assert db.expunged == [emptied]
+
+
+def test_release_expired_job_sweeps_all_tenants_until_a_short_batch(monkeypatch):
+    calls = []
+    sizes = iter([2, 2, 1])
+
+    class _Db:
+        commits = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def commit(self):
+            _Db.commits += 1
+
+    def _release(db, *, tenant_id, limit):
+        calls.append((tenant_id, limit))
+        return SimpleNamespace(outbound_ids=[uuid.uuid4() for _ in range(next(sizes))], reservations=1, qty=1)
+
+    monkeypatch.setattr(ledger_jobs, "SessionLocal", _Db)
+    monkeypatch.setattr(ledger_jobs, "release_expired_reservations", _release)
+    monkeypatch.setattr(ledger_jobs, "configure_logging", lambda: None)
+
+    ledger_jobs.main(["release-expired", "--batch-size", "2"])
+
+    assert calls == [(None, 2)] * 3
+    assert _Db.commits == 3
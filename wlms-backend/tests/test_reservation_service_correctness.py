@@ -1,10 +1,19 @@
+import itertools
 import uuid
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
 
 from app.models.inventory_reservation import InventoryReservation
-from app.services.reservation_service import consume_reservation
+from app.services.reservation_service import (
+    consume_reservation,
+    reserve_for_outbound,
+    reserve_for_outbound_line,
+    reserve_wave,
+)
 
 
 class FakeSession:
@@ -64,3 +73,243 @@ def test_consume_reservation_rejects_overconsume():
     assert e.value.status_code == 400
 
 
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class LockingFakeSession:
+    """Returns the given candidate rows for the SKIP LOCKED pass and `fallback_rows` for the blocking pass."""
+
+    def __init__(self, *, skip_locked_rows, fallback_rows):
+        self.skip_locked_rows = skip_locked_rows
+        self.fallback_rows = fallback_rows
+        self.statements = []
+        self.added = []
+
+    def execute(self, stmt, execution_options=None):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        return _Rows(self.skip_locked_rows if "SKIP LOCKED" in sql else self.fallback_rows)
+
+    def scalar(self, stmt):
+        return None
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def flush(self):
+        return None
+
+
+def _bal(*, on_hand, reserved=0, product_id=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        product_id=product_id,
+        batch_id=None,
+        location_id=uuid.uuid4(),
+        on_hand_qty=on_hand,
+        reserved_qty=reserved,
+        available_qty=on_hand - reserved,
+    )
+
+
+def test_locking_reserve_skips_locked_rows_and_updates_in_place(monkeypatch):
+    monkeypatch.setattr("app.services.reservation_service.adjust_reserved", lambda *_a, **_k: pytest.fail("no re-read"))
+    product_id = uuid.uuid4()
+    b1, b2 = _bal(on_hand=3, product_id=product_id), _bal(on_hand=5, product_id=product_id)
+    db = LockingFakeSession(skip_locked_rows=[(b1, None, None), (b2, None, None)], fallback_rows=[])
+
+    created = reserve_for_outbound_line(
+        db,
+        tenant_id=1,
+        outbound_id=uuid.uuid4(),
+        client_id=uuid.uuid4(),
+        warehouse_id=uuid.uuid4(),
+        product_id=product_id,
+        qty=4,
+        locking=True,
+    )
+
+    assert len(db.statements) == 2
+    assert "FOR UPDATE OF inventory_balances SKIP LOCKED" in db.statements[0]
+    assert db.statements[1].startswith("INSERT INTO inventory_availability")
+    assert (b1.reserved_qty, b1.available_qty) == (3, 0)
+    assert (b2.reserved_qty, b2.available_qty) == (1, 4)
+    assert [r.qty_reserved for r in created] == [3, 1]
+
+
+def test_locking_reserve_falls_back_to_blocking_fefo_lock():
+    product_id = uuid.uuid4()
+    b1 = _bal(on_hand=2, product_id=product_id)
+    db = LockingFakeSession(
+        skip_locked_rows=[(b1, None, None)],
+        fallback_rows=[(b1, None, None), (_bal(on_hand=9, product_id=product_id), None, None)],
+    )
+
+    reserve_for_outbound_line(
+        db,
+        tenant_id=1,
+        outbound_id=uuid.uuid4(),
+        client_id=uuid.uuid4(),
+        warehouse_id=uuid.uuid4(),
+        product_id=product_id,
+        qty=5,
+        locking=True,
+    )
+
+    assert len(db.statements) == 3
+    assert db.statements[1].rstrip().endswith("FOR UPDATE OF inventory_balances")
+
+
+
+class OrderFakeSession:
+    """Serves candidate rows to the SELECT and records every statement reserve_for_outbound issues."""
+
+    def __init__(self, *, candidate_rows, balance_rowcount):
+        self.candidate_rows = candidate_rows
+        self.balance_rowcount = balance_rowcount
+        self.statements = []
+
+    def execute(self, stmt, execution_options=None):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        return SimpleNamespace(all=lambda: list(self.candidate_rows), rowcount=self.balance_rowcount)
+
+    def scalars(self, stmt, execution_options=None):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Rows([])
+
+    def expire(self, obj, attrs=None):
+        return None
+
+
+def _order():
+    return SimpleNamespace(id=uuid.uuid4(), tenant_id=1, client_id=uuid.uuid4(), warehouse_id=uuid.uuid4())
+
+
+def _line(product_id, qty):
+    return SimpleNamespace(product_id=product_id, requested_qty=qty, reserved_qty=0)
+
+
+def test_reserve_for_outbound_uses_fixed_statement_count():
+    products = [uuid.uuid4() for _ in range(200)]
+    lines = [_line(pid, 3) for pid in products]
+    # Two locations per product; the first (FEFO) one only covers part of the line.
+    rows = [(_bal(on_hand=2, product_id=pid), None, None) for pid in products]
+    rows += [(_bal(on_hand=10, product_id=pid), None, None) for pid in products]
+    db = OrderFakeSession(candidate_rows=rows, balance_rowcount=400)
+
+    reserve_for_outbound(db, order=_order(), lines=lines, locking=True)
+
+    assert len(db.statements) == 5
+    select_sql, balances_sql, summary_sql, reservations_sql, lines_sql = db.statements
+    assert summary_sql.startswith("INSERT INTO inventory_availability")
+    assert "FOR UPDATE OF inventory_balances SKIP LOCKED" in select_sql
+    assert balances_sql.startswith("UPDATE inventory_balances")
+    assert "ON CONFLICT ON CONSTRAINT uq_inv_res_out_prod_batch_loc DO UPDATE" in reservations_sql
+    assert lines_sql.startswith("UPDATE outbound_lines")
+
+
+def test_reserve_for_outbound_is_all_or_nothing():
+    p1, p2 = uuid.uuid4(), uuid.uuid4()
+    db = OrderFakeSession(candidate_rows=[(_bal(on_hand=5, product_id=p1), None, None)], balance_rowcount=1)
+
+    with pytest.raises(HTTPException) as e:
+        reserve_for_outbound(db, order=_order(), lines=[_line(p1, 2), _line(p2, 1)], locking=False)
+    assert e.value.status_code == 409
+    assert len(db.statements) == 1
+
+
+def test_reserve_for_outbound_conflicts_when_balance_guard_fails():
+    p1 = uuid.uuid4()
+    rows = [(_bal(on_hand=1, product_id=p1), None, None), (_bal(on_hand=1, product_id=p1), None, None)]
+    # Optimistic mode: a concurrent approver drained one of the rows between SELECT and UPDATE.
+    db = OrderFakeSession(candidate_rows=rows, balance_rowcount=1)
+
+    with pytest.raises(HTTPException) as e:
+        reserve_for_outbound(db, order=_order(), lines=[_line(p1, 2)], locking=False)
+    assert e.value.status_code == 409
+
+
+class WaveFakeSession(OrderFakeSession):
+    """OrderFakeSession that also serves the wave's order and line queries."""
+
+    def __init__(self, *, orders, lines, candidate_rows, balance_rowcount):
+        super().__init__(candidate_rows=candidate_rows, balance_rowcount=balance_rowcount)
+        self.orders = orders
+        self.lines = lines
+
+    def scalars(self, stmt, execution_options=None):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        if sql.startswith("SELECT outbound_orders"):
+            return _Rows(self.orders)
+        if sql.startswith("SELECT outbound_lines"):
+            return _Rows(self.lines)
+        return _Rows([])
+
+
+def _wave_order(client_id, warehouse_id, *, ship=None, minute=0):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        tenant_id=1,
+        client_id=client_id,
+        warehouse_id=warehouse_id,
+        status="SUBMITTED",
+        requested_ship_date=ship,
+        created_at=datetime(2026, 2, 1, 12, minute, tzinfo=timezone.utc),
+    )
+
+
+_line_ids = itertools.count(1)
+
+
+def _wave_line(order, product_id, qty):
+    return SimpleNamespace(
+        id=next(_line_ids), outbound_id=order.id, product_id=product_id, requested_qty=qty, reserved_qty=0
+    )
+
+
+def _wave_setup():
+    client_id, warehouse_id, product_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    a = _wave_order(client_id, warehouse_id, ship=date(2026, 2, 10))
+    b = _wave_order(client_id, warehouse_id, ship=date(2026, 2, 5))
+    c = _wave_order(client_id, warehouse_id, minute=1)
+    lines = [_wave_line(a, product_id, 3), _wave_line(b, product_id, 4), _wave_line(c, product_id, 2)]
+    rows = [(_bal(on_hand=2, product_id=product_id), None, None), (_bal(on_hand=3, product_id=product_id), None, None)]
+    return (a, b, c), lines, rows
+
+
+def test_wave_allocates_by_ship_date_with_fixed_statement_count():
+    (a, b, c), lines, rows = _wave_setup()
+    db = WaveFakeSession(orders=[a, b, c], lines=lines, candidate_rows=rows, balance_rowcount=2)
+
+    result = reserve_wave(db, tenant_id=1, outbound_ids=[a.id, b.id, c.id, uuid.uuid4()], locking=True)
+
+    assert result.fully_allocated == [b.id]
+    assert result.partially_allocated == [a.id]
+    assert result.not_allocated == [c.id]
+    assert len(result.skipped) == 1
+    # orders, lines, candidates, balances, summary, reservations, line reserved_qty, order status
+    assert len(db.statements) == 8
+    assert db.statements[0].rstrip().endswith("FOR UPDATE")
+    assert db.statements[2].rstrip().endswith("FOR UPDATE OF inventory_balances")
+    assert db.statements[6].startswith("UPDATE outbound_lines")
+    assert db.statements[7].startswith("UPDATE outbound_orders")
+
+
+def test_wave_by_priority_without_partials_keeps_stock_for_later_orders():
+    (a, b, c), lines, rows = _wave_setup()
+    db = WaveFakeSession(orders=[a, b, c], lines=lines, candidate_rows=rows, balance_rowcount=2)
+
+    result = reserve_wave(db, tenant_id=1, outbound_ids=[a.id, b.id, c.id], sort="priority", allow_partial=False)
+
+    assert result.fully_allocated == [a.id, c.id]
+    assert result.partially_allocated == []
+    assert result.not_allocated == [b.id]
@@ -0,0 +1,93 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import slotting_service
+from app.services.slotting_service import SlotRequest, suggest_locations
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class SlottingFakeSession:
+    """scalars(): the warehouse's STORAGE locations; execute(): pick counts, then current occupancy."""
+
+    def __init__(self, *, locations, picks, occupancy):
+        self.locations = locations
+        self.executes = [picks, occupancy]
+        self.loads = 0
+
+    def scalars(self, stmt, execution_options=None):
+        self.loads += 1
+        return _Rows(self.locations)
+
+    def execute(self, stmt, execution_options=None):
+        return _Rows(self.executes.pop(0))
+
+
+WH = uuid.UUID(int=9)
+
+
+def _loc(code, aisle, rack):
+    return SimpleNamespace(id=uuid.uuid4(), code=code, zone_id=1, aisle=aisle, rack=rack, level="1", bin="1")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    slotting_service.invalidate()
+    yield
+    slotting_service.invalidate()
+
+
+def test_fast_movers_go_near_the_pick_face_and_slow_movers_to_the_back():
+    near, mid, far = _loc("A01-01", "1", "01"), _loc("A02-10", "2", "10"), _loc("A05-40", "5", "40")
+    fast, slow = uuid.uuid4(), uuid.uuid4()
+    db = SlottingFakeSession(locations=[far, near, mid], picks=[(fast, 90), (slow, 1)], occupancy=[])
+
+    out = suggest_locations(
+        db,
+        tenant_id=1,
+        requests=[SlotRequest(WH, fast, None), SlotRequest(WH, slow, None)],
+    )
+
+    assert [(s.location_id, s.reason) for s in out] == [(near.id, "EMPTY"), (far.id, "EMPTY")]
+
+
+def test_consolidates_with_same_sku_and_spreads_new_skus():
+    a, b, c = _loc("A01-01", "1", "01"), _loc("A01-02", "1", "02"), _loc("A01-03", "1", "03")
+    p, other = uuid.uuid4(), uuid.uuid4()
+    batch = uuid.uuid4()
+    db = SlottingFakeSession(locations=[a, b, c], picks=[], occupancy=[(c.id, p, batch), (a.id, other, None)])
+
+    out = suggest_locations(
+        db,
+        tenant_id=1,
+        requests=[
+            SlotRequest(WH, p, batch),  # same product and batch already in c
+            SlotRequest(WH, p, None),  # same product, other batch: not mixed into c
+            SlotRequest(WH, uuid.uuid4(), None),  # nothing free left: shares the emptiest fit
+        ],
+    )
+
+    assert [(s.location_id, s.reason) for s in out[:2]] == [(c.id, "CONSOLIDATE"), (b.id, "EMPTY")]
+    assert out[2].reason == "SHARED"
+    assert out[0].score > out[1].score > out[2].score
+
+
+def test_candidates_are_cached_per_warehouse():
+    loc = _loc("A01-01", "1", "01")
+    db = SlottingFakeSession(locations=[loc], picks=[], occupancy=[])
+    suggest_locations(db, tenant_id=1, requests=[SlotRequest(WH, uuid.uuid4(), None)])
+
+    db.executes = [[]]  # occupancy only: candidates and velocity come from the cache
+    out = suggest_locations(db, tenant_id=1, requests=[SlotRequest(WH, uuid.uuid4(), None)])
+
+    assert db.loads == 1
+    assert out[0].location_id == loc.id
+    assert suggest_locations(db, tenant_id=1, requests=[]) == []
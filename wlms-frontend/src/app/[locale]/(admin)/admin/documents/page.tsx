@@ -16,9 +16,22 @@ type FileItem = {
   original_name: string;
   mime_type: string;
   size_bytes: number;
+  status: string;
   created_at: string;
 };
 
+// A queued document is built by the document worker; its download answers 202 + Retry-After until then.
+const MAX_DOWNLOAD_POLLS = 30;
+
+async function fetchWhenReady(url: string, headers: HeadersInit | undefined): Promise<Response> {
+  for (let i = 0; ; i++) {
+    const res = await fetch(url, { headers });
+    if (res.status !== 202 || i >= MAX_DOWNLOAD_POLLS) return res;
+    const wait = Number(res.headers.get("Retry-After")) || 2;
+    await new Promise((resolve) => setTimeout(resolve, wait * 1000));
+  }
+}
+
 export default function AdminDocumentsPage() {
   useRequireAuth();
   const t = useTranslations("pages.adminDocuments");
@@ -89,6 +102,7 @@ export default function AdminDocumentsPage() {
               { header: t("type"), cell: (f) => f.file_type },
               { header: t("name"), cell: (f) => f.original_name },
               { header: t("size"), cell: (f) => String(f.size_bytes) },
+              { header: t("status"), cell: (f) => f.status },
               { header: t("created"), cell: (f) => f.created_at },
               {
                 header: "",
@@ -96,14 +110,16 @@ export default function AdminDocumentsPage() {
                   <button
                     className="btn btn-primary"
                     type="button"
+                    disabled={f.status === "FAILED"}
                     onClick={async () => {
                       setError(null);
                       try {
                         const token = getAccessToken();
-                        const res = await fetch(`${apiBaseUrl()}/api/v1/files/${f.id}/download`, {
-                          headers: token ? { Authorization: `Bearer ${token}` } : undefined,
-                        });
-                        if (!res.ok) throw new Error(await res.text());
+                        const res = await fetchWhenReady(
+                          `${apiBaseUrl()}/api/v1/files/${f.id}/download`,
+                          token ? { Authorization: `Bearer ${token}` } : undefined
+                        );
+                        if (res.status !== 200) throw new Error(await res.text());
                         const blob = await res.blob();
                         const url = URL.createObjectURL(blob);
                         const a = document.createElement("a");
@@ -120,7 +136,7 @@ export default function AdminDocumentsPage() {
                       }
                     }}
                   >
-                    {t("download")}
+                    {f.status === "FAILED" ? t("failed") : f.status === "PENDING" ? t("pending") : t("download")}
                   </button>
                 ),
               },
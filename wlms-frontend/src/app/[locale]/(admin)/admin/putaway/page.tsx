@@ -27,8 +27,8 @@ export default function AdminPutawayPage() {
   const [qty, setQty] = useState(1);
 
   async function load() {
-    const data = await api<Task[]>("/api/v1/putaway/tasks");
-    setItems(data);
+    const data = await api<{ items: Task[] }>("/api/v1/putaway/tasks?limit=500");
+    setItems(data.items);
   }
 
   useEffect(() => {
@@ -13,6 +13,7 @@ type FileItem = {
   original_name: string;
   mime_type: string;
   size_bytes: number;
+  status: string;
   created_at: string;
 };
 
@@ -90,9 +91,14 @@ export default function ClientDocumentsPage() {
                   <td className="py-2">{f.file_type}</td>
                   <td className="py-2">{f.original_name}</td>
                   <td className="py-2">
-                    <a className="btn btn-primary" href={`${apiBaseUrl()}/api/v1/files/${f.id}/download`}>
-                      {c("download")}
-                    </a>
+                    {/* Queued documents are built by the document worker; link them once they are READY */}
+                    {f.status === "READY" ? (
+                      <a className="btn btn-primary" href={`${apiBaseUrl()}/api/v1/files/${f.id}/download`}>
+                        {c("download")}
+                      </a>
+                    ) : (
+                      <span className="text-muted">{f.status === "FAILED" ? t("failed") : t("pending")}</span>
+                    )}
                   </td>
                 </tr>
               ))}
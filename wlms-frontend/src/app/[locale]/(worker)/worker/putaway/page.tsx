@@ -38,8 +38,8 @@ export default function WorkerPutawayPage() {
   const [overrideGranted, setOverrideGranted] = useState(false);
 
   async function load() {
-    const data = await api<Task[]>("/api/v1/putaway/tasks");
-    setTasks(data);
+    const data = await api<{ items: Task[] }>("/api/v1/putaway/tasks?limit=500");
+    setTasks(data.items);
   }
 
   useEffect(() => {